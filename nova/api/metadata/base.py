@@ -16,12 +16,14 @@
 
 """Instance Metadata information."""
 
+import hashlib
 import os
 import posixpath
 
 from oslo_log import log as logging
 from oslo_serialization import base64
 from oslo_serialization import jsonutils
+from oslo_utils import encodeutils
 from oslo_utils import timeutils
 import six
 
@@ -196,6 +198,8 @@ class InstanceMetadata(object):
 
         self.route_configuration = None
 
+        self.fingerprint = self._get_fingerprint(network_info)
+
         # NOTE(mikal): the decision to not pass extra_md here like we
         # do to the StaticJSON driver is deliberate. extra_md will
         # contain the admin password for the instance, and we shouldn't
@@ -209,6 +213,25 @@ class InstanceMetadata(object):
                 network_info=network_info, context=request_context)
         }
 
+    def _get_fingerprint(self, network_info):
+        """Return a digest of the data the metadata is rendered from.
+
+        The fingerprint changes whenever the instance, its metadata, network
+        information or keys change, so it can be used to cache the rendered
+        metadata responses.
+        """
+        keypairs = [(keypair.name, keypair.public_key)
+                    for keypair in self.instance.keypairs or []]
+        data = [self.uuid, self.address,
+                self.instance.get('updated_at', None), self.launch_metadata,
+                self.extra_md, network_info,
+                self.instance.get('key_name', None),
+                self.instance.get('key_data', None), keypairs,
+                [sg['name'] for sg in self.security_groups], self.mappings,
+                self.files]
+        return hashlib.sha256(
+            encodeutils.to_utf8(jsonutils.dumps(data))).hexdigest()
+
     def _route_configuration(self):
         if self.route_configuration:
             return self.route_configuration
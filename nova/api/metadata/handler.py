@@ -18,6 +18,7 @@
 import hashlib
 import hmac
 import os
+import posixpath
 
 from oslo_log import log as logging
 from oslo_utils import encodeutils
@@ -33,6 +34,7 @@ import nova.conf
 from nova import context as nova_context
 from nova import exception
 from nova.i18n import _
+from nova.network import address_index
 from nova.network.neutronv2 import api as neutronapi
 
 CONF = nova.conf.CONF
@@ -68,6 +70,7 @@ class MetadataRequestHandler(wsgi.Application):
 
         if CONF.api.metadata_cache_expiration > 0:
             self._cache.set(cache_key, data)
+        self._precompute_responses(data)
 
         return data
 
@@ -85,9 +88,61 @@ class MetadataRequestHandler(wsgi.Application):
 
         if CONF.api.metadata_cache_expiration > 0:
             self._cache.set(cache_key, data)
+        self._precompute_responses(data)
 
         return data
 
+    @staticmethod
+    def _response_cache_enabled():
+        return (CONF.api.metadata_response_cache and
+                CONF.api.metadata_cache_expiration > 0)
+
+    @staticmethod
+    def _get_response_cache_key(meta_data, path):
+        path = posixpath.normpath('/' + path.lstrip('/'))
+        digest = hashlib.sha256(encodeutils.to_utf8(path)).hexdigest()
+        return 'metadata-response-%s-%s' % (meta_data.fingerprint, digest)
+
+    def _render(self, meta_data, path):
+        """Render a metadata path.
+
+        :returns: A (body, mimetype) tuple, or the callable handling the path
+        :raises: InvalidMetadataPath if the path does not exist
+        """
+        data = meta_data.lookup(path)
+        if callable(data):
+            return data
+        body = encodeutils.to_utf8(base.ec2_md_print(data))
+        return body, meta_data.get_mimetype()
+
+    def _get_response(self, meta_data, path):
+        """Return the rendered metadata path, from the cache if possible."""
+        if not self._response_cache_enabled():
+            return self._render(meta_data, path)
+
+        cache_key = self._get_response_cache_key(meta_data, path)
+        response = self._cache.get(cache_key)
+        if response:
+            LOG.debug("Using cached response for metadata path %s", path)
+            return response
+
+        response = self._render(meta_data, path)
+        # NOTE: Callables handle the request themselves, e.g. to set the
+        # password, so they can't be cached.
+        if not callable(response):
+            self._cache.set(cache_key, response)
+        return response
+
+    def _precompute_responses(self, meta_data):
+        """Render and cache the configured paths of new instance metadata."""
+        if not self._response_cache_enabled():
+            return
+        for path in CONF.api.metadata_response_precompute:
+            try:
+                self._get_response(meta_data, path)
+            except base.InvalidMetadataPath:
+                LOG.debug("Unable to precompute metadata path %s", path)
+
     @webob.dec.wsgify(RequestClass=wsgi.Request)
     def __call__(self, req):
         if os.path.normpath(req.path_info) == "/":
@@ -114,17 +169,19 @@ class MetadataRequestHandler(wsgi.Application):
             raise webob.exc.HTTPNotFound()
 
         try:
-            data = meta_data.lookup(req.path_info)
+            response = self._get_response(meta_data, req.path_info)
         except base.InvalidMetadataPath:
             raise webob.exc.HTTPNotFound()
 
-        if callable(data):
-            return data(req, meta_data)
-
-        resp = base.ec2_md_print(data)
-        req.response.body = encodeutils.to_utf8(resp)
+        if callable(response):
+            return response(req, meta_data)
 
-        req.response.content_type = meta_data.get_mimetype()
+        body, content_type = response
+        req.response.body = body
+        req.response.content_type = content_type
+        # Let clients revalidate the responses with If-None-Match.
+        req.response.etag = hashlib.sha256(body).hexdigest()
+        req.response.conditional_response = True
         return req.response
 
     def _handle_remote_ip_request(self, req):
@@ -178,6 +235,62 @@ class MetadataRequestHandler(wsgi.Application):
         return self._get_meta_by_instance_id(instance_id, tenant_id,
                                              remote_address)
 
+    def _get_provider_networks(self, context, neutron, provider_id):
+        """Get the ids of the networks connected to a metadata provider."""
+        cache_key = 'metadata-provider-%s' % provider_id
+        md_networks = self._cache.get(cache_key)
+        if md_networks is not None:
+            return md_networks
+
+        md_subnets = neutron.list_subnets(
+            context,
+            advanced_service_providers=[provider_id],
+            fields=['network_id'])
+        md_networks = [subnet['network_id']
+                       for subnet in md_subnets['subnets']]
+
+        if (CONF.api.metadata_address_index and
+                CONF.api.metadata_cache_expiration > 0):
+            self._cache.set(cache_key, md_networks)
+
+        return md_networks
+
+    def _get_meta_by_indexed_address(self, provider_id, instance_address):
+        """Get the metadata of the instance indexed with an address in one
+        of the networks of a metadata provider.
+
+        :returns: The InstanceMetadata, or None if the address is not indexed
+        """
+        if not CONF.api.metadata_address_index:
+            return None
+        context = nova_context.get_admin_context()
+        neutron = neutronapi.get_client(context, admin=True)
+        md_networks = self._get_provider_networks(context, neutron,
+                                                  provider_id)
+        instance_id = address_index.get_instance_uuid(instance_address,
+                                                      md_networks)
+        if instance_id is None:
+            return None
+
+        try:
+            meta_data = self.get_metadata_by_instance_id(instance_id,
+                                                         instance_address)
+        except Exception:
+            LOG.exception('Failed to get metadata for instance id: %s',
+                          instance_id)
+            meta_data = None
+        # NOTE: The instance found in the index must still have the address,
+        # which also stands for the tenant check done when the instance is
+        # found from its port.
+        if meta_data is None or not address_index.has_address(
+                meta_data.instance.info_cache.network_info,
+                instance_address, network_ids=md_networks):
+            LOG.debug('Ignoring stale index entry of fixed IP %(ip)s for '
+                      'instance %(uuid)s',
+                      {'ip': instance_address, 'uuid': instance_id})
+            return None
+        return meta_data
+
     def _get_instance_id_from_lb(self, provider_id, instance_address):
         # We use admin context, admin=True to lookup the
         # inter-Edge network port
@@ -198,13 +311,8 @@ class MetadataRequestHandler(wsgi.Application):
         #  read the instance_id, tenant_id from that port entry.
 
         # Retrieve networks which are connected to metadata provider
-        md_subnets = neutron.list_subnets(
-            context,
-            advanced_service_providers=[provider_id],
-            fields=['network_id'])
-
-        md_networks = [subnet['network_id']
-                       for subnet in md_subnets['subnets']]
+        md_networks = self._get_provider_networks(context, neutron,
+                                                  provider_id)
 
         try:
             # Retrieve the instance data from the instance's port
@@ -252,6 +360,11 @@ class MetadataRequestHandler(wsgi.Application):
             self._validate_shared_secret(provider_id, signature,
                                          instance_address)
 
+        meta_data = self._get_meta_by_indexed_address(provider_id,
+                                                      instance_address)
+        if meta_data is not None:
+            return meta_data
+
         instance_id, tenant_id = self._get_instance_id_from_lb(
             provider_id, instance_address)
         LOG.debug('Instance %s with address %s matches provider %s',
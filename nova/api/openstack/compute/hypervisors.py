@@ -51,8 +51,9 @@ class HypervisorsController(wsgi.Controller):
         super(HypervisorsController, self).__init__()
 
     def _view_hypervisor(self, hypervisor, service, detail, req, servers=None,
-                         **kwargs):
-        alive = self.servicegroup_api.service_is_up(service)
+                         alive=None, **kwargs):
+        if alive is None:
+            alive = self.servicegroup_api.service_is_up(service)
         # The 2.53 microversion returns the compute node uuid rather than id.
         uuid_for_id = api_version_request.is_supported(
             req, min_version=UUID_FOR_ID_MIN_VERSION)
@@ -159,7 +160,7 @@ class HypervisorsController(wsgi.Controller):
                 msg = _('marker [%s] not found') % marker
                 raise webob.exc.HTTPBadRequest(explanation=msg)
 
-        hypervisors_list = []
+        found = []
         for hyp in compute_nodes:
             try:
                 instances = None
@@ -168,9 +169,7 @@ class HypervisorsController(wsgi.Controller):
                         context, hyp.host)
                 service = self.host_api.service_get_by_compute_host(
                     context, hyp.host)
-                hypervisors_list.append(
-                    self._view_hypervisor(
-                        hyp, service, detail, req, servers=instances))
+                found.append((hyp, service, instances))
             except (exception.ComputeHostNotFound,
                     exception.HostMappingNotFound):
                 # The compute service could be deleted which doesn't delete
@@ -180,6 +179,14 @@ class HypervisorsController(wsgi.Controller):
                           'service may be deleted and compute nodes need to '
                           'be manually cleaned up.', hyp.host)
 
+        alive = self.servicegroup_api.services_are_up(
+            [found_service for _hyp, found_service, _servers in found])
+        hypervisors_list = [
+            self._view_hypervisor(found_hyp, found_service, detail, req,
+                                  servers=found_servers, alive=is_up)
+            for (found_hyp, found_service, found_servers), is_up in zip(
+                found, alive)]
+
         hypervisors_dict = dict(hypervisors=hypervisors_list)
         if links:
             hypervisors_links = self._view_builder.get_links(
@@ -70,8 +70,9 @@ class ServiceController(wsgi.Controller):
 
         return _services
 
-    def _get_service_detail(self, svc, additional_fields, req):
-        alive = self.servicegroup_api.service_is_up(svc)
+    def _get_service_detail(self, svc, additional_fields, req, alive=None):
+        if alive is None:
+            alive = self.servicegroup_api.service_is_up(svc)
         state = (alive and "up") or "down"
         active = 'enabled'
         if svc['disabled']:
@@ -107,8 +108,10 @@ class ServiceController(wsgi.Controller):
 
     def _get_services_list(self, req, additional_fields=()):
         _services = self._get_services(req)
-        return [self._get_service_detail(svc, additional_fields, req)
-                for svc in _services]
+        alive = self.servicegroup_api.services_are_up(_services)
+        return [self._get_service_detail(svc, additional_fields, req,
+                                         alive=is_up)
+                for svc, is_up in zip(_services, alive)]
 
     def _enable(self, body, context):
         """Enable scheduling for a service."""
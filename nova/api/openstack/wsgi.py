@@ -14,24 +14,30 @@
 #    License for the specific language governing permissions and limitations
 #    under the License.
 
+import datetime
 import functools
+import uuid
 
 import microversion_parse
 from oslo_log import log as logging
 from oslo_serialization import jsonutils
 from oslo_utils import encodeutils
 from oslo_utils import strutils
+from oslo_utils import timeutils
 import six
 import webob
 
 from nova.api.openstack import api_version_request as api_version
 from nova.api.openstack import versioned_method
 from nova.api import wsgi
+import nova.conf
 from nova import exception
 from nova import i18n
 from nova.i18n import _
+from nova import policy
 
 
+CONF = nova.conf.CONF
 LOG = logging.getLogger(__name__)
 
 _SUPPORTED_CONTENT_TYPES = (
@@ -264,6 +270,24 @@ class JSONDeserializer(ActionDispatcher):
         return {'body': self._from_json(datastring)}
 
 
+def _json_default(value):
+    """Convert a value the JSON encoder does not know to a primitive.
+
+    The datetimes and the UUIDs, which make most of these values in the
+    views, are converted here as jsonutils.to_primitive() does, without going
+    through all of its checks.
+    """
+    if isinstance(value, datetime.datetime):
+        return value.strftime(timeutils.PERFECT_TIME_FORMAT)
+    if isinstance(value, uuid.UUID):
+        return six.text_type(value)
+    return jsonutils.to_primitive(value)
+
+
+def _json_dumps(data):
+    return six.text_type(jsonutils.dumps(data, default=_json_default))
+
+
 class JSONDictSerializer(ActionDispatcher):
     """Default JSON request body serialization."""
 
@@ -271,7 +295,35 @@ class JSONDictSerializer(ActionDispatcher):
         return self.dispatch(data, action=action)
 
     def default(self, data):
-        return six.text_type(jsonutils.dumps(data))
+        return _json_dumps(data)
+
+    def iterserialize(self, data, chunk_size):
+        """Serialize data in chunks.
+
+        The lists longer than chunk_size items found in the values of the
+        top level dict of data, like the lists of resources returned by the
+        listings, are serialized chunk_size items at a time. The
+        concatenation of the chunks is the same as the output of
+        serialize().
+        """
+        if (not isinstance(data, dict) or
+                not all(isinstance(key, six.string_types) for key in data)):
+            yield self.serialize(data)
+            return
+        yield u'{'
+        for index, (key, value) in enumerate(data.items()):
+            separator = u', ' if index else u''
+            if not isinstance(value, list) or len(value) <= chunk_size:
+                yield u'%s%s: %s' % (separator, _json_dumps(key),
+                                     _json_dumps(value))
+                continue
+            yield u'%s%s: [' % (separator, _json_dumps(key))
+            for start in six.moves.range(0, len(value), chunk_size):
+                # Strip the brackets of the list of the chunk.
+                chunk = _json_dumps(value[start:start + chunk_size])[1:-1]
+                yield u', ' + chunk if start else chunk
+            yield u']'
+        yield u'}'
 
 
 def response(code):
@@ -329,10 +381,18 @@ class ResponseObject(object):
 
         serializer = self.serializer
 
-        body = None
-        if self.obj is not None:
-            body = serializer.serialize(self.obj)
-        response = webob.Response(body=body)
+        chunk_size = CONF.api.response_chunk_size
+        if self.obj is not None and chunk_size:
+            # NOTE: Stream the body so that the serialized form of large
+            # listings is never held in memory at once.
+            response = webob.Response(app_iter=(
+                encodeutils.safe_encode(chunk)
+                for chunk in serializer.iterserialize(self.obj, chunk_size)))
+        else:
+            body = None
+            if self.obj is not None:
+                body = serializer.serialize(self.obj)
+            response = webob.Response(body=body)
         response.status_int = self.code
         for hdr, val in self._headers.items():
             if not isinstance(val, six.text_type):
@@ -587,8 +647,15 @@ class Resource(wsgi.Application):
         #            function.  If we try to audit __call__(), we can
         #            run into troubles due to the @webob.dec.wsgify()
         #            decorator.
-        return self._process_stack(request, action, action_args,
-                               content_type, body, accept)
+        context = request.environ.get('nova.context')
+        if context is None:
+            return self._process_stack(request, action, action_args,
+                                       content_type, body, accept)
+        # NOTE: Listing resources checks the same rules again and again,
+        # the policy decisions are cached for the duration of the request.
+        with policy.cache_decisions(context):
+            return self._process_stack(request, action, action_args,
+                                       content_type, body, accept)
 
     def _process_stack(self, request, action, action_args,
                        content_type, body, accept):
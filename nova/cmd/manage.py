@@ -27,6 +27,7 @@ import argparse
 import functools
 import re
 import sys
+import time
 import traceback
 
 from dateutil import parser as dateutil_parser
@@ -46,6 +47,7 @@ from sqlalchemy.engine import url as sqla_url
 
 from nova.api.ec2 import ec2utils
 from nova.cmd import common as cmd_common
+from nova.conductor import manager as conductor_manager
 import nova.conf
 from nova import config
 from nova import context
@@ -490,8 +492,14 @@ Error: %s""") % six.text_type(e))
                 'max_rows as a batch size for each iteration.'))
     @args('--purge', action='store_true', dest='purge', default=False,
           help='Purge all data from shadow tables after archive completes')
+    @args('--sleep', type=float, metavar='<seconds>', dest='sleep',
+          default=0,
+          help=('The amount of time in seconds to sleep between batches when '
+                '--until-complete is used. This lets database replicas '
+                'catch up and other transactions run between batches. '
+                'Defaults to 0.'))
     def archive_deleted_rows(self, max_rows=1000, verbose=False,
-                             until_complete=False, purge=False):
+                             until_complete=False, purge=False, sleep=0):
         """Move deleted rows from production tables to shadow tables.
 
         Returns 0 if nothing was archived, 1 if some number of rows were
@@ -503,6 +511,9 @@ Error: %s""") % six.text_type(e))
         if max_rows < 0:
             print(_("Must supply a positive value for max_rows"))
             return 2
+        if sleep < 0:
+            print(_("Must supply a non-negative value for sleep"))
+            return 2
         if max_rows > db.MAX_INT:
             print(_('max rows must be <= %(max_value)d') %
                   {'max_value': db.MAX_INT})
@@ -553,6 +564,8 @@ Error: %s""") % six.text_type(e))
                 break
             if verbose:
                 sys.stdout.write('.')
+            if sleep:
+                time.sleep(sleep)
         if verbose:
             if table_to_rows_archived:
                 self._print_dict(table_to_rows_archived, _('Table'),
@@ -577,11 +590,19 @@ Error: %s""") % six.text_type(e))
           help='Print information about purged records')
     @args('--all-cells', dest='all_cells', action='store_true', default=False,
           help='Run against all cell databases')
+    @args('--batch-size', type=int, metavar='<number>', dest='batch_size',
+          default=1000,
+          help='Number of rows deleted per transaction. Defaults to 1000.')
+    @args('--dry-run', dest='dry_run', action='store_true', default=False,
+          help='Only print how many rows would be purged from each table')
     def purge(self, before=None, purge_all=False, verbose=False,
-              all_cells=False):
+              all_cells=False, batch_size=1000, dry_run=False):
         if before is None and purge_all is False:
             print(_('Either --before or --all is required'))
             return 1
+        if batch_size < 1:
+            print(_('Must supply a positive value for batch_size'))
+            return 2
         if before:
             try:
                 before_date = dateutil_parser.parse(before, fuzzy=True)
@@ -592,7 +613,7 @@ Error: %s""") % six.text_type(e))
             before_date = None
 
         def status(msg):
-            if verbose:
+            if verbose or dry_run:
                 print('%s: %s' % (identity, msg))
 
         deleted = 0
@@ -608,13 +629,14 @@ Error: %s""") % six.text_type(e))
             for cell in cells:
                 identity = _('Cell %s') % cell.identity
                 with context.target_cell(admin_ctxt, cell) as cctxt:
-                    deleted += sa_db.purge_shadow_tables(cctxt,
-                                                         before_date,
-                                                         status_fn=status)
+                    deleted += sa_db.purge_shadow_tables(
+                        cctxt, before_date, status_fn=status,
+                        batch_size=batch_size, dry_run=dry_run)
         else:
             identity = _('DB')
-            deleted = sa_db.purge_shadow_tables(admin_ctxt,
-                                                before_date, status_fn=status)
+            deleted = sa_db.purge_shadow_tables(
+                admin_ctxt, before_date, status_fn=status,
+                batch_size=batch_size, dry_run=dry_run)
         if deleted:
             return 0
         else:
@@ -1668,12 +1690,79 @@ class CellV2Commands(object):
         return 0
 
 
+class HostCommands(object):
+    """Commands for managing the compute hosts."""
+
+    @args('--host', metavar='<host>', dest='host', required=True,
+          help=_('The compute host to drain.'))
+    @args('--block-migrate', action='store_true', dest='block_migration',
+          default=None,
+          help=_('Use block migration for all of the instances. By default '
+                 'the compute service decides based on the storage of each '
+                 'instance.'))
+    def drain(self, host, block_migration=None):
+        """Live migrate all the active and paused instances away from a host
+
+        The drain is run by this command, which prints its progress and
+        waits for all of the live migrations to complete. Interrupting the
+        command stops starting new live migrations, the ones in progress are
+        not aborted.
+
+        This command will return a non-zero exit code in the following cases.
+
+        * The host is not found.
+        * Some instances failed to be live migrated.
+        * The command is interrupted.
+
+        Returns 0 if all the instances which could be live migrated were.
+        """
+        ctxt = context.get_admin_context()
+        try:
+            host_mapping = objects.HostMapping.get_by_host(ctxt, host)
+        except exception.HostMappingNotFound:
+            print(_('The host %s was not found.') % host)
+            return 1
+
+        last_progress = {}
+
+        def _print_progress(progress):
+            # The migrations are polled every few seconds, only print the
+            # progress when it changes.
+            if progress != last_progress:
+                last_progress.update(progress)
+                print(_('%(migrated)d of %(total)d instances migrated, '
+                        '%(in_progress)d in progress, %(failed)d failed, '
+                        '%(skipped)d skipped.') % progress)
+
+        compute_task_mgr = conductor_manager.ComputeTaskManager()
+        with context.target_cell(ctxt, host_mapping.cell_mapping) as cctxt:
+            try:
+                result = compute_task_mgr.drain_host(
+                    cctxt, host, block_migration, None,
+                    progress_callback=_print_progress)
+            except KeyboardInterrupt:
+                print(_('Interrupted, the live migrations in progress are '
+                        'not aborted.'))
+                return 3
+
+        for instance_uuid in result['skipped']:
+            print(_('Instance %s was not live migrated, it is not active or '
+                    'paused, or it has a task in progress.') % instance_uuid)
+        for instance_uuid in result['failed']:
+            print(_('Instance %s failed to be live migrated.') %
+                  instance_uuid)
+        if result['failed']:
+            return 2
+        return 0
+
+
 CATEGORIES = {
     'api_db': ApiDbCommands,
     'cell': CellCommands,
     'cell_v2': CellV2Commands,
     'db': DbCommands,
     'floating': FloatingIpCommands,
+    'host': HostCommands,
     'network': NetworkCommands,
 }
 
@@ -63,7 +63,9 @@ from nova import hooks
 from nova.i18n import _
 from nova import image
 from nova import network
+from nova.network import address_index
 from nova.network import model as network_model
+from nova.network.security_group import bindings_cache
 from nova.network.security_group import openstack_driver
 from nova.network.security_group import security_group_base
 from nova import objects
@@ -4131,9 +4133,12 @@ class API(base.Base):
         """Use hotplug to add an network adapter to an instance."""
         self._record_action_start(
             context, instance, instance_actions.ATTACH_INTERFACE)
-        return self.compute_rpcapi.attach_interface(context,
-            instance=instance, network_id=network_id, port_id=port_id,
-            requested_ip=requested_ip, tag=tag)
+        try:
+            return self.compute_rpcapi.attach_interface(context,
+                instance=instance, network_id=network_id, port_id=port_id,
+                requested_ip=requested_ip, tag=tag)
+        finally:
+            bindings_cache.remove_instance(instance.uuid)
 
     @check_instance_lock
     @check_instance_state(vm_state=[vm_states.ACTIVE, vm_states.PAUSED,
@@ -4145,6 +4150,7 @@ class API(base.Base):
             context, instance, instance_actions.DETACH_INTERFACE)
         self.compute_rpcapi.detach_interface(context, instance=instance,
             port_id=port_id)
+        bindings_cache.remove_instance(instance.uuid)
 
     def get_instance_metadata(self, context, instance):
         """Get all metadata associated with an instance."""
@@ -4522,6 +4528,16 @@ class API(base.Base):
                 hosts_by_instance[instance.uuid].append(host)
 
         for event in events:
+            if event.name in ('network-changed', 'network-vif-deleted'):
+                # The fixed IPs of the instance are indexed again once the
+                # compute service refreshes its network info cache, its
+                # security groups are looked up again from Neutron.
+                address_index.remove_instance(event.instance_uuid)
+                bindings_cache.remove_instance(event.instance_uuid)
+            elif event.name == 'network-vif-plugged':
+                # The ports of the instance were bound, its security groups
+                # are looked up again from Neutron.
+                bindings_cache.remove_instance(event.instance_uuid)
             if event.name == 'volume-extended':
                 # Volume extend is a user-initiated operation starting in the
                 # Block Storage service API. We record an instance action so
@@ -15,10 +15,13 @@ import copy
 import heapq
 import itertools
 
+from oslo_log import log as logging
 import six
 
 from nova import context
 
+LOG = logging.getLogger(__name__)
+
 
 class RecordSortContext(object):
     def __init__(self, sort_keys, sort_dirs):
@@ -241,11 +244,18 @@ class CrossCellLister(object):
             return (RecordWrapper(self.sort_ctx, inst) for inst in
                     itertools.chain(local_marker_prefix, main_query_result))
 
-        # FIXME(danms): If we raise or timeout on a cell we need to handle
-        # that here gracefully. The below routine will provide sentinels
-        # to indicate that, which will crash the merge below, but we don't
-        # handle this anywhere yet anyway.
-        results = context.scatter_gather_all_cells(ctx, do_query)
+        # NOTE: The listing can do with the results of the cells which
+        # responded in time when [api]/cell_partial_results_timeout is set.
+        results = context.scatter_gather_all_cells_partial(ctx, do_query)
+
+        # NOTE: A cell that raised or did not respond in time is left out of
+        # the results, rather than failing the whole listing.
+        for cell_uuid in list(results):
+            if results[cell_uuid] in (context.did_not_respond_sentinel,
+                                      context.raised_exception_sentinel):
+                LOG.warning('Cell %s is not responding, leaving its records '
+                            'out of the results', cell_uuid)
+                del results[cell_uuid]
 
         # If a limit was provided, it was passed to the per-cell query
         # routines.  That means we have NUM_CELLS * limit items across
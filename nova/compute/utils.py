@@ -843,12 +843,17 @@ def check_num_instances_quota(context, instance_type, min_count,
     req_cores = max_count * instance_type.vcpus
     req_ram = max_count * instance_type.memory_mb
     deltas = {'instances': max_count, 'cores': req_cores, 'ram': req_ram}
+    count_kwargs = {}
+    if max_count == 0:
+        # The rechecks made after creating the instances exist to catch
+        # races, they must count the usage rather than use the cached counts.
+        count_kwargs['use_cache'] = False
 
     try:
         objects.Quotas.check_deltas(context, deltas,
                                     project_id, user_id=user_id,
                                     check_project_id=project_id,
-                                    check_user_id=user_id)
+                                    check_user_id=user_id, **count_kwargs)
     except exception.OverQuota as exc:
         quotas = exc.kwargs['quotas']
         overs = exc.kwargs['overs']
@@ -14,6 +14,7 @@
 
 """Handles database requests from other nova services."""
 
+import collections
 import contextlib
 import copy
 import functools
@@ -33,6 +34,7 @@ from nova.compute import task_states
 from nova.compute import utils as compute_utils
 from nova.compute.utils import wrap_instance_event
 from nova.compute import vm_states
+from nova.conductor.tasks import drain_host
 from nova.conductor.tasks import live_migrate
 from nova.conductor.tasks import migrate
 from nova import context as nova_context
@@ -383,7 +385,17 @@ class ComputeTaskManager(base.Base):
                            block_migration, disk_over_commit, request_spec)
 
     def _live_migrate(self, context, instance, scheduler_hint,
-                      block_migration, disk_over_commit, request_spec):
+                      block_migration, disk_over_commit, request_spec,
+                      ignore_hosts=None, migration=None,
+                      retry_no_valid_host=False):
+        """Live migrate an instance.
+
+        :param migration: The Migration record to use, a new one is created
+                          when None.
+        :param retry_no_valid_host: When True, NoValidHost is raised with the
+                                    instance and the migration left as they
+                                    are, for the caller to try again later.
+        """
         destination = scheduler_hint.get("host")
 
         def _set_vm_state(context, instance, ex, vm_state=None,
@@ -399,23 +411,14 @@ class ComputeTaskManager(base.Base):
                      expected_task_state=task_states.MIGRATING,),
                 ex, request_spec)
 
-        migration = objects.Migration(context=context.elevated())
-        migration.dest_compute = destination
-        migration.status = 'accepted'
-        migration.instance_uuid = instance.uuid
-        migration.source_compute = instance.host
-        migration.migration_type = 'live-migration'
-        if instance.obj_attr_is_set('flavor'):
-            migration.old_instance_type_id = instance.flavor.id
-            migration.new_instance_type_id = instance.flavor.id
-        else:
-            migration.old_instance_type_id = instance.instance_type_id
-            migration.new_instance_type_id = instance.instance_type_id
-        migration.create()
+        if migration is None:
+            migration = live_migrate.create_migration(context, instance,
+                                                      destination)
 
         task = self._build_live_migrate_task(context, instance, destination,
                                              block_migration, disk_over_commit,
-                                             migration, request_spec)
+                                             migration, request_spec,
+                                             ignore_hosts=ignore_hosts)
         try:
             task.execute()
         except (exception.NoValidHost,
@@ -433,10 +436,15 @@ class ComputeTaskManager(base.Base):
                 exception.LiveMigrationWithOldNovaNotSupported,
                 exception.MigrationSchedulerRPCError) as ex:
             with excutils.save_and_reraise_exception():
-                # TODO(johngarbutt) - eventually need instance actions here
-                _set_vm_state(context, instance, ex, instance.vm_state)
-                migration.status = 'error'
-                migration.save()
+                # NOTE: The caller tries again later when asked to, this is
+                # not a failure of the live migration yet.
+                if not (retry_no_valid_host and
+                        isinstance(ex, exception.NoValidHost)):
+                    # TODO(johngarbutt) - eventually need instance actions
+                    # here
+                    _set_vm_state(context, instance, ex, instance.vm_state)
+                    migration.status = 'error'
+                    migration.save()
         except Exception as ex:
             LOG.error('Migration of instance %(instance_id)s to host'
                       ' %(dest)s unexpectedly failed.',
@@ -449,17 +457,60 @@ class ComputeTaskManager(base.Base):
             migration.status = 'error'
             migration.save()
             raise exception.MigrationError(reason=six.text_type(ex))
+        return migration
+
+    def drain_host(self, context, host, block_migration, disk_over_commit,
+                   progress_callback=None):
+        """Live migrate all the instances away from a compute host.
+
+        This is not an RPC method. The drain waits for all of the live
+        migrations to complete, it is run by the nova-manage host drain
+        command which reports its progress.
+
+        :param context: The context targeted to the cell of the host
+        :param block_migration: True, False or None to let the compute
+            service decide based on the storage of each instance.
+        :param progress_callback: Called with the progress of the drain each
+            time the live migrations are polled, see DrainHostTask.
+        :returns: The uuids of the migrated, failed and skipped instances.
+        """
+        task = self._build_drain_host_task(context, host, block_migration,
+                                           disk_over_commit,
+                                           progress_callback)
+        result = task.execute()
+        LOG.info('Drained host %(host)s: %(migrated)d instances migrated, '
+                 '%(failed)d failed, %(skipped)d skipped',
+                 {'host': host, 'migrated': len(result['migrated']),
+                  'failed': len(result['failed']),
+                  'skipped': len(result['skipped'])})
+        return result
+
+    def _build_drain_host_task(self, context, host, block_migration,
+                               disk_over_commit, progress_callback=None):
+        def _live_migrate(context, instance, block_migration,
+                          disk_over_commit, request_spec, ignore_hosts,
+                          migration, retry_no_valid_host):
+            return self._live_migrate(
+                context, instance, {'host': None}, block_migration,
+                disk_over_commit, request_spec, ignore_hosts=ignore_hosts,
+                migration=migration,
+                retry_no_valid_host=retry_no_valid_host)
+
+        return drain_host.DrainHostTask(context, host, block_migration,
+                                        disk_over_commit, _live_migrate,
+                                        progress_callback=progress_callback)
 
     def _build_live_migrate_task(self, context, instance, destination,
                                  block_migration, disk_over_commit, migration,
-                                 request_spec=None):
+                                 request_spec=None, ignore_hosts=None):
         return live_migrate.LiveMigrationTask(context, instance,
                                               destination, block_migration,
                                               disk_over_commit, migration,
                                               self.compute_rpcapi,
                                               self.servicegroup_api,
                                               self.scheduler_client,
-                                              request_spec)
+                                              request_spec,
+                                              ignore_hosts=ignore_hosts)
 
     def _build_cold_migrate_task(self, context, instance, flavor, request_spec,
             clean_shutdown, host_list):
@@ -1018,15 +1069,41 @@ class ComputeTaskManager(base.Base):
                 bdm.update_or_create()
         return instance_block_device_mapping
 
-    def _create_tags(self, context, instance_uuid, tags):
-        """Create the Tags objects in the db."""
-        if tags:
-            tag_list = [tag.tag for tag in tags]
-            instance_tags = objects.TagList.create(
-                context, instance_uuid, tag_list)
-            return instance_tags
-        else:
-            return tags
+    def _create_block_device_mappings(self, context, instances,
+                                      block_device_mapping):
+        """Create the BlockDeviceMapping objects for several instances.
+
+        This is the bulk version of _create_block_device_mapping for
+        instances that all live in the cell targeted by context.
+
+        :returns: A dict, keyed by instance uuid, of BlockDeviceMappingList
+            objects
+        """
+        LOG.debug("block_device_mapping %s", list(block_device_mapping))
+        instance_bdms_by_uuid = {}
+        bdms = []
+        for instance in instances:
+            instance_block_device_mapping = copy.deepcopy(block_device_mapping)
+            for bdm in instance_block_device_mapping:
+                bdm.volume_size = self._volume_size(instance.flavor, bdm)
+                bdm.instance_uuid = instance.uuid
+                bdms.append(bdm)
+            instance_bdms_by_uuid[instance.uuid] = (
+                instance_block_device_mapping)
+        if bdms:
+            objects.BlockDeviceMappingList.create_bulk(context, bdms)
+        return instance_bdms_by_uuid
+
+    def _create_tags_bulk(self, context, instance_uuids, tags):
+        """Create the same Tags objects for several instances.
+
+        :returns: A dict, keyed by instance uuid, of TagList objects or an
+            empty dict if there are no tags to create
+        """
+        if not tags:
+            return {}
+        tag_list = [tag.tag for tag in tags]
+        return objects.TagList.create_bulk(context, instance_uuids, tag_list)
 
     def _bury_in_cell0(self, context, request_spec, exc,
                        build_requests=None, instances=None,
@@ -1117,9 +1194,20 @@ class ComputeTaskManager(base.Base):
             return
 
         host_mapping_cache = {}
+        host_az_cache = {}
         cell_mapping_cache = {}
+        # Instances to create, grouped by the uuid of their cell so that the
+        # cell and API database records can be written in bulk.
+        instances_by_cell = collections.OrderedDict()
         instances = []
 
+        # Before we create the instances, let's make one final check that
+        # the build requests are still around and weren't deleted by the user
+        # already. This is done with a single query for the whole request.
+        existing_build_requests = (
+            objects.BuildRequestList.get_existing_instance_uuids(
+                context, instance_uuids))
+
         for (build_request, request_spec, host_list) in six.moves.zip(
                 build_requests, request_specs, host_lists):
             instance = build_request.get_new_instance(context)
@@ -1148,13 +1236,7 @@ class ComputeTaskManager(base.Base):
 
             cell = host_mapping.cell_mapping
 
-            # Before we create the instance, let's make one final check that
-            # the build request is still around and wasn't deleted by the user
-            # already.
-            try:
-                objects.BuildRequest.get_by_instance_uuid(
-                    context, instance.uuid)
-            except exception.BuildRequestNotFound:
+            if instance.uuid not in existing_build_requests:
                 # the build request is gone so we're done for this instance
                 LOG.debug('While scheduling instance, the build request '
                           'was already deleted.', instance=instance)
@@ -1163,14 +1245,24 @@ class ComputeTaskManager(base.Base):
                 rc = self.scheduler_client.reportclient
                 rc.delete_allocation_for_instance(context, instance.uuid)
                 continue
-            else:
-                instance.availability_zone = (
+
+            if host.service_host not in host_az_cache:
+                host_az_cache[host.service_host] = (
                     availability_zones.get_host_availability_zone(
                         context, host.service_host))
-                with obj_target_cell(instance, cell):
-                    instance.create()
-                    instances.append(instance)
-                    cell_mapping_cache[instance.uuid] = cell
+            instance.availability_zone = host_az_cache[host.service_host]
+            instances.append(instance)
+            cell_mapping_cache[instance.uuid] = cell
+            instances_by_cell.setdefault(cell.uuid, (cell, []))[1].append(
+                instance)
+
+        # Create the instances and map them to their cell with a single
+        # transaction per cell rather than one per instance.
+        for cell, cell_instances in instances_by_cell.values():
+            with try_target_cell(context, cell) as cctxt:
+                objects.InstanceList.create_bulk(cctxt, cell_instances)
+            objects.InstanceMappingList.update_cell_bulk(
+                context, [inst.uuid for inst in cell_instances], cell)
 
         # NOTE(melwitt): We recheck the quota after creating the
         # objects to prevent users from allocating more resources
@@ -1189,6 +1281,20 @@ class ComputeTaskManager(base.Base):
                                                   request_specs,
                                                   cell_mapping_cache)
 
+        # Create the block device mappings and tags for all of the instances
+        # in a cell at once.
+        instance_bdms_by_uuid = {}
+        instance_tags_by_uuid = {}
+        for cell, cell_instances in instances_by_cell.values():
+            with try_target_cell(context, cell) as cctxt:
+                instance_bdms_by_uuid.update(
+                    self._create_block_device_mappings(
+                        cctxt, cell_instances, block_device_mapping))
+                instance_tags_by_uuid.update(
+                    self._create_tags_bulk(
+                        cctxt, [inst.uuid for inst in cell_instances],
+                        tags))
+
         zipped = six.moves.zip(build_requests, request_specs, host_lists,
                               instances)
         for (build_request, request_spec, host_list, instance) in zipped:
@@ -1207,6 +1313,8 @@ class ComputeTaskManager(base.Base):
             scheduler_utils.populate_retry(filter_props, instance.uuid)
             scheduler_utils.populate_filter_properties(filter_props,
                                                        host)
+            instance_bdms = instance_bdms_by_uuid[instance.uuid]
+            instance_tags = instance_tags_by_uuid.get(instance.uuid, tags)
             # TODO(melwitt): Maybe we should set_target_cell on the contexts
             # once we map to a cell, and remove these separate with statements.
             with obj_target_cell(instance, cell) as cctxt:
@@ -1218,9 +1326,6 @@ class ComputeTaskManager(base.Base):
                 objects.InstanceAction.action_start(
                     cctxt, instance.uuid, instance_actions.CREATE,
                     want_result=False)
-                instance_bdms = self._create_block_device_mapping(
-                    cell, instance.flavor, instance.uuid, block_device_mapping)
-                instance_tags = self._create_tags(cctxt, instance.uuid, tags)
 
             # TODO(Kevin Zheng): clean this up once instance.create() handles
             # tags; we do this so the instance.create notification in
@@ -1228,14 +1333,6 @@ class ComputeTaskManager(base.Base):
             instance.tags = instance_tags if instance_tags \
                 else objects.TagList()
 
-            # Update mapping for instance. Normally this check is guarded by
-            # a try/except but if we're here we know that a newer nova-api
-            # handled the build process and would have created the mapping
-            inst_mapping = objects.InstanceMapping.get_by_instance_uuid(
-                context, instance.uuid)
-            inst_mapping.cell_mapping = cell
-            inst_mapping.save()
-
             if not self._delete_build_request(
                     context, build_request, instance, cell, instance_bdms,
                     instance_tags):
@@ -1277,13 +1374,6 @@ class ComputeTaskManager(base.Base):
                                               'build_instances', updates, exc,
                                               request_spec)
 
-            # TODO(mnaser): The cell mapping should already be populated by
-            #               this point to avoid setting it below here.
-            inst_mapping = objects.InstanceMapping.get_by_instance_uuid(
-                context, instance.uuid)
-            inst_mapping.cell_mapping = cell
-            inst_mapping.save()
-
             # Be paranoid about artifacts being deleted underneath us.
             try:
                 build_request.destroy()
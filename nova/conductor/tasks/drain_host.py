@@ -0,0 +1,248 @@
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+import collections
+import time
+
+from oslo_log import log as logging
+from oslo_utils import units
+
+from nova.compute import instance_actions
+from nova.compute import power_state
+from nova.compute import task_states
+from nova.compute import vm_states
+from nova.conductor.tasks import base
+from nova.conductor.tasks import live_migrate
+import nova.conf
+from nova import exception
+from nova import objects
+
+LOG = logging.getLogger(__name__)
+CONF = nova.conf.CONF
+
+# Migration statuses after which the migration does not use the source and
+# destination hosts anymore.
+FINISHED_STATUSES = ('completed', 'done', 'error', 'failed', 'cancelled')
+IN_PROGRESS_STATUSES = ('accepted', 'queued', 'preparing', 'running',
+                        'post-migrating')
+
+
+class DrainHostTask(base.TaskBase):
+    """Live migrate all the instances away from a host.
+
+    The instances are migrated concurrently, the largest ones first, while
+    keeping the number of migrations in progress from the host, and the
+    number of live migrations in progress to each destination host, below
+    CONF.max_concurrent_live_migrations.
+    """
+
+    POLL_INTERVAL = 5
+
+    def __init__(self, context, host, block_migration, disk_over_commit,
+                 live_migrate, progress_callback=None):
+        """:param live_migrate: Callable starting the live migration of an
+            instance, taking the context, the instance, block_migration,
+            disk_over_commit, the request spec, the list of hosts the
+            scheduler should ignore, the Migration object and whether a
+            NoValidHost error is retried later, and returning the Migration
+            object.
+        :param progress_callback: Optional callable taking a dict with the
+            number of instances to migrate ('total'), and the numbers of
+            instances 'migrated', 'in_progress', 'failed' and 'skipped' so
+            far, called each time the live migrations are polled.
+        """
+        super(DrainHostTask, self).__init__(context, None)
+        self.host = host
+        self.block_migration = block_migration
+        self.disk_over_commit = disk_over_commit
+        self.live_migrate = live_migrate
+        self.progress_callback = progress_callback
+        self.migrated = []
+        self.failed = []
+        self.skipped = []
+        # The instances whose action was recorded, and the migrations of the
+        # instances waiting for a destination, by instance uuid.
+        self._actions_started = set()
+        self._waiting_migrations = {}
+
+    def _execute(self):
+        instances = self._get_instances_to_migrate()
+        pending = collections.deque(
+            sorted(instances, key=self._migration_cost, reverse=True))
+        in_progress = {}
+        total = len(pending)
+        LOG.info('Draining host %(host)s: %(total)d instances to live '
+                 'migrate', {'host': self.host, 'total': total})
+
+        try:
+            while pending or in_progress:
+                self._refresh(in_progress)
+                self._start_pending(pending, in_progress)
+                progress = {'total': total,
+                            'migrated': len(self.migrated),
+                            'in_progress': len(in_progress),
+                            'failed': len(self.failed),
+                            'skipped': len(self.skipped)}
+                LOG.info('Draining host %(host)s: %(migrated)d of %(total)d '
+                         'instances migrated, %(in_progress)d in progress, '
+                         '%(failed)d failed, %(skipped)d skipped',
+                         dict(progress, host=self.host))
+                if self.progress_callback:
+                    self.progress_callback(progress)
+                if in_progress:
+                    time.sleep(self.POLL_INTERVAL)
+        finally:
+            # NOTE: The drain can be interrupted while instances wait for a
+            # destination, their migrations will not be started anymore.
+            for instance_uuid in list(self._waiting_migrations):
+                self._cancel_migration(instance_uuid)
+
+        return {'host': self.host,
+                'total': total,
+                'migrated': self.migrated,
+                'failed': self.failed,
+                'skipped': self.skipped}
+
+    def _start_pending(self, pending, in_progress):
+        while pending and self._can_start(in_progress):
+            instance = pending.popleft()
+            busy_hosts = self._get_busy_hosts()
+            # The only suitable destinations might be the busy ones, the
+            # instance is then tried again once a migration is done.
+            retry = bool(busy_hosts and in_progress)
+            try:
+                migration = self._start(instance, busy_hosts, retry)
+            except exception.NoValidHost:
+                if retry:
+                    pending.appendleft(instance)
+                    return
+                LOG.warning('No valid host found to drain the instance '
+                            'from host %s', self.host, instance=instance)
+                self.failed.append(instance.uuid)
+            except Exception:
+                LOG.warning('Failed to start the live migration of the '
+                            'instance while draining host %s',
+                            self.host, instance=instance, exc_info=True)
+                self.failed.append(instance.uuid)
+            else:
+                if migration is not None:
+                    in_progress[instance.uuid] = migration
+
+    def _get_instances_to_migrate(self):
+        instances = objects.InstanceList.get_by_host(
+            self.context, self.host,
+            expected_attrs=['flavor', 'system_metadata'])
+        to_migrate = []
+        for instance in instances:
+            if (instance.vm_state in (vm_states.ACTIVE, vm_states.PAUSED) and
+                    instance.task_state is None and
+                    instance.power_state in (power_state.RUNNING,
+                                             power_state.PAUSED)):
+                to_migrate.append(instance)
+            else:
+                LOG.debug('Not draining the instance in vm_state %(vm)s, '
+                          'task_state %(task)s',
+                          {'vm': instance.vm_state,
+                           'task': instance.task_state}, instance=instance)
+                self.skipped.append(instance.uuid)
+        return to_migrate
+
+    def _migration_cost(self, instance):
+        # NOTE: The amount of memory to copy, plus the disks when they have
+        # to be copied too, is what makes a live migration long. Starting the
+        # longest ones first keeps the overall drain time short.
+        flavor = instance.flavor
+        cost = flavor.memory_mb
+        if self.block_migration:
+            cost += (flavor.root_gb + flavor.ephemeral_gb) * units.Ki
+        return cost
+
+    @staticmethod
+    def _can_start(in_progress):
+        limit = CONF.max_concurrent_live_migrations
+        return limit <= 0 or len(in_progress) < limit
+
+    def _get_busy_hosts(self):
+        limit = CONF.max_concurrent_live_migrations
+        if limit <= 0:
+            return []
+        # NOTE: Count all the live migrations to the destinations, not only
+        # the ones of this drain, other hosts could be drained at the same
+        # time.
+        migrations = objects.MigrationList.get_by_filters(
+            self.context, {'status': IN_PROGRESS_STATUSES,
+                           'migration_type': 'live-migration'})
+        counts = collections.Counter(
+            migration.dest_compute for migration in migrations
+            if migration.dest_compute)
+        return sorted(host for host, count in counts.items()
+                      if count >= limit)
+
+    def _refresh(self, in_progress):
+        for instance_uuid, migration in list(in_progress.items()):
+            migration = objects.Migration.get_by_id(self.context,
+                                                    migration.id)
+            if migration.status not in FINISHED_STATUSES:
+                in_progress[instance_uuid] = migration
+                continue
+            del in_progress[instance_uuid]
+            if migration.status in ('completed', 'done'):
+                self.migrated.append(instance_uuid)
+            else:
+                self.failed.append(instance_uuid)
+
+    def _cancel_migration(self, instance_uuid):
+        migration = self._waiting_migrations.pop(instance_uuid, None)
+        if migration is not None:
+            migration.status = 'cancelled'
+            migration.save()
+
+    def _start(self, instance, ignore_hosts, retry_no_valid_host):
+        instance.task_state = task_states.MIGRATING
+        try:
+            instance.save(expected_task_state=[None])
+        except (exception.UnexpectedTaskStateError,
+                exception.InstanceNotFound):
+            LOG.info('Not draining the instance, it changed state',
+                     instance=instance)
+            self.skipped.append(instance.uuid)
+            self._cancel_migration(instance.uuid)
+            return None
+        # NOTE: An instance waiting for a destination is started again with
+        # the same action and migration, the failure is only recorded once
+        # the instance is given up on.
+        if instance.uuid not in self._actions_started:
+            objects.InstanceAction.action_start(
+                self.context, instance.uuid, instance_actions.LIVE_MIGRATION,
+                want_result=False)
+            self._actions_started.add(instance.uuid)
+        try:
+            request_spec = objects.RequestSpec.get_by_instance_uuid(
+                self.context, instance.uuid)
+        except exception.RequestSpecNotFound:
+            request_spec = None
+        migration = self._waiting_migrations.pop(instance.uuid, None)
+        if migration is None:
+            migration = live_migrate.create_migration(self.context, instance,
+                                                      None)
+        try:
+            return self.live_migrate(self.context, instance,
+                                     self.block_migration,
+                                     self.disk_over_commit, request_spec,
+                                     ignore_hosts, migration,
+                                     retry_no_valid_host)
+        except exception.NoValidHost:
+            if retry_no_valid_host:
+                self._waiting_migrations[instance.uuid] = migration
+                instance.task_state = None
+                instance.save(expected_task_state=[task_states.MIGRATING])
+            raise
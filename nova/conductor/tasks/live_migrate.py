@@ -34,10 +34,33 @@ def should_do_migration_allocation(context):
     return minver >= 25
 
 
+def create_migration(context, instance, destination):
+    """Create the record of a live migration of the instance.
+
+    :param destination: The requested destination host or None to let the
+                        scheduler pick one.
+    """
+    migration = objects.Migration(context=context.elevated())
+    migration.dest_compute = destination
+    migration.status = 'accepted'
+    migration.instance_uuid = instance.uuid
+    migration.source_compute = instance.host
+    migration.migration_type = 'live-migration'
+    if instance.obj_attr_is_set('flavor'):
+        migration.old_instance_type_id = instance.flavor.id
+        migration.new_instance_type_id = instance.flavor.id
+    else:
+        migration.old_instance_type_id = instance.instance_type_id
+        migration.new_instance_type_id = instance.instance_type_id
+    migration.create()
+    return migration
+
+
 class LiveMigrationTask(base.TaskBase):
     def __init__(self, context, instance, destination,
                  block_migration, disk_over_commit, migration, compute_rpcapi,
-                 servicegroup_api, scheduler_client, request_spec=None):
+                 servicegroup_api, scheduler_client, request_spec=None,
+                 ignore_hosts=None):
         super(LiveMigrationTask, self).__init__(context, instance)
         self.destination = destination
         self.block_migration = block_migration
@@ -50,6 +73,10 @@ class LiveMigrationTask(base.TaskBase):
         self.servicegroup_api = servicegroup_api
         self.scheduler_client = scheduler_client
         self.request_spec = request_spec
+        # Hosts the scheduler should not pick in addition to the ones which
+        # were already attempted, e.g. destinations that are busy with other
+        # migrations while draining a host.
+        self.ignore_hosts = list(ignore_hosts or [])
         self._source_cn = None
         self._held_allocations = None
 
@@ -314,7 +341,7 @@ class LiveMigrationTask(base.TaskBase):
         host = None
         while host is None:
             self._check_not_over_max_retries(attempted_hosts)
-            request_spec.ignore_hosts = attempted_hosts
+            request_spec.ignore_hosts = attempted_hosts + self.ignore_hosts
             try:
                 selection_lists = self.scheduler_client.select_destinations(
                         self.context, request_spec, [self.instance.uuid],
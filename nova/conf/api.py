@@ -200,6 +200,72 @@ metadata caching is disabled entirely; this is generally not recommended for
 performance reasons. Increasing this setting should improve response times
 of the metadata API when under heavy load. Higher values may increase memory
 usage, and result in longer times for host metadata changes to take effect.
+"""),
+    cfg.BoolOpt("metadata_response_cache",
+        default=False,
+        help="""
+Cache the rendered responses of the metadata API.
+
+When enabled, the body of every metadata path requested by an instance is
+cached for ``metadata_cache_expiration`` seconds, so that repeated requests,
+such as the ones made by cloud-init while an instance boots, are not rendered
+again and do not call the dynamic vendordata services again. The cached
+responses are tied to the instance metadata, network information and keys
+they were rendered from, so a change to any of those is picked up as soon as
+the cached metadata of the instance expires.
+
+Note that a cached ``meta_data.json`` response returns the same
+``random_seed`` until it expires.
+
+Related options:
+
+* metadata_cache_expiration
+* metadata_response_precompute
+"""),
+    cfg.ListOpt("metadata_response_precompute",
+        default=[],
+        help="""
+A list of metadata paths to render and cache as soon as the metadata of an
+instance is first requested.
+
+Rendering the paths that every instance requests up front, for example
+``openstack/latest/meta_data.json``, ``openstack/latest/network_data.json``
+and ``openstack/latest/vendor_data2.json``, lets the following requests be
+served from the cache.
+
+Possible values:
+
+* A list of metadata paths, empty by default.
+
+Related options:
+
+* metadata_response_cache: The paths are only precomputed when the rendered
+  responses are cached.
+"""),
+    cfg.BoolOpt("metadata_address_index",
+        default=False,
+        help="""
+Index the fixed IP addresses of the instances for the metadata API.
+
+When enabled, the fixed IP addresses of every instance are stored in an index
+whenever its network info cache is updated. For the requests proxied by a
+metadata provider, the metadata API then looks up the instance making a
+request from its address in the networks of the provider in the index instead
+of querying the network service, and only falls back to the network service
+when the address is not indexed. Every instance found through the index is
+checked to still have the address in those networks before its metadata is
+returned. The requests whose network is not known, which are not proxied by a
+metadata provider, never use the index since the same address can be used by
+the instances of different tenants.
+
+The index is stored in the backend configured in the ``[cache]`` section,
+which must be shared, for example memcached, by the metadata API, conductor
+and API services for the index to be useful.
+
+Related options:
+
+* ``[cache] enabled``
+* ``[neutron] service_metadata_proxy``
 """),
 ]
 
@@ -253,6 +319,24 @@ unchanged.
 Possible values:
 
 * Any string, including an empty string (the default).
+"""),
+    cfg.IntOpt("response_chunk_size",
+        default=0,
+        min=0,
+        help="""
+When set, the JSON responses containing long lists, such as the listing of
+the servers with their details, are streamed to the client in chunks of this
+number of list items instead of being serialized in memory at once. This
+lowers the memory used by the API service for large responses.
+
+Possible values:
+
+* 0: Serialize the responses at once (the default).
+* Any positive integer: The number of list items serialized in each chunk.
+
+Related options:
+
+* max_limit
 """),
 ]
 
@@ -348,6 +432,72 @@ so if your hypervisor does not support password injection, set this to False.
 """)
 ]
 
+cell_query_opts = [
+    cfg.IntOpt("cell_timeout",
+        default=60,
+        min=1,
+        help="""
+Maximum time in seconds to wait for the results of a query made to all of the
+cells in parallel, such as when listing servers or migrations or counting
+quota usage.
+
+Cells that did not respond within this time are reported as not responding
+and their results are left out.
+
+Related options:
+
+* ``[api] cell_partial_results_timeout``
+"""),
+    cfg.FloatOpt("cell_partial_results_timeout",
+        default=0.0,
+        min=0.0,
+        help="""
+Time in seconds after which listing the servers of all of the cells returns
+the results gathered so far, without waiting for the slower cells.
+
+When at least one cell has responded within this time, the cells that did not
+respond yet are reported as not responding, as they would be after
+``[api] cell_timeout``, and their servers are left out of the listing. This
+keeps a single degraded cell from stalling every listing of the servers. The
+other queries made to all of the cells, like counting quota usage, always wait
+for every cell up to ``[api] cell_timeout``.
+
+Possible values:
+
+* 0 (default) to always wait for every cell up to ``[api] cell_timeout``.
+* A positive number of seconds lower than ``[api] cell_timeout``.
+
+Related options:
+
+* ``[api] cell_timeout``
+"""),
+    cfg.FloatOpt("cell_hedge_latency_factor",
+        default=0.0,
+        min=0.0,
+        help="""
+Factor of the usual latency of a cell after which a read query made to all of
+the cells is repeated against the read replica of a cell that is slow to
+respond.
+
+The latency of the queries made to each cell is tracked over the most recent
+queries. When a cell has not responded after this factor times its 95th
+percentile latency, the same query is sent again in the asynchronous reader
+mode, which uses ``[database] slave_connection`` when it is configured, and
+the first result returned is used. Only queries which are allowed to run
+asynchronously can be repeated this way.
+
+Possible values:
+
+* 0 (default) to disable the hedged queries.
+* A positive factor, for example 2.0 to repeat a query when a cell is twice
+  as slow as usual.
+
+Related options:
+
+* ``[database] slave_connection``
+"""),
+]
+
 API_OPTS = (auth_opts +
             metadata_opts +
             file_opts +
@@ -355,7 +505,8 @@ API_OPTS = (auth_opts +
             osapi_hide_opts +
             fping_path_opts +
             os_network_opts +
-            enable_inst_pw_opts)
+            enable_inst_pw_opts +
+            cell_query_opts)
 
 
 def register_opts(conf):
@@ -642,6 +642,26 @@ Possible values:
 
 * Any positive integer representing a build failure count.
 * Zero to never auto-disable.
+"""),
+    cfg.StrOpt('numa_cell_placement_policy',
+        default='ordered',
+        choices=('ordered', 'pack', 'spread'),
+        help="""
+Order in which host NUMA cells are considered when fitting instance NUMA cells.
+
+When several host NUMA cells can fit the NUMA cells of an instance, this
+option decides which of them are preferred:
+
+* ``ordered``: Host NUMA cells are tried in the order of their IDs.
+* ``pack``: Host NUMA cells with the least free memory and CPUs are tried
+  first, which keeps the other host NUMA cells free for larger instances.
+* ``spread``: Host NUMA cells with the most free memory and CPUs are tried
+  first, which spreads the instances over the host NUMA cells.
+
+In all cases, host NUMA cells without PCI devices are preferred for instances
+which do not request PCI devices. This option should be set to the same value
+on the nodes running the nova-scheduler and nova-compute services, since both
+fit instances onto host NUMA cells.
 """),
 ]
 
@@ -79,6 +79,47 @@ Related options:
         min=0,
         help='Timeout (seconds) to wait for node serial console state '
              'changed. Set to 0 to disable timeout.'),
+    cfg.IntOpt(
+        'node_cache_full_refresh_interval',
+        default=600,
+        min=0,
+        help="""
+Interval in seconds between full refreshes of the cache of Ironic nodes.
+
+The compute service refreshes its cache of the Ironic nodes it manages every
+time the resource tracker runs. Between full refreshes, it only lists the
+UUID, instance UUID and last update time of the nodes and fetches again the
+nodes which were updated since they were cached. A full refresh lists all the
+fields of the nodes used by the compute service.
+
+Possible values:
+
+* 0: Always do a full refresh.
+* Any positive integer in seconds.
+"""),
+    cfg.IntOpt(
+        'node_cache_max_age',
+        default=0,
+        min=0,
+        help="""
+Maximum age in seconds of the cached Ironic node used to get the state of an
+instance.
+
+The state of an instance is read from its node in the cache of Ironic nodes
+when the cache was refreshed less than this number of seconds ago, instead of
+getting the node from the Ironic API. The power state of instances reported
+by the compute service, for example to sync it with the database, may then be
+this number of seconds old.
+
+Possible values:
+
+* 0: Always get the node from the Ironic API.
+* Any positive integer in seconds.
+
+Related options:
+
+* ``[ironic] node_cache_full_refresh_interval``
+"""),
 ]
 
 deprecated_opts = {
@@ -390,6 +390,28 @@ Related options:
 * live_migration_downtime
 * live_migration_downtime_steps
 * live_migration_downtime_delay
+"""),
+    cfg.BoolOpt('live_migration_adaptive_control',
+                default=False,
+                help="""
+Adapt the live migration to its observed progress.
+
+When enabled, the transfer rate and the rate at which the guest dirties its
+memory are estimated while the live migration runs, from the statistics
+reported by the hypervisor. Instead of increasing the maximum downtime at
+fixed time intervals, it is then raised as soon as the migration stops
+converging, to what is needed to transfer the remaining data, up to
+``live_migration_downtime``. When post-copy is permitted, the migration is
+switched to post-copy once it is predicted not to complete within the maximum
+downtime or before the completion timeout, rather than when a memory
+iteration makes less than 10% progress.
+
+Related options:
+
+* live_migration_downtime
+* live_migration_downtime_steps
+* live_migration_completion_timeout
+* live_migration_permit_post_copy
 """),
     cfg.IntOpt('live_migration_progress_timeout',
                default=0,
@@ -700,6 +722,30 @@ Create sparse logical volumes (with virtualsize) if this flag is set to True.
     cfg.StrOpt('images_rbd_ceph_conf',
                default='',  # default determined by librados
                help='Path to the ceph configuration file to use'),
+    cfg.IntOpt('rbd_connection_pool_size',
+               default=0,
+               min=0,
+               help="""
+Maximum number of idle RADOS connections kept per pool.
+
+Each operation of the RBD image backend connects to the ceph cluster, which
+authenticates against and fetches the cluster maps from the monitors. Instead
+of shutting it down once the operation is done, the compute service keeps the
+connection and its pool I/O context to reuse it for the following operations
+on the same pool with the same user and ceph configuration. Idle connections
+are checked before being reused and dropped if they are not healthy anymore.
+
+Possible values:
+
+* 0: Disables pooling, every operation uses a new connection (the default).
+* Any positive integer: The number of idle connections kept per pool.
+
+Related options:
+
+* ``images_rbd_pool``
+* ``images_rbd_ceph_conf``
+* ``rbd_user``
+"""),
     cfg.StrOpt('hw_disk_discard',
                choices=('ignore', 'unmap'),
                help="""
@@ -967,7 +1013,42 @@ compute nodes, other method must be used for:
 * creating file on remote host
 * removing file from remote host
 * copying file to remote host
-""")
+"""),
+    cfg.IntOpt('remote_filesystem_copy_concurrency',
+               default=4,
+               min=1,
+               help="""
+Maximum number of instance disks copied at the same time to the destination
+host of a cold migration or resize.
+
+The instance is powered off while its disks are copied, copying them in
+parallel shortens the time it is unavailable when the network and the
+storage are not saturated by a single copy.
+
+Possible values:
+
+* 1 to copy the disks one after another
+* Any positive integer
+"""),
+    cfg.IntOpt('remote_filesystem_copy_retries',
+               default=2,
+               min=0,
+               help="""
+Number of times the copy of an instance disk to the destination host of a
+cold migration or resize is retried after a failure.
+
+With the rsync transport, the data already transferred is kept and the copy
+resumes from it.
+
+Possible values:
+
+* 0 to fail the migration on the first copy error
+* Any positive integer
+
+Related options:
+
+* remote_filesystem_transport
+"""),
 ]
 
 libvirt_volume_vzstorage_opts = [
@@ -76,6 +76,30 @@ Neutron for extensions.  After this number of seconds the next time Nova
 needs to create a resource in Neutron it will requery Neutron for the
 extensions that it has loaded.  Setting value to 0 will refresh the
 extensions with no wait.
+"""),
+    cfg.IntOpt('security_group_bindings_cache_time',
+        default=0,
+        min=0,
+        help="""
+Number of seconds the security groups of the instances are cached.
+
+Listing the servers with their security groups asks Neutron for the ports and
+the security groups of all of the servers. When this option is set, the
+security groups of the instances having ports are cached, and forgotten when
+Neutron sends a network-changed, network-vif-plugged or network-vif-deleted
+event for an instance, when an interface is attached to or detached from an
+instance, or when a security group is added to or removed from an instance
+through the compute API. Changes made directly in
+Neutron, like renaming a security group, may only show up in the server
+details once the cached entries expire.
+
+The cache backend is configured in the ``[cache]`` section, a shared backend
+like memcached lets all of the API workers use the same entries.
+
+Possible values:
+
+* 0: The security groups are not cached (Default)
+* Any positive integer: The number of seconds
 """),
 ]
 
@@ -128,6 +128,69 @@ If enabled, include block device information in the versioned notification
 payload. Sending block device information is disabled by default as providing
 that information can incur some overhead on the system since the information
 may need to be loaded from the database.
+"""),
+    cfg.IntOpt(
+        'queue_size',
+        default=0,
+        min=0,
+        help="""
+Maximum number of versioned notifications waiting to be sent.
+
+When set, the versioned notifications are put in a queue and sent in the
+background, emitting a notification does not wait for the message bus then.
+The notifications still waiting in the queue are lost if the service is
+killed. The notifications are still sent right away by the services which are
+not monkey patched by eventlet, like nova-api running under uwsgi or mod_wsgi.
+
+Possible values:
+
+* 0: The versioned notifications are sent right away (Default)
+* Any positive integer: The size of the queue
+
+Related options:
+
+* queue_full_action
+* instance_update_coalesce_window
+"""),
+    cfg.StrOpt(
+        'queue_full_action',
+        default='block',
+        choices=('block', 'drop'),
+        help="""
+What to do with a versioned notification when the queue is full.
+
+Possible values:
+
+* block: Wait for room in the queue (Default)
+* drop: Drop the notification, a warning is logged
+
+Related options:
+
+* queue_size
+"""),
+    cfg.FloatOpt(
+        'instance_update_coalesce_window',
+        default=0.0,
+        min=0.0,
+        help="""
+Number of seconds an instance.update versioned notification waits in the
+queue, during which the following instance.update notifications of the same
+instance are merged into it. The merging stops once another notification of
+the instance is queued.
+
+The merged notification carries the latest state of the instance, and the
+state and task state the instance had before the first of the merged
+notifications. The notifications queued after it are delayed too, to keep the
+notifications in order.
+
+Possible values:
+
+* 0: The instance.update notifications are not merged (Default)
+* Any positive number of seconds
+
+Related options:
+
+* queue_size: The notifications are only merged when the queue is enabled.
 """)
 ]
 
@@ -330,6 +330,55 @@ impossible for a user to exceed their quota with the caveat that it will,
 however, be possible for a REST API user to be rejected with a 403 response in
 the event of a collision close to reaching their quota limit, even if the user
 has enough quota available when they made the request.
+"""),
+    cfg.IntOpt('count_usage_cache_ttl',
+        default=0,
+        min=0,
+        help="""
+Time in seconds to cache the counted instance, cores and ram usage of a
+project.
+
+Counting the instances, cores and ram used by a project requires a query to
+the database of every cell, which is done on every server create and resize
+and again for the quota recheck. When this is set to a positive value the
+counts of a project are cached for that many seconds. The cached counts are
+invalidated whenever an instance of the project is created, deleted, resized,
+soft deleted or restored. The quota recheck, which is done to catch racing
+requests, never uses the cached counts.
+
+The cache uses the backend configured in the ``[cache]`` section. For the
+invalidations to be seen by all of the API and conductor services, a shared
+backend such as memcached must be used. Otherwise each service has its own
+in-memory cache and the counts can be stale for up to this many seconds.
+
+Possible values:
+
+* 0 (default) to disable the cache and always count usage from the cells.
+* A positive integer number of seconds.
+
+Related options:
+
+* ``[quota] recheck_quota``
+* ``[cache] enabled``
+"""),
+    cfg.BoolOpt('count_usage_from_placement',
+        default=False,
+        help="""
+Count cores and ram usage from the placement service.
+
+When enabled, the cores and ram used by a project and user are counted from
+the VCPU and MEMORY_MB allocations in placement with a single request instead
+of being summed from the instance records in every cell. Only the instances
+are then counted in the cells. If placement cannot be reached the cores and
+ram usage is counted in the cells as usual.
+
+Note that while a server is being resized it has allocations against both the
+source and the destination host, so its cores and ram are counted twice until
+the resize is confirmed or reverted.
+
+Related options:
+
+* ``[placement]`` section options for the placement service endpoint
 """),
 ]
 
@@ -50,6 +50,48 @@ Related Options:
 
 * report_interval (service_down_time should not be less than report_interval)
 * scheduler.periodic_task_interval
+"""),
+    cfg.IntOpt('heartbeat_batch_interval',
+               default=0,
+               min=0,
+               help="""
+Number of seconds the state reports of the services are gathered before being
+written to the database together.
+
+With the database servicegroup driver every service writes its state report to
+the database every report_interval seconds. When this option is set, the
+services report their state through nova-conductor, which writes the reports
+it received to the database with a single update every
+heartbeat_batch_interval seconds. The nova-conductor services also use the
+reports they received, and did not write yet, to tell whether a service is up.
+
+The option must be set on both the nova-conductor services and the services
+reporting through them, and only once all of the nova-conductor services have
+been upgraded.
+
+Possible Values:
+
+* 0: Every state report is written to the database right away (Default)
+* Any positive integer (in seconds)
+
+Related Options:
+
+* servicegroup_driver: Only the db driver writes the state reports to the
+  database.
+* service_down_time: This should be well below service_down_time, the state
+  reports are written up to heartbeat_batch_interval seconds late.
+"""),
+    cfg.BoolOpt('lazy_object_deserialization',
+               default=False,
+               help="""
+Deserialize the child objects of the objects received over RPC on first
+access.
+
+When this option is enabled, the child objects of the objects a service
+receives over RPC, such as the flavor, NUMA topology or network info cache of
+an instance, are only deserialized when they are first accessed. The RPC
+handlers which only use a few fields of the objects they receive use less CPU
+and memory. The versions of the child objects are still checked on receipt.
 """),
     cfg.BoolOpt('periodic_enable',
                default=True,
@@ -17,11 +17,12 @@
 
 """RequestContext: context for requests that persist through all of nova."""
 
+import collections
 from contextlib import contextmanager
 import copy
+import math
 
 import eventlet.queue
-import eventlet.timeout
 from keystoneauth1.access import service_catalog as ksa_service_catalog
 from keystoneauth1 import plugin
 from oslo_context import context
@@ -30,12 +31,14 @@ from oslo_log import log as logging
 from oslo_utils import timeutils
 import six
 
+import nova.conf
 from nova import exception
 from nova.i18n import _
 from nova import objects
 from nova import policy
 from nova import utils
 
+CONF = nova.conf.CONF
 LOG = logging.getLogger(__name__)
 # TODO(melwitt): This cache should be cleared whenever WSGIService receives a
 # SIGHUP and periodically based on an expiration time. Currently, none of the
@@ -47,6 +50,13 @@ did_not_respond_sentinel = object()
 # NOTE(melwitt): Used for the scatter-gather utility to indicate an exception
 # was raised gathering a result from a cell.
 raised_exception_sentinel = object()
+# Rolling latency statistics of the scatter-gather queries made to each cell,
+# keyed by cell uuid.
+CELL_LATENCY_STATS = {}
+# Number of recent queries the latency statistics of a cell are kept for, and
+# the number of queries needed before they are used to hedge queries.
+CELL_LATENCY_WINDOW = 100
+CELL_LATENCY_MIN_SAMPLES = 10
 # FIXME(danms): Keep a global cache of the cells we find the
 # first time we look. This needs to be refreshed on a timer or
 # trigger.
@@ -138,6 +148,10 @@ class RequestContext(context.RequestContext):
         self.db_connection = None
         self.mq_connection = None
 
+        # NOTE: The policy decisions made while processing an API request,
+        # see nova.policy.cache_decisions().
+        self.policy_cache = None
+
         self.user_auth_plugin = user_auth_plugin
         if self.is_admin is None:
             self.is_admin = policy.check_is_admin(self)
@@ -402,12 +416,56 @@ def target_cell(context, cell_mapping):
     yield cctxt
 
 
+class CellLatencyStats(object):
+    """Rolling latency statistics of the queries made to a cell."""
+
+    def __init__(self, size=CELL_LATENCY_WINDOW):
+        self._samples = collections.deque(maxlen=size)
+
+    def __len__(self):
+        return len(self._samples)
+
+    def add(self, elapsed):
+        self._samples.append(elapsed)
+
+    def percentile(self, percent):
+        """Return the given percentile of the latencies, or None."""
+        if not self._samples:
+            return None
+        ordered = sorted(self._samples)
+        index = int(math.ceil(percent / 100.0 * len(ordered))) - 1
+        return ordered[max(index, 0)]
+
+
+def _get_cell_latency_stats(cell_uuid):
+    try:
+        return CELL_LATENCY_STATS[cell_uuid]
+    except KeyError:
+        return CELL_LATENCY_STATS.setdefault(cell_uuid, CellLatencyStats())
+
+
+def _get_hedge_delay(cell_uuid):
+    """Return the time after which to hedge a query to a cell, or None."""
+    factor = CONF.api.cell_hedge_latency_factor
+    if not factor:
+        return None
+    stats = _get_cell_latency_stats(cell_uuid)
+    if len(stats) < CELL_LATENCY_MIN_SAMPLES:
+        return None
+    return factor * stats.percentile(95)
+
+
 def scatter_gather_cells(context, cell_mappings, timeout, fn, *args, **kwargs):
     """Target cells in parallel and return their results.
 
     The first parameter in the signature of the function to call for each cell
     should be of type RequestContext.
 
+    The latency of every cell is tracked in CELL_LATENCY_STATS. When
+    [api]/cell_hedge_latency_factor is set, the call to a cell that is slow
+    compared to its usual latency is repeated in the asynchronous reader mode
+    of the cell database, using its read replica, and the first result wins.
+
     :param context: The RequestContext for querying cells
     :param cell_mappings: The CellMappings to target in parallel
     :param timeout: The total time in seconds to wait for all the results to be
@@ -422,9 +480,28 @@ def scatter_gather_cells(context, cell_mappings, timeout, fn, *args, **kwargs):
               be returned if the call to a cell raised an exception. The
               exception will be logged.
     """
-    greenthreads = []
+    return _scatter_gather_cells(context, cell_mappings, timeout, None, fn,
+                                 args, kwargs)
+
+
+def _scatter_gather_cells(context, cell_mappings, timeout, partial_timeout,
+                          fn, args, kwargs):
+    """Target cells in parallel and return their results.
+
+    :param partial_timeout: The time in seconds after which the results
+                            gathered so far are returned, if at least one
+                            cell responded, or None to wait for all of the
+                            results up to timeout
+    """
+    # avoid circular import
+    from nova.db.sqlalchemy import api as db_api
+
+    greenthreads = {}
+    hedges = {}
     queue = eventlet.queue.LightQueue()
     results = {}
+    watch = timeutils.StopWatch()
+    watch.start()
 
     def gather_result(cell_mapping, fn, context, *args, **kwargs):
         cell_uuid = cell_mapping.uuid
@@ -434,33 +511,88 @@ def scatter_gather_cells(context, cell_mappings, timeout, fn, *args, **kwargs):
         except Exception:
             LOG.exception('Error gathering result from cell %s', cell_uuid)
             result = raised_exception_sentinel
+        elapsed = watch.elapsed()
+        _get_cell_latency_stats(cell_uuid).add(elapsed)
+        LOG.debug('Gathered result of %(fn)s from cell %(cell)s in '
+                  '%(elapsed).3f seconds',
+                  {'fn': getattr(fn, '__name__', fn), 'cell': cell_uuid,
+                   'elapsed': elapsed})
         # The queue is already synchronized.
         queue.put((cell_uuid, result))
 
-    for cell_mapping in cell_mappings:
-        greenthreads.append((cell_mapping.uuid,
-                             utils.spawn(gather_result, cell_mapping,
-                                         fn, context, *args, **kwargs)))
+    def gather_hedged_result(cell_mapping, fn, context, *args, **kwargs):
+        cell_uuid = cell_mapping.uuid
+        try:
+            with target_cell(context, cell_mapping) as cctxt:
+                with db_api.get_context_manager(cctxt).async.using(cctxt):
+                    result = fn(cctxt, *args, **kwargs)
+        except Exception as e:
+            # NOTE: Hedging is best effort, the query might not be allowed to
+            # run asynchronously. Keep waiting for the original one.
+            LOG.debug('Hedged query to cell %(cell)s failed: %(error)s',
+                      {'cell': cell_uuid, 'error': e})
+            return
+        queue.put((cell_uuid, result))
 
-    with eventlet.timeout.Timeout(timeout, exception.CellTimeout):
+    cell_mappings = list(cell_mappings)
+    for cell_mapping in cell_mappings:
+        greenthreads[cell_mapping.uuid] = utils.spawn(
+            gather_result, cell_mapping, fn, context, *args, **kwargs)
+
+    hedge_delays = {cell_mapping.uuid: _get_hedge_delay(cell_mapping.uuid)
+                    for cell_mapping in cell_mappings}
+    while len(results) != len(cell_mappings):
+        elapsed = watch.elapsed()
+        if elapsed >= timeout:
+            break
+        if results and partial_timeout and elapsed >= partial_timeout:
+            LOG.debug('Returning partial results after %.3f seconds',
+                      elapsed)
+            break
+
+        # Hedge the queries to the cells that are slower than usual.
+        for cell_mapping in cell_mappings:
+            cell_uuid = cell_mapping.uuid
+            delay = hedge_delays[cell_uuid]
+            if (cell_uuid not in results and cell_uuid not in hedges and
+                    delay is not None and elapsed >= delay):
+                LOG.debug('Cell %(cell)s did not respond within %(delay).3f '
+                          'seconds, hedging the query',
+                          {'cell': cell_uuid, 'delay': delay})
+                hedges[cell_uuid] = utils.spawn(
+                    gather_hedged_result, cell_mapping, fn, context, *args,
+                    **kwargs)
+
+        # Wake up at the next deadline to check for partial results and
+        # queries to hedge.
+        deadlines = [timeout]
+        if partial_timeout:
+            deadlines.append(partial_timeout)
+        deadlines.extend(delay for cell_uuid, delay in hedge_delays.items()
+                         if delay is not None and cell_uuid not in hedges)
+        wait = min(d for d in deadlines if d > elapsed) - elapsed
         try:
-            while len(results) != len(greenthreads):
-                cell_uuid, result = queue.get()
-                results[cell_uuid] = result
-        except exception.CellTimeout:
-            # NOTE(melwitt): We'll fill in did_not_respond_sentinels at the
-            # same time we kill/wait for the green threads.
-            pass
+            cell_uuid, result = queue.get(timeout=wait)
+        except eventlet.queue.Empty:
+            continue
+        # NOTE: Ignore the slower result of a hedged query.
+        results.setdefault(cell_uuid, result)
 
     # Kill the green threads still pending and wait on those we know are done.
-    for cell_uuid, greenthread in greenthreads:
+    for cell_uuid, greenthread in greenthreads.items():
         if cell_uuid not in results:
             greenthread.kill()
             results[cell_uuid] = did_not_respond_sentinel
+            _get_cell_latency_stats(cell_uuid).add(watch.elapsed())
             LOG.warning('Timed out waiting for response from cell %s',
                         cell_uuid)
+        elif cell_uuid in hedges:
+            # Either query may have returned the result, stop the other one.
+            greenthread.kill()
         else:
             greenthread.wait()
+    for greenthread in hedges.values():
+        greenthread.kill()
 
     return results
 
@@ -481,8 +613,8 @@ def scatter_gather_skip_cell0(context, fn, *args, **kwargs):
     """Target all cells except cell0 in parallel and return their results.
 
     The first parameter in the signature of the function to call for each cell
-    should be of type RequestContext. There is a 60 second timeout for waiting
-    on all results to be gathered.
+    should be of type RequestContext. The [api]/cell_timeout option sets the
+    timeout for waiting on all results to be gathered.
 
     :param context: The RequestContext for querying cells
     :param fn: The function to call for each cell
@@ -497,7 +629,8 @@ def scatter_gather_skip_cell0(context, fn, *args, **kwargs):
     """
     load_cells()
     cell_mappings = [cell for cell in CELLS if not cell.is_cell0()]
-    return scatter_gather_cells(context, cell_mappings, 60, fn, *args,
+    return scatter_gather_cells(context, cell_mappings,
+                                CONF.api.cell_timeout, fn, *args,
                                 **kwargs)
 
 
@@ -505,8 +638,8 @@ def scatter_gather_all_cells(context, fn, *args, **kwargs):
     """Target all cells in parallel and return their results.
 
     The first parameter in the signature of the function to call for each cell
-    should be of type RequestContext. There is a 60 second timeout for waiting
-    on all results to be gathered.
+    should be of type RequestContext. The [api]/cell_timeout option sets the
+    timeout for waiting on all results to be gathered.
 
     :param context: The RequestContext for querying cells
     :param fn: The function to call for each cell
@@ -520,4 +653,32 @@ def scatter_gather_all_cells(context, fn, *args, **kwargs):
               exception will be logged.
     """
     load_cells()
-    return scatter_gather_cells(context, CELLS, 60, fn, *args, **kwargs)
+    return scatter_gather_cells(context, CELLS, CONF.api.cell_timeout, fn,
+                                *args, **kwargs)
+
+
+def scatter_gather_all_cells_partial(context, fn, *args, **kwargs):
+    """Target all cells in parallel and return the results gathered in time.
+
+    This is like scatter_gather_all_cells(), but when
+    [api]/cell_partial_results_timeout is set and at least one cell has
+    responded by then, the results gathered so far are returned and the other
+    cells are reported as not responding. This is only meant for the callers
+    which can do with the results of some of the cells, like listing servers,
+    and never for counting quota usage.
+
+    :param context: The RequestContext for querying cells
+    :param fn: The function to call for each cell
+    :param args: The args for the function to call for each cell, not including
+                 the RequestContext
+    :param kwargs: The kwargs for the function to call for each cell
+    :returns: A dict {cell_uuid: result} containing the joined results. The
+              did_not_respond_sentinel will be returned if a cell did not
+              respond in time. The raised_exception_sentinel will be returned
+              if the call to a cell raised an exception. The exception will be
+              logged.
+    """
+    load_cells()
+    return _scatter_gather_cells(context, CELLS, CONF.api.cell_timeout,
+                                 CONF.api.cell_partial_results_timeout or None,
+                                 fn, args, kwargs)
@@ -183,6 +183,17 @@ def service_update(context, service_id, values):
     return IMPL.service_update(context, service_id, values)
 
 
+def service_report_heartbeats(context, service_ids, last_seen_up):
+    """Record a state report of the given services.
+
+    The report counts of the services are increased and their last_seen_up
+    timestamps set, with a single update of all of the services.
+
+    :returns: The number of services updated
+    """
+    return IMPL.service_report_heartbeats(context, service_ids, last_seen_up)
+
+
 ###################
 
 
@@ -748,6 +759,14 @@ def instance_create(context, values):
     return IMPL.instance_create(context, values)
 
 
+def instance_create_bulk(context, values_list):
+    """Create several instances from a list of values dictionaries.
+
+    All of the instances are created in a single transaction.
+    """
+    return IMPL.instance_create_bulk(context, values_list)
+
+
 def instance_destroy(context, instance_uuid, constraint=None):
     """Destroy the instance or raise if it does not exist."""
     return IMPL.instance_destroy(context, instance_uuid, constraint)
@@ -1253,6 +1272,11 @@ def block_device_mapping_create(context, values, legacy=True):
     return IMPL.block_device_mapping_create(context, values, legacy)
 
 
+def block_device_mapping_create_bulk(context, values_list, legacy=True):
+    """Create several entries of block device mapping in one transaction."""
+    return IMPL.block_device_mapping_create_bulk(context, values_list, legacy)
+
+
 def block_device_mapping_update(context, bdm_id, values, legacy=True):
     """Update an entry of block device mapping."""
     return IMPL.block_device_mapping_update(context, bdm_id, values, legacy)
@@ -1877,6 +1901,11 @@ def instance_tag_set(context, instance_uuid, tags):
     return IMPL.instance_tag_set(context, instance_uuid, tags)
 
 
+def instance_tag_add_bulk(context, instance_uuids, tags):
+    """Add the same list of tags to each of the given instances."""
+    return IMPL.instance_tag_add_bulk(context, instance_uuids, tags)
+
+
 def instance_tag_get_by_instance_uuid(context, instance_uuid):
     """Get all tags for a given instance."""
     return IMPL.instance_tag_get_by_instance_uuid(context, instance_uuid)
@@ -563,6 +563,18 @@ def service_update(context, service_id, values):
     return service_ref
 
 
+@oslo_db_api.wrap_db_retry(max_retries=5, retry_on_deadlock=True)
+@pick_context_manager_writer
+def service_report_heartbeats(context, service_ids, last_seen_up):
+    if not service_ids:
+        return 0
+    return model_query(context, models.Service).\
+        filter(models.Service.id.in_(service_ids)).\
+        update({'report_count': models.Service.report_count + 1,
+                'last_seen_up': last_seen_up},
+               synchronize_session=False)
+
+
 ###################
 
 
@@ -1725,6 +1737,25 @@ def instance_create(context, values):
 
     security_group_ensure_default(context)
 
+    return _instance_create(context, values)
+
+
+@require_context
+@oslo_db_api.wrap_db_retry(max_retries=5, retry_on_deadlock=True)
+@pick_context_manager_writer
+def instance_create_bulk(context, values_list):
+    """Create several new Instance records in a single transaction.
+
+    context - request context object
+    values_list - list of dicts containing column values, one per instance.
+    """
+
+    security_group_ensure_default(context)
+
+    return [_instance_create(context, values) for values in values_list]
+
+
+def _instance_create(context, values):
     values = values.copy()
     values['metadata'] = _metadata_refs(
             values.get('metadata'), models.InstanceMetadata)
@@ -3702,6 +3733,22 @@ def _set_or_validate_uuid(values):
 @require_context
 @pick_context_manager_writer
 def block_device_mapping_create(context, values, legacy=True):
+    bdm_ref = _block_device_mapping_new(values, legacy)
+    bdm_ref.save(context.session)
+    return bdm_ref
+
+
+@require_context
+@pick_context_manager_writer
+def block_device_mapping_create_bulk(context, values_list, legacy=True):
+    bdm_refs = [_block_device_mapping_new(values, legacy)
+                for values in values_list]
+    context.session.add_all(bdm_refs)
+    context.session.flush()
+    return bdm_refs
+
+
+def _block_device_mapping_new(values, legacy):
     _scrub_empty_str_values(values, ['volume_size'])
     values = _from_legacy_values(values, legacy)
     convert_objects_related_datetimes(values)
@@ -3710,7 +3757,6 @@ def block_device_mapping_create(context, values, legacy=True):
 
     bdm_ref = models.BlockDeviceMapping()
     bdm_ref.update(values)
-    bdm_ref.save(context.session)
     return bdm_ref
 
 
@@ -5445,6 +5491,24 @@ def _archive_if_instance_deleted(table, shadow_table, instances, conn,
         return 0
 
 
+def _soft_delete_rows_in_batch(conn, table, condition, max_rows):
+    """Soft delete up to max_rows rows of a table matching a condition.
+
+    The rows are selected by primary key first and then updated by primary
+    key, so that the update only locks the rows which are soft deleted
+    rather than the ranges scanned to evaluate the condition.
+    """
+    select = sql.select([table.c.id]).\
+        where(and_(condition,
+                   table.c.deleted == table.c.deleted.default.arg)).\
+        order_by(table.c.id).limit(max_rows)
+    ids = [r[0] for r in conn.execute(select).fetchall()]
+    if ids:
+        conn.execute(table.update().values(deleted=table.c.id).
+                     where(table.c.id.in_(ids)))
+    return len(ids)
+
+
 def _archive_deleted_rows_for_table(tablename, max_rows):
     """Move up to max_rows rows from one tables to the corresponding
     shadow table.
@@ -5491,10 +5555,9 @@ def _archive_deleted_rows_for_table(tablename, max_rows):
         instances = models.BASE.metadata.tables["instances"]
         deleted_instances = sql.select([instances.c.uuid]).\
             where(instances.c.deleted != instances.c.deleted.default.arg)
-        update_statement = table.update().values(deleted=table.c.id).\
-            where(table.c.instance_uuid.in_(deleted_instances))
-
-        conn.execute(update_statement)
+        _soft_delete_rows_in_batch(
+            conn, table,
+            table.c.instance_uuid.in_(deleted_instances), max_rows)
 
     elif tablename == "instance_actions_events":
         # NOTE(clecomte): we have to grab all the relation from
@@ -5506,11 +5569,8 @@ def _archive_deleted_rows_for_table(tablename, max_rows):
             where(instances.c.deleted != instances.c.deleted.default.arg)
         deleted_actions = sql.select([instance_actions.c.id]).\
             where(instance_actions.c.instance_uuid.in_(deleted_instances))
-
-        update_statement = table.update().values(deleted=table.c.id).\
-            where(table.c.action_id.in_(deleted_actions))
-
-        conn.execute(update_statement)
+        _soft_delete_rows_in_batch(
+            conn, table, table.c.action_id.in_(deleted_actions), max_rows)
 
     select = sql.select([column],
                         deleted_column != deleted_column.default.arg).\
@@ -5587,9 +5647,18 @@ def archive_deleted_rows(max_rows=None):
         if (tablename == 'migrate_version' or
                 tablename.startswith(_SHADOW_TABLE_PREFIX)):
             continue
+        watch = timeutils.StopWatch()
+        watch.start()
         rows_archived,\
         deleted_instance_uuid = _archive_deleted_rows_for_table(
                 tablename, max_rows=max_rows - total_rows_archived)
+        if rows_archived:
+            elapsed = watch.elapsed()
+            LOG.debug('Archived %(rows)d rows from table %(table)s in '
+                      '%(elapsed).3f seconds (%(rate).1f rows/s)',
+                      {'rows': rows_archived, 'table': tablename,
+                       'elapsed': elapsed,
+                       'rate': rows_archived / max(elapsed, 0.001)})
         total_rows_archived += rows_archived
         if tablename == 'instances':
             deleted_instance_uuids = deleted_instance_uuid
@@ -5607,7 +5676,54 @@ def _purgeable_tables(metadata):
                 t.name.endswith('migrate_version'))]
 
 
-def purge_shadow_tables(context, before_date, status_fn=None):
+def _purge_table_in_batches(conn, table, col, before_date, batch_size):
+    """Delete the rows of a shadow table older than before_date.
+
+    The rows are deleted batch_size at a time, each batch in its own
+    transaction, to keep the transactions and the undo logs small.
+    """
+    pk_columns = list(table.primary_key.columns)
+    if not batch_size or len(pk_columns) != 1:
+        delete = table.delete()
+        if col is not None:
+            delete = delete.where(col < before_date)
+        return conn.execute(delete).rowcount
+
+    pk = pk_columns[0]
+    deleted = 0
+    while True:
+        select = sql.select([pk]).order_by(pk).limit(batch_size)
+        if col is not None:
+            select = select.where(col < before_date)
+        ids = [r[0] for r in conn.execute(select).fetchall()]
+        if not ids:
+            break
+        deleted += conn.execute(table.delete().where(pk.in_(ids))).rowcount
+        if len(ids) < batch_size:
+            break
+    return deleted
+
+
+def _truncate_table(conn, table):
+    count = conn.execute(
+        sql.select([func.count()]).select_from(table)).scalar()
+    if count:
+        conn.execute(sql.text('TRUNCATE TABLE %s' % table.name))
+    return count
+
+
+def purge_shadow_tables(context, before_date, status_fn=None,
+                        batch_size=None, dry_run=False):
+    """Delete rows from the shadow tables.
+
+    :param before_date: Only delete the rows older than this date, or all
+                        the rows when None
+    :param status_fn: Function called with a message for each table
+    :param batch_size: Number of rows deleted per transaction, all the rows
+                       of a table are deleted at once when None
+    :param dry_run: Only count the rows which would be deleted
+    :returns: Number of rows deleted, or which would be deleted
+    """
     engine = get_engine(context=context)
     conn = engine.connect()
     metadata = MetaData()
@@ -5643,19 +5759,35 @@ def purge_shadow_tables(context, before_date, status_fn=None):
                             'table': table.name})
             continue
 
-        if col is not None:
-            delete = table.delete().where(col < before_date)
-        else:
-            delete = table.delete()
+        if dry_run:
+            count = sql.select([func.count()]).select_from(table)
+            if col is not None:
+                count = count.where(col < before_date)
+            rows = conn.execute(count).scalar()
+            if rows > 0:
+                status_fn(_('Would delete %(rows)i rows from %(table)s '
+                            'based on timestamp column %(col)s') % {
+                                'rows': rows,
+                                'table': table.name,
+                                'col': col is None and '(n/a)' or col.name})
+            total_deleted += rows
+            continue
 
-        deleted = conn.execute(delete)
-        if deleted.rowcount > 0:
+        # NOTE: Emptying a whole table is much faster with TRUNCATE, which
+        # drops the data at once instead of deleting every row, when the
+        # backend supports it.
+        if col is None and engine.dialect.name in ('mysql', 'postgresql'):
+            deleted = _truncate_table(conn, table)
+        else:
+            deleted = _purge_table_in_batches(conn, table, col, before_date,
+                                              batch_size)
+        if deleted > 0:
             status_fn(_('Deleted %(rows)i rows from %(table)s based on '
                         'timestamp column %(col)s') % {
-                            'rows': deleted.rowcount,
+                            'rows': deleted,
                             'table': table.name,
                             'col': col is None and '(n/a)' or col.name})
-        total_deleted += deleted.rowcount
+        total_deleted += deleted
 
     return total_deleted
 
@@ -6056,6 +6188,24 @@ def instance_tag_set(context, instance_uuid, tags):
         resource_id=instance_uuid).all()
 
 
+@pick_context_manager_writer
+def instance_tag_add_bulk(context, instance_uuids, tags):
+    # NOTE: This is meant for freshly created instances, so unlike
+    # instance_tag_set() we neither look for existing tags nor check that
+    # each instance exists; that would cost a query per instance.
+    if not instance_uuids:
+        return []
+
+    tags = set(tags)
+    data = [{'resource_id': instance_uuid, 'tag': tag}
+            for instance_uuid in instance_uuids for tag in tags]
+    if data:
+        context.session.execute(models.Tag.__table__.insert(), data)
+
+    return context.session.query(models.Tag).filter(
+        models.Tag.resource_id.in_(instance_uuids)).all()
+
+
 @pick_context_manager_reader
 def instance_tag_get_by_instance_uuid(context, instance_uuid):
     _check_instance_exists_in_project(context, instance_uuid)
@@ -2126,6 +2126,11 @@ class ResourceProviderTraitRetrievalFailed(NovaException):
                 " %(uuid)s")
 
 
+class UsagesRetrievalFailed(NovaException):
+    msg_fmt = _("Failed to retrieve usages for project %(project_id)s and "
+                "user %(user_id)s.")
+
+
 class ResourceProviderCreationFailed(NovaException):
     msg_fmt = _("Failed to create resource provider %(name)s")
 
@@ -0,0 +1,153 @@
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+"""Index of the fixed IP addresses of instances.
+
+The metadata API uses this index to find the instance making a request from
+its address without asking the network service. The index is kept up to date
+from the network info cache of the instances and must be stored in a cache
+backend shared by the services, see the [api]/metadata_address_index option.
+"""
+
+import six
+
+from nova import cache_utils
+import nova.conf
+
+CONF = nova.conf.CONF
+
+# NOTE: The entries of an instance are refreshed every time its network info
+# cache is saved, which the compute service does periodically.
+INDEX_CACHE_SECONDS = 24 * 60 * 60
+MC = None
+
+
+def _get_cache():
+    global MC
+
+    if MC is None:
+        MC = cache_utils.get_client(expiration_time=INDEX_CACHE_SECONDS)
+
+    return MC
+
+
+def reset_cache():
+    """Reset the cache, mainly for testing purposes."""
+    global MC
+
+    MC = None
+
+
+def _make_address_key(address):
+    if six.PY2:
+        address = address.encode('utf-8')
+    return 'address-index-%s' % address
+
+
+def _make_instance_key(instance_uuid):
+    if six.PY2:
+        instance_uuid = instance_uuid.encode('utf-8')
+    return 'address-index-instance-%s' % instance_uuid
+
+
+def get_addresses(network_info):
+    """Return the set of (network_id, address) of the fixed IPs of a
+    network info model.
+    """
+    addresses = set()
+    for vif in network_info or []:
+        network_id = vif['network']['id'] if vif.get('network') else None
+        for ip in vif.fixed_ips():
+            addresses.add((network_id, ip['address']))
+    return addresses
+
+
+def has_address(network_info, address, network_ids=None):
+    """Check that a network info model has the given fixed IP address.
+
+    :param network_info: The network info model of an instance
+    :param address: The fixed IP address to look for
+    :param network_ids: Optional list of network ids the address must be in
+    """
+    return any(addr == address and
+               (network_ids is None or network_id in network_ids)
+               for network_id, addr in get_addresses(network_info))
+
+
+def _remove_address(cache, instance_uuid, network_id, address):
+    key = _make_address_key(address)
+    entries = cache.get(key) or {}
+    # NOTE: The address may have been given to another instance already.
+    if entries.get(network_id) == instance_uuid:
+        del entries[network_id]
+        if entries:
+            cache.set(key, entries)
+        else:
+            cache.delete(key)
+
+
+def update_instance(instance_uuid, network_info):
+    """Index the fixed IP addresses of an instance.
+
+    The addresses the instance does not have anymore are removed from the
+    index.
+
+    :param instance_uuid: The uuid of the instance
+    :param network_info: The network info model of the instance
+    """
+    if not CONF.api.metadata_address_index:
+        return
+    cache = _get_cache()
+    addresses = get_addresses(network_info)
+    old_addresses = set(tuple(address) for address in
+                        cache.get(_make_instance_key(instance_uuid)) or [])
+    for network_id, address in old_addresses - addresses:
+        _remove_address(cache, instance_uuid, network_id, address)
+    for network_id, address in addresses:
+        key = _make_address_key(address)
+        entries = cache.get(key) or {}
+        entries[network_id] = instance_uuid
+        cache.set(key, entries)
+    cache.set(_make_instance_key(instance_uuid), list(addresses))
+
+
+def remove_instance(instance_uuid):
+    """Remove all of the fixed IP addresses of an instance from the index."""
+    if not CONF.api.metadata_address_index:
+        return
+    cache = _get_cache()
+    instance_key = _make_instance_key(instance_uuid)
+    for network_id, address in cache.get(instance_key) or []:
+        _remove_address(cache, instance_uuid, network_id, address)
+    cache.delete(instance_key)
+
+
+def get_instance_uuid(address, network_ids):
+    """Look up the instance that has a fixed IP address.
+
+    The same address can be used in the networks of different tenants, so
+    the lookup is always scoped to the networks of the requester.
+
+    :param address: The fixed IP address
+    :param network_ids: List of the network ids the address is in
+    :returns: The uuid of the instance, or None if the address is not
+              indexed or is used by several instances in those networks
+    """
+    if not CONF.api.metadata_address_index:
+        return None
+    entries = _get_cache().get(_make_address_key(address)) or {}
+    instance_uuids = set(instance_uuid
+                         for network_id, instance_uuid in entries.items()
+                         if network_id in network_ids)
+    if len(instance_uuids) == 1:
+        return instance_uuids.pop()
+    return None
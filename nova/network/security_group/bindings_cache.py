@@ -0,0 +1,109 @@
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+"""Cache of the Neutron security groups of the instances.
+
+Listing the servers with their security groups asks Neutron for the ports and
+the security groups of all of the servers of the page. The security groups of
+the instances are kept for [neutron]/security_group_bindings_cache_time
+seconds, and forgotten when Neutron sends a network-changed event for the
+instance or when nova adds or removes a security group of the instance.
+"""
+
+import six
+
+from nova import cache_utils
+import nova.conf
+
+CONF = nova.conf.CONF
+
+MC = None
+
+
+def _get_cache():
+    global MC
+
+    if MC is None:
+        MC = cache_utils.get_client(
+            expiration_time=CONF.neutron.security_group_bindings_cache_time)
+
+    return MC
+
+
+def reset_cache():
+    """Reset the cache, mainly for testing purposes."""
+    global MC
+
+    MC = None
+
+
+def _make_key(instance_uuid):
+    if six.PY2:
+        instance_uuid = instance_uuid.encode('utf-8')
+    return 'security-group-bindings-%s' % instance_uuid
+
+
+def _get_scope(context):
+    # NOTE: Neutron only returns the security groups the user can see, the
+    # bindings are kept apart for each project, and for the admins.
+    return 'admin' if context.is_admin else context.project_id
+
+
+def get_bindings(context, instance_uuids):
+    """Look up the security groups of instances.
+
+    :param context: The request context
+    :param instance_uuids: The uuids of the instances
+    :returns: A tuple of a dict of the lists of Neutron security groups keyed
+              by the instance uuids found in the cache, and the list of the
+              uuids of the instances not found in the cache
+    """
+    if not CONF.neutron.security_group_bindings_cache_time:
+        return {}, list(instance_uuids)
+    scope = _get_scope(context)
+    values = _get_cache().get_multi(
+        [_make_key(instance_uuid) for instance_uuid in instance_uuids])
+    bindings = {}
+    missing = []
+    for instance_uuid, value in six.moves.zip(instance_uuids, values):
+        if value is not None and scope in value:
+            bindings[instance_uuid] = value[scope]
+        else:
+            missing.append(instance_uuid)
+    return bindings, missing
+
+
+def set_bindings(context, bindings):
+    """Cache the security groups of instances.
+
+    :param context: The request context
+    :param bindings: A dict of the lists of Neutron security groups keyed by
+                     instance uuid
+    """
+    if not CONF.neutron.security_group_bindings_cache_time:
+        return
+    cache = _get_cache()
+    scope = _get_scope(context)
+    instance_uuids = list(bindings)
+    keys = [_make_key(instance_uuid) for instance_uuid in instance_uuids]
+    for key, instance_uuid, value in six.moves.zip(
+            keys, instance_uuids, cache.get_multi(keys)):
+        value = value or {}
+        value[scope] = bindings[instance_uuid]
+        cache.set(key, value)
+
+
+def remove_instance(instance_uuid):
+    """Forget the security groups of an instance."""
+    if not CONF.neutron.security_group_bindings_cache_time:
+        return
+    _get_cache().delete(_make_key(instance_uuid))
@@ -27,6 +27,7 @@ from webob import exc
 from nova import exception
 from nova.i18n import _
 from nova.network.neutronv2 import api as neutronapi
+from nova.network.security_group import bindings_cache
 from nova.network.security_group import security_group_base
 from nova import utils
 
@@ -371,34 +372,49 @@ class SecurityGroupAPI(security_group_base.SecurityGroupBase):
         all of the instances and their security groups in one shot.
         """
 
-        neutron = neutronapi.get_client(context)
+        port_security_groups, missing = bindings_cache.get_bindings(
+            context, [server['id'] for server in servers])
+
+        if missing:
+            neutron = neutronapi.get_client(context)
+
+            ports = self._get_ports_from_server_list(
+                [{'id': instance_uuid} for instance_uuid in missing], neutron)
 
-        ports = self._get_ports_from_server_list(servers, neutron)
+            security_groups = self._get_secgroups_from_port_list(ports,
+                                                                 neutron)
 
-        security_groups = self._get_secgroups_from_port_list(ports, neutron)
+            # NOTE: The instances without ports are not cached, their ports
+            # may not have been created yet.
+            missing_security_groups = {port['device_id']: []
+                                       for port in ports}
+            for port in ports:
+                for port_sg_id in port.get('security_groups', []):
+
+                    # Note:  have to check we found port_sg as its possible
+                    # the port has an SG that this user doesn't have access to
+                    port_sg = security_groups.get(port_sg_id)
+                    if port_sg:
+                        missing_security_groups.setdefault(
+                            port['device_id'], []).append(port_sg)
+            bindings_cache.set_bindings(context, missing_security_groups)
+            port_security_groups.update(missing_security_groups)
 
         instances_security_group_bindings = {}
-        for port in ports:
-            for port_sg_id in port.get('security_groups', []):
-
-                # Note:  have to check we found port_sg as its possible
-                # the port has an SG that this user doesn't have access to
-                port_sg = security_groups.get(port_sg_id)
-                if port_sg:
-                    if detailed:
-                        sg_entry = self._convert_to_nova_security_group_format(
-                                 port_sg)
-                        instances_security_group_bindings.setdefault(
-                            port['device_id'], []).append(sg_entry)
-                    else:
-                        # name is optional in neutron so if not specified
-                        # return id
-                        name = port_sg.get('name')
-                        if not name:
-                            name = port_sg.get('id')
-                        sg_entry = {'name': name}
-                        instances_security_group_bindings.setdefault(
-                            port['device_id'], []).append(sg_entry)
+        for instance_uuid, port_sgs in port_security_groups.items():
+            for port_sg in port_sgs:
+                if detailed:
+                    sg_entry = self._convert_to_nova_security_group_format(
+                             port_sg)
+                else:
+                    # name is optional in neutron so if not specified
+                    # return id
+                    name = port_sg.get('name')
+                    if not name:
+                        name = port_sg.get('id')
+                    sg_entry = {'name': name}
+                instances_security_group_bindings.setdefault(
+                    instance_uuid, []).append(sg_entry)
 
         return instances_security_group_bindings
 
@@ -472,6 +488,10 @@ class SecurityGroupAPI(security_group_base.SecurityGroupBase):
                          {'security_group_id': security_group_id,
                           'port_id': port['id']})
                 neutron.update_port(port['id'], {'port': updated_port})
+                # NOTE: Forget the security groups of the instance once the
+                # port is updated, a concurrent listing could cache the
+                # previous ones otherwise.
+                bindings_cache.remove_instance(instance.uuid)
             except n_exc.NeutronClientException as e:
                 exc_info = sys.exc_info()
                 if e.status_code == 400:
@@ -532,6 +552,7 @@ class SecurityGroupAPI(security_group_base.SecurityGroupBase):
                          {'security_group_id': security_group_id,
                           'port_id': port['id']})
                 neutron.update_port(port['id'], {'port': updated_port})
+                bindings_cache.remove_instance(instance.uuid)
                 found_security_group = True
             except Exception:
                 with excutils.save_and_reraise_exception():
@@ -15,6 +15,7 @@ from oslo_log import log as logging
 from oslo_versionedobjects import exception as ovo_exception
 
 from nova import exception
+from nova.notifications import pipeline
 from nova.objects import base
 from nova.objects import fields
 from nova import rpc
@@ -183,9 +184,8 @@ class NotificationBase(NotificationObject):
     }
 
     def _emit(self, context, event_type, publisher_id, payload):
-        notifier = rpc.get_versioned_notifier(publisher_id)
-        notify = getattr(notifier, self.priority)
-        notify(context, event_type=event_type, payload=payload)
+        pipeline.emit(context, publisher_id, self.priority, event_type,
+                      payload)
 
     @rpc.if_notifications_enabled
     def emit(self, context):
@@ -0,0 +1,231 @@
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+"""Asynchronous sending of the versioned notifications.
+
+When [notifications]/queue_size is set, the versioned notifications are put in
+a bounded queue and sent by a greenthread of the service, emitting a
+notification then does not wait for the message bus. Successive
+instance.update notifications of an instance can also be coalesced into one,
+see the [notifications]/instance_update_coalesce_window option.
+
+The queue needs a monkey patched eventlet hub to be drained, the notifications
+are sent right away otherwise, e.g. in nova-api running under uwsgi or
+mod_wsgi.
+"""
+
+import collections
+import time
+
+from eventlet import greenthread
+from eventlet import patcher
+from eventlet import queue
+from oslo_log import log as logging
+
+import nova.conf
+from nova import rpc
+from nova import utils
+
+LOG = logging.getLogger(__name__)
+CONF = nova.conf.CONF
+
+PIPELINE = None
+
+
+def _notify(context, publisher_id, priority, event_type, payload):
+    notifier = rpc.get_versioned_notifier(publisher_id)
+    notify = getattr(notifier, priority)
+    notify(context, event_type=event_type, payload=payload)
+
+
+def _merge_instance_update(old_payload, new_payload):
+    """Make an instance.update payload also cover the previous one.
+
+    The payload describes the latest state of the instance, and the state
+    transitions of both notifications.
+    """
+    old_data = old_payload['nova_object.data']
+    new_data = new_payload['nova_object.data']
+    old_update = old_data['state_update']['nova_object.data']
+    new_update = new_data['state_update']['nova_object.data']
+    for field in ('old_state', 'old_task_state'):
+        if field in old_update:
+            new_update[field] = old_update[field]
+    if old_data.get('old_display_name') and not new_data.get(
+            'old_display_name'):
+        new_data['old_display_name'] = old_data['old_display_name']
+
+
+class _Notification(object):
+    def __init__(self, context, publisher_id, priority, event_type, payload,
+                 send_after=0):
+        self.context = context
+        self.publisher_id = publisher_id
+        self.priority = priority
+        self.event_type = event_type
+        self.payload = payload
+        self.send_after = send_after
+
+
+class NotificationPipeline(object):
+    """Send the notifications from a bounded queue in a greenthread.
+
+    :param size: The maximum number of notifications waiting to be sent
+    :param coalesce_window: The number of seconds the instance.update
+                            notifications wait in the queue, during which the
+                            following ones of the same instance are merged in
+    :param drop_when_full: Whether the notifications are dropped when the
+                           queue is full, rather than waiting for room in the
+                           queue
+    """
+
+    COALESCED_EVENT_TYPES = ('instance.update',)
+
+    def __init__(self, size, coalesce_window=0, drop_when_full=False):
+        self.coalesce_window = coalesce_window
+        self.drop_when_full = drop_when_full
+        # Counters of the queued, coalesced, dropped, blocked (waited for
+        # room in the queue), sent and failed notifications.
+        self.stats = collections.Counter()
+        self._queue = queue.Queue(size)
+        # The notifications waiting in the queue which can be coalesced, by
+        # publisher and instance uuid.
+        self._coalescable = {}
+        utils.spawn_n(self._run)
+
+    def _coalesce_key(self, publisher_id, event_type, payload):
+        if (not self.coalesce_window or
+                event_type not in self.COALESCED_EVENT_TYPES):
+            return None
+        return publisher_id, payload['nova_object.data'].get('uuid')
+
+    def emit(self, context, publisher_id, priority, event_type, payload):
+        key = self._coalesce_key(publisher_id, event_type, payload)
+        pending = self._coalescable.get(key)
+        if pending is not None and pending.priority == priority:
+            _merge_instance_update(pending.payload, payload)
+            pending.context = context
+            pending.payload = payload
+            self.stats['coalesced'] += 1
+            return
+
+        # NOTE: Only the adjacent instance.update notifications of an
+        # instance are merged, the merged notification would otherwise be
+        # sent before the other notifications of the instance queued in
+        # between, with a state of the instance later than theirs.
+        uuid = (payload.get('nova_object.data', {}).get('uuid')
+                if isinstance(payload, dict) else None)
+        self._coalescable.pop((publisher_id, uuid), None)
+
+        notification = _Notification(context, publisher_id, priority,
+                                     event_type, payload)
+        if key is not None:
+            notification.send_after = time.time() + self.coalesce_window
+        try:
+            if self.drop_when_full:
+                self._queue.put_nowait(notification)
+            else:
+                if self._queue.full():
+                    self.stats['blocked'] += 1
+                self._queue.put(notification)
+        except queue.Full:
+            self.stats['dropped'] += 1
+            LOG.warning('The notification queue is full, dropped the '
+                        '%(event_type)s notification, %(dropped)d '
+                        'notifications dropped so far.',
+                        {'event_type': event_type,
+                         'dropped': self.stats['dropped']})
+            return
+        if key is not None:
+            self._coalescable[key] = notification
+        self.stats['queued'] += 1
+
+    def _run(self):
+        while True:
+            notification = self._queue.get()
+            try:
+                if notification is None:
+                    return
+                self._send(notification)
+            finally:
+                self._queue.task_done()
+
+    def _send(self, notification):
+        delay = notification.send_after - time.time()
+        if delay > 0:
+            greenthread.sleep(delay)
+        key = self._coalesce_key(notification.publisher_id,
+                                 notification.event_type,
+                                 notification.payload)
+        # NOTE: Nothing can be merged in the notification once it is out of
+        # the coalescable ones.
+        if self._coalescable.get(key) is notification:
+            del self._coalescable[key]
+        try:
+            _notify(notification.context, notification.publisher_id,
+                    notification.priority, notification.event_type,
+                    notification.payload)
+            self.stats['sent'] += 1
+        except Exception:
+            self.stats['failed'] += 1
+            LOG.exception('Failed to send the %s notification.',
+                          notification.event_type)
+
+    def flush(self):
+        """Wait for the queued notifications to be sent."""
+        self._queue.join()
+
+    def stop(self):
+        """Send the queued notifications and stop the greenthread."""
+        self._queue.put(None)
+        self.flush()
+
+
+def emit(context, publisher_id, priority, event_type, payload):
+    """Send a versioned notification, through the queue if enabled."""
+    global PIPELINE
+
+    # NOTE: The queue is drained by a greenthread, which never runs unless
+    # eventlet monkey patched the service, as it is not in nova-api under
+    # uwsgi or mod_wsgi.
+    if (not CONF.notifications.queue_size or
+            not patcher.is_monkey_patched('socket')):
+        _notify(context, publisher_id, priority, event_type, payload)
+        return
+    if PIPELINE is None:
+        PIPELINE = NotificationPipeline(
+            CONF.notifications.queue_size,
+            coalesce_window=CONF.notifications.instance_update_coalesce_window,
+            drop_when_full=CONF.notifications.queue_full_action == 'drop')
+    PIPELINE.emit(context, publisher_id, priority, event_type, payload)
+
+
+def get_stats():
+    """Return the counters of the notifications queue."""
+    if PIPELINE is None:
+        return {}
+    return dict(PIPELINE.stats)
+
+
+def flush():
+    """Wait for the queued notifications to be sent."""
+    if PIPELINE is not None:
+        PIPELINE.flush()
+
+
+def reset():
+    """Stop the queue, mainly for testing purposes."""
+    global PIPELINE
+
+    if PIPELINE is not None:
+        PIPELINE.stop()
+    PIPELINE = None
@@ -17,6 +17,7 @@
 import contextlib
 import datetime
 import functools
+import threading
 import traceback
 
 import netaddr
@@ -39,6 +40,33 @@ def get_attrname(name):
     return '_obj_' + name
 
 
+_UNSET = object()
+
+# Set while obj_from_primitive_lazy() hydrates an object, until
+# NovaObject._obj_from_primitive() takes it into account.
+_lazy_hydration = threading.local()
+
+# The implementations of obj_what_changed() which only depend on the
+# changed fields of the object and on its child objects.
+_FIELD_TRACKED_WHAT_CHANGED = (
+    ovoo_base.VersionedObject.obj_what_changed,
+    ovoo_base.ObjectListBase.obj_what_changed,
+)
+if six.PY2:
+    _FIELD_TRACKED_WHAT_CHANGED = tuple(
+        meth.__func__ for meth in _FIELD_TRACKED_WHAT_CHANGED)
+
+
+def _copy_primitive(primitive):
+    """Copy the dicts and lists of a primitive."""
+    if isinstance(primitive, dict):
+        return {key: _copy_primitive(value)
+                for key, value in primitive.items()}
+    if isinstance(primitive, list):
+        return [_copy_primitive(value) for value in primitive]
+    return primitive
+
+
 class NovaObjectRegistry(ovoo_base.VersionedObjectRegistry):
     notification_classes = []
 
@@ -95,6 +123,238 @@ class NovaObject(ovoo_base.VersionedObject):
     OBJ_SERIAL_NAMESPACE = 'nova_object'
     OBJ_PROJECT_NAMESPACE = 'nova'
 
+    def obj_to_primitive(self, target_version=None, version_manifest=None):
+        # NOTE: The same objects are often serialized several times, e.g. an
+        # instance sent to the compute service and in notifications. The
+        # primitive of the current version of an object is kept and reused
+        # as long as none of the fields of the object, or of its child
+        # objects, changed.
+        if (version_manifest is not None or
+                target_version not in (None, self.VERSION)):
+            return super(NovaObject, self).obj_to_primitive(
+                target_version=target_version,
+                version_manifest=version_manifest)
+        primitive = self._get_cached_primitive()
+        if primitive is None:
+            primitive = super(NovaObject, self).obj_to_primitive()
+            self._cache_primitive(primitive)
+        # The primitive is copied, the callers are free to modify it, for
+        # example to make it compatible with an older version.
+        return _copy_primitive(primitive)
+
+    @classmethod
+    def obj_from_primitive_lazy(cls, primitive, context=None):
+        """Object hydration deferring the child objects.
+
+        This is like obj_from_primitive() but the object and list of objects
+        fields are only hydrated when they are first accessed. The versions
+        of the child objects are checked right away, so the same exceptions
+        are raised, and the same backports requested, as with
+        obj_from_primitive().
+        """
+        objns = cls._obj_primitive_field(primitive, 'namespace')
+        objname = cls._obj_primitive_field(primitive, 'name')
+        objver = cls._obj_primitive_field(primitive, 'version')
+        if objns != cls.OBJ_PROJECT_NAMESPACE:
+            raise ovoo_exc.UnsupportedObjectError(
+                objtype='%s.%s' % (objns, objname))
+        objclass = cls.obj_class_from_name(objname, objver)
+        # NOTE: The object is hydrated through _obj_from_primitive(), so that
+        # the steps the classes add to it, like resetting the tracking of the
+        # changes of their dict fields, are run as well.
+        _lazy_hydration.enabled = True
+        try:
+            return objclass._obj_from_primitive(context, objver, primitive)
+        finally:
+            _lazy_hydration.enabled = False
+
+    @classmethod
+    def _obj_from_primitive(cls, context, objver, primitive):
+        lazy_hydration = getattr(_lazy_hydration, 'enabled', False)
+        # The child objects hydrated from here on are not deferred unless
+        # they are hydrated with obj_from_primitive_lazy() as well.
+        _lazy_hydration.enabled = False
+        if not lazy_hydration:
+            return super(NovaObject, cls)._obj_from_primitive(
+                context, objver, primitive)
+        self = cls()
+        self._context = context
+        self.VERSION = objver
+        objdata = cls._obj_primitive_field(primitive, 'data')
+        changes = cls._obj_primitive_field(primitive, 'changes', [])
+        lazy = {}
+        for name, field in self.fields.items():
+            if name not in objdata:
+                continue
+            value = objdata[name]
+            if (name == 'objects' and
+                    isinstance(self, ovoo_base.ObjectListBase)):
+                # NOTE: The list is used right away, its objects are the ones
+                # hydrated lazily.
+                value = [NovaObject.obj_from_primitive_lazy(item, context)
+                         for item in value]
+            elif (value is not None and
+                    isinstance(field, (obj_fields.ObjectField,
+                                       obj_fields.ListOfObjectsField))):
+                self._check_primitive_versions(value)
+                lazy[get_attrname(name)] = (context, name, value)
+                continue
+            else:
+                value = field.from_primitive(self, name, value)
+            setattr(self, name, value)
+        if lazy:
+            self._lazy_primitives = lazy
+        self._changed_fields = set([x for x in changes if x in self.fields])
+        return self
+
+    @classmethod
+    def _check_primitive_versions(cls, primitive):
+        """Check that the objects of a primitive have a compatible version.
+
+        :raises: IncompatibleObjectVersion or UnsupportedObjectError
+        """
+        if isinstance(primitive, list):
+            for item in primitive:
+                cls._check_primitive_versions(item)
+        elif isinstance(primitive, dict):
+            if cls._obj_primitive_key('name') in primitive:
+                objns = cls._obj_primitive_field(primitive, 'namespace')
+                objname = cls._obj_primitive_field(primitive, 'name')
+                objver = cls._obj_primitive_field(primitive, 'version')
+                if objns != cls.OBJ_PROJECT_NAMESPACE:
+                    raise ovoo_exc.UnsupportedObjectError(
+                        objtype='%s.%s' % (objns, objname))
+                cls.obj_class_from_name(objname, objver)
+                primitive = cls._obj_primitive_field(primitive, 'data')
+            for value in primitive.values():
+                cls._check_primitive_versions(value)
+
+    def _is_lazy(self, name):
+        """Tell whether a field is still waiting to be hydrated."""
+        attrname = get_attrname(name)
+        return (attrname in self.__dict__.get('_lazy_primitives', ()) and
+                attrname not in self.__dict__)
+
+    def __getattr__(self, name):
+        # NOTE: This is only called when the attribute is not found, which
+        # is when a field deserialized lazily is accessed the first time.
+        lazy = self.__dict__.get('_lazy_primitives')
+        if not lazy or name not in lazy:
+            raise AttributeError("'%s' object has no attribute '%s'" %
+                                 (type(self).__name__, name))
+        # NOTE: The primitive is only dropped once the field is hydrated, on
+        # py2 the ovo property getters get here through hasattr(), which
+        # would hide the error of a failed hydration and lose the primitive.
+        context, field_name, primitive = lazy[name]
+        field = self.fields[field_name]
+        with self.obj_alternate_context(context):
+            value = field.coerce(self, field_name, field.from_primitive(
+                self, field_name, primitive))
+        setattr(self, name, value)
+        del lazy[name]
+        return value
+
+    def obj_attr_is_set(self, attrname):
+        if self._is_lazy(attrname):
+            return True
+        return super(NovaObject, self).obj_attr_is_set(attrname)
+
+    def obj_what_changed(self):
+        if not self.__dict__.get('_lazy_primitives'):
+            return super(NovaObject, self).obj_what_changed()
+        # NOTE: The child objects which were not hydrated did not change,
+        # there is no need to hydrate them to find out.
+        changes = set([field for field in self._changed_fields
+                       if field in self.fields])
+        for field in self.fields:
+            if (not self._is_lazy(field) and self.obj_attr_is_set(field) and
+                    isinstance(getattr(self, field),
+                               ovoo_base.VersionedObject) and
+                    getattr(self, field).obj_what_changed()):
+                changes.add(field)
+        return changes
+
+    def _fields_state(self):
+        """Return the values of the fields and the snapshots of the lists
+        of objects, which tell whether the object changed.
+        """
+        values = []
+        snapshots = []
+        for name in self.fields:
+            value = self.__dict__.get(get_attrname(name), _UNSET)
+            values.append(value)
+            if (isinstance(value, list) and
+                    any(isinstance(item, NovaObject) for item in value)):
+                snapshots.append(tuple(value))
+            else:
+                snapshots.append(None)
+        return values, snapshots
+
+    def _cache_primitive(self, primitive):
+        values, snapshots = self._fields_state()
+        self._primitive_cache = (values, snapshots,
+                                 frozenset(self._changed_fields), primitive)
+        # NOTE: The primitive of some fields, like the network info of the
+        # instances, does not compare equal to their value, and the objects
+        # whose child objects are not cached could never be checked
+        # unchanged. These are not worth keeping a primitive for.
+        if self._get_cached_primitive() is None:
+            del self._primitive_cache
+
+    def __getstate__(self):
+        # NOTE: The cached primitive is not pickled with the object, e.g. when
+        # it is stored in memcache. A deep copy of the object does not keep
+        # it either, only the fields are copied.
+        state = self.__dict__.copy()
+        state.pop('_primitive_cache', None)
+        return state
+
+    def _get_cached_primitive(self):
+        """Return the cached primitive if the object did not change since
+        it was cached, otherwise None.
+        """
+        cache = self.__dict__.get('_primitive_cache')
+        if cache is None:
+            return None
+        values, snapshots, changed_fields, primitive = cache
+        if self._changed_fields != changed_fields:
+            return None
+        data = primitive[self._obj_primitive_key('data')]
+        for name, old_value, snapshot in six.moves.zip(self.fields, values,
+                                                       snapshots):
+            value = self.__dict__.get(get_attrname(name), _UNSET)
+            if value is not old_value:
+                return None
+            if isinstance(value, NovaObject):
+                if value._get_cached_primitive() is None:
+                    return None
+            elif snapshot is not None:
+                # A list of objects, the same objects must be in it and
+                # none of them must have changed.
+                if (len(value) != len(snapshot) or
+                        any(item is not old for item, old in
+                            six.moves.zip(value, snapshot))):
+                    return None
+                for item in value:
+                    if (isinstance(item, NovaObject) and
+                            item._get_cached_primitive() is None):
+                        return None
+            elif isinstance(value, (list, dict)):
+                # NOTE: The content of mutable values can change in place.
+                if value != data.get(name):
+                    return None
+            elif isinstance(value, set):
+                # Sets are sent as tuples.
+                if value != set(data.get(name, ())):
+                    return None
+        what_changed = type(self).obj_what_changed
+        what_changed = getattr(what_changed, '__func__', what_changed)
+        if what_changed not in _FIELD_TRACKED_WHAT_CHANGED:
+            changes = primitive.get(self._obj_primitive_key('changes'), [])
+            if self.obj_what_changed() != set(changes):
+                return None
+        return primitive
+
     # NOTE(ndipanov): This is nova-specific
     @staticmethod
     def should_migrate_data():
@@ -140,6 +400,9 @@ class NovaObject(ovoo_base.VersionedObject):
             self._context = original_context
 
 
+_FIELD_TRACKED_WHAT_CHANGED += (NovaObject.__dict__['obj_what_changed'],)
+
+
 class NovaPersistentObject(object):
     """Mixin class for Persistent objects.
 
@@ -177,8 +440,16 @@ class NovaObjectSerializer(messaging.NoOpSerializer):
     ability to serialize and deserialize NovaObject entities. Any service
     that needs to accept or return NovaObjects as arguments or result values
     should pass this to its RPCClient and RPCServer objects.
+
+    :param lazy: Whether the child objects of the objects received are only
+                 hydrated when they are first accessed, see
+                 NovaObject.obj_from_primitive_lazy()
     """
 
+    def __init__(self, lazy=False):
+        super(NovaObjectSerializer, self).__init__()
+        self.lazy = lazy
+
     @property
     def conductor(self):
         if not hasattr(self, '_conductor'):
@@ -188,7 +459,12 @@ class NovaObjectSerializer(messaging.NoOpSerializer):
 
     def _process_object(self, context, objprim):
         try:
-            objinst = NovaObject.obj_from_primitive(objprim, context=context)
+            if self.lazy:
+                objinst = NovaObject.obj_from_primitive_lazy(
+                    objprim, context=context)
+            else:
+                objinst = NovaObject.obj_from_primitive(objprim,
+                                                        context=context)
         except ovoo_exc.IncompatibleObjectVersion:
             objver = objprim['nova_object.version']
             if objver.count('.') == 2:
@@ -430,6 +430,41 @@ class BlockDeviceMappingList(base.ObjectListBase, base.NovaObject):
         return base.obj_make_list(
                 context, cls(), objects.BlockDeviceMapping, db_bdms or [])
 
+    @classmethod
+    def create_bulk(cls, context, bdms):
+        """Create the block device records for new instances in one go.
+
+        This is the bulk equivalent of BlockDeviceMapping.create() and is
+        only meant for cells v2 deployments, where the conductor creates the
+        mappings for all the instances of a multi-create request.
+
+        :param context: security context used for database calls
+        :param bdms: list of BlockDeviceMapping objects which will be updated
+                     in place with the created records
+        """
+        if cells_opts.get_cell_type() == 'api':
+            raise exception.ObjectActionError(
+                    action='create',
+                    reason='BlockDeviceMapping cannot be '
+                           'created in the API cell.')
+
+        values_list = []
+        for bdm in bdms:
+            if bdm.obj_attr_is_set('id'):
+                raise exception.ObjectActionError(action='create',
+                                                  reason='already created')
+            updates = bdm.obj_get_changes()
+            if 'instance' in updates:
+                raise exception.ObjectActionError(action='create',
+                                                  reason='instance assigned')
+            values_list.append(updates)
+
+        db_bdms = db.block_device_mapping_create_bulk(
+                context, values_list, legacy=False)
+        for bdm, db_bdm in zip(bdms, db_bdms):
+            bdm._from_db_object(context, bdm, db_bdm)
+        return bdms
+
     def root_bdm(self):
         """It only makes sense to call this method when the
         BlockDeviceMappingList contains BlockDeviceMappings from
@@ -278,6 +278,27 @@ class BuildRequestList(base.ObjectListBase, base.NovaObject):
         return base.obj_make_list(context, cls(context), objects.BuildRequest,
                                   db_build_reqs)
 
+    @staticmethod
+    @db.api_context_manager.reader
+    def _get_instance_uuids_from_db(context, instance_uuids):
+        return context.session.query(api_models.BuildRequest.instance_uuid).\
+            filter(api_models.BuildRequest.instance_uuid.in_(
+                instance_uuids)).all()
+
+    @classmethod
+    def get_existing_instance_uuids(cls, context, instance_uuids):
+        """Return the subset of instance_uuids that still have a BuildRequest.
+
+        This is a cheaper alternative to calling
+        BuildRequest.get_by_instance_uuid for each instance in a multi-create
+        request since it only needs a single query and does not load the
+        serialized instance, block device mappings or tags.
+        """
+        if not instance_uuids:
+            return set()
+        db_rows = cls._get_instance_uuids_from_db(context, instance_uuids)
+        return set(row.instance_uuid for row in db_rows)
+
     @staticmethod
     def _pass_exact_filters(instance, filters):
         for filter_key, filter_val in filters.items():
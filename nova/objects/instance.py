@@ -39,6 +39,7 @@ from nova import notifications
 from nova import objects
 from nova.objects import base
 from nova.objects import fields
+from nova import quota
 from nova import utils
 
 
@@ -62,6 +63,24 @@ _INSTANCE_EXTRA_FIELDS = ['numa_topology', 'pci_requests',
 _MIGRATION_CONTEXT_ATTRS = ['numa_topology', 'pci_requests',
                             'pci_devices']
 
+# Fields that affect the instances, cores and ram usage counted for quota
+_QUOTA_USAGE_FIELDS = ('project_id', 'user_id', 'vcpus', 'memory_mb')
+
+
+def _invalidate_quota_usage_counts(old_ref, new_ref):
+    """Invalidate the cached quota usage counts if an update changed them."""
+    old_ref = old_ref or {}
+    new_ref = new_ref or {}
+    if (all(old_ref.get(field) == new_ref.get(field)
+            for field in _QUOTA_USAGE_FIELDS) and
+            (old_ref.get('vm_state') == vm_states.SOFT_DELETED) ==
+            (new_ref.get('vm_state') == vm_states.SOFT_DELETED)):
+        return
+    for project_id in set([old_ref.get('project_id'),
+                           new_ref.get('project_id')]):
+        quota.invalidate_usage_counts(project_id)
+
+
 # These are fields that can be specified as expected_attrs
 INSTANCE_OPTIONAL_ATTRS = (_INSTANCE_OPTIONAL_JOINED_FIELDS +
                            _INSTANCE_OPTIONAL_NON_COLUMN_FIELDS +
@@ -486,8 +505,9 @@ class Instance(base.NovaPersistentObject, base.NovaObject,
         return cls._from_db_object(context, cls(), db_inst,
                                    expected_attrs)
 
-    @base.remotable
-    def create(self):
+    def _get_create_updates(self):
+        """Return the db updates and expected_attrs to create this instance.
+        """
         if self.obj_attr_is_set('id'):
             raise exception.ObjectActionError(action='create',
                                               reason='already created')
@@ -560,7 +580,9 @@ class Instance(base.NovaPersistentObject, base.NovaObject,
                 jsonutils.dumps(vcpu_model.obj_to_primitive()))
         else:
             updates['extra']['vcpu_model'] = None
-        db_inst = db.instance_create(self._context, updates)
+        return updates, expected_attrs
+
+    def _from_created_db_object(self, db_inst, expected_attrs):
         self._from_db_object(self._context, self, db_inst, expected_attrs)
 
         # NOTE(danms): The EC2 ids are created on their first load. In order
@@ -570,6 +592,13 @@ class Instance(base.NovaPersistentObject, base.NovaObject,
         self._load_ec2_ids()
         self.obj_reset_changes(['ec2_ids'])
 
+    @base.remotable
+    def create(self):
+        updates, expected_attrs = self._get_create_updates()
+        db_inst = db.instance_create(self._context, updates)
+        self._from_created_db_object(db_inst, expected_attrs)
+        quota.invalidate_usage_counts(self.project_id)
+
     @base.remotable
     def destroy(self):
         if not self.obj_attr_is_set('id'):
@@ -595,6 +624,7 @@ class Instance(base.NovaPersistentObject, base.NovaObject,
         except exception.ConstraintNotMet:
             raise exception.ObjectActionError(action='destroy',
                                               reason='host changed')
+        quota.invalidate_usage_counts(self.project_id)
         if cell_type == 'compute':
             cells_api = cells_rpcapi.CellsAPI()
             cells_api.instance_destroy_at_top(self._context, stale_instance)
@@ -808,6 +838,7 @@ class Instance(base.NovaPersistentObject, base.NovaObject,
                 columns_to_join=_expected_cols(expected_attrs))
         self._from_db_object(context, self, inst_ref,
                              expected_attrs=expected_attrs)
+        _invalidate_quota_usage_counts(old_ref, inst_ref)
 
         if cells_update_from_api:
             _handle_cell_update_from_api()
@@ -1214,12 +1245,35 @@ class InstanceList(base.ObjectListBase, base.NovaObject):
     # Version 2.2: Pagination for get_active_by_window_joined()
     # Version 2.3: Add get_count_by_vm_state()
     # Version 2.4: Add get_counts()
-    VERSION = '2.4'
+    # Version 2.5: Add get_instance_counts()
+    VERSION = '2.5'
 
     fields = {
         'objects': fields.ListOfObjectsField('Instance'),
     }
 
+    @classmethod
+    def create_bulk(cls, context, instances):
+        """Create several new instances in a single database transaction.
+
+        The instances are created in the database targeted by context, but
+        each Instance object keeps its own context afterwards, like it would
+        if it had been created with obj_target_cell() and Instance.create().
+
+        :param context: The security context, possibly targeted at a cell
+        :param instances: list of Instance objects that have not been created
+        """
+        prepared = [instance._get_create_updates() for instance in instances]
+        db_insts = db.instance_create_bulk(
+            context, [updates for updates, expected_attrs in prepared])
+        for instance, (updates, expected_attrs), db_inst in zip(
+                instances, prepared, db_insts):
+            with instance.obj_alternate_context(context):
+                instance._from_created_db_object(db_inst, expected_attrs)
+        for project_id in set(instance.project_id for instance in instances):
+            quota.invalidate_usage_counts(project_id)
+        return instances
+
     @classmethod
     @db.select_db_reader_mode
     def _get_by_filters_impl(cls, context, filters,
@@ -1423,7 +1477,8 @@ class InstanceList(base.ObjectListBase, base.NovaObject):
 
     @staticmethod
     @db_api.pick_context_manager_reader
-    def _get_counts_in_db(context, project_id, user_id=None):
+    def _get_counts_in_db(context, project_id, user_id=None,
+                          instances_only=False):
         # NOTE(melwitt): Copied from nova/db/sqlalchemy/api.py:
         # It would be better to have vm_state not be nullable
         # but until then we test it explicitly as a workaround.
@@ -1431,16 +1486,20 @@ class InstanceList(base.ObjectListBase, base.NovaObject):
             models.Instance.vm_state != vm_states.SOFT_DELETED,
             models.Instance.vm_state == null()
             )
-        project_query = context.session.query(
-            func.count(models.Instance.id),
-            func.sum(models.Instance.vcpus),
-            func.sum(models.Instance.memory_mb)).\
+        if instances_only:
+            columns = (func.count(models.Instance.id),)
+            fields = ('instances',)
+        else:
+            columns = (func.count(models.Instance.id),
+                       func.sum(models.Instance.vcpus),
+                       func.sum(models.Instance.memory_mb))
+            fields = ('instances', 'cores', 'ram')
+        project_query = context.session.query(*columns).\
             filter_by(deleted=0).\
             filter(not_soft_deleted).\
             filter_by(project_id=project_id)
 
         project_result = project_query.first()
-        fields = ('instances', 'cores', 'ram')
         project_counts = {field: int(project_result[idx] or 0)
                           for idx, field in enumerate(fields)}
         counts = {'project': project_counts}
@@ -1469,3 +1528,20 @@ class InstanceList(base.ObjectListBase, base.NovaObject):
                               'ram': <count across user>}}
         """
         return cls._get_counts_in_db(context, project_id, user_id=user_id)
+
+    @base.remotable_classmethod
+    def get_instance_counts(cls, context, project_id, user_id=None):
+        """Get the counts of Instance objects in the database, without their
+        cores and ram.
+
+        :param context: The request context for database access
+        :param project_id: The project_id to count across
+        :param user_id: The user_id to count across
+        :returns: A dict containing the project-scoped count and user-scoped
+                  count if user_id is specified. For example:
+
+                    {'project': {'instances': <count across project>},
+                     'user': {'instances': <count across user>}}
+        """
+        return cls._get_counts_in_db(context, project_id, user_id=user_id,
+                                     instances_only=True)
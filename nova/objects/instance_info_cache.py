@@ -18,6 +18,7 @@ from nova.cells import opts as cells_opts
 from nova.cells import rpcapi as cells_rpcapi
 from nova import db
 from nova import exception
+from nova.network import address_index
 from nova.objects import base
 from nova.objects import fields
 
@@ -94,6 +95,8 @@ class InstanceInfoCache(base.NovaPersistentObject, base.NovaObject):
                                                self.instance_uuid,
                                                {'network_info': nw_info_json})
             self._from_db_object(self._context, self, rv)
+            address_index.update_instance(self.instance_uuid,
+                                          self.network_info)
             if update_cells:
                 # Send a copy of ourselves before updates are applied so
                 # that cells can tell what changed.
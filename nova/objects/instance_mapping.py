@@ -195,3 +195,21 @@ class InstanceMappingList(base.ObjectListBase, base.NovaObject):
     @classmethod
     def destroy_bulk(cls, context, instance_uuids):
         return cls._destroy_bulk_in_db(context, instance_uuids)
+
+    @staticmethod
+    @db_api.api_context_manager.writer
+    def _update_cell_bulk_in_db(context, instance_uuids, cell_id):
+        return context.session.query(api_models.InstanceMapping).filter(
+                api_models.InstanceMapping.instance_uuid.in_(instance_uuids)).\
+                update({'cell_id': cell_id}, synchronize_session=False)
+
+    @classmethod
+    def update_cell_bulk(cls, context, instance_uuids, cell_mapping):
+        """Map all of the given instances to cell_mapping in one update.
+
+        :returns: The number of instance mappings that were updated.
+        """
+        if not instance_uuids:
+            return 0
+        return cls._update_cell_bulk_in_db(context, instance_uuids,
+                                           cell_mapping.id)
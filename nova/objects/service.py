@@ -25,6 +25,7 @@ from nova.notifications.objects import service as service_notification
 from nova import objects
 from nova.objects import base
 from nova.objects import fields
+from nova.servicegroup import heartbeat
 
 
 LOG = logging.getLogger(__name__)
@@ -161,7 +162,8 @@ class Service(base.NovaPersistentObject, base.NovaObject,
     # Version 1.20: Added get_minimum_version_multi()
     # Version 1.21: Added uuid
     # Version 1.22: Added get_by_uuid()
-    VERSION = '1.22'
+    # Version 1.23: Added report_heartbeat()
+    VERSION = '1.23'
 
     fields = {
         'id': fields.IntegerField(read_only=True),
@@ -384,6 +386,15 @@ class Service(base.NovaPersistentObject, base.NovaObject,
 
         self._send_status_update_notification(updates)
 
+    @base.remotable
+    def report_heartbeat(self):
+        """Record a state report of the service.
+
+        Unlike save(), the report may only be written to the database with
+        the reports of other services, see heartbeat_batch_interval.
+        """
+        heartbeat.report(self._context, self.id)
+
     def _send_status_update_notification(self, updates):
         # Note(gibi): We do not trigger notification on version as that field
         # is always dirty, which would cause that nova sends notification on
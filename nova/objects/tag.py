@@ -74,3 +74,17 @@ class TagList(base.ObjectListBase, base.NovaObject):
     @base.remotable_classmethod
     def destroy(cls, context, resource_id):
         db.instance_tag_delete_all(context, resource_id)
+
+    @classmethod
+    def create_bulk(cls, context, resource_ids, tags):
+        """Add the same tags to several newly created instances.
+
+        :returns: A dict, keyed by resource_id, of TagList objects.
+        """
+        db_tags = db.instance_tag_add_bulk(context, resource_ids, tags)
+        tags_by_resource = {resource_id: [] for resource_id in resource_ids}
+        for db_tag in db_tags:
+            tags_by_resource[db_tag['resource_id']].append(db_tag)
+        return {resource_id: base.obj_make_list(context, cls(), objects.Tag,
+                                                resource_tags)
+                for resource_id, resource_tags in tags_by_resource.items()}
@@ -14,7 +14,7 @@
 #    License for the specific language governing permissions and limitations
 #    under the License.
 
-import copy
+import heapq
 
 from oslo_config import cfg
 from oslo_log import log as logging
@@ -57,15 +57,42 @@ class PciDeviceStats(object):
 
     pool_keys = ['product_id', 'vendor_id', 'numa_node', 'dev_type']
 
+    # The keys pools are indexed by, see _get_pool_index()
+    index_keys = ('vendor_id', 'product_id')
+
     def __init__(self, stats=None, dev_filter=None):
         super(PciDeviceStats, self).__init__()
         # NOTE(sbauza): Stats are a PCIDevicePoolList object
         self.pools = [pci_pool.to_dict()
                       for pci_pool in stats] if stats else []
         self.pools.sort(key=lambda item: len(item))
+        self._pool_index = None
         self.dev_filter = dev_filter or whitelist.Whitelist(
             CONF.pci.passthrough_whitelist)
 
+    def _get_pool_index(self):
+        """Return the pools indexed by their vendor and product IDs.
+
+        The index maps the values of index_keys of the pools to the list of
+        the pools with these values, along with their position in the pools
+        list. It is built again after pools are added or removed.
+        """
+        if self._pool_index is None:
+            self._pool_index = {}
+            for position, pool in enumerate(self.pools):
+                key = tuple(pool.get(k) for k in self.index_keys)
+                self._pool_index.setdefault(key, []).append((position, pool))
+        return self._pool_index
+
+    def _add_pool(self, pool):
+        self.pools.append(pool)
+        self.pools.sort(key=lambda item: len(item))
+        self._pool_index = None
+
+    def _remove_pool(self, pool):
+        self.pools.remove(pool)
+        self._pool_index = None
+
     def _equal_properties(self, dev, entry, matching_keys):
         return all(dev.get(prop) == entry.get(prop)
                    for prop in matching_keys)
@@ -105,24 +132,42 @@ class PciDeviceStats(object):
             if not pool:
                 dev_pool['count'] = 0
                 dev_pool['devices'] = []
-                self.pools.append(dev_pool)
-                self.pools.sort(key=lambda item: len(item))
+                self._add_pool(dev_pool)
                 pool = dev_pool
             pool['count'] += 1
             pool['devices'].append(dev)
 
     @staticmethod
-    def _decrease_pool_count(pool_list, pool, count=1):
+    def _get_pool_count(pool, counts=None):
+        """Return the number of devices left in a pool.
+
+        :param counts: Optional dict of the number of devices left in the
+            pools by pool id, which overrides the count of the pools when
+            requests are only checked and not applied.
+        """
+        if counts is None:
+            return pool['count']
+        return counts.get(id(pool), pool['count'])
+
+    def _decrease_pool_count(self, pool, count=1, counts=None):
         """Decrement pool's size by count.
 
-        If pool becomes empty, remove pool from pool_list.
+        If pool becomes empty, remove pool from the pools, or set its count
+        to zero in counts if it is given.
         """
-        if pool['count'] > count:
-            pool['count'] -= count
+        pool_count = self._get_pool_count(pool, counts)
+        if pool_count > count:
+            pool_count -= count
             count = 0
         else:
-            count -= pool['count']
-            pool_list.remove(pool)
+            count -= pool_count
+            pool_count = 0
+        if counts is not None:
+            counts[id(pool)] = pool_count
+        elif pool_count:
+            pool['count'] = pool_count
+        else:
+            self._remove_pool(pool)
         return count
 
     def remove_device(self, dev):
@@ -134,7 +179,7 @@ class PciDeviceStats(object):
                 raise exception.PciDevicePoolEmpty(
                     compute_node_id=dev.compute_node_id, address=dev.address)
             pool['devices'].remove(dev)
-            self._decrease_pool_count(self.pools, pool)
+            self._decrease_pool_count(pool)
 
     def get_free_devs(self):
         free_devs = []
@@ -149,7 +194,7 @@ class PciDeviceStats(object):
             spec = request.spec
             # For now, keep the same algorithm as during scheduling:
             # a spec may be able to match multiple pools.
-            pools = self._filter_pools_for_spec(self.pools, spec)
+            pools = self._filter_pools_for_spec(spec)
             if numa_cells:
                 numa_policy = None
                 if 'numa_policy' in request:
@@ -208,14 +253,27 @@ class PciDeviceStats(object):
             except exception.PciDeviceNotFound:
                 return
 
-    @staticmethod
-    def _filter_pools_for_spec(pools, request_specs):
-        return [pool for pool in pools
-                if utils.pci_device_prop_match(pool, request_specs)]
+    def _filter_pools_for_spec(self, request_specs):
+        """Return the pools matching any of the request specs.
+
+        Only the pools with the vendor and product IDs of the specs are
+        checked when all the specs have them, and the pools are returned in
+        the order of the pools list.
+        """
+        match = utils.pci_device_prop_matcher(request_specs)
+        if not all(k in spec and not isinstance(spec[k], list)
+                   for spec in request_specs for k in self.index_keys):
+            return [pool for pool in self.pools if match(pool)]
+
+        index = self._get_pool_index()
+        keys = set(tuple(spec[k] for k in self.index_keys)
+                   for spec in request_specs)
+        candidates = heapq.merge(*[index.get(key, []) for key in keys])
+        return [pool for position, pool in candidates if match(pool)]
 
     @classmethod
     def _filter_pools_for_numa_cells(cls, pools, numa_cells, numa_policy,
-            requested_count):
+            requested_count, counts=None):
         """Filter out pools with the wrong NUMA affinity, if required.
 
         Exclude pools that do not have *suitable* PCI NUMA affinity.
@@ -230,6 +288,8 @@ class PciDeviceStats(object):
             corresponds to the ``id`` of host NUMACells.
         :param numa_policy: The PCI NUMA affinity policy to apply.
         :param requested_count: The number of PCI devices requested.
+        :param counts: Optional dict of the number of devices left in the
+            pools by pool id, see _get_pool_count.
         :returns: A list of pools that can, together, provide at least
             ``requested_count`` PCI devices with the level of NUMA affinity
             required by ``numa_policy``, else all pools that can satisfy this
@@ -242,15 +302,15 @@ class PciDeviceStats(object):
 
         # filter out pools which numa_node is not included in numa_cell_ids
         filtered_pools = [
-            pool for pool in pools if any(utils.pci_device_prop_match(
-                pool, [{'numa_node': cell}]) for cell in numa_cell_ids)]
+            pool for pool in pools if pool.get('numa_node') in numa_cell_ids]
 
         # we can't apply a less strict policy than the one requested, so we
         # need to return if we've demanded a NUMA affinity of REQUIRED.
         # However, NUMA affinity is a good thing. If we can get enough devices
         # with the stricter policy then we will use them.
         if requested_policy == fields.PCINUMAAffinityPolicy.REQUIRED or sum(
-                pool['count'] for pool in filtered_pools) >= requested_count:
+                cls._get_pool_count(pool, counts)
+                for pool in filtered_pools) >= requested_count:
             return filtered_pools
 
         # some systems don't report NUMA node info for PCI devices, in which
@@ -261,15 +321,15 @@ class PciDeviceStats(object):
 
         # filter out pools which numa_node is not included in numa_cell_ids
         filtered_pools = [
-            pool for pool in pools if any(utils.pci_device_prop_match(
-                pool, [{'numa_node': cell}]) for cell in numa_cell_ids)]
+            pool for pool in pools if pool.get('numa_node') in numa_cell_ids]
 
         # once again, we can't apply a less strict policy than the one
         # requested, so we need to return if we've demanded a NUMA affinity of
         # LEGACY. Similarly, we will also return if we have enough devices to
         # satisfy this somewhat strict policy.
         if requested_policy == fields.PCINUMAAffinityPolicy.LEGACY or sum(
-                pool['count'] for pool in filtered_pools) >= requested_count:
+                cls._get_pool_count(pool, counts)
+                for pool in filtered_pools) >= requested_count:
             return filtered_pools
 
         # if we've got here, we're using the PREFERRED policy and weren't able
@@ -293,21 +353,23 @@ class PciDeviceStats(object):
         return [pool for pool in pools
                 if not pool.get('dev_type') == fields.PciDeviceType.SRIOV_PF]
 
-    def _apply_request(self, pools, request, numa_cells=None):
+    def _apply_request(self, request, numa_cells=None, counts=None):
         """Apply a PCI request.
 
-        Apply a PCI request against a given set of PCI device pools, which are
+        Apply a PCI request against the PCI device pools, which are
         collections of devices with similar traits.
 
         If ``numa_cells`` is provided then NUMA locality may be taken into
         account, depending on the value of ``request.numa_policy``.
 
-        :param pools: A list of PCI device pool dicts
         :param request: An InstancePCIRequest object describing the type,
             quantity and required NUMA affinity of device(s) we want..
         :param numa_cells: A list of InstanceNUMACell objects whose ``id``
             corresponds to the ``id`` of host NUMACells.
-        :returns: True if the request was applied against the provided pools
+        :param counts: Optional dict of the number of devices left in the
+            pools by pool id. When given, the request is applied to it rather
+            than to the pools themselves, see _get_pool_count.
+        :returns: True if the request was applied against the pools
             successfully, else False.
         """
         # NOTE(vladikr): This code maybe open to race conditions.
@@ -317,7 +379,7 @@ class PciDeviceStats(object):
 
         # Firstly, let's exclude all devices that don't match our spec (e.g.
         # they've got different PCI IDs or something)
-        matching_pools = self._filter_pools_for_spec(pools, request.spec)
+        matching_pools = self._filter_pools_for_spec(request.spec)
 
         # Next, let's exclude all devices that aren't on the correct NUMA node
         # *assuming* we have devices and care about that, as determined by
@@ -328,7 +390,7 @@ class PciDeviceStats(object):
                 numa_policy = request.numa_policy
 
             matching_pools = self._filter_pools_for_numa_cells(matching_pools,
-                numa_cells, numa_policy, count)
+                numa_cells, numa_policy, count, counts)
 
         # Finally, if we're not requesting PFs then we should not use these.
         # Exclude them.
@@ -336,11 +398,12 @@ class PciDeviceStats(object):
                                                         request)
 
         # Do we still have any devices left?
-        if sum([pool['count'] for pool in matching_pools]) < count:
+        if sum([self._get_pool_count(pool, counts)
+                for pool in matching_pools]) < count:
             return False
         else:
             for pool in matching_pools:
-                count = self._decrease_pool_count(pools, pool, count)
+                count = self._decrease_pool_count(pool, count, counts)
                 if not count:
                     break
         return True
@@ -363,8 +426,11 @@ class PciDeviceStats(object):
         """
         # note (yjiang5): this function has high possibility to fail,
         # so no exception should be triggered for performance reason.
-        pools = copy.deepcopy(self.pools)
-        return all(self._apply_request(pools, r, numa_cells) for r in requests)
+        # The requests are applied to a dict of the pool counts rather than
+        # to a copy of the pools, which would include their devices.
+        counts = {}
+        return all(self._apply_request(r, numa_cells, counts)
+                   for r in requests)
 
     def apply_requests(self, requests, numa_cells=None):
         """Apply PCI requests to the PCI stats.
@@ -383,8 +449,7 @@ class PciDeviceStats(object):
         :raises: exception.PciDeviceRequestFailed if this compute node cannot
             satisfy the given request.
         """
-        if not all(self._apply_request(self.pools, r, numa_cells)
-                   for r in requests):
+        if not all(self._apply_request(r, numa_cells) for r in requests):
             raise exception.PciDeviceRequestFailed(requests=requests)
 
     def __iter__(self):
@@ -398,6 +463,7 @@ class PciDeviceStats(object):
     def clear(self):
         """Clear all the stats maintained."""
         self.pools = []
+        self._pool_index = None
 
     def __eq__(self, other):
         return self.pools == other.pools
@@ -35,6 +35,41 @@ _PCI_ADDRESS_REGEX = re.compile(_PCI_ADDRESS_PATTERN)
 _SRIOV_TOTALVFS = "sriov_totalvfs"
 
 
+def pci_device_prop_matcher(specs):
+    """Build a function checking if a pci_dev meets spec requirements.
+
+    The returned function gives the same result as pci_device_prop_match for
+    the given specs, but the specs are only processed once, which is faster
+    when they are matched against many devices or pools.
+    """
+    def _compile(spec):
+        exact = []
+        lists = []
+        for k, v in spec.items():
+            if isinstance(v, list):
+                lists.append((k, v))
+            else:
+                exact.append((k, v))
+
+        def _matching_devices(pci_dev):
+            for k, v in exact:
+                if pci_dev.get(k) != v:
+                    return False
+            for k, v in lists:
+                pci_dev_v = pci_dev.get(k)
+                if isinstance(pci_dev_v, list):
+                    if not all(x in pci_dev_v for x in v):
+                        return False
+                elif pci_dev_v != v:
+                    return False
+            return True
+
+        return _matching_devices
+
+    matchers = [_compile(spec) for spec in specs]
+    return lambda pci_dev: any(match(pci_dev) for match in matchers)
+
+
 def pci_device_prop_match(pci_dev, specs):
     """Check if the pci_dev meet spec requirement
 
@@ -48,17 +83,7 @@ def pci_device_prop_match(pci_dev, specs):
       "capabilities_network": ["rx", "tx", "tso", "gso"]}]
 
     """
-    def _matching_devices(spec):
-        for k, v in spec.items():
-            pci_dev_v = pci_dev.get(k)
-            if isinstance(v, list) and isinstance(pci_dev_v, list):
-                if not all(x in pci_dev.get(k) for x in v):
-                    return False
-            elif pci_dev_v != v:
-                return False
-        return True
-
-    return any(_matching_devices(spec) for spec in specs)
+    return pci_device_prop_matcher(specs)(pci_dev)
 
 
 def parse_address(address):
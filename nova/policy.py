@@ -14,9 +14,11 @@
 #    under the License.
 
 """Policy Engine For Nova."""
+import contextlib
 import copy
 import re
 import sys
+import time
 
 from oslo_config import cfg
 from oslo_log import log as logging
@@ -41,6 +43,11 @@ USER_BASED_RESOURCES = ['os-keypairs']
 # rules whether were updated.
 saved_file_rules = []
 KEY_EXPR = re.compile(r'%\((\w+)\)s')
+TARGET_KEY_EXPR = re.compile(r'%\(([^)]*)\)s')
+# The keys of the target the rules of the actions depend on, by action, with
+# the rules they were found in.
+_rule_target_keys = {}
+_MISSING = object()
 
 
 def reset():
@@ -48,6 +55,7 @@ def reset():
     if _ENFORCER:
         _ENFORCER.clear()
         _ENFORCER = None
+    _rule_target_keys.clear()
 
 
 def init(policy_file=None, rules=None, default_rule=None, use_conf=True):
@@ -155,6 +163,13 @@ def authorize(context, action, target, do_raise=True, exc=None):
     credentials = context.to_policy_values()
     if not exc:
         exc = exception.PolicyNotAuthorized
+    cache = getattr(context, 'policy_cache', None)
+    if cache is not None:
+        return cache.authorize(action, target, credentials, do_raise, exc)
+    return _authorize(action, target, credentials, do_raise, exc)
+
+
+def _authorize(action, target, credentials, do_raise, exc):
     try:
         result = _ENFORCER.authorize(action, target, credentials,
                                      do_raise=do_raise, exc=exc, action=action)
@@ -169,6 +184,146 @@ def authorize(context, action, target, do_raise=True, exc=None):
     return result
 
 
+def _collect_target_keys(check, keys, seen_rules):
+    """Collect the keys of the target a check depends on.
+
+    :returns: False if the check may depend on something else than the target
+              and the credentials
+    """
+    if isinstance(check, (policy.AndCheck, policy.OrCheck)):
+        return all(_collect_target_keys(rule, keys, seen_rules)
+                   for rule in check.rules)
+    if isinstance(check, policy.NotCheck):
+        return _collect_target_keys(check.rule, keys, seen_rules)
+    if isinstance(check, policy.RuleCheck):
+        if check.match in seen_rules:
+            return True
+        seen_rules.add(check.match)
+        try:
+            rule = _ENFORCER.rules[check.match]
+        except KeyError:
+            # The check is always False.
+            return True
+        return _collect_target_keys(rule, keys, seen_rules)
+    if isinstance(check, policy.Check):
+        # NOTE: The http and https checks ask an external server.
+        if check.kind in ('http', 'https'):
+            return False
+        match_keys = TARGET_KEY_EXPR.findall(check.match)
+        if check.match.count('%') != len(match_keys):
+            return False
+        keys.update(match_keys)
+        return True
+    # The "@" and "!" checks.
+    return str(check) in ('@', '!')
+
+
+def _get_target_keys(action):
+    """Return the keys of the target the rule of an action depends on.
+
+    :returns: A sorted tuple of keys, or None if the decision may depend on
+              something else than the target and the credentials
+    """
+    try:
+        rule = _ENFORCER.rules[action]
+    except KeyError:
+        return None
+    cached = _rule_target_keys.get(action)
+    if cached is not None and cached[0] is rule:
+        return cached[1]
+    keys = set()
+    if _collect_target_keys(rule, keys, set([action])):
+        target_keys = tuple(sorted(keys))
+    else:
+        target_keys = None
+    _rule_target_keys[action] = (rule, target_keys)
+    return target_keys
+
+
+def _freeze(value):
+    if isinstance(value, dict):
+        return tuple(sorted((key, _freeze(item))
+                            for key, item in value.items()))
+    if isinstance(value, (list, tuple, set)):
+        return tuple(_freeze(item) for item in value)
+    hash(value)
+    return value
+
+
+class DecisionCache(object):
+    """The policy decisions made while processing an API request.
+
+    Listing resources checks the same rules again and again, with the same
+    credentials and often targets only differing in attributes the rules do
+    not depend on. The decisions are keyed by the action, the credentials and
+    the values of the attributes of the target the rule of the action depends
+    on, so a rule not depending on the target is only checked once.
+
+    The number of checks, of decisions taken from the cache and the time
+    spent checking the rules are counted.
+    """
+
+    def __init__(self):
+        self.decisions = {}
+        self.checks = 0
+        self.hits = 0
+        self.elapsed = 0.0
+
+    def _make_key(self, action, target, credentials):
+        target_keys = _get_target_keys(action)
+        if target_keys is None:
+            return None
+        # NOTE: Reading the deprecated credentials warns, their string does
+        # not and tells them apart as well.
+        try:
+            return (action, str(credentials),
+                    tuple(_freeze(target.get(key, _MISSING))
+                          for key in target_keys))
+        except TypeError:
+            # An unhashable value.
+            return None
+
+    def authorize(self, action, target, credentials, do_raise, exc):
+        start = time.time()
+        self.checks += 1
+        try:
+            key = self._make_key(action, target, credentials)
+            if key is not None and key in self.decisions:
+                self.hits += 1
+                result = self.decisions[key]
+                if not result and do_raise:
+                    raise exc(action=action)
+                return result
+            try:
+                result = _authorize(action, target, credentials, do_raise,
+                                    exc)
+            except exc:
+                if key is not None:
+                    self.decisions[key] = False
+                raise
+            if key is not None:
+                self.decisions[key] = result
+            return result
+        finally:
+            self.elapsed += time.time() - start
+
+
+@contextlib.contextmanager
+def cache_decisions(context):
+    """Cache the policy decisions made with a context, for an API request."""
+    cache = DecisionCache()
+    context.policy_cache = cache
+    try:
+        yield cache
+    finally:
+        context.policy_cache = None
+        if cache.checks:
+            LOG.debug('Checked %(checks)d policy rules, %(hits)d from the '
+                      'cache, in %(elapsed).6f seconds.',
+                      {'checks': cache.checks, 'hits': cache.hits,
+                       'elapsed': cache.elapsed})
+
+
 def check_is_admin(context):
     """Whether or not roles contains 'admin' role according to policy setting.
 
@@ -20,8 +20,10 @@ import copy
 
 from oslo_log import log as logging
 from oslo_utils import importutils
+from oslo_utils import uuidutils
 import six
 
+from nova import cache_utils
 import nova.conf
 from nova import context as nova_context
 from nova import db
@@ -33,6 +35,12 @@ LOG = logging.getLogger(__name__)
 
 
 CONF = nova.conf.CONF
+# Cache of the instances, cores and ram counts of projects, see
+# [quota]/count_usage_cache_ttl.
+USAGE_COUNT_CACHE = None
+# Lazy-loaded placement client used when [quota]/count_usage_from_placement
+# is enabled.
+PLACEMENT_CLIENT = None
 
 
 class DbQuotaDriver(object):
@@ -1302,31 +1310,112 @@ def _floating_ip_count(context, project_id):
     return {'project': {'floating_ips': count}}
 
 
-def _instances_cores_ram_count(context, project_id, user_id=None):
-    """Get the counts of instances, cores, and ram in the database.
+def _get_usage_count_cache():
+    global USAGE_COUNT_CACHE
 
-    :param context: The request context for database access
-    :param project_id: The project_id to count across
-    :param user_id: The user_id to count across
-    :returns: A dict containing the project-scoped counts and user-scoped
-              counts if user_id is specified. For example:
+    if USAGE_COUNT_CACHE is None:
+        USAGE_COUNT_CACHE = cache_utils.get_client(
+            expiration_time=CONF.quota.count_usage_cache_ttl)
 
-                {'project': {'instances': <count across project>,
-                             'cores': <count across project>,
-                             'ram': <count across project>},
-                 'user': {'instances': <count across user>,
-                          'cores': <count across user>,
-                          'ram': <count across user>}}
+    return USAGE_COUNT_CACHE
+
+
+def reset_usage_count_cache():
+    """Reset the usage count cache, mainly for testing purposes."""
+    global USAGE_COUNT_CACHE
+
+    USAGE_COUNT_CACHE = None
+
+
+def _make_usage_generation_cache_key(project_id):
+    if six.PY2:
+        project_id = project_id.encode('utf-8')
+    return 'quota-usage-generation-%s' % project_id
+
+
+def _make_usage_count_cache_key(project_id, generation):
+    if six.PY2:
+        project_id = project_id.encode('utf-8')
+    return 'quota-usage-%s-%s' % (project_id, generation)
+
+
+def _get_usage_generation(cache, project_id):
+    """Get the generation of the cached counts of a project.
+
+    The counts of a project are cached under a key including its generation,
+    a new generation is set every time the counts are invalidated.
+    """
+    key = _make_usage_generation_cache_key(project_id)
+    generation = cache.get(key)
+    if generation is None:
+        generation = uuidutils.generate_uuid()
+        cache.set(key, generation)
+    return generation
+
+
+def invalidate_usage_counts(project_id):
+    """Drop the cached instances, cores and ram counts of a project.
+
+    This must be called whenever an instance of the project is created,
+    deleted or changes the resources it counts against quota.
+
+    :param project_id: The project_id of the instance that changed
+    """
+    if not CONF.quota.count_usage_cache_ttl or not project_id:
+        return
+    # NOTE: The counts are not deleted but left behind with a new generation,
+    # so that counts which were being made before the change, and are cached
+    # after it, are never used.
+    _get_usage_count_cache().set(
+        _make_usage_generation_cache_key(project_id),
+        uuidutils.generate_uuid())
+
+
+def _get_placement_client():
+    global PLACEMENT_CLIENT
+
+    if PLACEMENT_CLIENT is None:
+        # avoid circular import
+        from nova.scheduler.client import report
+        PLACEMENT_CLIENT = report.SchedulerReportClient()
+
+    return PLACEMENT_CLIENT
+
+
+def _cores_ram_count_placement(context, project_id, user_id=None):
+    """Get the counts of cores and ram from placement.
+
+    :returns: The same dict as _instances_cores_ram_count without the
+              instances counts, or None if placement could not be reached
+    """
+    try:
+        return _get_placement_client().get_usages_counts_for_quota(
+            context, project_id, user_id=user_id)
+    except exception.UsagesRetrievalFailed:
+        return None
+
+
+def _instances_cores_ram_count_cells(context, project_id, user_id=None,
+                                     instances_only=False):
+    """Get the counts of instances, cores, and ram in every cell.
+
+    :param instances_only: Whether to only count the instances
     """
     # TODO(melwitt): Counting across cells for instances means we will miss
     # counting resources if a cell is down. In the future, we should query
     # placement for cores/ram and InstanceMappings for instances (once we are
     # deleting InstanceMappings when we delete instances).
+    if instances_only:
+        get_counts = objects.InstanceList.get_instance_counts
+        resources = ('instances',)
+    else:
+        get_counts = objects.InstanceList.get_counts
+        resources = ('instances', 'cores', 'ram')
     results = nova_context.scatter_gather_all_cells(
-        context, objects.InstanceList.get_counts, project_id, user_id=user_id)
-    total_counts = {'project': {'instances': 0, 'cores': 0, 'ram': 0}}
+        context, get_counts, project_id, user_id=user_id)
+    total_counts = {'project': dict.fromkeys(resources, 0)}
     if user_id:
-        total_counts['user'] = {'instances': 0, 'cores': 0, 'ram': 0}
+        total_counts['user'] = dict.fromkeys(resources, 0)
     for result in results.values():
         if result not in (nova_context.did_not_respond_sentinel,
                           nova_context.raised_exception_sentinel):
@@ -1338,6 +1427,73 @@ def _instances_cores_ram_count(context, project_id, user_id=None):
     return total_counts
 
 
+def _instances_cores_ram_count_uncached(context, project_id, user_id=None):
+    if CONF.quota.count_usage_from_placement:
+        placement_counts = _cores_ram_count_placement(context, project_id,
+                                                      user_id=user_id)
+        if placement_counts is not None:
+            # Only the instances are counted in the cells.
+            total_counts = _instances_cores_ram_count_cells(
+                context, project_id, user_id=user_id, instances_only=True)
+            for key, counts in placement_counts.items():
+                total_counts[key].update(counts)
+            return total_counts
+        LOG.warning('Unable to count cores and ram usage of project %s from '
+                    'placement, counting them in the cells instead.',
+                    project_id)
+    return _instances_cores_ram_count_cells(context, project_id,
+                                            user_id=user_id)
+
+
+def _instances_cores_ram_count(context, project_id, user_id=None,
+                               use_cache=True):
+    """Get the counts of instances, cores, and ram in the database.
+
+    If [quota]/count_usage_cache_ttl is set, the counts are served from a
+    cache of the project's usage when possible.
+
+    :param context: The request context for database access
+    :param project_id: The project_id to count across
+    :param user_id: The user_id to count across
+    :param use_cache: Whether the cached counts can be used, the quota
+                      rechecks made to catch races count the usage again
+    :returns: A dict containing the project-scoped counts and user-scoped
+              counts if user_id is specified. For example:
+
+                {'project': {'instances': <count across project>,
+                             'cores': <count across project>,
+                             'ram': <count across project>},
+                 'user': {'instances': <count across user>,
+                          'cores': <count across user>,
+                          'ram': <count across user>}}
+    """
+    if not CONF.quota.count_usage_cache_ttl or not use_cache:
+        return _instances_cores_ram_count_uncached(context, project_id,
+                                                   user_id=user_id)
+
+    # NOTE: The counts of a project and all of its users are stored under a
+    # single key so that they can all be invalidated at once.
+    cache = _get_usage_count_cache()
+    key = _make_usage_count_cache_key(
+        project_id, _get_usage_generation(cache, project_id))
+    cached = cache.get(key)
+    if cached is not None and (not user_id or user_id in cached['users']):
+        total_counts = {'project': dict(cached['project'])}
+        if user_id:
+            total_counts['user'] = dict(cached['users'][user_id])
+        return total_counts
+
+    total_counts = _instances_cores_ram_count_uncached(context, project_id,
+                                                       user_id=user_id)
+    # NOTE: Only the fresh counts are stored, so that the counts of other
+    # users can't outlive the TTL by being stored again with this entry.
+    cached = {'project': dict(total_counts['project']), 'users': {}}
+    if user_id:
+        cached['users'][user_id] = dict(total_counts['user'])
+    cache.set(key, cached)
+    return total_counts
+
+
 def _server_group_count(context, project_id, user_id=None):
     """Get the counts of server groups in the database.
 
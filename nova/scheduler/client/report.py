@@ -1519,6 +1519,55 @@ class SchedulerReportClient(object):
         else:
             return resp.json()['allocations']
 
+    def _get_usages(self, context, project_id, user_id=None):
+        url = '/usages?project_id=%s' % project_id
+        if user_id:
+            url = ''.join([url, '&user_id=%s' % user_id])
+        resp = self.get(url, version='1.9',
+                        global_request_id=context.global_id)
+        if resp:
+            return resp.json()['usages']
+
+        msg = ('Failed to retrieve usages from placement API for project '
+               '%(project_id)s and user %(user_id)s. Got %(status_code)d: '
+               '%(err_text)s.')
+        args = {
+            'project_id': project_id,
+            'user_id': user_id,
+            'status_code': resp.status_code,
+            'err_text': resp.text,
+        }
+        LOG.error(msg, args)
+        raise exception.UsagesRetrievalFailed(project_id=project_id,
+                                              user_id=user_id)
+
+    @safe_connect
+    def get_usages_counts_for_quota(self, context, project_id, user_id=None):
+        """Get the cores and ram usages of a project (and user) for quota.
+
+        :param context: The request context
+        :param project_id: The project_id to count across
+        :param user_id: The user_id to count across
+        :returns: A dict containing the project-scoped counts and user-scoped
+                  counts if user_id is specified. For example:
+
+                    {'project': {'cores': <count across project>,
+                                 'ram': <count across project>},
+                     'user': {'cores': <count across user>,
+                              'ram': <count across user>}}
+        :raises: UsagesRetrievalFailed if the placement API returned an error
+        """
+        def _get_counts(usages):
+            return {'cores': usages.get(fields.ResourceClass.VCPU, 0),
+                    'ram': usages.get(fields.ResourceClass.MEMORY_MB, 0)}
+
+        counts = {'project': _get_counts(
+            self._get_usages(context, project_id))}
+        if user_id:
+            counts['user'] = _get_counts(
+                self._get_usages(context, project_id, user_id=user_id))
+        return counts
+
     def get_allocations_for_consumer_by_provider(self, context, rp_uuid,
                                                  consumer):
         # NOTE(cdent): This trims to just the allocations being
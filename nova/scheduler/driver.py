@@ -57,8 +57,9 @@ class Scheduler(object):
 
         services = objects.ServiceList.get_by_topic(context, topic)
         return [service.host
-                for service in services
-                if self.servicegroup_api.service_is_up(service)]
+                for service, is_up in zip(
+                    services, self.servicegroup_api.services_are_up(services))
+                if is_up]
 
     @abc.abstractmethod
     def select_destinations(self, context, spec_obj, instance_uuids,
@@ -57,6 +57,33 @@ class NUMATopologyFilter(filters.BaseHostFilter):
 
         return True
 
+    def filter_all(self, filter_obj_list, spec_obj):
+        if not spec_obj.numa_topology:
+            return super(NUMATopologyFilter, self).filter_all(
+                filter_obj_list, spec_obj)
+        return self._filter_all_by_fingerprint(filter_obj_list, spec_obj)
+
+    def _filter_all_by_fingerprint(self, filter_obj_list, spec_obj):
+        # NOTE: Hosts with the same NUMA, CPU pinning and PCI state give the
+        # same result, so it is only computed once per fingerprint. This is
+        # common for the identical hosts of large deployments.
+        results = {}
+        for host_state in filter_obj_list:
+            fingerprint = host_state.numa_pci_fingerprint
+            if fingerprint not in results:
+                results[fingerprint] = self._filter_one(host_state, spec_obj)
+            elif results[fingerprint]:
+                host_state.limits['numa_topology'] = self._get_limits(
+                    host_state)
+            if results[fingerprint]:
+                yield host_state
+
+    @staticmethod
+    def _get_limits(host_state):
+        return objects.NUMATopologyLimits(
+            cpu_allocation_ratio=host_state.cpu_allocation_ratio,
+            ram_allocation_ratio=host_state.ram_allocation_ratio)
+
     def host_passes(self, host_state, spec_obj):
         # TODO(stephenfin): The 'numa_fit_instance_to_host' function has the
         # unfortunate side effect of modifying 'spec_obj.numa_topology' - an
@@ -67,8 +94,6 @@ class NUMATopologyFilter(filters.BaseHostFilter):
         # future filter calls.
         spec_obj = spec_obj.obj_clone()
 
-        ram_ratio = host_state.ram_allocation_ratio
-        cpu_ratio = host_state.cpu_allocation_ratio
         extra_specs = spec_obj.flavor.extra_specs
         image_props = spec_obj.image.properties
         requested_topology = spec_obj.numa_topology
@@ -84,9 +109,7 @@ class NUMATopologyFilter(filters.BaseHostFilter):
             return False
 
         if requested_topology and host_topology:
-            limits = objects.NUMATopologyLimits(
-                cpu_allocation_ratio=cpu_ratio,
-                ram_allocation_ratio=ram_ratio)
+            limits = self._get_limits(host_state)
             instance_topology = (hardware.numa_fit_instance_to_host(
                         host_topology, requested_topology,
                         limits=limits,
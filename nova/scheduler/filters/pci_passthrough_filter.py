@@ -42,6 +42,24 @@ class PciPassthroughFilter(filters.BaseHostFilter):
 
     RUN_ON_REBUILD = False
 
+    def filter_all(self, filter_obj_list, spec_obj):
+        pci_requests = spec_obj.pci_requests
+        if not pci_requests or not pci_requests.requests:
+            return super(PciPassthroughFilter, self).filter_all(
+                filter_obj_list, spec_obj)
+        return self._filter_all_by_fingerprint(filter_obj_list, spec_obj)
+
+    def _filter_all_by_fingerprint(self, filter_obj_list, spec_obj):
+        # NOTE: Hosts with the same PCI state give the same result, so it is
+        # only computed once per fingerprint.
+        results = {}
+        for host_state in filter_obj_list:
+            fingerprint = host_state.numa_pci_fingerprint
+            if fingerprint not in results:
+                results[fingerprint] = self._filter_one(host_state, spec_obj)
+            if results[fingerprint]:
+                yield host_state
+
     def host_passes(self, host_state, spec_obj):
         """Return true if the host has the required PCI devices."""
         pci_requests = spec_obj.pci_requests
@@ -19,6 +19,7 @@ Manage hosts in the current zone.
 
 import collections
 import functools
+import hashlib
 import time
 try:
     from collections import UserDict as IterableUserDict   # Python 3
@@ -28,6 +29,8 @@ except ImportError:
 
 import iso8601
 from oslo_log import log as logging
+from oslo_serialization import jsonutils
+from oslo_utils import encodeutils
 from oslo_utils import timeutils
 import six
 
@@ -123,6 +126,7 @@ class HostState(object):
         self.vcpus_used = 0
         self.pci_stats = None
         self.numa_topology = None
+        self._numa_pci_fingerprint = None
 
         # Additional host information from the compute node stats:
         self.num_instances = 0
@@ -226,6 +230,7 @@ class HostState(object):
         self.numa_topology = compute.numa_topology
         self.pci_stats = pci_stats.PciDeviceStats(
             stats=compute.pci_device_pools)
+        self._numa_pci_fingerprint = None
 
         # All virt drivers report host_ip
         self.host_ip = compute.host_ip
@@ -257,6 +262,50 @@ class HostState(object):
         self.ram_allocation_ratio = compute.ram_allocation_ratio
         self.disk_allocation_ratio = compute.disk_allocation_ratio
 
+    @property
+    def numa_pci_fingerprint(self):
+        """Fingerprint of the NUMA, CPU pinning and PCI state of the host.
+
+        Hosts with the same fingerprint fit the same instance NUMA topologies
+        and PCI requests onto the same host NUMA cells, which lets filters
+        reuse the result computed for one of them for the others. The
+        fingerprint is computed again once the host state is updated from its
+        compute node or consumed by a request.
+        """
+        if self._numa_pci_fingerprint is None:
+            self._numa_pci_fingerprint = self._get_numa_pci_fingerprint()
+        return self._numa_pci_fingerprint
+
+    def _get_numa_pci_fingerprint(self):
+        host_topology, _fmt = hardware.host_topology_and_format_from_host(
+                self)
+        cells = []
+        for cell in (host_topology.cells if host_topology else []):
+            state = {}
+            for field in cell.fields:
+                if not cell.obj_attr_is_set(field):
+                    continue
+                value = getattr(cell, field)
+                if field == 'mempages':
+                    value = [pages.obj_to_primitive()['nova_object.data']
+                             for pages in value]
+                elif field == 'siblings':
+                    value = sorted(sorted(siblings) for siblings in value)
+                elif isinstance(value, set):
+                    value = sorted(value)
+                state[field] = value
+            cells.append(state)
+
+        pools = []
+        for pool in (self.pci_stats.pools if self.pci_stats else []):
+            pools.append(dict((key, value) for key, value in pool.items()
+                              if key != 'devices'))
+
+        state = [cells, pools, self.cpu_allocation_ratio,
+                 self.ram_allocation_ratio]
+        return hashlib.sha256(encodeutils.to_utf8(
+            jsonutils.dumps(state, sort_keys=True))).hexdigest()
+
     def consume_from_request(self, spec_obj):
         """Incrementally update host state from a RequestSpec object."""
 
@@ -267,7 +316,11 @@ class HostState(object):
             # message will be dispatched in its own green thread. So the
             # shared host state should be consumed in a consistent way to make
             # sure its data is valid under concurrent write operations.
-            self._locked_consume_from_request(spec_obj)
+            try:
+                self._locked_consume_from_request(spec_obj)
+            finally:
+                # Only the fingerprint of this host changes.
+                self._numa_pci_fingerprint = None
 
         return _locked(self, spec_obj)
 
@@ -35,6 +35,7 @@ from nova import context
 from nova import debugger
 from nova import exception
 from nova.i18n import _, _LE, _LI, _LW
+from nova.notifications import pipeline as notification_pipeline
 from nova import objects
 from nova.objects import base as objects_base
 from nova.objects import service as service_obj
@@ -192,7 +193,8 @@ class Service(service.Service):
         ]
         endpoints.extend(self.manager.additional_endpoints)
 
-        serializer = objects_base.NovaObjectSerializer()
+        serializer = objects_base.NovaObjectSerializer(
+            lazy=CONF.lazy_object_deserialization)
 
         self.rpcserver = rpc.get_server(target, endpoints, serializer)
         self.rpcserver.start()
@@ -288,6 +290,9 @@ class Service(service.Service):
             LOG.exception(_LE('Service error occurred during cleanup_host'))
             pass
 
+        # Send the notifications still waiting in the queue, if any.
+        notification_pipeline.flush()
+
         super(Service, self).stop()
 
     def periodic_tasks(self, raise_on_error=False):
@@ -423,6 +428,8 @@ class WSGIService(service.Service):
 
         """
         self.server.stop()
+        # Send the notifications still waiting in the queue, if any.
+        notification_pipeline.flush()
 
     def wait(self):
         """Wait for the service to stop serving this API.
@@ -79,6 +79,25 @@ class API(object):
 
         return self._driver.is_up(member)
 
+    def services_are_up(self, members):
+        """Check whether the given members are up.
+
+        This is faster than calling service_is_up() for each of the members.
+
+        :param members: A list of members
+        :returns: A list of booleans, in the order of the members
+        """
+        members = list(members)
+        are_up = [False] * len(members)
+        indexes = [index for index, member in enumerate(members)
+                   if not member.get('forced_down')]
+        if indexes:
+            driver_are_up = self._driver.are_up(
+                [members[index] for index in indexes])
+            for index, is_up in zip(indexes, driver_are_up):
+                are_up[index] = is_up
+        return are_up
+
     def get_updated_time(self, member):
         """Get the updated time from drivers except db"""
         return self._driver.updated_time(member)
@@ -28,6 +28,14 @@ class Driver(object):
         """Check whether the given member is up."""
         raise NotImplementedError()
 
+    def are_up(self, members):
+        """Check whether the given members are up.
+
+        :param members: A list of members
+        :returns: A list of booleans, in the order of the members
+        """
+        return [self.is_up(member) for member in members]
+
     def updated_time(self, service_ref):
         """Get the updated time"""
         raise NotImplementedError()
@@ -22,6 +22,7 @@ import nova.conf
 from nova.i18n import _, _LI, _LW, _LE
 from nova.servicegroup import api
 from nova.servicegroup.drivers import base
+from nova.servicegroup import heartbeat
 
 
 CONF = nova.conf.CONF
@@ -57,6 +58,15 @@ class DbDriver(base.Driver):
         """Moved from nova.utils
         Check whether a service is up based on last heartbeat.
         """
+        return self._is_up(service_ref, timeutils.utcnow())
+
+    def are_up(self, service_refs):
+        """Check whether services are up based on their last heartbeat."""
+        # NOTE: All of the services are compared to the same current time.
+        now = timeutils.utcnow()
+        return [self._is_up(service_ref, now) for service_ref in service_refs]
+
+    def _is_up(self, service_ref, now):
         last_heartbeat = (service_ref.get('last_seen_up') or
             service_ref['created_at'])
         if isinstance(last_heartbeat, six.string_types):
@@ -68,8 +78,14 @@ class DbDriver(base.Driver):
             # Objects have proper UTC timezones, but the timeutils comparison
             # below does not (and will fail)
             last_heartbeat = last_heartbeat.replace(tzinfo=None)
+        # NOTE: The latest state report of the service received by this
+        # process may not have been written to the database yet.
+        if 'id' in service_ref:
+            aggregated_heartbeat = heartbeat.last_seen(service_ref['id'])
+            if aggregated_heartbeat and aggregated_heartbeat > last_heartbeat:
+                last_heartbeat = aggregated_heartbeat
         # Timestamps in DB are UTC.
-        elapsed = timeutils.delta_seconds(last_heartbeat, timeutils.utcnow())
+        elapsed = timeutils.delta_seconds(last_heartbeat, now)
         is_up = abs(elapsed) <= self.service_down_time
         if not is_up:
             LOG.debug('Seems service %(binary)s on host %(host)s is down. '
@@ -87,8 +103,11 @@ class DbDriver(base.Driver):
         """Update the state of this service in the datastore."""
 
         try:
-            service.service_ref.report_count += 1
-            service.service_ref.save()
+            if CONF.heartbeat_batch_interval:
+                service.service_ref.report_heartbeat()
+            else:
+                service.service_ref.report_count += 1
+                service.service_ref.save()
 
             # TODO(termie): make this pattern be more elegant.
             if getattr(service, 'model_disconnected', False):
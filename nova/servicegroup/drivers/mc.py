@@ -68,6 +68,21 @@ class MemcachedDriver(base.Driver):
 
         return is_up
 
+    def are_up(self, service_refs):
+        """Check whether services are up based on their last heartbeat."""
+        if not service_refs:
+            return []
+        keys = [str("%(topic)s:%(host)s" % service_ref)
+                for service_ref in service_refs]
+        # NOTE: A single round-trip to memcached for all of the services.
+        values = self.mc.get_multi(keys)
+        are_up = []
+        for key, value in zip(keys, values):
+            if value is None:
+                LOG.debug('Seems service %s is down', key)
+            are_up.append(value is not None)
+        return are_up
+
     def updated_time(self, service_ref):
         """Get the updated time from memcache"""
         key = "%(topic)s:%(host)s" % service_ref
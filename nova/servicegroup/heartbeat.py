@@ -0,0 +1,128 @@
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+"""Aggregation of the state reports of the services.
+
+When [DEFAULT]/heartbeat_batch_interval is set, the state reports of the
+services received by a process are kept in memory, and written to the
+database with a single update every heartbeat_batch_interval seconds.
+"""
+
+from eventlet import greenthread
+from oslo_log import log as logging
+from oslo_utils import timeutils
+
+import nova.conf
+from nova import context as nova_context
+from nova import db
+from nova import utils
+
+LOG = logging.getLogger(__name__)
+CONF = nova.conf.CONF
+
+AGGREGATOR = None
+
+
+class HeartbeatAggregator(object):
+    """Write the state reports of the services together, periodically.
+
+    :param interval: The number of seconds between two writes
+    """
+
+    def __init__(self, interval):
+        self.interval = interval
+        # The time of the oldest state report not written yet, by service id.
+        self._pending = {}
+        # The time of the latest state report received, by service id.
+        self._last_seen = {}
+        self._stopped = False
+        utils.spawn_n(self._run)
+
+    def record(self, service_id):
+        """Record a state report of a service."""
+        now = timeutils.utcnow()
+        self._pending.setdefault(service_id, now)
+        self._last_seen[service_id] = now
+
+    def last_seen(self, service_id):
+        """Return the time of the latest state report of a service.
+
+        :returns: The time of the report, or None if no report of the
+                  service was received
+        """
+        return self._last_seen.get(service_id)
+
+    def _run(self):
+        while not self._stopped:
+            greenthread.sleep(self.interval)
+            try:
+                self.flush()
+            except Exception:
+                LOG.exception('Failed to write the state reports of the '
+                              'services.')
+
+    def flush(self):
+        """Write the state reports not written yet."""
+        if not self._pending:
+            return
+        pending, self._pending = self._pending, {}
+        # NOTE: The services are only known to have been up at the time of
+        # the oldest report of the batch, do not make them look up longer.
+        last_seen_up = min(pending.values())
+        try:
+            db.service_report_heartbeats(nova_context.get_admin_context(),
+                                         list(pending), last_seen_up)
+        except Exception:
+            # Keep the reports for the next write.
+            for service_id, report_time in pending.items():
+                self._pending[service_id] = min(
+                    report_time, self._pending.get(service_id, report_time))
+            raise
+        LOG.debug('Wrote the state reports of %d services.', len(pending))
+
+    def stop(self):
+        """Write the state reports not written yet, and stop."""
+        self._stopped = True
+        self.flush()
+
+
+def report(context, service_id):
+    """Record a state report of a service, in the next write if enabled."""
+    global AGGREGATOR
+
+    if not CONF.heartbeat_batch_interval:
+        db.service_report_heartbeats(context, [service_id],
+                                     timeutils.utcnow())
+        return
+    if AGGREGATOR is None:
+        AGGREGATOR = HeartbeatAggregator(CONF.heartbeat_batch_interval)
+    AGGREGATOR.record(service_id)
+
+
+def last_seen(service_id):
+    """Return the time of the latest state report received of a service.
+
+    :returns: The time of the report, or None if the state reports are not
+              aggregated or no report of the service was received
+    """
+    if AGGREGATOR is None:
+        return None
+    return AGGREGATOR.last_seen(service_id)
+
+
+def reset():
+    """Stop the aggregation, mainly for testing purposes."""
+    global AGGREGATOR
+
+    if AGGREGATOR is not None:
+        AGGREGATOR.stop()
+    AGGREGATOR = None
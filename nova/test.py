@@ -54,10 +54,12 @@ from nova.api.openstack.placement.objects import resource_provider
 from nova import context
 from nova import db
 from nova import exception
+from nova.network import address_index
 from nova.network import manager as network_manager
 from nova.network.security_group import openstack_driver
 from nova import objects
 from nova.objects import base as objects_base
+from nova import quota
 from nova.tests import fixtures as nova_fixtures
 from nova.tests.unit import conf_fixture
 from nova.tests.unit import policy_fixture
@@ -280,8 +282,14 @@ class TestCase(testtools.TestCase):
         from nova.compute import api
         api.CELLS = []
         context.CELL_CACHE = {}
+        context.CELL_LATENCY_STATS = {}
         context.CELLS = []
 
+        # Reset the cached quota usage counts and placement client
+        quota.reset_usage_count_cache()
+        quota.PLACEMENT_CLIENT = None
+        address_index.reset_cache()
+
         self.cell_mappings = {}
         self.host_mappings = {}
         # NOTE(danms): If the test claims to want to set up the database
@@ -222,6 +222,34 @@ class TestDatabaseArchive(test_servers.ServersTestBase):
         # There should be no rows in any table if we purged everything
         self.assertFalse(any(results.values()))
 
+    def test_archive_then_purge_by_date_in_batches(self):
+        server = self._create_server()
+        server_id = server['id']
+        self._delete_server(server_id)
+        results, deleted_ids = db.archive_deleted_rows(max_rows=1000)
+        self.assertEqual([server_id], deleted_ids)
+
+        pre_purge_results = self._get_table_counts()
+        future = timeutils.utcnow() + datetime.timedelta(hours=1)
+        admin_context = context.get_admin_context()
+
+        # A dry run only estimates the number of rows to purge.
+        lines = []
+        estimated = sqlalchemy_api.purge_shadow_tables(
+            admin_context, future, status_fn=lines.append, dry_run=True)
+        self.assertEqual(sum(pre_purge_results.values()), estimated)
+        self.assertNotEqual(0, len(lines))
+        for line in lines:
+            self.assertIsNotNone(
+                re.match(r'Would delete [1-9][0-9]* rows from .*', line))
+        self.assertEqual(pre_purge_results, self._get_table_counts())
+
+        deleted = sqlalchemy_api.purge_shadow_tables(admin_context, future,
+                                                     batch_size=1)
+        self.assertEqual(estimated, deleted)
+        results = self._get_table_counts()
+        self.assertFalse(any(results.values()))
+
     def test_purge_with_real_date(self):
         """Make sure the result of dateutil's parser works with the
            query we're making to sqlalchemy.
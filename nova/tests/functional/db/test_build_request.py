@@ -224,6 +224,22 @@ class BuildRequestListTestCase(test.NoDBTestCase):
             objects.base.obj_equal_prims(reqs[i].instance,
                                          req_list[i].instance)
 
+    def test_get_existing_instance_uuids(self):
+        reqs = [self._create_req(), self._create_req(), self._create_req()]
+        reqs[1].destroy()
+        uuids = [req.instance_uuid for req in reqs]
+
+        existing = build_request.BuildRequestList.get_existing_instance_uuids(
+            self.context, uuids + [uuidutils.generate_uuid()])
+
+        self.assertEqual(set([reqs[0].instance_uuid, reqs[2].instance_uuid]),
+                         existing)
+
+    def test_get_existing_instance_uuids_empty(self):
+        self.assertEqual(
+            set(), build_request.BuildRequestList.get_existing_instance_uuids(
+                self.context, []))
+
     def test_get_all_filter_by_project_id(self):
         reqs = [self._create_req(), self._create_req(project_id='filter')]
 
@@ -43,6 +43,17 @@ class InstanceObjectTestCase(test.TestCase):
             vm_states.ACTIVE)
         self.assertEqual(1, count)
 
+    def test_get_instance_counts(self):
+        self._create_instance(vcpus=2, memory_mb=512)
+        self._create_instance(vcpus=2, memory_mb=512, user_id='bar')
+        self._create_instance(vcpus=2, memory_mb=512, project_id='foo')
+        self._create_instance(vm_state=vm_states.SOFT_DELETED)
+        counts = objects.InstanceList.get_instance_counts(
+            self.context, self.context.project_id,
+            user_id=self.context.user_id)
+        self.assertEqual({'project': {'instances': 2},
+                          'user': {'instances': 1}}, counts)
+
     def test_embedded_instance_flavor_description_is_not_persisted(self):
         """The instance.flavor.description field will not be exposed out
         of the REST API when showing server details, so we want to make
@@ -183,3 +183,31 @@ class InstanceMappingListTestCase(test.NoDBTestCase):
             self.context, uuids + [uuidsentinel.deleted_instance])
         self.assertEqual(sorted(uuids),
                          sorted([m.instance_uuid for m in mappings]))
+
+    def test_update_cell_bulk(self):
+        cell = create_cell_mapping(id=42)
+        db_inst_mapping1 = create_mapping(cell_id=None)
+        db_inst_mapping2 = create_mapping(cell_id=None)
+        # Create a third that we won't include
+        db_inst_mapping3 = create_mapping(cell_id=None)
+        cell_obj = cell_mapping.CellMapping._from_db_object(
+            self.context, cell_mapping.CellMapping(), cell)
+        uuids = [db_inst_mapping1.instance_uuid,
+                 db_inst_mapping2.instance_uuid]
+
+        result = instance_mapping.InstanceMappingList.update_cell_bulk(
+            self.context, uuids, cell_obj)
+
+        self.assertEqual(2, result)
+        mappings = instance_mapping.InstanceMappingList.get_by_cell_id(
+            self.context, cell['id'])
+        self.assertEqual(sorted(uuids),
+                         sorted([m.instance_uuid for m in mappings]))
+        mapping3 = instance_mapping.InstanceMapping.get_by_instance_uuid(
+            self.context, db_inst_mapping3.instance_uuid)
+        self.assertIsNone(mapping3.cell_mapping)
+
+    def test_update_cell_bulk_empty(self):
+        cell_obj = cell_mapping.CellMapping(id=sample_cell_mapping['id'])
+        self.assertEqual(0, instance_mapping.InstanceMappingList.
+                         update_cell_bulk(self.context, [], cell_obj))
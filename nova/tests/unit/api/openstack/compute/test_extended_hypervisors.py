@@ -89,14 +89,16 @@ class ExtendedHypervisorsTestV21(test.NoDBTestCase):
             mock.patch.object(self.controller.host_api, 'compute_node_get_all',
                               side_effect=fake_compute_node_get_all),
             mock.patch.object(self.controller.servicegroup_api,
-                              'service_is_up', return_value=True),
-        ) as (mock_node_get_all, mock_service_is_up):
+                              'services_are_up',
+                              side_effect=lambda services: [True] * len(
+                                  services)),
+        ) as (mock_node_get_all, mock_services_are_up):
             req = self._get_request()
             result = self.controller.detail(req)
 
             self.assertEqual(dict(hypervisors=self.DETAIL_HYPERS_DICTS),
                              result)
-            self.assertTrue(mock_service_is_up.called)
+            self.assertTrue(mock_services_are_up.called)
             self.assertTrue(mock_get_by_host.called)
             self.assertTrue(mock_node_get_all.called)
 
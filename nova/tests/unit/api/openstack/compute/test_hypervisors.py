@@ -223,6 +223,8 @@ class HypervisorsTestV21(test.NoDBTestCase):
         self.controller = hypervisors_v21.HypervisorsController()
         self.controller.servicegroup_api.service_is_up = mock.MagicMock(
             return_value=True)
+        self.controller.servicegroup_api.services_are_up = mock.MagicMock(
+            side_effect=lambda services: [True] * len(services))
 
     def _get_hyper_id(self):
         """Helper function to get the proper hypervisor id for a request
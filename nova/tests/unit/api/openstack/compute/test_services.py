@@ -706,8 +706,8 @@ class ServicesTestV21(test.TestCase):
 
     # This test is just to verify that the servicegroup API gets used when
     # calling the API
-    @mock.patch.object(db_driver.DbDriver, 'is_up', side_effect=KeyError)
-    def test_services_with_exception(self, mock_is_up):
+    @mock.patch.object(db_driver.DbDriver, 'are_up', side_effect=KeyError)
+    def test_services_with_exception(self, mock_are_up):
         url = '/fake/services?host=host1&binary=nova-compute'
         req = fakes.HTTPRequest.blank(url, use_admin_context=True)
         self.assertRaises(self.service_is_up_exc, self.controller.index, req)
@@ -1057,6 +1057,9 @@ class FakeServiceGroupAPI(object):
     def service_is_up(self, *args, **kwargs):
         return True
 
+    def services_are_up(self, services):
+        return [True] * len(services)
+
     def get_updated_time(self, *args, **kwargs):
         return mock.sentinel.updated_time
 
@@ -10,6 +10,9 @@
 #    License for the specific language governing permissions and limitations
 #    under the License.
 
+import datetime
+import uuid
+
 import mock
 from oslo_serialization import jsonutils
 import six
@@ -20,6 +23,7 @@ from nova.api.openstack import api_version_request as api_version
 from nova.api.openstack import versioned_method
 from nova.api.openstack import wsgi
 from nova import exception
+from nova import policy
 from nova import test
 from nova.tests.unit.api.openstack import fakes
 from nova.tests.unit import matchers
@@ -197,6 +201,42 @@ class JSONDictSerializerTest(test.NoDBTestCase):
         result = result.replace('\n', '').replace(' ', '')
         self.assertEqual(result, expected_json)
 
+    @staticmethod
+    def _fake_servers(count):
+        created = datetime.datetime(2017, 3, 1, 10, 20, 30, 123456)
+        return {'servers': [{'id': uuid.uuid4(),
+                             'name': 'server-%d' % i,
+                             'created': created,
+                             'updated': created.replace(microsecond=0),
+                             'metadata': {'index': i},
+                             'addresses': {}}
+                            for i in range(count)],
+                'servers_links': [{'rel': 'next', 'href': 'fake'}]}
+
+    def test_json_datetime_uuid(self):
+        data = self._fake_servers(3)
+        serializer = wsgi.JSONDictSerializer()
+        self.assertEqual(jsonutils.dumps(data), serializer.serialize(data))
+
+    def test_iterserialize(self):
+        data = self._fake_servers(1000)
+        serializer = wsgi.JSONDictSerializer()
+        chunks = list(serializer.iterserialize(data, 100))
+        self.assertEqual(15, len(chunks))
+        self.assertEqual(jsonutils.dumps(data), ''.join(chunks))
+
+    def test_iterserialize_short_lists(self):
+        data = self._fake_servers(10)
+        serializer = wsgi.JSONDictSerializer()
+        chunks = list(serializer.iterserialize(data, 100))
+        self.assertEqual(4, len(chunks))
+        self.assertEqual(jsonutils.dumps(data), ''.join(chunks))
+
+    def test_iterserialize_not_dict(self):
+        serializer = wsgi.JSONDictSerializer()
+        self.assertEqual(['[1, 2, 3]'],
+                         list(serializer.iterserialize([1, 2, 3], 1)))
+
 
 class JSONDeserializerTest(test.NoDBTestCase):
     def test_json(self):
@@ -636,6 +676,22 @@ class ResourceTest(MicroversionedTest):
         self.assertEqual(b'', response.body)
         self.assertEqual(response.status_int, 200)
 
+    def test_policy_decisions_cached_for_request(self):
+        policy_caches = []
+
+        class Controller(wsgi.Controller):
+            def index(self, req):
+                context = req.environ['nova.context']
+                policy_caches.append(context.policy_cache)
+                return {'foo': 'bar'}
+
+        req = fakes.HTTPRequest.blank('/tests')
+        app = fakes.TestRouter(Controller())
+        response = req.get_response(app)
+        self.assertEqual(response.status_int, 200)
+        self.assertIsInstance(policy_caches[0], policy.DecisionCache)
+        self.assertIsNone(req.environ['nova.context'].policy_cache)
+
     def test_deserialize_default(self):
         class Controller(object):
             def index(self, req, pants=None):
@@ -893,6 +949,20 @@ class ResponseObjectTest(test.NoDBTestCase):
         robj._default_code = 202
         self.assertEqual(robj.code, 404)
 
+    def test_serialize(self):
+        robj = wsgi.ResponseObject({'servers': [{'id': 1}, {'id': 2}]})
+        response = robj.serialize(None, 'application/json')
+        self.assertEqual(b'{"servers": [{"id": 1}, {"id": 2}]}', response.body)
+        self.assertEqual('application/json', response.content_type)
+
+    def test_serialize_streamed(self):
+        self.flags(response_chunk_size=1, group='api')
+        robj = wsgi.ResponseObject({'servers': [{'id': 1}, {'id': 2}]})
+        response = robj.serialize(None, 'application/json')
+        self.assertEqual([b'{', b'"servers": [', b'{"id": 1}', b', {"id": 2}',
+                          b']', b'}'], list(response.app_iter))
+        self.assertEqual('application/json', response.content_type)
+
     def test_set_header(self):
         robj = wsgi.ResponseObject({})
         robj['Header'] = 'foo'
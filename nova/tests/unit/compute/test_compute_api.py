@@ -3912,8 +3912,11 @@ class _ComputeAPIUnitTestMixIn(object):
                             'ram': 512 + instance.flavor.memory_mb},
             project_id=instance.project_id, user_id=instance.user_id)
 
+    @mock.patch('nova.network.security_group.bindings_cache.remove_instance')
+    @mock.patch('nova.network.address_index.remove_instance')
     @mock.patch.object(objects.InstanceAction, 'action_start')
-    def test_external_instance_event(self, mock_action_start):
+    def test_external_instance_event(self, mock_action_start,
+                                     mock_remove_index, mock_remove_bindings):
         instances = [
             objects.Instance(uuid=uuids.instance_1, host='host1',
                              migration_context=None),
@@ -3947,6 +3950,9 @@ class _ComputeAPIUnitTestMixIn(object):
                 instance_uuid=uuids.instance_4,
                 name='volume-extended',
                 tag=volume_id),
+            objects.InstanceExternalEvent(
+                instance_uuid=uuids.instance_4,
+                name='network-vif-plugged'),
             ]
         self.compute_api.compute_rpcapi = mock.MagicMock()
         self.compute_api.external_instance_event(self.context,
@@ -3960,6 +3966,13 @@ class _ComputeAPIUnitTestMixIn(object):
             self.context, uuids.instance_4, instance_actions.EXTEND_VOLUME,
             want_result=False)
         self.assertEqual(2, method.call_count)
+        mock_remove_index.assert_has_calls(
+            [mock.call(uuids.instance_1), mock.call(uuids.instance_2),
+             mock.call(uuids.instance_3)])
+        self.assertEqual(3, mock_remove_index.call_count)
+        self.assertEqual(mock_remove_index.call_args_list +
+                         [mock.call(uuids.instance_4)],
+                         mock_remove_bindings.call_args_list)
 
     def test_external_instance_event_evacuating_instance(self):
         # Since we're patching the db's migration_get(), use a dict here so
@@ -5768,9 +5781,11 @@ class ComputeAPIUnitTestCase(_ComputeAPIUnitTestMixIn, test.NoDBTestCase):
         self.assertItemsEqual(['default', uuids.secgroup_uuid],
                               security_groups)
 
+    @mock.patch('nova.network.security_group.bindings_cache.remove_instance')
     @mock.patch('nova.compute.api.API._record_action_start')
     @mock.patch.object(compute_rpcapi.ComputeAPI, 'attach_interface')
-    def test_tagged_interface_attach(self, mock_attach, mock_record):
+    def test_tagged_interface_attach(self, mock_attach, mock_record,
+                                     mock_remove_bindings):
         instance = self._create_instance_obj()
         self.compute_api.attach_interface(self.context, instance, None, None,
                                           None, tag='foo')
@@ -5779,16 +5794,20 @@ class ComputeAPIUnitTestCase(_ComputeAPIUnitTestMixIn, test.NoDBTestCase):
                                        requested_ip=None, tag='foo')
         mock_record.assert_called_once_with(
             self.context, instance, instance_actions.ATTACH_INTERFACE)
+        mock_remove_bindings.assert_called_once_with(instance.uuid)
 
+    @mock.patch('nova.network.security_group.bindings_cache.remove_instance')
     @mock.patch('nova.compute.api.API._record_action_start')
     @mock.patch.object(compute_rpcapi.ComputeAPI, 'detach_interface')
-    def test_detach_interface(self, mock_detach, mock_record):
+    def test_detach_interface(self, mock_detach, mock_record,
+                              mock_remove_bindings):
         instance = self._create_instance_obj()
         self.compute_api.detach_interface(self.context, instance, None)
         mock_detach.assert_called_with(self.context, instance=instance,
                                        port_id=None)
         mock_record.assert_called_once_with(
             self.context, instance, instance_actions.DETACH_INTERFACE)
+        mock_remove_bindings.assert_called_once_with(instance.uuid)
 
     def test_check_attach_and_reserve_volume_multiattach_old_version(self):
         """Tests that _check_attach_and_reserve_volume fails if trying
@@ -189,7 +189,8 @@ class CellsComputeAPITestCase(test_compute.ComputeAPITestCase):
                           check_project_id=project_id, check_user_id=None)
         call2 = mock.call(self.context, {'instances': 0, 'cores': 0, 'ram': 0},
                           project_id, user_id=None,
-                          check_project_id=project_id, check_user_id=None)
+                          check_project_id=project_id, check_user_id=None,
+                          use_cache=False)
         check_deltas_mock.assert_has_calls([call1, call2])
 
         # Verify we removed the artifacts that were added after the first
@@ -13,6 +13,8 @@
 import mock
 
 from nova.compute import instance_list
+from nova.compute import multi_cell_list
+from nova import context
 from nova import objects
 from nova import test
 from nova.tests import fixtures
@@ -77,3 +79,22 @@ class TestInstanceList(test.NoDBTestCase):
         insts_two = [inst['hostname'] for inst in insts]
 
         self.assertEqual(insts_one, insts_two)
+
+    @mock.patch('nova.context.scatter_gather_all_cells_partial')
+    @mock.patch('nova.objects.CellMappingList.get_all')
+    def test_get_instances_sorted_cell_down(self, mock_cells, mock_scatter):
+        mock_cells.return_value = self.cells
+        ctx = instance_list.InstanceSortContext(['hostname'], ['asc'])
+        records = [multi_cell_list.RecordWrapper(ctx, inst)
+                   for inst in self.insts[uuids.cell1]]
+        mock_scatter.return_value = {
+            uuids.cell0: context.did_not_respond_sentinel,
+            uuids.cell1: iter(records),
+            uuids.cell2: context.raised_exception_sentinel}
+
+        insts = instance_list.get_instances_sorted(self.context, {},
+                                                   None, None,
+                                                   [], ['hostname'], ['asc'])
+
+        self.assertEqual(['cell1-inst0', 'cell1-inst1', 'cell1-inst2'],
+                         [inst['hostname'] for inst in insts])
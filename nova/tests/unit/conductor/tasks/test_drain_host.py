@@ -0,0 +1,260 @@
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+import mock
+
+from nova.compute import power_state
+from nova.compute import task_states
+from nova.compute import vm_states
+from nova.conductor.tasks import drain_host
+from nova import exception
+from nova import objects
+from nova import test
+from nova.tests import uuidsentinel as uuids
+
+
+class DrainHostTaskTestCase(test.NoDBTestCase):
+    def setUp(self):
+        super(DrainHostTaskTestCase, self).setUp()
+        self.context = mock.sentinel.context
+        self.flags(max_concurrent_live_migrations=2)
+        self.live_migrate = mock.Mock(side_effect=self._fake_live_migrate)
+        self.task = drain_host.DrainHostTask(self.context, 'src', False,
+                                             False, self.live_migrate)
+        self.migrations = {}
+        self.destinations = {}
+        self.started = []
+
+        mock.patch.object(drain_host, 'time').start().sleep.side_effect = (
+            self._fake_sleep)
+        mock.patch.object(objects.InstanceAction, 'action_start').start()
+        mock.patch.object(drain_host.live_migrate, 'create_migration',
+                          side_effect=self._fake_create_migration).start()
+        mock.patch.object(objects.Migration, 'save').start()
+        mock.patch.object(objects.RequestSpec, 'get_by_instance_uuid',
+                          side_effect=exception.RequestSpecNotFound(
+                              instance_uuid=uuids.instance)).start()
+        mock.patch.object(objects.Migration, 'get_by_id',
+                          side_effect=self._fake_get_migration).start()
+        mock.patch.object(objects.MigrationList, 'get_by_filters',
+                          side_effect=self._fake_get_migrations).start()
+        self.addCleanup(mock.patch.stopall)
+
+    def _instance(self, uuid, memory_mb, root_gb=0, **kwargs):
+        values = dict(uuid=uuid, host='src', vm_state=vm_states.ACTIVE,
+                      task_state=None, power_state=power_state.RUNNING,
+                      flavor=objects.Flavor(memory_mb=memory_mb,
+                                            root_gb=root_gb, ephemeral_gb=0))
+        values.update(kwargs)
+        instance = objects.Instance(**values)
+        instance.save = mock.Mock()
+        return instance
+
+    def _fake_create_migration(self, context, instance, destination):
+        return objects.Migration(instance_uuid=instance.uuid,
+                                 status='accepted', dest_compute=destination)
+
+    def _fake_live_migrate(self, context, instance, block_migration,
+                           disk_over_commit, request_spec, ignore_hosts,
+                           migration, retry_no_valid_host):
+        self.started.append((instance.uuid, list(ignore_hosts)))
+        migration.id = len(self.migrations)
+        migration.status = 'running'
+        migration.dest_compute = self.destinations.get(instance.uuid, 'dest')
+        self.migrations[migration.id] = migration
+        return migration
+
+    def _fake_get_migration(self, context, migration_id):
+        return self.migrations[migration_id]
+
+    def _fake_get_migrations(self, context, filters):
+        return [migration for migration in self.migrations.values()
+                if migration.status in filters['status']]
+
+    def _fake_sleep(self, interval):
+        # Complete the running migrations between two polls.
+        for migration in self.migrations.values():
+            if migration.status == 'running':
+                migration.status = 'completed'
+
+    @mock.patch.object(objects.InstanceList, 'get_by_host')
+    def test_execute(self, mock_get_by_host):
+        small = self._instance(uuids.small, 512)
+        large = self._instance(uuids.large, 4096)
+        medium = self._instance(uuids.medium, 2048)
+        mock_get_by_host.return_value = [small, large, medium]
+
+        result = self.task.execute()
+
+        mock_get_by_host.assert_called_once_with(
+            self.context, 'src', expected_attrs=['flavor', 'system_metadata'])
+        # The largest instances are migrated first, two at a time.
+        self.assertEqual([uuids.large, uuids.medium, uuids.small],
+                         [uuid for uuid, ignore in self.started])
+        self.assertEqual([uuids.large, uuids.medium, uuids.small],
+                         result['migrated'])
+        self.assertEqual([], result['failed'])
+        self.assertEqual(3, result['total'])
+        for instance in (small, large, medium):
+            self.assertEqual(task_states.MIGRATING, instance.task_state)
+            instance.save.assert_called_once_with(expected_task_state=[None])
+
+    @mock.patch.object(objects.InstanceList, 'get_by_host')
+    def test_execute_reports_progress(self, mock_get_by_host):
+        self.flags(max_concurrent_live_migrations=1)
+        mock_get_by_host.return_value = [
+            self._instance(uuids.inst1, 1024),
+            self._instance(uuids.inst2, 512),
+            self._instance(uuids.stopped, 512, vm_state=vm_states.STOPPED,
+                           power_state=power_state.SHUTDOWN)]
+        self.task.progress_callback = mock.Mock()
+
+        self.task.execute()
+
+        progress = {'total': 2, 'failed': 0, 'skipped': 1}
+        self.assertEqual(
+            [mock.call(dict(progress, migrated=0, in_progress=1)),
+             mock.call(dict(progress, migrated=1, in_progress=1)),
+             mock.call(dict(progress, migrated=2, in_progress=0))],
+            self.task.progress_callback.call_args_list)
+
+    @mock.patch.object(objects.InstanceList, 'get_by_host')
+    def test_execute_skips_busy_instances(self, mock_get_by_host):
+        mock_get_by_host.return_value = [
+            self._instance(uuids.active, 512),
+            self._instance(uuids.stopped, 512, vm_state=vm_states.STOPPED,
+                           power_state=power_state.SHUTDOWN),
+            self._instance(uuids.resizing, 512,
+                           task_state=task_states.RESIZE_PREP)]
+
+        result = self.task.execute()
+
+        self.assertEqual([uuids.active], result['migrated'])
+        self.assertEqual([uuids.stopped, uuids.resizing], result['skipped'])
+
+    @mock.patch.object(objects.InstanceList, 'get_by_host')
+    def test_execute_ignores_busy_destinations(self, mock_get_by_host):
+        # A migration from another host is running to dest1.
+        self.migrations[100] = objects.Migration(
+            id=100, status='running', dest_compute='dest1')
+        self.flags(max_concurrent_live_migrations=1)
+        mock_get_by_host.return_value = [self._instance(uuids.inst1, 1024),
+                                         self._instance(uuids.inst2, 512)]
+
+        self.task.execute()
+
+        self.assertEqual([(uuids.inst1, ['dest1']), (uuids.inst2, [])],
+                         self.started)
+
+    def test_get_busy_hosts(self):
+        self.migrations = {
+            1: objects.Migration(status='running', dest_compute='dest1'),
+            2: objects.Migration(status='queued', dest_compute='dest1'),
+            3: objects.Migration(status='running', dest_compute='dest2'),
+            4: objects.Migration(status='completed', dest_compute='dest2')}
+
+        self.assertEqual(['dest1'], self.task._get_busy_hosts())
+        objects.MigrationList.get_by_filters.assert_called_once_with(
+            self.context, {'status': drain_host.IN_PROGRESS_STATUSES,
+                           'migration_type': 'live-migration'})
+        self.flags(max_concurrent_live_migrations=0)
+        self.assertEqual([], self.task._get_busy_hosts())
+
+    @mock.patch.object(objects.InstanceList, 'get_by_host')
+    def test_execute_requeues_when_destinations_busy(self, mock_get_by_host):
+        self.flags(max_concurrent_live_migrations=1)
+        self.task.live_migrate = mock.Mock(side_effect=[
+            self._fake_live_migrate(self.context, mock.Mock(uuid=uuids.inst1),
+                                    False, False, None, [],
+                                    objects.Migration(), False),
+            exception.NoValidHost(reason='busy'),
+            exception.NoValidHost(reason='none')])
+        self.started = []
+        mock_get_by_host.return_value = [self._instance(uuids.inst1, 1024),
+                                         self._instance(uuids.inst2, 512)]
+
+        with mock.patch.object(self.task, '_can_start', return_value=True), \
+                mock.patch.object(self.task, '_get_busy_hosts',
+                                  side_effect=[[], ['dest'], []]):
+            result = self.task.execute()
+
+        self.assertEqual(3, self.task.live_migrate.call_count)
+        self.assertEqual([uuids.inst1], result['migrated'])
+        self.assertEqual([uuids.inst2], result['failed'])
+        # The NoValidHost error is only final once the instance is given up
+        # on, with the same action and migration as the first attempt.
+        retry_call, final_call = self.task.live_migrate.call_args_list[1:]
+        self.assertTrue(retry_call[0][7])
+        self.assertFalse(final_call[0][7])
+        self.assertIs(retry_call[0][6], final_call[0][6])
+        self.assertEqual(2, objects.InstanceAction.action_start.call_count)
+        self.assertEqual({}, self.task._waiting_migrations)
+
+    @mock.patch.object(objects.InstanceList, 'get_by_host')
+    def test_execute_interrupted_cancels_waiting(self, mock_get_by_host):
+        self.flags(max_concurrent_live_migrations=1)
+        instance = self._instance(uuids.inst2, 512)
+        self.task.live_migrate = mock.Mock(side_effect=[
+            self._fake_live_migrate(self.context, mock.Mock(uuid=uuids.inst1),
+                                    False, False, None, [],
+                                    objects.Migration(), False),
+            exception.NoValidHost(reason='busy')])
+        drain_host.time.sleep.side_effect = KeyboardInterrupt
+        mock_get_by_host.return_value = [self._instance(uuids.inst1, 1024),
+                                         instance]
+
+        with mock.patch.object(self.task, '_can_start', return_value=True), \
+                mock.patch.object(self.task, '_get_busy_hosts',
+                                  return_value=['dest']):
+            self.assertRaises(KeyboardInterrupt, self.task.execute)
+
+        migration = self.task.live_migrate.call_args_list[1][0][6]
+        self.assertEqual('cancelled', migration.status)
+        migration.save.assert_called_once_with()
+        self.assertIsNone(instance.task_state)
+        instance.save.assert_called_with(
+            expected_task_state=[task_states.MIGRATING])
+
+    @mock.patch.object(objects.InstanceList, 'get_by_host')
+    def test_execute_migration_failed(self, mock_get_by_host):
+        mock_get_by_host.return_value = [self._instance(uuids.inst1, 1024),
+                                         self._instance(uuids.inst2, 512)]
+        self.task.live_migrate = mock.Mock(side_effect=[
+            self._fake_live_migrate(self.context, mock.Mock(uuid=uuids.inst1),
+                                    False, False, None, [],
+                                    objects.Migration(), False),
+            exception.MigrationError(reason='boom')])
+        self.migrations[0].status = 'error'
+
+        result = self.task.execute()
+
+        self.assertEqual([], result['migrated'])
+        self.assertEqual([uuids.inst2, uuids.inst1], result['failed'])
+
+    @mock.patch.object(objects.InstanceList, 'get_by_host')
+    def test_execute_instance_changed_state(self, mock_get_by_host):
+        instance = self._instance(uuids.inst1, 1024)
+        instance.save.side_effect = exception.UnexpectedTaskStateError(
+            instance_uuid=uuids.inst1, expected=None, actual='deleting')
+        mock_get_by_host.return_value = [instance]
+
+        result = self.task.execute()
+
+        self.live_migrate.assert_not_called()
+        self.assertEqual([uuids.inst1], result['skipped'])
+
+    def test_migration_cost(self):
+        instance = self._instance(uuids.inst1, 512, root_gb=10)
+        self.assertEqual(512, self.task._migration_cost(instance))
+        self.task.block_migration = True
+        self.assertEqual(512 + 10 * 1024,
+                         self.task._migration_cost(instance))
@@ -564,6 +564,29 @@ class LiveMigrationTaskTestCase(test.NoDBTestCase):
         self.mox.ReplayAll()
         self.assertRaises(exception.NoValidHost, self.task._find_destination)
 
+    @mock.patch.object(live_migrate.LiveMigrationTask,
+                       '_call_livem_checks_on_host')
+    @mock.patch.object(live_migrate.LiveMigrationTask,
+                       '_check_compatible_with_source_hypervisor')
+    @mock.patch.object(live_migrate.LiveMigrationTask,
+                       '_get_source_cell_mapping',
+                       return_value=objects.CellMapping(uuid=uuids.cell))
+    @mock.patch('nova.scheduler.utils.setup_instance_group')
+    def test_find_destination_ignore_hosts(self, mock_setup, mock_cell,
+                                           mock_check, mock_livem):
+        self.task.ignore_hosts = ['busy-host']
+
+        def fake_select_destinations(context, request_spec, *args, **kw):
+            self.assertEqual([self.instance_host, 'busy-host'],
+                             request_spec.ignore_hosts)
+            return [[fake_selection1]]
+
+        with mock.patch.object(self.task.scheduler_client,
+                               'select_destinations',
+                               side_effect=fake_select_destinations):
+            self.assertEqual(("host1", "node1"),
+                             self.task._find_destination())
+
     @mock.patch("nova.utils.get_image_from_system_metadata")
     @mock.patch("nova.scheduler.utils.build_request_spec")
     @mock.patch("nova.scheduler.utils.setup_instance_group")
@@ -1714,6 +1714,67 @@ class ConductorTaskTestCase(_BaseTaskTestCase, test_compute.BaseTestCase):
         self.assertEqual(2, build_and_run_instance.call_count)
         self.assertEqual(2, len(instance_cells))
 
+    @mock.patch('nova.objects.TagList.create_bulk',
+                wraps=objects.TagList.create_bulk)
+    @mock.patch('nova.objects.BlockDeviceMappingList.create_bulk',
+                wraps=objects.BlockDeviceMappingList.create_bulk)
+    @mock.patch('nova.objects.InstanceMappingList.update_cell_bulk',
+                wraps=objects.InstanceMappingList.update_cell_bulk)
+    @mock.patch('nova.objects.InstanceList.create_bulk',
+                wraps=objects.InstanceList.create_bulk)
+    @mock.patch('nova.objects.Instance.create')
+    @mock.patch('nova.availability_zones.get_host_availability_zone',
+                return_value='myaz')
+    @mock.patch('nova.compute.rpcapi.ComputeAPI.build_and_run_instance')
+    @mock.patch('nova.scheduler.rpcapi.SchedulerAPI.select_destinations')
+    def test_schedule_and_build_multiple_instances_bulk_per_cell(
+            self, select_destinations, build_and_run_instance, get_az,
+            inst_create, inst_create_bulk, im_update_bulk, bdm_create_bulk,
+            tags_create_bulk):
+        """Tests that the instances, instance mappings, block device mappings
+        and tags are written with one bulk call per cell.
+        """
+        select_destinations.return_value = [[fake_selection1],
+                [fake_selection1], [fake_selection1]]
+        params = self.params
+        self.start_service('compute', host='host1')
+
+        for x in range(2):
+            build_request = fake_build_request.fake_req_obj(self.ctxt)
+            del build_request.instance.id
+            build_request.create()
+            params['build_requests'].objects.append(build_request)
+            objects.InstanceMapping(
+                self.ctxt, instance_uuid=build_request.instance.uuid,
+                cell_mapping=None, project_id=self.ctxt.project_id).create()
+            params['request_specs'].append(objects.RequestSpec(
+                instance_uuid=build_request.instance_uuid,
+                instance_group=None))
+
+        self.conductor.schedule_and_build_instances(**params)
+
+        self.assertEqual(3, build_and_run_instance.call_count)
+        inst_create.assert_not_called()
+        self.assertEqual(1, inst_create_bulk.call_count)
+        self.assertEqual(3, len(inst_create_bulk.call_args[0][1]))
+        self.assertEqual(1, im_update_bulk.call_count)
+        self.assertEqual(1, bdm_create_bulk.call_count)
+        self.assertEqual(3, len(bdm_create_bulk.call_args[0][1]))
+        self.assertEqual(1, tags_create_bulk.call_count)
+        # The availability zone lookup is cached per selected host.
+        get_az.assert_called_once_with(mock.ANY, 'host1')
+
+        for build_request in params['build_requests']:
+            inst_mapping = objects.InstanceMapping.get_by_instance_uuid(
+                self.ctxt, build_request.instance_uuid)
+            self.assertEqual(self.cell_mappings['cell1'].uuid,
+                             inst_mapping.cell_mapping.uuid)
+            with context.target_cell(self.ctxt,
+                                     inst_mapping.cell_mapping) as cctxt:
+                tags = objects.TagList.get_by_resource_id(
+                    cctxt, build_request.instance_uuid)
+                self.assertEqual(['tag1'], [tag.tag for tag in tags])
+
     @mock.patch('nova.scheduler.rpcapi.SchedulerAPI.select_destinations')
     def test_schedule_and_build_scheduler_failure(self, select_destinations):
         select_destinations.side_effect = Exception
@@ -1727,7 +1788,7 @@ class ConductorTaskTestCase(_BaseTaskTestCase, test_compute.BaseTestCase):
         self.assertIsNone(instance.task_state)
 
     @mock.patch('nova.objects.TagList.destroy')
-    @mock.patch('nova.objects.TagList.create')
+    @mock.patch('nova.objects.TagList.create_bulk')
     @mock.patch('nova.compute.utils.notify_about_instance_usage')
     @mock.patch('nova.compute.rpcapi.ComputeAPI.build_and_run_instance')
     @mock.patch('nova.scheduler.rpcapi.SchedulerAPI.select_destinations')
@@ -1745,7 +1806,9 @@ class ConductorTaskTestCase(_BaseTaskTestCase, test_compute.BaseTestCase):
         br_destroy.side_effect = exc.BuildRequestNotFound(uuid='foo')
         self.start_service('compute', host='host1')
         select_destinations.return_value = [[fake_selection1]]
-        taglist_create.return_value = self.params['tags']
+        taglist_create.return_value = {
+            self.params['build_requests'][0].instance_uuid:
+                self.params['tags']}
         self.conductor.schedule_and_build_instances(**self.params)
         self.assertFalse(build_and_run.called)
         self.assertFalse(bury.called)
@@ -1820,20 +1883,19 @@ class ConductorTaskTestCase(_BaseTaskTestCase, test_compute.BaseTestCase):
 
     @mock.patch('nova.compute.rpcapi.ComputeAPI.build_and_run_instance')
     @mock.patch('nova.scheduler.rpcapi.SchedulerAPI.select_destinations')
-    @mock.patch('nova.objects.BuildRequest.get_by_instance_uuid')
+    @mock.patch('nova.objects.BuildRequestList.get_existing_instance_uuids')
     @mock.patch('nova.objects.BuildRequest.destroy')
     @mock.patch('nova.conductor.manager.ComputeTaskManager._bury_in_cell0')
-    @mock.patch('nova.objects.Instance.create')
+    @mock.patch('nova.objects.InstanceList.create_bulk')
     def test_schedule_and_build_delete_before_scheduling(self, inst_create,
                                                          bury, br_destroy,
-                                                         br_get_by_inst,
+                                                         br_get_existing,
                                                          select_destinations,
                                                          build_and_run):
         """Tests the case that the build request is deleted before the instance
         is created, so we do not create the instance.
         """
-        inst_uuid = self.params['build_requests'][0].instance.uuid
-        br_get_by_inst.side_effect = exc.BuildRequestNotFound(uuid=inst_uuid)
+        br_get_existing.return_value = set()
         self.start_service('compute', host='host1')
         select_destinations.return_value = [[fake_selection1]]
         self.conductor.schedule_and_build_instances(**self.params)
@@ -1907,7 +1969,7 @@ class ConductorTaskTestCase(_BaseTaskTestCase, test_compute.BaseTestCase):
         mock_check.assert_called_once_with(
             self.params['context'], {'instances': 0, 'cores': 0, 'ram': 0},
             project_id, user_id=None, check_project_id=project_id,
-            check_user_id=None)
+            check_user_id=None, use_cache=False)
 
         # Verify we set the instance to ERROR state and set the fault message.
         instances = objects.InstanceList.get_all(self.ctxt)
@@ -2813,6 +2875,72 @@ class ConductorTaskTestCase(_BaseTaskTestCase, test_compute.BaseTestCase):
             disk_over_commit=None, request_spec=reqspec)
         mock_execute.assert_called_once_with()
 
+    @mock.patch.object(conductor_manager.ComputeTaskManager,
+                       '_build_drain_host_task')
+    def test_drain_host(self, mock_build):
+        mock_build.return_value.execute.return_value = {
+            'migrated': [uuids.inst1], 'failed': [], 'skipped': []}
+
+        result = self.conductor.drain_host(
+            self.ctxt, 'src-host', None, None,
+            progress_callback=mock.sentinel.callback)
+
+        self.assertEqual(mock_build.return_value.execute.return_value,
+                         result)
+        mock_build.assert_called_once_with(self.ctxt, 'src-host', None, None,
+                                           mock.sentinel.callback)
+        mock_build.return_value.execute.assert_called_once_with()
+
+    @mock.patch.object(conductor_manager.ComputeTaskManager, '_live_migrate')
+    def test_build_drain_host_task(self, mock_live_migrate):
+        task = self.conductor._build_drain_host_task(
+            self.ctxt, 'src-host', True, False, mock.sentinel.callback)
+        self.assertEqual(mock.sentinel.callback, task.progress_callback)
+        instance = objects.Instance(uuid=uuids.instance)
+
+        migration = task.live_migrate(self.ctxt, instance, True, False,
+                                      mock.sentinel.reqspec, ['busy-host'],
+                                      mock.sentinel.migration, True)
+
+        self.assertEqual(mock_live_migrate.return_value, migration)
+        mock_live_migrate.assert_called_once_with(
+            self.ctxt, instance, {'host': None}, True, False,
+            mock.sentinel.reqspec, ignore_hosts=['busy-host'],
+            migration=mock.sentinel.migration, retry_no_valid_host=True)
+
+    @mock.patch.object(scheduler_utils, 'set_vm_state_and_notify')
+    @mock.patch.object(live_migrate, 'create_migration')
+    @mock.patch.object(live_migrate.LiveMigrationTask, 'execute',
+                       side_effect=exc.NoValidHost(reason='busy'))
+    def test_live_migrate_retry_no_valid_host(self, mock_execute,
+                                              mock_create, mock_set_state):
+        instance = objects.Instance(uuid=uuids.instance, host='src-host',
+                                    vm_state=vm_states.ACTIVE)
+        migration = objects.Migration(status='accepted')
+
+        with mock.patch.object(migration, 'save') as mock_save:
+            self.assertRaises(exc.NoValidHost, self.conductor._live_migrate,
+                              self.ctxt, instance, {'host': None}, None,
+                              None, None, migration=migration,
+                              retry_no_valid_host=True)
+            # The failure is only recorded once it is not retried anymore.
+            mock_set_state.assert_not_called()
+            mock_save.assert_not_called()
+            self.assertEqual('accepted', migration.status)
+
+            self.assertRaises(exc.NoValidHost, self.conductor._live_migrate,
+                              self.ctxt, instance, {'host': None}, None,
+                              None, None, migration=migration)
+            mock_set_state.assert_called_once_with(
+                self.ctxt, uuids.instance, 'compute_task', 'migrate_server',
+                {'vm_state': vm_states.ACTIVE, 'task_state': None,
+                 'expected_task_state': task_states.MIGRATING},
+                mock_execute.side_effect,
+                {'instance_properties': {'uuid': uuids.instance}})
+            mock_save.assert_called_once_with()
+            self.assertEqual('error', migration.status)
+        mock_create.assert_not_called()
+
 
 class ConductorTaskRPCAPITestCase(_BaseTaskTestCase,
         test_compute.BaseTestCase):
@@ -1876,6 +1876,25 @@ class InstanceTestCase(test.TestCase, ModelsObjectComparatorMixin):
         instance = self.create_instance_with_args()
         self.assertTrue(uuidutils.is_uuid_like(instance['uuid']))
 
+    def test_instance_create_bulk(self):
+        values_list = [dict(self.sample_data, hostname='host%d' % x)
+                       for x in range(3)]
+        instances = db.instance_create_bulk(self.ctxt, values_list)
+        self.assertEqual(3, len(instances))
+        for x, instance in enumerate(instances):
+            self.assertTrue(uuidutils.is_uuid_like(instance['uuid']))
+            self.assertEqual('host%d' % x, instance['hostname'])
+            db_instance = db.instance_get_by_uuid(self.ctxt, instance['uuid'])
+            self.assertEqual({'mkey1': 'mval1', 'mkey2': 'mval2'},
+                             utils.metadata_to_dict(db_instance['metadata']))
+            self.assertIsNotNone(db.ec2_instance_get_by_uuid(
+                self.ctxt, instance['uuid']))
+
+    @mock.patch.object(db.sqlalchemy.api, 'security_group_ensure_default')
+    def test_instance_create_bulk_ensures_default_group_once(self, mock_sg):
+        db.instance_create_bulk(self.ctxt, [{}, {}])
+        mock_sg.assert_called_once_with(self.ctxt)
+
     @mock.patch.object(db.sqlalchemy.api, 'security_group_ensure_default')
     def test_instance_create_with_deadlock_retry(self, mock_sg):
         mock_sg.side_effect = [db_exc.DBDeadlock(), None]
@@ -3094,6 +3113,29 @@ class ServiceTestCase(test.TestCase, ModelsObjectComparatorMixin):
         for key, value in new_values.items():
             self.assertEqual(value, updated_service[key])
 
+    def test_service_report_heartbeats(self):
+        service1 = self._create_service({})
+        service2 = self._create_service({'host': 'fake_host2'})
+        service3 = self._create_service({'host': 'fake_host3'})
+        db.service_destroy(self.ctxt, service3['id'])
+        last_seen_up = datetime.datetime(2018, 1, 1, 12, 0, 0)
+
+        updated = db.service_report_heartbeats(
+            self.ctxt, [service1['id'], service3['id']], last_seen_up)
+
+        self.assertEqual(1, updated)
+        updated_service = db.service_get(self.ctxt, service1['id'])
+        self.assertEqual(4, updated_service['report_count'])
+        self.assertEqual(last_seen_up, updated_service['last_seen_up'])
+        self.assertIsNotNone(updated_service['updated_at'])
+        other_service = db.service_get(self.ctxt, service2['id'])
+        self.assertEqual(3, other_service['report_count'])
+        self.assertIsNone(other_service['last_seen_up'])
+
+    def test_service_report_heartbeats_no_services(self):
+        self.assertEqual(0, db.service_report_heartbeats(
+            self.ctxt, [], timeutils.utcnow()))
+
     def test_service_update_not_found_exception(self):
         self.assertRaises(exception.ServiceNotFound,
                           db.service_update, self.ctxt, 100500, {})
@@ -5610,6 +5652,26 @@ class BlockDeviceMappingTestCase(test.TestCase):
         self.assertIsNotNone(bdm)
         self.assertTrue(uuidutils.is_uuid_like(bdm['uuid']))
 
+    def test_block_device_mapping_create_bulk(self):
+        instance2 = db.instance_create(self.ctxt, {})
+        values_list = []
+        for instance_uuid in (self.instance['uuid'], instance2['uuid']):
+            values_list.append(block_device.BlockDeviceDict({
+                'instance_uuid': instance_uuid,
+                'device_name': 'fake_device',
+                'source_type': 'volume',
+                'destination_type': 'volume'}))
+        bdms = db.block_device_mapping_create_bulk(self.ctxt, values_list,
+                                                   legacy=False)
+        self.assertEqual(2, len(bdms))
+        for bdm, instance_uuid in zip(
+                bdms, (self.instance['uuid'], instance2['uuid'])):
+            self.assertIsNotNone(bdm['id'])
+            self.assertTrue(uuidutils.is_uuid_like(bdm['uuid']))
+            db_bdms = db.block_device_mapping_get_all_by_instance(
+                self.ctxt, instance_uuid)
+            self.assertEqual([bdm['id']], [db_bdm['id'] for db_bdm in db_bdms])
+
     def test_block_device_mapping_create_with_blank_uuid(self):
         bdm = self._create_bdm({'uuid': ''})
         self.assertIsNotNone(bdm)
@@ -8440,6 +8502,29 @@ class ArchiveTestCase(test.TestCase, ModelsObjectComparatorMixin):
             'shadow_migrations'
         )
 
+    def test_archive_deleted_rows_for_migrations_in_batches(self):
+        self._check_sqlite_version_less_than_3_7()
+        instance_uuid = uuidsentinel.instance
+        ins_stmt = self.instances.insert().values(uuid=instance_uuid,
+                                                  deleted=1)
+        self.conn.execute(ins_stmt)
+        for _ in range(3):
+            ins_stmt = self.migrations.insert().values(
+                instance_uuid=instance_uuid, deleted=0)
+            self.conn.execute(ins_stmt)
+
+        # Only max_rows rows are soft deleted and archived at a time.
+        num = sqlalchemy_api._archive_deleted_rows_for_table("migrations",
+                                                             max_rows=2)
+        self.assertEqual(2, num[0])
+        rows = self.conn.execute(self.migrations.select()).fetchall()
+        self.assertEqual(1, len(rows))
+        self.assertEqual(0, rows[0].deleted)
+        num = sqlalchemy_api._archive_deleted_rows_for_table("migrations",
+                                                             max_rows=2)
+        self.assertEqual(1, num[0])
+        self._assert_shadow_tables_empty_except('shadow_migrations')
+
     def test_archive_deleted_rows_2_tables(self):
         # Add 6 rows to each table
         for uuidstr in self.uuidstrs:
@@ -9102,6 +9187,25 @@ class TestDBInstanceTags(test.TestCase):
         tags = self._get_tags_from_resp(tag_refs)
         self.assertEqual([(uuid, tag)], tags)
 
+    def test_instance_tag_add_bulk(self):
+        uuids = [self._create_instance() for x in range(2)]
+
+        tag_refs = db.instance_tag_add_bulk(self.context, uuids,
+                                            [u'tag1', u'tag2', u'tag1'])
+
+        expected = set((uuid, tag) for uuid in uuids
+                       for tag in (u'tag1', u'tag2'))
+        self.assertEqual(expected, set(self._get_tags_from_resp(tag_refs)))
+        self.assertEqual(4, len(tag_refs))
+        for uuid in uuids:
+            tag_refs = db.instance_tag_get_by_instance_uuid(self.context, uuid)
+            self.assertEqual(set([u'tag1', u'tag2']),
+                             set(t.tag for t in tag_refs))
+
+    def test_instance_tag_add_bulk_no_instances(self):
+        self.assertEqual([], db.instance_tag_add_bulk(self.context, [],
+                                                      [u'tag1']))
+
     def test_instance_tag_set(self):
         uuid = self._create_instance()
 
@@ -21,6 +21,7 @@ from six.moves import range
 
 from nova import context
 from nova import exception
+from nova.network.security_group import bindings_cache
 from nova.network.security_group import neutron_driver
 from nova import objects
 from nova import test
@@ -383,6 +384,54 @@ class TestNeutronDriver(test.NoDBTestCase):
         self.assertEqual(['1', '2'],
             sorted(self.mocked_client.list_security_groups.call_args[1]['id']))
 
+    def test_instances_security_group_bindings_cached(self):
+        self.flags(security_group_bindings_cache_time=60, group='neutron')
+        bindings_cache.reset_cache()
+        self.addCleanup(bindings_cache.reset_cache)
+        servers = [{'id': uuids.server1}, {'id': uuids.server2}]
+        sg1 = {'id': uuids.sg1, 'name': 'wol', 'description': '',
+               'tenant_id': 'my_tenantid', 'security_group_rules': []}
+        self.mocked_client.list_ports.return_value = {'ports': [
+            {'id': uuids.port1, 'device_id': uuids.server1,
+             'security_groups': [uuids.sg1]}]}
+        self.mocked_client.list_security_groups.return_value = {
+            'security_groups': [sg1]}
+        sg_api = neutron_driver.SecurityGroupAPI()
+
+        result = sg_api.get_instances_security_groups_bindings(
+            self.context, servers)
+        self.assertEqual({uuids.server1: [{'name': 'wol'}]}, result)
+        self.mocked_client.list_ports.assert_called_once_with(
+            device_id=[uuids.server1, uuids.server2])
+
+        # The servers without ports are not cached, their ports may not have
+        # been created yet.
+        self.mocked_client.list_ports.return_value = {'ports': []}
+        result = sg_api.get_instances_security_groups_bindings(
+            self.context, servers)
+        self.assertEqual({uuids.server1: [{'name': 'wol'}]}, result)
+        result = sg_api.get_instances_security_groups_bindings(
+            self.context, servers, detailed=True)
+        self.assertEqual(
+            {uuids.server1: [
+                sg_api._convert_to_nova_security_group_format(sg1)]},
+            result)
+        self.mocked_client.list_ports.assert_called_with(
+            device_id=[uuids.server2])
+        self.assertEqual(3, self.mocked_client.list_ports.call_count)
+        self.assertEqual(1, self.mocked_client.list_security_groups.call_count)
+
+        # The admins may see other security groups than the users.
+        admin_context = context.RequestContext('user1', 'admin_tenant', True)
+        sg_api.get_instances_security_groups_bindings(admin_context, servers)
+        self.mocked_client.list_ports.assert_called_with(
+            device_id=[uuids.server1, uuids.server2])
+
+        bindings_cache.remove_instance(uuids.server1)
+        sg_api.get_instances_security_groups_bindings(self.context, servers)
+        self.mocked_client.list_ports.assert_called_with(
+            device_id=[uuids.server1, uuids.server2])
+
     def test_instance_empty_security_groups(self):
 
         port_list = {'ports': [{'id': 1, 'device_id': uuids.instance,
@@ -395,7 +444,8 @@ class TestNeutronDriver(test.NoDBTestCase):
         self.mocked_client.list_ports.assert_called_once_with(
             device_id=[uuids.instance])
 
-    def test_add_to_instance(self):
+    @mock.patch.object(bindings_cache, 'remove_instance')
+    def test_add_to_instance(self, mock_remove_bindings):
         sg_name = 'web_server'
         sg_id = '85cc3048-abc3-43cc-89b3-377341426ac5'
         port_id = 1
@@ -403,6 +453,10 @@ class TestNeutronDriver(test.NoDBTestCase):
                      'fixed_ips': [{'ip_address': '10.0.0.1'}],
                      'port_security_enabled': True, 'security_groups': []}]}
         self.mocked_client.list_ports.return_value = port_list
+        # The security groups of the instance are forgotten once the port
+        # is updated.
+        self.mocked_client.update_port.side_effect = (
+            lambda *args: self.assertFalse(mock_remove_bindings.called))
         sg_api = neutron_driver.SecurityGroupAPI()
         with mock.patch.object(neutronv20, 'find_resourceid_by_name_or_id',
                                return_value=sg_id):
@@ -412,6 +466,7 @@ class TestNeutronDriver(test.NoDBTestCase):
             device_id=uuids.instance)
         self.mocked_client.update_port.assert_called_once_with(
             port_id, {'port': {'security_groups': [sg_id]}})
+        mock_remove_bindings.assert_called_once_with(uuids.instance)
 
     def test_add_to_instance_with_bad_request(self):
         sg_name = 'web_server'
@@ -0,0 +1,119 @@
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+from nova.network import address_index
+from nova.network import model as network_model
+from nova import test
+from nova.tests import uuidsentinel as uuids
+
+
+def _network_info(*addresses):
+    """Build a network info model with one VIF per (network_id, address)."""
+    vifs = []
+    for network_id, address in addresses:
+        subnet = network_model.Subnet(
+            cidr='10.0.0.0/24',
+            ips=[network_model.FixedIP(address=address)])
+        network = network_model.Network(id=network_id, subnets=[subnet])
+        vifs.append(network_model.VIF(network=network))
+    return network_model.NetworkInfo(vifs)
+
+
+class AddressIndexTestCase(test.NoDBTestCase):
+    def setUp(self):
+        super(AddressIndexTestCase, self).setUp()
+        self.flags(metadata_address_index=True, group='api')
+
+    @staticmethod
+    def _get_instance_uuid(address):
+        return address_index.get_instance_uuid(
+            address, [uuids.net1, uuids.net2])
+
+    def test_get_addresses(self):
+        nw_info = _network_info((uuids.net1, '10.0.0.2'),
+                                (uuids.net2, '10.0.0.3'))
+        self.assertEqual(set([(uuids.net1, '10.0.0.2'),
+                              (uuids.net2, '10.0.0.3')]),
+                         address_index.get_addresses(nw_info))
+        self.assertEqual(set(), address_index.get_addresses(None))
+
+    def test_has_address(self):
+        nw_info = _network_info((uuids.net1, '10.0.0.2'))
+        self.assertTrue(address_index.has_address(nw_info, '10.0.0.2'))
+        self.assertTrue(address_index.has_address(
+            nw_info, '10.0.0.2', network_ids=[uuids.net1]))
+        self.assertFalse(address_index.has_address(
+            nw_info, '10.0.0.2', network_ids=[uuids.net2]))
+        self.assertFalse(address_index.has_address(nw_info, '10.0.0.3'))
+
+    def test_update_instance(self):
+        address_index.update_instance(
+            uuids.instance, _network_info((uuids.net1, '10.0.0.2')))
+        self.assertEqual(uuids.instance,
+                         self._get_instance_uuid('10.0.0.2'))
+        self.assertEqual(uuids.instance, address_index.get_instance_uuid(
+            '10.0.0.2', [uuids.net1]))
+        self.assertIsNone(address_index.get_instance_uuid(
+            '10.0.0.2', [uuids.net2]))
+        self.assertIsNone(self._get_instance_uuid('10.0.0.3'))
+
+    def test_update_instance_removes_old_addresses(self):
+        address_index.update_instance(
+            uuids.instance, _network_info((uuids.net1, '10.0.0.2')))
+        address_index.update_instance(
+            uuids.instance, _network_info((uuids.net1, '10.0.0.3')))
+        self.assertIsNone(self._get_instance_uuid('10.0.0.2'))
+        self.assertEqual(uuids.instance,
+                         self._get_instance_uuid('10.0.0.3'))
+
+    def test_update_instance_keeps_reused_address(self):
+        # The address moved to another instance before the old instance
+        # refreshed its entries.
+        address_index.update_instance(
+            uuids.instance1, _network_info((uuids.net1, '10.0.0.2')))
+        address_index.update_instance(
+            uuids.instance2, _network_info((uuids.net1, '10.0.0.2')))
+        address_index.update_instance(uuids.instance1, _network_info())
+        self.assertEqual(uuids.instance2,
+                         self._get_instance_uuid('10.0.0.2'))
+
+    def test_get_instance_uuid_ambiguous(self):
+        address_index.update_instance(
+            uuids.instance1, _network_info((uuids.net1, '10.0.0.2')))
+        address_index.update_instance(
+            uuids.instance2, _network_info((uuids.net2, '10.0.0.2')))
+        self.assertIsNone(self._get_instance_uuid('10.0.0.2'))
+        self.assertEqual(uuids.instance2, address_index.get_instance_uuid(
+            '10.0.0.2', [uuids.net2]))
+
+    def test_remove_instance(self):
+        address_index.update_instance(
+            uuids.instance, _network_info((uuids.net1, '10.0.0.2'),
+                                          (uuids.net2, '10.0.0.3')))
+        address_index.remove_instance(uuids.instance)
+        self.assertIsNone(self._get_instance_uuid('10.0.0.2'))
+        self.assertIsNone(self._get_instance_uuid('10.0.0.3'))
+        # Removing an instance which is not indexed does nothing.
+        address_index.remove_instance(uuids.instance)
+
+    def test_disabled(self):
+        address_index.update_instance(
+            uuids.instance, _network_info((uuids.net1, '10.0.0.2')))
+        self.flags(metadata_address_index=False, group='api')
+        self.assertIsNone(self._get_instance_uuid('10.0.0.2'))
+        address_index.update_instance(
+            uuids.instance, _network_info((uuids.net1, '10.0.0.3')))
+        address_index.remove_instance(uuids.instance)
+        self.flags(metadata_address_index=True, group='api')
+        self.assertEqual(uuids.instance,
+                         self._get_instance_uuid('10.0.0.2'))
+        self.assertIsNone(self._get_instance_uuid('10.0.0.3'))
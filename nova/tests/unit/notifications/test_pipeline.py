@@ -0,0 +1,183 @@
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+import mock
+
+from nova.notifications import pipeline
+from nova import test
+from nova.tests import uuidsentinel as uuids
+
+
+def _update_payload(uuid, old_state, state, **kwargs):
+    data = {'uuid': uuid,
+            'state_update': {'nova_object.data': {
+                'old_state': old_state, 'state': state,
+                'old_task_state': None, 'new_task_state': None}}}
+    data.update(kwargs)
+    return {'nova_object.data': data}
+
+
+class NotificationPipelineTestCase(test.NoDBTestCase):
+    def setUp(self):
+        super(NotificationPipelineTestCase, self).setUp()
+        self.notify_patcher = mock.patch.object(pipeline, '_notify')
+        self.notify = self.notify_patcher.start()
+        self.addCleanup(mock.patch.stopall)
+        self.addCleanup(pipeline.reset)
+
+    def _make_pipeline(self, size=10, **kwargs):
+        notification_pipeline = pipeline.NotificationPipeline(size, **kwargs)
+        self.addCleanup(notification_pipeline.stop)
+        return notification_pipeline
+
+    def test_emit_synchronous_by_default(self):
+        pipeline.emit(mock.sentinel.context, 'nova-compute:host', 'info',
+                      'instance.create.end', {})
+
+        self.notify.assert_called_once_with(
+            mock.sentinel.context, 'nova-compute:host', 'info',
+            'instance.create.end', {})
+        self.assertIsNone(pipeline.PIPELINE)
+
+    @mock.patch('nova.rpc.get_versioned_notifier')
+    def test_emit_queued(self, mock_get_notifier):
+        self.notify_patcher.stop()
+        self.flags(queue_size=10, group='notifications')
+
+        pipeline.emit(mock.sentinel.context, 'nova-compute:host', 'info',
+                      'instance.create.end', {})
+        pipeline.flush()
+
+        mock_get_notifier.assert_called_once_with('nova-compute:host')
+        mock_get_notifier.return_value.info.assert_called_once_with(
+            mock.sentinel.context, event_type='instance.create.end',
+            payload={})
+        self.assertEqual({'queued': 1, 'sent': 1}, pipeline.get_stats())
+
+    @mock.patch('eventlet.patcher.is_monkey_patched', return_value=False)
+    def test_emit_synchronous_not_monkey_patched(self, mock_patched):
+        self.flags(queue_size=10, group='notifications')
+
+        pipeline.emit(mock.sentinel.context, 'nova-compute:host', 'info',
+                      'instance.create.end', {})
+
+        self.notify.assert_called_once_with(
+            mock.sentinel.context, 'nova-compute:host', 'info',
+            'instance.create.end', {})
+        self.assertIsNone(pipeline.PIPELINE)
+        mock_patched.assert_called_once_with('socket')
+
+    def test_coalesce_instance_updates(self):
+        notification_pipeline = self._make_pipeline(coalesce_window=0.01)
+
+        for payload in (_update_payload(uuids.inst1, 'building', 'building'),
+                        _update_payload(uuids.inst2, 'active', 'stopped'),
+                        _update_payload(uuids.inst1, 'building', 'active',
+                                        old_display_name='old')):
+            notification_pipeline.emit(mock.sentinel.context, 'publisher',
+                                       'info', 'instance.update', payload)
+        notification_pipeline.emit(mock.sentinel.context, 'publisher', 'info',
+                                   'instance.create.end', {})
+        notification_pipeline.flush()
+
+        self.assertEqual(
+            [mock.call(mock.sentinel.context, 'publisher', 'info',
+                       'instance.update',
+                       _update_payload(uuids.inst1, 'building', 'active',
+                                       old_display_name='old')),
+             mock.call(mock.sentinel.context, 'publisher', 'info',
+                       'instance.update',
+                       _update_payload(uuids.inst2, 'active', 'stopped')),
+             mock.call(mock.sentinel.context, 'publisher', 'info',
+                       'instance.create.end', {})],
+            self.notify.call_args_list)
+        self.assertEqual(1, notification_pipeline.stats['coalesced'])
+
+    def test_not_coalesced_across_other_notifications(self):
+        notification_pipeline = self._make_pipeline(coalesce_window=0.01)
+        power_off_payload = {'nova_object.data': {'uuid': uuids.inst1}}
+
+        notification_pipeline.emit(
+            mock.sentinel.context, 'publisher', 'info', 'instance.update',
+            _update_payload(uuids.inst1, 'active', 'active'))
+        notification_pipeline.emit(
+            mock.sentinel.context, 'publisher', 'info',
+            'instance.power_off.start', power_off_payload)
+        notification_pipeline.emit(
+            mock.sentinel.context, 'publisher', 'info', 'instance.update',
+            _update_payload(uuids.inst1, 'active', 'stopped'))
+        notification_pipeline.flush()
+
+        self.assertEqual(
+            [mock.call(mock.sentinel.context, 'publisher', 'info',
+                       'instance.update',
+                       _update_payload(uuids.inst1, 'active', 'active')),
+             mock.call(mock.sentinel.context, 'publisher', 'info',
+                       'instance.power_off.start', power_off_payload),
+             mock.call(mock.sentinel.context, 'publisher', 'info',
+                       'instance.update',
+                       _update_payload(uuids.inst1, 'active', 'stopped'))],
+            self.notify.call_args_list)
+        self.assertEqual(0, notification_pipeline.stats['coalesced'])
+
+    def test_not_coalesced_once_sent(self):
+        notification_pipeline = self._make_pipeline(coalesce_window=0.01)
+
+        notification_pipeline.emit(
+            mock.sentinel.context, 'publisher', 'info', 'instance.update',
+            _update_payload(uuids.inst1, 'building', 'active'))
+        notification_pipeline.flush()
+        notification_pipeline.emit(
+            mock.sentinel.context, 'publisher', 'info', 'instance.update',
+            _update_payload(uuids.inst1, 'active', 'stopped'))
+        notification_pipeline.flush()
+
+        self.assertEqual(2, self.notify.call_count)
+        self.assertEqual(0, notification_pipeline.stats['coalesced'])
+
+    def test_drop_when_full(self):
+        notification_pipeline = self._make_pipeline(size=1,
+                                                    drop_when_full=True)
+
+        # The queue is not emptied until this greenthread yields.
+        for i in range(3):
+            notification_pipeline.emit(mock.sentinel.context, 'publisher',
+                                       'info', 'instance.create.end', {})
+        notification_pipeline.flush()
+
+        self.assertEqual(1, self.notify.call_count)
+        self.assertEqual({'queued': 1, 'dropped': 2, 'sent': 1},
+                         dict(notification_pipeline.stats))
+
+    def test_block_when_full(self):
+        notification_pipeline = self._make_pipeline(size=1)
+
+        for i in range(3):
+            notification_pipeline.emit(mock.sentinel.context, 'publisher',
+                                       'info', 'instance.create.end', {})
+        notification_pipeline.flush()
+
+        self.assertEqual(3, self.notify.call_count)
+        self.assertEqual(3, notification_pipeline.stats['sent'])
+        self.assertGreater(notification_pipeline.stats['blocked'], 0)
+
+    def test_send_failure(self):
+        notification_pipeline = self._make_pipeline()
+        self.notify.side_effect = [Exception('boom'), None]
+
+        for i in range(2):
+            notification_pipeline.emit(mock.sentinel.context, 'publisher',
+                                       'info', 'instance.create.end', {})
+        notification_pipeline.flush()
+
+        self.assertEqual(1, notification_pipeline.stats['failed'])
+        self.assertEqual(1, notification_pipeline.stats['sent'])
@@ -551,6 +551,51 @@ class _TestBlockDeviceMappingListObject(object):
         })
         return fake_bdm
 
+    @mock.patch.object(db, 'block_device_mapping_create_bulk')
+    def test_create_bulk(self, create_bulk):
+        create_bulk.return_value = [
+            self.fake_bdm(123, instance_uuid=uuids.instance1),
+            self.fake_bdm(456, instance_uuid=uuids.instance2)]
+        bdms = [objects.BlockDeviceMapping(
+                    context=self.context, source_type='snapshot',
+                    destination_type='volume', instance_uuid=instance_uuid)
+                for instance_uuid in (uuids.instance1, uuids.instance2)]
+
+        created = objects.BlockDeviceMappingList.create_bulk(
+            self.context, bdms)
+
+        self.assertIs(bdms, created)
+        create_bulk.assert_called_once_with(
+            self.context,
+            [{'source_type': 'snapshot', 'destination_type': 'volume',
+              'instance_uuid': uuids.instance1},
+             {'source_type': 'snapshot', 'destination_type': 'volume',
+              'instance_uuid': uuids.instance2}],
+            legacy=False)
+        self.assertEqual([123, 456], [bdm.id for bdm in bdms])
+        self.assertEqual([uuids.instance1, uuids.instance2],
+                         [bdm.instance_uuid for bdm in bdms])
+        for bdm in bdms:
+            self.assertEqual(set(), bdm.obj_what_changed())
+
+    @mock.patch.object(db, 'block_device_mapping_create_bulk')
+    def test_create_bulk_already_created(self, create_bulk):
+        bdms = [objects.BlockDeviceMapping(context=self.context, id=1)]
+        self.assertRaises(exception.ObjectActionError,
+                          objects.BlockDeviceMappingList.create_bulk,
+                          self.context, bdms)
+        create_bulk.assert_not_called()
+
+    @mock.patch.object(db, 'block_device_mapping_create_bulk')
+    def test_create_bulk_api_cell(self, create_bulk):
+        self.flags(enable=True, cell_type='api', group='cells')
+        bdms = [objects.BlockDeviceMapping(context=self.context,
+                                           instance_uuid=uuids.instance)]
+        self.assertRaises(exception.ObjectActionError,
+                          objects.BlockDeviceMappingList.create_bulk,
+                          self.context, bdms)
+        create_bulk.assert_not_called()
+
     @mock.patch.object(db, 'block_device_mapping_get_all_by_instance_uuids')
     def test_bdms_by_instance_uuid(self, get_all_by_inst_uuids):
         fakes = [self.fake_bdm(123), self.fake_bdm(456)]
@@ -522,6 +522,36 @@ class _TestInstanceObject(object):
             'system_metadata'])
         mock_send.assert_called_once_with(self.context, mock.ANY, mock.ANY)
 
+    @mock.patch('nova.quota.invalidate_usage_counts')
+    @mock.patch.object(db, 'instance_update_and_get_original')
+    @mock.patch.object(db, 'instance_get_by_uuid')
+    def test_save_invalidates_quota_usage_counts(self, mock_get,
+                                                 mock_update_and_get,
+                                                 mock_invalidate):
+        self.flags(enable=False, group='cells')
+        old_ref = dict(self.fake_instance, vcpus=1, display_name='hello')
+        mock_get.return_value = old_ref
+        inst = objects.Instance.get_by_uuid(self.context, old_ref['uuid'])
+
+        # Renaming the instance doesn't change its usage.
+        mock_update_and_get.return_value = (
+            old_ref, dict(old_ref, display_name='goodbye'))
+        inst.display_name = 'goodbye'
+        inst.save()
+        mock_invalidate.assert_not_called()
+
+        mock_update_and_get.return_value = (old_ref, dict(old_ref, vcpus=2))
+        inst.vcpus = 2
+        inst.save()
+        mock_invalidate.assert_called_with(old_ref['project_id'])
+
+        mock_invalidate.reset_mock()
+        mock_update_and_get.return_value = (
+            old_ref, dict(old_ref, vm_state=vm_states.SOFT_DELETED))
+        inst.vm_state = vm_states.SOFT_DELETED
+        inst.save()
+        mock_invalidate.assert_called_with(old_ref['project_id'])
+
     @mock.patch('nova.db.instance_extra_update_by_uuid')
     def test_save_object_pci_requests(self, mock_instance_extra_update):
         expected_json = ('[{"count": 1, "alias_name": null, "is_new": false,'
@@ -1046,6 +1076,32 @@ class _TestInstanceObject(object):
     def test_system_metadata_change_tracking(self):
         self._test_metadata_change_tracking('system_metadata')
 
+    def test_obj_to_primitive_cache_metadata_changed_in_place(self):
+        inst = objects.Instance(uuid=uuids.instance, metadata={'foo': 'bar'})
+        inst.obj_reset_changes()
+        inst.obj_to_primitive()
+        inst.metadata['foo'] = 'baz'
+        primitive = inst.obj_to_primitive()
+        self.assertEqual({'foo': 'baz'},
+                         primitive['nova_object.data']['metadata'])
+        self.assertEqual(['metadata'], primitive['nova_object.changes'])
+        # Resetting the changes only updates the original metadata of the
+        # instance, the cached primitive must not keep the old changes.
+        inst.obj_reset_changes()
+        self.assertNotIn('nova_object.changes', inst.obj_to_primitive())
+
+    def test_obj_to_primitive_cache_network_info_not_cached(self):
+        # The primitive of the network info is its JSON serialization, it
+        # can not be compared to the network info to tell if it changed.
+        inst = objects.Instance(
+            uuid=uuids.instance,
+            info_cache=objects.InstanceInfoCache(
+                network_info=network_model.NetworkInfo()))
+        inst.obj_reset_changes(recursive=True)
+        inst.obj_to_primitive()
+        self.assertNotIn('_primitive_cache', inst.info_cache.__dict__)
+        self.assertNotIn('_primitive_cache', inst.__dict__)
+
     @mock.patch.object(db, 'instance_create')
     def test_create_stubbed(self, mock_create):
         vals = {'host': 'foo-host',
@@ -1082,6 +1138,18 @@ class _TestInstanceObject(object):
         mock_create.assert_called_once_with(self.context, {'deleted': 0,
                                                            'extra': extras})
 
+    @mock.patch('nova.quota.invalidate_usage_counts')
+    def test_create_destroy_invalidate_quota_usage_counts(self,
+                                                          mock_invalidate):
+        inst = objects.Instance(context=self.context,
+                                user_id=self.context.user_id,
+                                project_id=self.context.project_id)
+        inst.create()
+        mock_invalidate.assert_called_once_with(self.context.project_id)
+        mock_invalidate.reset_mock()
+        inst.destroy()
+        mock_invalidate.assert_called_once_with(self.context.project_id)
+
     def test_create_with_values(self):
         inst1 = objects.Instance(context=self.context,
                                  user_id=self.context.user_id,
@@ -1627,6 +1695,33 @@ class _TestInstanceListObject(object):
             db_inst.update(updates)
         return db_inst
 
+    def test_create_bulk(self):
+        instances = [objects.Instance(context=self.context,
+                                      user_id=self.context.user_id,
+                                      project_id=self.context.project_id,
+                                      host='foo-host%d' % x)
+                     for x in range(2)]
+        target_ctxt = self.context.elevated()
+
+        created = objects.InstanceList.create_bulk(target_ctxt, instances)
+
+        self.assertIs(instances, created)
+        for x, inst in enumerate(instances):
+            self.assertIsNotNone(inst.id)
+            self.assertIsNotNone(inst.ec2_ids)
+            # The instances keep their own context.
+            self.assertIs(self.context, inst._context)
+            got = objects.Instance.get_by_uuid(self.context, inst.uuid)
+            self.assertEqual('foo-host%d' % x, got.host)
+
+    @mock.patch.object(db, 'instance_create_bulk')
+    def test_create_bulk_already_created(self, mock_create_bulk):
+        inst = objects.Instance(context=self.context, id=1)
+        self.assertRaises(exception.ObjectActionError,
+                          objects.InstanceList.create_bulk,
+                          self.context, [inst])
+        mock_create_bulk.assert_not_called()
+
     @mock.patch.object(db, 'instance_get_all_by_filters')
     def test_get_all_by_filters(self, mock_get_all):
         fakes = [self.fake_instance(1), self.fake_instance(2)]
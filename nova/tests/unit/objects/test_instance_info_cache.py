@@ -123,6 +123,19 @@ class _TestInstanceInfoCacheObject(object):
         self.assertEqual(timeutils.normalize_time(fake_updated_at),
                          timeutils.normalize_time(obj.updated_at))
 
+    @mock.patch('nova.network.address_index.update_instance')
+    @mock.patch.object(db, 'instance_info_cache_update')
+    def test_save_updates_address_index(self, mock_update, mock_index):
+        nwinfo = network_model.NetworkInfo.hydrate([{'address': 'foo'}])
+        mock_update.return_value = dict(fake_info_cache,
+                                        network_info=nwinfo.json())
+        obj = instance_info_cache.InstanceInfoCache(context=self.context)
+        obj.instance_uuid = uuids.info_instance
+        obj.network_info = nwinfo
+        obj.save()
+        mock_index.assert_called_once_with(uuids.info_instance,
+                                           obj.network_info)
+
     @mock.patch.object(db, 'instance_info_cache_get',
                        return_value=fake_info_cache)
     def test_refresh(self, mock_get):
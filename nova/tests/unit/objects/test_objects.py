@@ -17,6 +17,7 @@ import copy
 import datetime
 import inspect
 import os
+import pickle
 import pprint
 
 import fixtures
@@ -36,6 +37,7 @@ from nova.objects import virt_device_metadata
 from nova import test
 from nova.tests import fixtures as nova_fixtures
 from nova.tests.unit import fake_notifier
+from nova.tests import uuidsentinel as uuids
 from nova import utils
 
 
@@ -810,6 +812,98 @@ class TestObject(_LocalTest, _TestObject):
         self.assertEqual(1, obj.foo)
         self.assertTrue(obj.deleted)
 
+    def _make_cached_obj(self):
+        obj = MyObj(foo=1, bar='bar', mutable_default=['a'],
+                    rel_object=MyOwnedObject(baz=1),
+                    rel_objects=[MyOwnedObject(baz=2)])
+        obj.obj_reset_changes(recursive=True)
+        obj.obj_to_primitive()
+        return obj
+
+    def test_obj_to_primitive_cached(self):
+        obj = self._make_cached_obj()
+        with mock.patch('oslo_versionedobjects.base.VersionedObject.'
+                        'obj_to_primitive') as mock_to_primitive:
+            primitive = obj.obj_to_primitive()
+        mock_to_primitive.assert_not_called()
+        self.assertEqual(1, primitive['nova_object.data']['foo'])
+        # The callers get their own copy of the primitive.
+        primitive['nova_object.data']['rel_object']['nova_object.data'][
+            'baz'] = 42
+        self.assertEqual(1, obj.obj_to_primitive()['nova_object.data'][
+            'rel_object']['nova_object.data']['baz'])
+
+    def _assert_cache_invalidated(self, obj, field, value):
+        self.assertIsNone(obj._get_cached_primitive())
+        primitive = obj.obj_to_primitive()
+        self.assertEqual(value, primitive['nova_object.data'][field])
+        self.assertIsNotNone(obj._get_cached_primitive())
+
+    def test_obj_to_primitive_cache_field_set(self):
+        obj = self._make_cached_obj()
+        obj.bar = 'baz'
+        self._assert_cache_invalidated(obj, 'bar', 'baz')
+        self.assertEqual(['bar'],
+                         obj.obj_to_primitive()['nova_object.changes'])
+
+    def test_obj_to_primitive_cache_reset_changes(self):
+        obj = self._make_cached_obj()
+        obj.bar = 'baz'
+        obj.obj_to_primitive()
+        obj.obj_reset_changes()
+        self.assertIsNone(obj._get_cached_primitive())
+        self.assertNotIn('nova_object.changes', obj.obj_to_primitive())
+
+    def test_obj_to_primitive_cache_list_changed_in_place(self):
+        obj = self._make_cached_obj()
+        obj.mutable_default.append('b')
+        self._assert_cache_invalidated(obj, 'mutable_default', ['a', 'b'])
+
+    def test_obj_to_primitive_cache_child_changed(self):
+        obj = self._make_cached_obj()
+        obj.rel_object.baz = 3
+        self.assertIsNone(obj._get_cached_primitive())
+        primitive = obj.obj_to_primitive()
+        self.assertEqual(3, primitive['nova_object.data']['rel_object'][
+            'nova_object.data']['baz'])
+        self.assertEqual(['rel_object'], primitive['nova_object.changes'])
+
+    def test_obj_to_primitive_cache_list_of_objects_changed(self):
+        obj = self._make_cached_obj()
+        obj.rel_objects.append(MyOwnedObject(baz=3))
+        self.assertIsNone(obj._get_cached_primitive())
+        obj.obj_to_primitive()
+        obj.rel_objects[0].baz = 4
+        self.assertIsNone(obj._get_cached_primitive())
+        primitive = obj.obj_to_primitive()
+        self.assertEqual([4, 3],
+                         [child['nova_object.data']['baz'] for child in
+                          primitive['nova_object.data']['rel_objects']])
+
+    def test_obj_to_primitive_cache_attr_deleted(self):
+        obj = self._make_cached_obj()
+        delattr(obj, 'bar')
+        self.assertIsNone(obj._get_cached_primitive())
+        self.assertNotIn('bar',
+                         obj.obj_to_primitive()['nova_object.data'])
+
+    def test_obj_to_primitive_cache_not_copied(self):
+        obj = self._make_cached_obj()
+        self.assertNotIn('_primitive_cache', obj.obj_clone().__dict__)
+        unpickled = pickle.loads(pickle.dumps(obj))
+        self.assertNotIn('_primitive_cache', unpickled.__dict__)
+        self.assertEqual(obj.obj_to_primitive(),
+                         unpickled.obj_to_primitive())
+
+    def test_obj_to_primitive_older_version_not_cached(self):
+        obj = MyObj(foo=1, bar='bar')
+        obj.obj_to_primitive()
+        primitive = obj.obj_to_primitive(target_version='1.1')
+        self.assertEqual('1.1', primitive['nova_object.version'])
+        self.assertEqual('oldbar', primitive['nova_object.data']['bar'])
+        self.assertEqual('bar',
+                         obj.obj_to_primitive()['nova_object.data']['bar'])
+
 
 class TestObjectSerializer(_BaseTestCase):
     def test_serialize_entity_primitive(self):
@@ -991,6 +1085,98 @@ class TestObjectSerializer(_BaseTestCase):
         thing2 = ser.deserialize_entity(self.context, thing)
         self.assertIsInstance(thing2['foo'], base.NovaObject)
 
+    def test_deserialize_entity_lazy(self):
+        obj = MyObj(foo=1, rel_object=MyOwnedObject(baz=1),
+                    rel_objects=[MyOwnedObject(baz=2)])
+        obj.obj_reset_changes(['rel_objects'])
+        primitive = obj.obj_to_primitive()
+        ser = base.NovaObjectSerializer(lazy=True)
+
+        obj2 = ser.deserialize_entity(self.context, primitive)
+
+        self.assertNotIn('_obj_rel_object', obj2.__dict__)
+        self.assertNotIn('_obj_rel_objects', obj2.__dict__)
+        self.assertTrue(obj2.obj_attr_is_set('rel_object'))
+        self.assertEqual(set(['foo', 'rel_object']), obj2.obj_what_changed())
+        self.assertNotIn('_obj_rel_object', obj2.__dict__)
+        self.assertEqual(1, obj2.foo)
+        self.assertEqual(1, obj2.rel_object.baz)
+        self.assertEqual(self.context, obj2.rel_object._context)
+        self.assertEqual(2, obj2.rel_objects[0].baz)
+        self.assertEqual(primitive, obj2.obj_to_primitive())
+        obj2.obj_reset_changes(recursive=True)
+        obj2.rel_object.baz = 3
+        self.assertEqual(set(['rel_object']), obj2.obj_what_changed())
+
+    def test_deserialize_entity_lazy_hydration_failed(self):
+        primitive = MyObj(rel_object=MyOwnedObject(baz=1)).obj_to_primitive()
+        ser = base.NovaObjectSerializer(lazy=True)
+        obj = ser.deserialize_entity(self.context, primitive)
+
+        with mock.patch.object(MyOwnedObject, '_obj_from_primitive',
+                               side_effect=ValueError):
+            self.assertRaises(ValueError, getattr, obj, 'rel_object')
+        # The primitive is kept to hydrate the field on the next access.
+        self.assertTrue(obj.obj_attr_is_set('rel_object'))
+        self.assertEqual(1, obj.rel_object.baz)
+        self.assertNotIn('_obj_rel_object', obj._lazy_primitives)
+
+    def test_deserialize_entity_lazy_change_tracking(self):
+        # The objects tracking the changes of their dict fields go through
+        # the same steps when they are hydrated lazily.
+        flavor = objects.Flavor(flavorid='1', extra_specs={'foo': 'bar'},
+                                projects=[])
+        inst = objects.Instance(uuid=uuids.instance, metadata={'foo': 'bar'},
+                                system_metadata={'baz': 'qux'})
+        inst.obj_reset_changes()
+        ser = base.NovaObjectSerializer(lazy=True)
+
+        inst2 = ser.deserialize_entity(self.context, inst.obj_to_primitive())
+        self.assertEqual(set(), inst2.obj_what_changed())
+        inst2.metadata['foo'] = 'baz'
+        self.assertEqual(set(['metadata']), inst2.obj_what_changed())
+
+        with mock.patch.object(objects.Flavor, '_obj_from_primitive',
+                               wraps=objects.Flavor._obj_from_primitive
+                               ) as mock_from_primitive:
+            flavor2 = ser.deserialize_entity(self.context,
+                                             flavor.obj_to_primitive())
+        mock_from_primitive.assert_called_once_with(
+            self.context, flavor.VERSION, mock.ANY)
+        flavor3 = base.NovaObjectSerializer().deserialize_entity(
+            self.context, flavor.obj_to_primitive())
+        self.assertEqual(flavor3.obj_what_changed(),
+                         flavor2.obj_what_changed())
+
+    def test_deserialize_entity_lazy_list(self):
+        @base.NovaObjectRegistry.register
+        class MyObjList(base.ObjectListBase, base.NovaObject):
+            VERSION = '1.0'
+            fields = {'objects': fields.ListOfObjectsField('MyObj')}
+
+        objs = MyObjList(objects=[MyObj(rel_object=MyOwnedObject(baz=1))])
+        ser = base.NovaObjectSerializer(lazy=True)
+
+        objs2 = ser.deserialize_entity(self.context, objs.obj_to_primitive())
+
+        self.assertIsInstance(objs2[0], MyObj)
+        self.assertNotIn('_obj_rel_object', objs2[0].__dict__)
+        self.assertEqual(1, objs2[0].rel_object.baz)
+
+    def test_deserialize_entity_lazy_child_newer_version_backports(self):
+        ser = base.NovaObjectSerializer(lazy=True)
+        ser._conductor = mock.Mock()
+        ser._conductor.object_backport_versions.return_value = 'backported'
+        primitive = MyObj(rel_object=MyOwnedObject(baz=1)).obj_to_primitive()
+        primitive['nova_object.data']['rel_object'][
+            'nova_object.version'] = '1.5'
+
+        result = ser.deserialize_entity(self.context, primitive)
+
+        self.assertEqual('backported', result)
+        ser._conductor.object_backport_versions.assert_called_once_with(
+            self.context, primitive, ovo_base.obj_tree_get_versions('MyObj'))
+
 
 class TestArgsSerializer(test.NoDBTestCase):
     def setUp(self):
@@ -1107,7 +1293,7 @@ object_data = {
     'InstanceGroup': '1.10-1a0c8c7447dc7ecb9da53849430c4a5f',
     'InstanceGroupList': '1.8-90f8f1a445552bb3bbc9fa1ae7da27d4',
     'InstanceInfoCache': '1.5-cd8b96fefe0fc8d4d337243ba0bf0e1e',
-    'InstanceList': '2.4-d2c5723da8c1d08e07cb00160edfd292',
+    'InstanceList': '2.5-74b3fa31dc4a6a3cd331870139058600',
     'InstanceMapping': '1.0-65de80c491f54d19374703c0753c4d47',
     'InstanceMappingList': '1.2-ee638619aa3d8a82a59c0c83bfa64d78',
     'InstanceNUMACell': '1.4-7c1eb9a198dee076b4de0840e45f4f55',
@@ -1152,7 +1338,7 @@ object_data = {
     'SecurityGroupRule': '1.1-ae1da17b79970012e8536f88cb3c6b29',
     'SecurityGroupRuleList': '1.2-0005c47fcd0fb78dd6d7fd32a1409f5b',
     'Selection': '1.0-7f5c065097371fe527dd1245f1530653',
-    'Service': '1.22-8a740459ab9bf258a19c8fcb875c2d9a',
+    'Service': '1.23-c2cb7650e573568fcf975cb330b87212',
     'ServiceList': '1.19-5325bce13eebcbf22edc9678285270cc',
     'TaskLog': '1.0-78b0534366f29aa3eebb01860fbe18fe',
     'TaskLogList': '1.0-cc8cce1af8a283b9d28b55fcd682e777',
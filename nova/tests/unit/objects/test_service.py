@@ -170,6 +170,14 @@ class _TestServiceObject(object):
             self.context, 123, {'host': 'fake-host',
                                 'version': fake_service['version']})
 
+    @mock.patch('nova.servicegroup.heartbeat.report')
+    def test_report_heartbeat(self, mock_report):
+        service_obj = service.Service(context=self.context)
+        service_obj.id = 123
+        service_obj.report_heartbeat()
+        mock_report.assert_called_once_with(
+            test.MatchType(context.RequestContext), 123)
+
     @mock.patch.object(db, 'service_create',
                        return_value=fake_service)
     def test_set_id_failure(self, db_mock):
@@ -101,6 +101,24 @@ class _TestTagList(object):
                                         RESOURCE_ID, [TAG_NAME1, TAG_NAME2])
         self._compare_tag_list(fake_tag_list, tag_list_obj)
 
+    @mock.patch('nova.db.instance_tag_add_bulk')
+    def test_create_bulk(self, tag_add_bulk):
+        resource_id2 = '456'
+        fake_tag3 = {'resource_id': resource_id2, 'tag': TAG_NAME1}
+        tag_add_bulk.return_value = fake_tag_list + [fake_tag3]
+
+        tags_by_resource = tag.TagList.create_bulk(
+            self.context, [RESOURCE_ID, resource_id2, '789'], [TAG_NAME1])
+
+        tag_add_bulk.assert_called_once_with(
+            self.context, [RESOURCE_ID, resource_id2, '789'], [TAG_NAME1])
+        self.assertEqual(set([RESOURCE_ID, resource_id2, '789']),
+                         set(tags_by_resource))
+        self._compare_tag_list(fake_tag_list, tags_by_resource[RESOURCE_ID])
+        self._compare_tag_list([fake_tag3], tags_by_resource[resource_id2])
+        self.assertIsInstance(tags_by_resource['789'], tag.TagList)
+        self.assertEqual(0, len(tags_by_resource['789']))
+
     @mock.patch('nova.db.instance_tag_delete_all')
     def test_destroy(self, tag_delete_all):
         tag.TagList.destroy(self.context, RESOURCE_ID)
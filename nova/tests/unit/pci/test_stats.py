@@ -173,6 +173,48 @@ class PciDeviceStatsTestCase(test.NoDBTestCase):
         self.assertEqual(set([d['count'] for d in self.pci_stats]),
                          set([1, 2]))
 
+    def test_support_requests_same_pool(self):
+        # The two devices of the 'v1' pool are counted once.
+        requests = self._get_fake_requests(vendor_ids=['v1', 'v1'])
+        self.assertTrue(self.pci_stats.support_requests(requests))
+        requests = self._get_fake_requests(vendor_ids=['v1', 'v1', 'v1'])
+        self.assertFalse(self.pci_stats.support_requests(requests))
+        self.assertEqual(2, self.pci_stats.pools[0]['count'])
+
+    def test_filter_pools_for_spec_indexed(self):
+        spec = [{'vendor_id': 'v1', 'product_id': 'p1'},
+                {'vendor_id': 'v2', 'product_id': 'p2', 'numa_node': 1},
+                {'vendor_id': 'v3', 'product_id': 'p3', 'numa_node': 0}]
+        with mock.patch('nova.pci.utils.pci_device_prop_matcher',
+                        return_value=mock.Mock(return_value=True)) as m:
+            pools = self.pci_stats._filter_pools_for_spec(spec)
+        self.assertEqual(self.pci_stats.pools, pools)
+        # Only the pools with the vendor and product IDs of the specs are
+        # matched against them.
+        self.assertEqual(3, m.return_value.call_count)
+
+        self.assertEqual(
+            ['v1', 'v2'],
+            sorted(pool['vendor_id'] for pool in
+                   self.pci_stats._filter_pools_for_spec(spec[:2])))
+        self.assertEqual([], self.pci_stats._filter_pools_for_spec(
+            [{'vendor_id': 'v1', 'product_id': 'p2'}]))
+
+    def test_filter_pools_for_spec_not_indexed(self):
+        pools = self.pci_stats._filter_pools_for_spec([{'vendor_id': 'v2'}])
+        self.assertEqual(['v2'], [pool['vendor_id'] for pool in pools])
+        # A product_id list is never equal to the product_id of a pool.
+        self.assertEqual([], self.pci_stats._filter_pools_for_spec(
+            [{'vendor_id': 'v1', 'product_id': ['p1']}]))
+
+    def test_filter_pools_for_spec_index_updated(self):
+        spec = [{'vendor_id': 'v2', 'product_id': 'p2'}]
+        self.assertEqual(1, len(self.pci_stats._filter_pools_for_spec(spec)))
+        self.pci_stats.remove_device(self.fake_dev_2)
+        self.assertEqual([], self.pci_stats._filter_pools_for_spec(spec))
+        self.pci_stats.add_device(self.fake_dev_2)
+        self.assertEqual(1, len(self.pci_stats._filter_pools_for_spec(spec)))
+
     def test_support_requests_numa(self):
         cells = [objects.InstanceNUMACell(id=0, cpuset=set(), memory=0),
                  objects.InstanceNUMACell(id=1, cpuset=set(), memory=0)]
@@ -72,6 +72,16 @@ class PciDeviceMatchTestCase(test.NoDBTestCase):
         self.assertFalse(utils.pci_device_prop_match(
             self.fake_pci_1, [{'vendor_id': 'v1', 'device_id': ['d1']}]))
 
+    def test_matcher(self):
+        match = utils.pci_device_prop_matcher(
+            [{'vendor_id': 'v4', 'device_id': 'd4'},
+             {'vendor_id': 'v1', 'capabilities_network': ['cap3', 'cap1']}])
+        self.assertTrue(match(self.fake_pci_1))
+        self.assertFalse(match(dict(self.fake_pci_1, vendor_id='v2')))
+        self.assertFalse(match(dict(self.fake_pci_1,
+                                    capabilities_network=['cap1'])))
+        self.assertTrue(match({'vendor_id': 'v4', 'device_id': 'd4'}))
+
 
 class PciDeviceAddressParserTestCase(test.NoDBTestCase):
     def test_parse_address(self):
@@ -3417,3 +3417,52 @@ class TestResourceClass(SchedulerReportClientTestCase):
         self.mock_put.assert_called_once_with(
             '/resource_classes/CUSTOM_BAD', None, version='1.7',
             global_request_id=self.context.global_id)
+
+
+class TestUsages(SchedulerReportClientTestCase):
+
+    @mock.patch('nova.scheduler.client.report.SchedulerReportClient.get')
+    def test_get_usages_counts_for_quota(self, mock_get):
+        project_resp = mock.Mock(status_code=200)
+        project_resp.json.return_value = {
+            'usages': {fields.ResourceClass.VCPU: 2,
+                       fields.ResourceClass.MEMORY_MB: 512,
+                       fields.ResourceClass.DISK_GB: 10}}
+        user_resp = mock.Mock(status_code=200)
+        user_resp.json.return_value = {
+            'usages': {fields.ResourceClass.VCPU: 1,
+                       fields.ResourceClass.MEMORY_MB: 256}}
+        mock_get.side_effect = [project_resp, user_resp]
+        counts = self.client.get_usages_counts_for_quota(
+            self.context, 'fake-project', user_id='fake-user')
+        expected = {'project': {'cores': 2, 'ram': 512},
+                    'user': {'cores': 1, 'ram': 256}}
+        self.assertEqual(expected, counts)
+        mock_get.assert_has_calls([
+            mock.call('/usages?project_id=fake-project', version='1.9',
+                      global_request_id=self.context.global_id),
+            mock.call('/usages?project_id=fake-project&user_id=fake-user',
+                      version='1.9',
+                      global_request_id=self.context.global_id)])
+
+    @mock.patch('nova.scheduler.client.report.SchedulerReportClient.get')
+    def test_get_usages_counts_for_quota_no_usages(self, mock_get):
+        mock_get.return_value.json.return_value = {'usages': {}}
+        counts = self.client.get_usages_counts_for_quota(
+            self.context, 'fake-project')
+        self.assertEqual({'project': {'cores': 0, 'ram': 0}}, counts)
+        mock_get.assert_called_once_with(
+            '/usages?project_id=fake-project', version='1.9',
+            global_request_id=self.context.global_id)
+
+    @mock.patch('nova.scheduler.client.report.SchedulerReportClient.get')
+    def test_get_usages_counts_for_quota_fail(self, mock_get):
+        resp = requests.Response()
+        resp.status_code = 500
+        mock_get.return_value = resp
+        self.assertRaises(exception.UsagesRetrievalFailed,
+                          self.client.get_usages_counts_for_quota,
+                          self.context, 'fake-project', user_id='fake-user')
+        mock_get.assert_called_once_with(
+            '/usages?project_id=fake-project', version='1.9',
+            global_request_id=self.context.global_id)
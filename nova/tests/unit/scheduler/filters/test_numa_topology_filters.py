@@ -50,6 +50,44 @@ class TestNUMATopologyFilter(test.NoDBTestCase):
                                     'ram_allocation_ratio': 1.5})
         self.assertTrue(self.filt_cls.host_passes(host, spec_obj))
 
+    @mock.patch('nova.virt.hardware.numa_fit_instance_to_host')
+    def test_numa_topology_filter_all_same_fingerprint(self, mock_fit):
+        instance_topology = objects.InstanceNUMATopology(
+            cells=[objects.InstanceNUMACell(id=0, cpuset=set([1]), memory=512)
+               ])
+        spec_obj = self._get_spec_obj(numa_topology=instance_topology)
+        hosts = [fakes.FakeHostState('host%d' % i, 'node%d' % i,
+                                     {'numa_topology': fakes.NUMA_TOPOLOGY,
+                                      'pci_stats': None,
+                                      'cpu_allocation_ratio': 16.0,
+                                      'ram_allocation_ratio': 1.5})
+                 for i in range(3)]
+        # The last host has a different NUMA topology state.
+        hosts[2].cpu_allocation_ratio = 2.0
+
+        self.assertEqual(hosts, list(self.filt_cls.filter_all(hosts,
+                                                              spec_obj)))
+        self.assertEqual(2, mock_fit.call_count)
+        for host in hosts:
+            self.assertEqual(host.cpu_allocation_ratio,
+                             host.limits['numa_topology'].cpu_allocation_ratio)
+
+    @mock.patch('nova.scheduler.host_manager.HostState.numa_pci_fingerprint',
+                new_callable=mock.PropertyMock)
+    def test_numa_topology_filter_all_no_numa_instance(self,
+                                                       mock_fingerprint):
+        spec_obj = self._get_spec_obj(numa_topology=None)
+        hosts = [fakes.FakeHostState('host%d' % i, 'node%d' % i,
+                                     {'numa_topology': fakes.NUMA_TOPOLOGY,
+                                      'pci_stats': None,
+                                      'cpu_allocation_ratio': 16.0,
+                                      'ram_allocation_ratio': 1.5})
+                 for i in range(2)]
+
+        self.assertEqual(hosts, list(self.filt_cls.filter_all(hosts,
+                                                              spec_obj)))
+        self.assertFalse(mock_fingerprint.called)
+
     def test_numa_topology_filter_numa_instance_no_numa_host_fail(self):
         instance_topology = objects.InstanceNUMATopology(
             cells=[objects.InstanceNUMACell(id=0, cpuset=set([1]), memory=512),
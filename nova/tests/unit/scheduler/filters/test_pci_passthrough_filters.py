@@ -39,6 +39,34 @@ class TestPCIPassthroughFilter(test.NoDBTestCase):
         pci_stats_mock.support_requests.assert_called_once_with(
             requests.requests)
 
+    def test_pci_passthrough_filter_all_same_fingerprint(self):
+        request = objects.InstancePCIRequest(count=1,
+            spec=[{'vendor_id': '8086'}])
+        requests = objects.InstancePCIRequests(requests=[request])
+        spec_obj = objects.RequestSpec(pci_requests=requests)
+        hosts = [fakes.FakeHostState(
+                     'host%d' % i, 'node%d' % i,
+                     attribute_dict={'pci_stats': stats.PciDeviceStats()})
+                 for i in range(3)]
+        with mock.patch.object(stats.PciDeviceStats, 'support_requests',
+                               return_value=True) as mock_support:
+            self.assertEqual(hosts, list(self.filt_cls.filter_all(hosts,
+                                                                  spec_obj)))
+        mock_support.assert_called_once_with(requests.requests)
+
+    @mock.patch('nova.scheduler.host_manager.HostState.numa_pci_fingerprint',
+                new_callable=mock.PropertyMock)
+    def test_pci_passthrough_filter_all_no_pci_request(self,
+                                                       mock_fingerprint):
+        spec_obj = objects.RequestSpec(pci_requests=None)
+        hosts = [fakes.FakeHostState(
+                     'host%d' % i, 'node%d' % i,
+                     attribute_dict={'pci_stats': None})
+                 for i in range(2)]
+        self.assertEqual(hosts, list(self.filt_cls.filter_all(hosts,
+                                                              spec_obj)))
+        self.assertFalse(mock_fingerprint.called)
+
     def test_pci_passthrough_fail(self):
         pci_stats_mock = mock.MagicMock()
         pci_stats_mock.support_requests.return_value = False
@@ -1323,6 +1323,38 @@ class HostStateTestCase(test.NoDBTestCase):
         self.assertEqual(0, len(host.pci_stats.pools))
         self.assertIsNotNone(host.updated)
 
+    def test_numa_pci_fingerprint(self):
+        inst_topology = objects.InstanceNUMATopology(
+                            cells = [objects.InstanceNUMACell(
+                                                      cpuset=set([0]),
+                                                      memory=512, id=0)])
+        req_spec = objects.RequestSpec(
+            instance_uuid=uuids.instance,
+            project_id='12345',
+            numa_topology=inst_topology,
+            pci_requests=None,
+            flavor=objects.Flavor(root_gb=0,
+                                  ephemeral_gb=0,
+                                  memory_mb=512,
+                                  vcpus=1))
+        hosts = []
+        for i in range(2):
+            host = host_manager.HostState("fakehost%d" % i, "fakenode",
+                                          uuids.cell)
+            host.pci_stats = pci_stats.PciDeviceStats(
+                                      [objects.PciDevicePool(vendor_id='8086',
+                                                             product_id='15ed',
+                                                             numa_node=1,
+                                                             count=1)])
+            host.numa_topology = fakes.NUMA_TOPOLOGY
+            hosts.append(host)
+        fingerprint = hosts[0].numa_pci_fingerprint
+        self.assertEqual(fingerprint, hosts[1].numa_pci_fingerprint)
+
+        hosts[0].consume_from_request(req_spec)
+        self.assertNotEqual(fingerprint, hosts[0].numa_pci_fingerprint)
+        self.assertEqual(fingerprint, hosts[1].numa_pci_fingerprint)
+
     def test_stat_consumption_from_instance_with_pci_exception(self):
         fake_requests = [{'request_id': uuids.request_id, 'count': 3,
                           'spec': [{'vendor_id': '8086'}]}]
@@ -61,6 +61,26 @@ class ServiceGroupApiTestCase(test.NoDBTestCase):
         self.assertIs(result, False)
         driver.is_up.assert_not_called()
 
+    def test_services_are_up(self):
+        members = [{"host": "host1", "topic": "compute",
+                    "forced_down": False},
+                   {"host": "host2", "topic": "compute",
+                    "forced_down": True},
+                   {"host": "host3", "topic": "compute",
+                    "forced_down": False}]
+
+        driver = self.servicegroup_api._driver
+        driver.are_up = mock.MagicMock(return_value=[False, True])
+        result = self.servicegroup_api.services_are_up(members)
+
+        self.assertEqual([False, False, True], result)
+        driver.are_up.assert_called_once_with([members[0], members[2]])
+
+        driver.are_up.reset_mock()
+        result = self.servicegroup_api.services_are_up(members[1:2])
+        self.assertEqual([False], result)
+        driver.are_up.assert_not_called()
+
     def test_get_updated_time(self):
         member = {"host": "fake-host",
                   "topic": "compute",
@@ -12,6 +12,8 @@
 #    License for the specific language governing permissions and limitations
 #    under the License.
 
+import datetime
+
 import mock
 import oslo_messaging as messaging
 from oslo_utils import fixture as utils_fixture
@@ -71,6 +73,32 @@ class DBServiceGroupTestCase(test.NoDBTestCase):
         result = self.servicegroup_api.service_is_up(service)
         self.assertTrue(result)
 
+    def test_are_up(self):
+        now = timeutils.utcnow()
+        time_fixture = self.useFixture(utils_fixture.TimeFixture(now))
+        services = [
+            objects.Service(host='host1', topic='compute',
+                            binary='nova-compute', created_at=now,
+                            last_seen_up=now, forced_down=False),
+            objects.Service(host='host2', topic='compute',
+                            binary='nova-compute', created_at=now,
+                            last_seen_up=None, forced_down=False),
+            objects.Service(host='host3', topic='compute',
+                            binary='nova-compute', created_at=now,
+                            last_seen_up=now, forced_down=True)]
+
+        result = self.servicegroup_api.services_are_up(services)
+        self.assertEqual([True, True, False], result)
+
+        services[1].created_at = now - datetime.timedelta(
+            seconds=self.down_time + 1)
+        result = self.servicegroup_api.services_are_up(services)
+        self.assertEqual([True, False, False], result)
+
+        time_fixture.advance_time_seconds(self.down_time + 1)
+        result = self.servicegroup_api.services_are_up(services)
+        self.assertEqual([False, False, False], result)
+
     def test_join(self):
         service = mock.MagicMock(report_interval=1)
 
@@ -90,6 +118,37 @@ class DBServiceGroupTestCase(test.NoDBTestCase):
         self.assertEqual(11, service_ref.report_count)
         self.assertFalse(service.model_disconnected)
 
+    @mock.patch.object(objects.Service, 'report_heartbeat')
+    @mock.patch.object(objects.Service, 'save')
+    def test_report_state_batched(self, upd_mock, report_mock):
+        self.flags(heartbeat_batch_interval=5)
+        service_ref = objects.Service(host='fake-host', topic='compute',
+                                      report_count=10)
+        service = mock.MagicMock(model_disconnected=False,
+                                 service_ref=service_ref)
+        fn = self.servicegroup_api._driver._report_state
+        fn(service)
+        report_mock.assert_called_once_with()
+        upd_mock.assert_not_called()
+        self.assertFalse(service.model_disconnected)
+
+    @mock.patch('nova.servicegroup.heartbeat.last_seen')
+    def test_is_up_aggregated_heartbeat(self, mock_last_seen):
+        now = timeutils.utcnow()
+        self.useFixture(utils_fixture.TimeFixture(now))
+        service = objects.Service(
+            id=1, host='fake-host', topic='compute', binary='nova-compute',
+            created_at=now, forced_down=False,
+            last_seen_up=now - datetime.timedelta(seconds=self.down_time + 1))
+
+        # The state report was received but not written to the database yet.
+        mock_last_seen.return_value = now
+        self.assertTrue(self.servicegroup_api.service_is_up(service))
+        mock_last_seen.assert_called_once_with(1)
+
+        mock_last_seen.return_value = None
+        self.assertFalse(self.servicegroup_api.service_is_up(service))
+
     @mock.patch.object(objects.Service, 'save')
     def _test_report_state_error(self, exc_cls, upd_mock):
         upd_mock.side_effect = exc_cls("service save failed")
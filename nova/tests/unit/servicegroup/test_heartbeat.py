@@ -0,0 +1,78 @@
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+import mock
+from oslo_utils import fixture as utils_fixture
+from oslo_utils import timeutils
+
+from nova import db
+from nova.servicegroup import heartbeat
+from nova import test
+
+
+class HeartbeatTestCase(test.NoDBTestCase):
+    def setUp(self):
+        super(HeartbeatTestCase, self).setUp()
+        self.time_fixture = self.useFixture(utils_fixture.TimeFixture())
+        self.report_heartbeats = mock.patch.object(
+            db, 'service_report_heartbeats').start()
+        self.addCleanup(mock.patch.stopall)
+        self.addCleanup(heartbeat.reset)
+
+    def test_report_not_aggregated(self):
+        heartbeat.report(mock.sentinel.context, 1)
+
+        self.report_heartbeats.assert_called_once_with(
+            mock.sentinel.context, [1], timeutils.utcnow())
+        self.assertIsNone(heartbeat.AGGREGATOR)
+        self.assertIsNone(heartbeat.last_seen(1))
+
+    @mock.patch('nova.utils.spawn_n')
+    def test_report_aggregated(self, mock_spawn):
+        self.flags(heartbeat_batch_interval=5)
+        first_report = timeutils.utcnow()
+
+        heartbeat.report(mock.sentinel.context, 1)
+        self.time_fixture.advance_time_seconds(2)
+        heartbeat.report(mock.sentinel.context, 2)
+        heartbeat.report(mock.sentinel.context, 1)
+
+        self.report_heartbeats.assert_not_called()
+        mock_spawn.assert_called_once_with(heartbeat.AGGREGATOR._run)
+        self.assertEqual(timeutils.utcnow(), heartbeat.last_seen(1))
+
+        heartbeat.AGGREGATOR.flush()
+
+        self.report_heartbeats.assert_called_once_with(
+            mock.ANY, mock.ANY, first_report)
+        self.assertEqual([1, 2],
+                         sorted(self.report_heartbeats.call_args[0][1]))
+        # The reports are only written once.
+        heartbeat.AGGREGATOR.flush()
+        self.assertEqual(1, self.report_heartbeats.call_count)
+        self.assertEqual(timeutils.utcnow(), heartbeat.last_seen(1))
+
+    @mock.patch('nova.utils.spawn_n')
+    def test_flush_failed(self, mock_spawn):
+        aggregator = heartbeat.HeartbeatAggregator(5)
+        aggregator.record(1)
+        first_report = timeutils.utcnow()
+        self.report_heartbeats.side_effect = [test.TestingException, None]
+
+        self.assertRaises(test.TestingException, aggregator.flush)
+        self.time_fixture.advance_time_seconds(2)
+        aggregator.record(1)
+        aggregator.flush()
+
+        # The failed reports are written with the next ones.
+        self.report_heartbeats.assert_called_with(mock.ANY, [1], first_report)
+        self.assertEqual(2, self.report_heartbeats.call_count)
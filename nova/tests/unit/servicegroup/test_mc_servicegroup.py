@@ -47,6 +47,17 @@ class MemcachedServiceGroupTestCase(test.NoDBTestCase):
         self.assertTrue(self.servicegroup_api.service_is_up(service_ref))
         self.mc_client.get.assert_called_once_with('compute:fake-host')
 
+    def test_are_up(self):
+        service_refs = [{'host': 'host1', 'topic': 'compute'},
+                        {'host': 'host2', 'topic': 'compute'}]
+        self.mc_client.get_multi.return_value = [True, None]
+
+        self.assertEqual([True, False],
+                         self.servicegroup_api.services_are_up(service_refs))
+        self.mc_client.get_multi.assert_called_once_with(
+            ['compute:host1', 'compute:host2'])
+        self.mc_client.get.assert_not_called()
+
     def test_join(self):
         service = mock.MagicMock(report_interval=1)
 
@@ -12,9 +12,13 @@
 #    License for the specific language governing permissions and limitations
 #    under the License.
 
+import contextlib
+
+import eventlet
 import mock
 from oslo_context import context as o_context
 from oslo_context import fixture as o_fixture
+from oslo_utils import timeutils
 
 from nova import context
 from nova import exception
@@ -362,37 +366,133 @@ class ContextTestCase(test.NoDBTestCase):
                           mock.call.target_cell().__exit__(None, None, None)]
         manager.assert_has_calls(expected_calls)
 
-    @mock.patch('nova.context.LOG.warning')
-    @mock.patch('eventlet.timeout.Timeout')
-    @mock.patch('eventlet.queue.LightQueue.get')
-    @mock.patch('nova.objects.InstanceList.get_by_filters')
-    def test_scatter_gather_cells_timeout(self, mock_get_inst,
-                                          mock_get_result, mock_timeout,
-                                          mock_log_warning):
-        # This is needed because we're mocking get_by_filters.
-        self.useFixture(nova_fixtures.SpawnIsSynchronousFixture())
-        ctxt = context.get_context()
+    def _fake_target_cell_by_uuid(self):
+        @contextlib.contextmanager
+        def fake_target_cell(ctxt, cell_mapping):
+            # Pass the uuid of the targeted cell as the context.
+            yield cell_mapping.uuid
+        return mock.patch('nova.context.target_cell', fake_target_cell)
+
+    def _get_two_cell_mappings(self):
         mapping0 = objects.CellMapping(database_connection='fake://db0',
                                        transport_url='none:///',
                                        uuid=objects.CellMapping.CELL0_UUID)
         mapping1 = objects.CellMapping(database_connection='fake://db1',
                                        transport_url='fake://mq1',
                                        uuid=uuids.cell1)
-        mappings = objects.CellMappingList(objects=[mapping0, mapping1])
+        return objects.CellMappingList(objects=[mapping0, mapping1])
+
+    @mock.patch('nova.context.LOG.warning')
+    def test_scatter_gather_cells_timeout(self, mock_log_warning):
+        ctxt = context.get_context()
+        mappings = self._get_two_cell_mappings()
 
         # Simulate cell1 not responding.
-        mock_get_result.side_effect = [(mapping0.uuid,
-                                        mock.sentinel.instances),
-                                       exception.CellTimeout()]
+        def fake_get(cell_uuid):
+            if cell_uuid == uuids.cell1:
+                eventlet.sleep(30)
+            return mock.sentinel.instances
+
+        with self._fake_target_cell_by_uuid():
+            results = context.scatter_gather_cells(ctxt, mappings, 0.1,
+                                                   fake_get)
+        self.assertEqual({objects.CellMapping.CELL0_UUID:
+                              mock.sentinel.instances,
+                          uuids.cell1: context.did_not_respond_sentinel},
+                         results)
+        mock_log_warning.assert_called_once_with(
+            'Timed out waiting for response from cell %s', uuids.cell1)
+        # The time waited for cell1 is recorded in its latency stats.
+        self.assertEqual(1, len(context.CELL_LATENCY_STATS[uuids.cell1]))
+        self.assertGreaterEqual(
+            context.CELL_LATENCY_STATS[uuids.cell1].percentile(95), 0.1)
 
-        results = context.scatter_gather_cells(
-            ctxt, mappings, 30, objects.InstanceList.get_by_filters)
-        self.assertEqual(2, len(results))
-        self.assertIn(mock.sentinel.instances, results.values())
-        self.assertIn(context.did_not_respond_sentinel, results.values())
-        mock_timeout.assert_called_once_with(30, exception.CellTimeout)
+    @mock.patch('nova.context.LOG.warning')
+    @mock.patch('nova.objects.CellMappingList.get_all')
+    def test_scatter_gather_all_cells_partial(self, mock_get_all,
+                                              mock_log_warning):
+        self.flags(cell_partial_results_timeout=0.1, group='api')
+        ctxt = context.get_context()
+        mock_get_all.return_value = self._get_two_cell_mappings()
+
+        def fake_get(cell_uuid):
+            if cell_uuid == uuids.cell1:
+                eventlet.sleep(30)
+            return mock.sentinel.instances
+
+        with self._fake_target_cell_by_uuid():
+            watch = timeutils.StopWatch()
+            watch.start()
+            results = context.scatter_gather_all_cells_partial(ctxt,
+                                                               fake_get)
+        self.assertLess(watch.elapsed(), 30)
+        self.assertEqual({objects.CellMapping.CELL0_UUID:
+                              mock.sentinel.instances,
+                          uuids.cell1: context.did_not_respond_sentinel},
+                         results)
         self.assertTrue(mock_log_warning.called)
 
+    def test_scatter_gather_cells_no_partial_results(self):
+        # The other callers, like the quota usage counting, wait for every
+        # cell.
+        self.flags(cell_partial_results_timeout=0.1, group='api')
+        ctxt = context.get_context()
+        mappings = self._get_two_cell_mappings()
+
+        def fake_get(cell_uuid):
+            if cell_uuid == uuids.cell1:
+                eventlet.sleep(0.3)
+            return mock.sentinel.instances
+
+        with self._fake_target_cell_by_uuid():
+            results = context.scatter_gather_cells(ctxt, mappings, 30,
+                                                   fake_get)
+        self.assertEqual({objects.CellMapping.CELL0_UUID:
+                              mock.sentinel.instances,
+                          uuids.cell1: mock.sentinel.instances},
+                         results)
+
+    @mock.patch('nova.db.sqlalchemy.api.get_context_manager')
+    def test_scatter_gather_cells_hedged(self, mock_get_ctxt_mgr):
+        self.flags(cell_hedge_latency_factor=2, group='api')
+        ctxt = context.get_context()
+        mappings = self._get_two_cell_mappings()
+        # cell1 usually responds in 10ms, but not this time.
+        stats = context.CellLatencyStats()
+        for x in range(context.CELL_LATENCY_MIN_SAMPLES):
+            stats.add(0.01)
+        context.CELL_LATENCY_STATS[uuids.cell1] = stats
+        calls = []
+
+        def fake_get(cell_uuid):
+            calls.append(cell_uuid)
+            if cell_uuid == uuids.cell1 and calls.count(cell_uuid) == 1:
+                eventlet.sleep(30)
+                return mock.sentinel.slow_instances
+            return mock.sentinel.instances
+
+        with self._fake_target_cell_by_uuid():
+            results = context.scatter_gather_cells(ctxt, mappings, 30,
+                                                   fake_get)
+        self.assertEqual({objects.CellMapping.CELL0_UUID:
+                              mock.sentinel.instances,
+                          uuids.cell1: mock.sentinel.instances},
+                         results)
+        self.assertEqual(2, calls.count(uuids.cell1))
+        # The hedged query ran in the asynchronous reader mode of cell1.
+        mock_get_ctxt_mgr.assert_called_once_with(uuids.cell1)
+
+    def test_cell_latency_stats(self):
+        stats = context.CellLatencyStats(size=4)
+        self.assertIsNone(stats.percentile(95))
+        for elapsed in (5, 1, 2, 3, 4):
+            stats.add(elapsed)
+        # Only the most recent samples are kept.
+        self.assertEqual(4, len(stats))
+        self.assertEqual(1, stats.percentile(1))
+        self.assertEqual(2, stats.percentile(50))
+        self.assertEqual(4, stats.percentile(95))
+
     @mock.patch('nova.context.LOG.exception')
     @mock.patch('nova.objects.InstanceList.get_by_filters')
     def test_scatter_gather_cells_exception(self, mock_get_inst,
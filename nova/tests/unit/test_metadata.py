@@ -1384,6 +1384,70 @@ class MetadataHandlerTestCase(test.TestCase):
         self._metadata_handler_with_remote_address(hnd)
         self.assertEqual(2, get_by_uuid.call_count)
 
+    def test_etag(self):
+        response = fake_request(self, self.mdinst, "/2009-04-04/user-data")
+        self.assertEqual(200, response.status_int)
+        self.assertEqual(hashlib.sha256(response.body).hexdigest(),
+                         response.etag)
+
+        response = fake_request(self, self.mdinst, "/2009-04-04/user-data",
+                                headers={'If-None-Match': response.etag})
+        self.assertEqual(304, response.status_int)
+        self.assertEqual(b'', response.body)
+
+    @mock.patch.object(base, 'get_metadata_by_address')
+    def test_metadata_handler_response_cache(self, mock_get_md):
+        self.flags(metadata_response_cache=True, group='api')
+        mock_get_md.return_value = self.mdinst
+        hnd = handler.MetadataRequestHandler()
+        with mock.patch.object(self.mdinst, 'lookup',
+                               wraps=self.mdinst.lookup) as mock_lookup:
+            for x in range(2):
+                response = fake_request(
+                    None, self.mdinst, "/openstack/latest/meta_data.json",
+                    app=hnd)
+                self.assertEqual(200, response.status_int)
+                self.assertTrue(response.headers['Content-Type'].startswith(
+                    'application/json'))
+            mock_lookup.assert_called_once_with(
+                "/openstack/latest/meta_data.json")
+
+            # A change of the instance data changes the fingerprint of the
+            # metadata and the cached responses are not used anymore.
+            self.mdinst.fingerprint = 'new-fingerprint'
+            fake_request(None, self.mdinst, "/openstack/latest/meta_data.json",
+                         app=hnd)
+            self.assertEqual(2, mock_lookup.call_count)
+
+    @mock.patch.object(base, 'get_metadata_by_address')
+    def test_metadata_handler_response_cache_precompute(self, mock_get_md):
+        self.flags(metadata_response_cache=True,
+                   metadata_response_precompute=[
+                       'openstack/latest/meta_data.json',
+                       'openstack/latest/not_found.json'],
+                   group='api')
+        mock_get_md.return_value = self.mdinst
+        hnd = handler.MetadataRequestHandler()
+        with mock.patch.object(self.mdinst, 'lookup',
+                               wraps=self.mdinst.lookup) as mock_lookup:
+            response = fake_request(
+                None, self.mdinst, "/openstack/latest/meta_data.json",
+                app=hnd)
+            self.assertEqual(200, response.status_int)
+            mock_lookup.assert_has_calls([
+                mock.call('openstack/latest/meta_data.json'),
+                mock.call('openstack/latest/not_found.json')])
+            self.assertEqual(2, mock_lookup.call_count)
+
+    def test_password_not_cached(self):
+        self.flags(metadata_response_cache=True, group='api')
+        hnd = handler.MetadataRequestHandler()
+        with mock.patch.object(hnd._cache, 'set') as mock_set:
+            response = fake_request(self, self.mdinst,
+                                    "/openstack/latest/password", app=hnd)
+        self.assertEqual(200, response.status_int)
+        mock_set.assert_not_called()
+
     @mock.patch.object(neutronapi, 'get_client', return_value=mock.Mock())
     def test_metadata_lb_proxy(self, mock_get_client):
 
@@ -1532,6 +1596,73 @@ class MetadataHandlerTestCase(test.TestCase):
             'CONTEXT', 'foo')
         gmd.assert_called_once_with(fixed_ip.instance_uuid, 'foo', 'CONTEXT')
 
+    @staticmethod
+    def _fake_indexed_metadata(address, network_id='f-f-f-f'):
+        subnet = network_model.Subnet(
+            cidr='192.192.192.0/24',
+            ips=[network_model.FixedIP(address=address)])
+        vif = network_model.VIF(
+            network=network_model.Network(id=network_id, subnets=[subnet]))
+        meta_data = mock.Mock()
+        meta_data.instance.info_cache.network_info = (
+            network_model.NetworkInfo([vif]))
+        return meta_data
+
+    @mock.patch.object(context, 'get_admin_context')
+    @mock.patch('nova.network.API')
+    @mock.patch('nova.network.address_index.get_instance_uuid',
+                return_value=uuids.other_instance)
+    def test_get_metadata_by_address_not_indexed(self, mock_index,
+                                                 mock_net_api,
+                                                 mock_get_context):
+        # The network of the requester is not known so the index, where the
+        # address can belong to the instance of another tenant, is not used.
+        self.flags(metadata_address_index=True, group='api')
+        mock_get_context.return_value = 'CONTEXT'
+        api = mock_net_api.return_value
+        api.get_fixed_ip_by_address.return_value = objects.FixedIP(
+            instance_uuid=uuids.instance)
+
+        with mock.patch.object(base, 'get_metadata_by_instance_id') as gmd:
+            base.get_metadata_by_address('192.192.192.2')
+
+        mock_index.assert_not_called()
+        gmd.assert_called_once_with(uuids.instance, '192.192.192.2',
+                                    'CONTEXT')
+
+    @mock.patch.object(neutronapi, 'get_client', return_value=mock.Mock())
+    @mock.patch('nova.network.address_index.get_instance_uuid',
+                return_value=uuids.instance)
+    def test_metadata_lb_proxy_indexed(self, mock_index, mock_get_client):
+        self.flags(service_metadata_proxy=True, group='neutron')
+        self.flags(metadata_address_index=True, group='api')
+        mock_client = mock_get_client()
+        mock_client.list_subnets.return_value = {
+            'subnets': [{'network_id': 'f-f-f-f'}]}
+        meta_data = self._fake_indexed_metadata('192.192.192.2')
+        meta_data.lookup.return_value = 'user-data'
+        meta_data.get_mimetype.return_value = 'text/plain'
+        hnd = handler.MetadataRequestHandler()
+
+        with mock.patch.object(hnd, 'get_metadata_by_instance_id',
+                               return_value=meta_data) as gmd:
+            for x in range(2):
+                response = fake_request(
+                    None, self.mdinst, relpath="/2009-04-04/user-data",
+                    address="192.192.192.2", app=hnd,
+                    headers={'X-Forwarded-For': '192.192.192.2',
+                             'X-Metadata-Provider': 'edge-x'})
+                self.assertEqual(200, response.status_int)
+
+        mock_index.assert_called_with('192.192.192.2', ['f-f-f-f'])
+        gmd.assert_called_with(uuids.instance, '192.192.192.2')
+        # The networks of the provider are cached and the instance is not
+        # looked up from its port.
+        mock_client.list_subnets.assert_called_once_with(
+            mock.ANY, advanced_service_providers=['edge-x'],
+            fields=['network_id'])
+        mock_client.list_ports.assert_not_called()
+
     @mock.patch.object(context, 'get_admin_context')
     @mock.patch.object(objects.Instance, 'get_by_uuid')
     def test_get_metadata_by_instance_id(self, mock_uuid, mock_context):
@@ -451,6 +451,27 @@ Archiving.....complete
     def test_archive_deleted_rows_until_complete_quiet(self):
         self.test_archive_deleted_rows_until_complete(verbose=False)
 
+    @mock.patch('time.sleep')
+    @mock.patch.object(db, 'archive_deleted_rows')
+    @mock.patch.object(objects.CellMappingList, 'get_all')
+    def test_archive_deleted_rows_until_complete_sleep(self, mock_get_all,
+                                                       mock_db_archive,
+                                                       mock_sleep):
+        mock_db_archive.side_effect = [
+            ({'instances': 10}, list()),
+            ({'instances': 5}, list()),
+            ({}, list())]
+        result = self.commands.archive_deleted_rows(20, until_complete=True,
+                                                    sleep=0.5)
+        self.assertEqual(1, result)
+        self.assertEqual(3, mock_db_archive.call_count)
+        # No sleep after the last, empty, batch.
+        mock_sleep.assert_has_calls([mock.call(0.5), mock.call(0.5)])
+        self.assertEqual(2, mock_sleep.call_count)
+
+    def test_archive_deleted_rows_negative_sleep(self):
+        self.assertEqual(2, self.commands.archive_deleted_rows(20, sleep=-1))
+
     @mock.patch('nova.db.sqlalchemy.api.purge_shadow_tables')
     @mock.patch.object(db, 'archive_deleted_rows')
     @mock.patch.object(objects.CellMappingList, 'get_all')
@@ -486,7 +507,8 @@ Rows were archived, running purge...
                                           mock.call(20),
                                           mock.call(20)])
         mock_db_purge.assert_called_once_with(mock.ANY, None,
-                                              status_fn=mock.ANY)
+                                              status_fn=mock.ANY,
+                                              batch_size=1000, dry_run=False)
 
     def test_archive_deleted_rows_until_stopped_quiet(self):
         self.test_archive_deleted_rows_until_stopped(verbose=False)
@@ -571,7 +593,8 @@ is set and run this command again.
         mock_purge.return_value = 1
         ret = self.commands.purge(purge_all=True)
         self.assertEqual(0, ret)
-        mock_purge.assert_called_once_with(mock.ANY, None, status_fn=mock.ANY)
+        mock_purge.assert_called_once_with(mock.ANY, None, status_fn=mock.ANY,
+                                           batch_size=1000, dry_run=False)
 
     @mock.patch('nova.db.sqlalchemy.api.purge_shadow_tables')
     def test_purge_date(self, mock_purge):
@@ -580,7 +603,31 @@ is set and run this command again.
         self.assertEqual(0, ret)
         mock_purge.assert_called_once_with(mock.ANY,
                                            datetime.datetime(2015, 10, 21),
-                                           status_fn=mock.ANY)
+                                           status_fn=mock.ANY,
+                                           batch_size=1000, dry_run=False)
+
+    @mock.patch('nova.db.sqlalchemy.api.purge_shadow_tables')
+    def test_purge_dry_run(self, mock_purge):
+        def fake_purge(*args, **kwargs):
+            kwargs['status_fn']('Would delete 5 rows from shadow_instances')
+            return 5
+        mock_purge.side_effect = fake_purge
+
+        ret = self.commands.purge(purge_all=True, batch_size=10,
+                                  dry_run=True)
+
+        self.assertEqual(0, ret)
+        mock_purge.assert_called_once_with(mock.ANY, None, status_fn=mock.ANY,
+                                           batch_size=10, dry_run=True)
+        # The estimate is printed even without --verbose.
+        self.assertEqual('DB: Would delete 5 rows from shadow_instances\n',
+                         self.output.getvalue())
+
+    @mock.patch('nova.db.sqlalchemy.api.purge_shadow_tables')
+    def test_purge_invalid_batch_size(self, mock_purge):
+        ret = self.commands.purge(purge_all=True, batch_size=0)
+        self.assertEqual(2, ret)
+        self.assertFalse(mock_purge.called)
 
     @mock.patch('nova.db.sqlalchemy.api.purge_shadow_tables')
     def test_purge_date_fail(self, mock_purge):
@@ -2232,6 +2279,78 @@ class CellV2CommandsTestCase(test.NoDBTestCase):
             node.save.assert_called_once_with()
 
 
+class HostCommandsTestCase(test.NoDBTestCase):
+    def setUp(self):
+        super(HostCommandsTestCase, self).setUp()
+        self.output = StringIO()
+        self.useFixture(fixtures.MonkeyPatch('sys.stdout', self.output))
+        self.commands = manage.HostCommands()
+        self.cell_mapping = objects.CellMapping(
+            uuid=uuidsentinel.cell1, database_connection='fake:///db',
+            transport_url='fake:///mq')
+        self.mock_get_hm = self.useFixture(fixtures.MockPatchObject(
+            objects.HostMapping, 'get_by_host',
+            return_value=objects.HostMapping(
+                host='fake-host', cell_mapping=self.cell_mapping))).mock
+        self.mock_drain = self.useFixture(fixtures.MockPatchObject(
+            manage.conductor_manager.ComputeTaskManager,
+            'drain_host')).mock
+
+    def test_drain_host_not_found(self):
+        self.mock_get_hm.side_effect = exception.HostMappingNotFound(
+            name='fake-host')
+        self.assertEqual(1, self.commands.drain('fake-host'))
+        self.assertEqual('The host fake-host was not found.',
+                         self.output.getvalue().strip())
+        self.mock_drain.assert_not_called()
+
+    def test_drain(self):
+        def fake_drain_host(ctxt, host, block_migration, disk_over_commit,
+                            progress_callback):
+            progress = {'total': 2, 'migrated': 0, 'in_progress': 2,
+                        'failed': 0, 'skipped': 1}
+            progress_callback(progress)
+            # The progress is only printed when it changes.
+            progress_callback(dict(progress))
+            progress_callback(dict(progress, migrated=2, in_progress=0))
+            return {'total': 2, 'migrated': [uuidsentinel.inst1,
+                                             uuidsentinel.inst2],
+                    'failed': [], 'skipped': [uuidsentinel.inst3]}
+
+        self.mock_drain.side_effect = fake_drain_host
+
+        self.assertEqual(0, self.commands.drain('fake-host',
+                                                block_migration=True))
+
+        self.mock_get_hm.assert_called_once_with(mock.ANY, 'fake-host')
+        self.mock_drain.assert_called_once_with(
+            mock.ANY, 'fake-host', True, None, progress_callback=mock.ANY)
+        self.assertEqual(
+            '0 of 2 instances migrated, 2 in progress, 0 failed, 1 skipped.\n'
+            '2 of 2 instances migrated, 0 in progress, 0 failed, 1 skipped.\n'
+            'Instance %s was not live migrated, it is not active or paused, '
+            'or it has a task in progress.\n' % uuidsentinel.inst3,
+            self.output.getvalue())
+
+    def test_drain_failed(self):
+        self.mock_drain.return_value = {
+            'total': 2, 'migrated': [uuidsentinel.inst1],
+            'failed': [uuidsentinel.inst2], 'skipped': []}
+
+        self.assertEqual(2, self.commands.drain('fake-host'))
+        self.assertEqual(
+            'Instance %s failed to be live migrated.' % uuidsentinel.inst2,
+            self.output.getvalue().strip())
+
+    def test_drain_interrupted(self):
+        self.mock_drain.side_effect = KeyboardInterrupt
+
+        self.assertEqual(3, self.commands.drain('fake-host'))
+        self.assertEqual(
+            'Interrupted, the live migrations in progress are not aborted.',
+            self.output.getvalue().strip())
+
+
 class TestNovaManageMain(test.NoDBTestCase):
     """Tests the nova-manage:main() setup code."""
 
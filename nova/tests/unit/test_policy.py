@@ -17,6 +17,7 @@
 
 import os.path
 
+import fixtures
 import mock
 from oslo_policy import policy as oslo_policy
 from oslo_serialization import jsonutils
@@ -208,6 +209,102 @@ class PolicyTestCase(test.NoDBTestCase):
         self.assertFalse(using_old_action)
 
 
+class DecisionCacheTestCase(test.NoDBTestCase):
+    def setUp(self):
+        super(DecisionCacheTestCase, self).setUp()
+        rules = [
+            oslo_policy.RuleDefault("example:allowed", '@'),
+            oslo_policy.RuleDefault("example:denied", "!"),
+            oslo_policy.RuleDefault("example:get_http",
+                                    "http://www.example.com"),
+            oslo_policy.RuleDefault("example:my_file",
+                                    "role:compute_admin or "
+                                    "project_id:%(project_id)s"),
+            oslo_policy.RuleDefault("example:lowercase_admin",
+                                    "role:admin or role:sysadmin"),
+        ]
+        policy.reset()
+        policy.init()
+        policy._ENFORCER.register_defaults(rules)
+        self.context = context.RequestContext('fake', 'fake', roles=['member'])
+        self.enforcer_authorize = self.useFixture(fixtures.MockPatchObject(
+            policy._ENFORCER, 'authorize',
+            side_effect=policy._ENFORCER.authorize)).mock
+
+    def test_rule_not_depending_on_target(self):
+        with policy.cache_decisions(self.context) as cache:
+            self.assertIs(cache, self.context.policy_cache)
+            for i in range(3):
+                self.assertTrue(policy.authorize(
+                    self.context, 'example:allowed', {'uuid': i}))
+                self.assertRaises(exception.PolicyNotAuthorized,
+                                  policy.authorize, self.context,
+                                  'example:denied', {'uuid': i})
+                self.assertFalse(policy.authorize(
+                    self.context, 'example:denied', {'uuid': i}, False))
+
+        self.assertIsNone(self.context.policy_cache)
+        self.assertEqual(2, self.enforcer_authorize.call_count)
+        self.assertEqual(9, cache.checks)
+        self.assertEqual(7, cache.hits)
+        self.assertGreater(cache.elapsed, 0)
+
+    def test_rule_depending_on_target(self):
+        action = 'example:my_file'
+        with policy.cache_decisions(self.context):
+            policy.authorize(self.context, action,
+                             {'project_id': 'fake', 'uuid': 1})
+            policy.authorize(self.context, action,
+                             {'project_id': 'fake', 'uuid': 2})
+            for i in range(2):
+                self.assertRaises(exception.PolicyNotAuthorized,
+                                  policy.authorize, self.context, action,
+                                  {'project_id': 'other', 'uuid': 1})
+            # The rule is checked again with other credentials.
+            admin_context = self.context.elevated()
+            admin_context.roles.append('compute_admin')
+            policy.authorize(admin_context, action,
+                             {'project_id': 'other', 'uuid': 1})
+
+        self.assertEqual(3, self.enforcer_authorize.call_count)
+
+    @requests_mock.mock()
+    def test_http_rule_not_cached(self, req_mock):
+        req_mock.post('http://www.example.com/', text='True')
+        with policy.cache_decisions(self.context) as cache:
+            for i in range(2):
+                policy.authorize(self.context, 'example:get_http', {})
+
+        self.assertEqual(2, self.enforcer_authorize.call_count)
+        self.assertEqual(0, cache.hits)
+
+    def test_unhashable_target_not_cached(self):
+        with policy.cache_decisions(self.context):
+            for i in range(2):
+                policy.authorize(self.context, 'example:my_file',
+                                 {'project_id': ['fake']}, False)
+                policy.authorize(self.context, 'example:my_file',
+                                 {'project_id': object()}, False)
+
+        self.assertEqual(3, self.enforcer_authorize.call_count)
+
+    def test_target_keys(self):
+        policy._ENFORCER.register_defaults([
+            oslo_policy.RuleDefault('example:owner',
+                                    'user_id:%(user_id)s and '
+                                    'rule:example:my_file'),
+            oslo_policy.RuleDefault('example:not_target',
+                                    'not rule:example:lowercase_admin'),
+            oslo_policy.RuleDefault('example:loop', 'rule:example:loop')])
+        policy._ENFORCER.load_rules(True)
+
+        self.assertEqual(('project_id', 'user_id'),
+                         policy._get_target_keys('example:owner'))
+        self.assertEqual((), policy._get_target_keys('example:not_target'))
+        self.assertEqual((), policy._get_target_keys('example:loop'))
+        self.assertIsNone(policy._get_target_keys('example:get_http'))
+
+
 class IsAdminCheckTestCase(test.NoDBTestCase):
     def setUp(self):
         super(IsAdminCheckTestCase, self).setUp()
@@ -29,6 +29,7 @@ from nova import objects
 from nova import quota
 from nova import test
 import nova.tests.unit.image.fake
+from nova.tests import uuidsentinel as uuids
 
 CONF = nova.conf.CONF
 
@@ -2262,3 +2263,128 @@ class NoopQuotaDriverTestCase(test.TestCase):
                                                  quota.QUOTAS._resources,
                                                  'test_project')
         self.assertEqual(self.expected_settable_quotas, result)
+
+
+@mock.patch('nova.context.scatter_gather_all_cells')
+class InstancesCoresRamCountTestCase(test.NoDBTestCase):
+    def setUp(self):
+        super(InstancesCoresRamCountTestCase, self).setUp()
+        self.context = context.RequestContext('fake-user', 'fake-project')
+        self.cell_counts = {
+            'project': {'instances': 2, 'cores': 4, 'ram': 1024},
+            'user': {'instances': 1, 'cores': 2, 'ram': 512}}
+
+    def _count(self, user_id='fake-user', **kwargs):
+        return quota._instances_cores_ram_count(self.context, 'fake-project',
+                                                user_id=user_id, **kwargs)
+
+    def test_count_no_cache(self, mock_scatter):
+        mock_scatter.return_value = {
+            uuids.cell1: self.cell_counts,
+            uuids.cell2: context.did_not_respond_sentinel}
+        self.assertEqual(self.cell_counts, self._count())
+        self.assertEqual(self.cell_counts, self._count())
+        self.assertEqual(2, mock_scatter.call_count)
+        mock_scatter.assert_called_with(
+            self.context, objects.InstanceList.get_counts, 'fake-project',
+            user_id='fake-user')
+
+    def test_count_cached(self, mock_scatter):
+        self.flags(count_usage_cache_ttl=60, group='quota')
+        mock_scatter.return_value = {uuids.cell1: self.cell_counts}
+        self.assertEqual(self.cell_counts, self._count())
+        self.assertEqual(self.cell_counts, self._count())
+        self.assertEqual({'project': self.cell_counts['project']},
+                         self._count(user_id=None))
+        mock_scatter.assert_called_once_with(
+            self.context, objects.InstanceList.get_counts, 'fake-project',
+            user_id='fake-user')
+
+    def test_count_cached_other_user(self, mock_scatter):
+        self.flags(count_usage_cache_ttl=60, group='quota')
+        mock_scatter.return_value = {uuids.cell1: self.cell_counts}
+        self._count()
+        self._count(user_id='other-user')
+        # The entry was replaced with the counts of the other user.
+        self._count(user_id='other-user')
+        self.assertEqual(2, mock_scatter.call_count)
+        mock_scatter.assert_called_with(
+            self.context, objects.InstanceList.get_counts, 'fake-project',
+            user_id='other-user')
+
+    def test_count_cache_invalidated(self, mock_scatter):
+        self.flags(count_usage_cache_ttl=60, group='quota')
+        mock_scatter.return_value = {uuids.cell1: self.cell_counts}
+        self._count()
+        quota.invalidate_usage_counts('other-project')
+        self._count()
+        self.assertEqual(1, mock_scatter.call_count)
+        quota.invalidate_usage_counts('fake-project')
+        self._count()
+        self.assertEqual(2, mock_scatter.call_count)
+
+    def test_count_cache_invalidated_while_counting(self, mock_scatter):
+        self.flags(count_usage_cache_ttl=60, group='quota')
+
+        def fake_scatter(*args, **kwargs):
+            # An instance is created while the usage is being counted.
+            if mock_scatter.call_count == 1:
+                quota.invalidate_usage_counts('fake-project')
+            return {uuids.cell1: self.cell_counts}
+
+        mock_scatter.side_effect = fake_scatter
+        self._count()
+        # The counts made before the instance was created are not used.
+        self._count()
+        self._count()
+        self.assertEqual(2, mock_scatter.call_count)
+
+    def test_count_cache_not_used(self, mock_scatter):
+        self.flags(count_usage_cache_ttl=60, group='quota')
+        mock_scatter.return_value = {uuids.cell1: self.cell_counts}
+        self._count()
+        self.assertEqual(self.cell_counts, self._count(use_cache=False))
+        self.assertEqual(2, mock_scatter.call_count)
+
+    @mock.patch('nova.scheduler.client.report.SchedulerReportClient.'
+                'get_usages_counts_for_quota')
+    def test_count_from_placement(self, mock_usages, mock_scatter):
+        self.flags(count_usage_from_placement=True, group='quota')
+        mock_scatter.return_value = {
+            uuids.cell1: {'project': {'instances': 2},
+                          'user': {'instances': 1}}}
+        mock_usages.return_value = {'project': {'cores': 8, 'ram': 2048},
+                                    'user': {'cores': 6, 'ram': 1536}}
+        expected = {'project': {'instances': 2, 'cores': 8, 'ram': 2048},
+                    'user': {'instances': 1, 'cores': 6, 'ram': 1536}}
+        self.assertEqual(expected, self._count())
+        mock_usages.assert_called_once_with(self.context, 'fake-project',
+                                            user_id='fake-user')
+        # Only the instances are counted in the cells.
+        mock_scatter.assert_called_once_with(
+            self.context, objects.InstanceList.get_instance_counts,
+            'fake-project', user_id='fake-user')
+
+    @mock.patch('nova.scheduler.client.report.SchedulerReportClient.'
+                'get_usages_counts_for_quota', return_value=None)
+    def test_count_from_placement_unreachable(self, mock_usages,
+                                              mock_scatter):
+        self.flags(count_usage_from_placement=True, group='quota')
+        mock_scatter.return_value = {uuids.cell1: self.cell_counts}
+        self.assertEqual(self.cell_counts, self._count())
+        mock_usages.assert_called_once_with(self.context, 'fake-project',
+                                            user_id='fake-user')
+        mock_scatter.assert_called_once_with(
+            self.context, objects.InstanceList.get_counts, 'fake-project',
+            user_id='fake-user')
+
+    @mock.patch('nova.scheduler.client.report.SchedulerReportClient.'
+                'get_usages_counts_for_quota',
+                side_effect=exception.UsagesRetrievalFailed(
+                    project_id='fake-project', user_id='fake-user'))
+    def test_count_from_placement_fail(self, mock_usages, mock_scatter):
+        self.flags(count_usage_from_placement=True, group='quota')
+        mock_scatter.return_value = {uuids.cell1: self.cell_counts}
+        self.assertEqual(self.cell_counts, self._count())
+        mock_usages.assert_called_once_with(self.context, 'fake-project',
+                                            user_id='fake-user')
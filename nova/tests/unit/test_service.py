@@ -249,6 +249,39 @@ class ServiceTestCase(test.NoDBTestCase):
         serv.rpcserver.stop.assert_called_once_with()
         serv.rpcserver.wait.assert_called_once_with()
 
+    @mock.patch('nova.notifications.pipeline.flush')
+    @mock.patch('nova.servicegroup.API')
+    @mock.patch('nova.objects.service.Service.get_by_host_and_binary')
+    @mock.patch.object(rpc, 'get_server')
+    def test_service_stop_flushes_notifications(
+            self, mock_rpc, mock_svc_get_by_host_and_binary, mock_API,
+            mock_flush):
+        serv = service.Service(self.host,
+                               self.binary,
+                               self.topic,
+                               'nova.tests.unit.test_service.FakeManager')
+        serv.start()
+        serv.stop()
+        mock_flush.assert_called_once_with()
+
+    @mock.patch('nova.servicegroup.API')
+    @mock.patch('nova.objects.service.Service.get_by_host_and_binary')
+    @mock.patch.object(rpc, 'get_server')
+    def test_service_start_lazy_serializer(
+            self, mock_rpc, mock_svc_get_by_host_and_binary, mock_API):
+        serv = service.Service(self.host,
+                               self.binary,
+                               self.topic,
+                               'nova.tests.unit.test_service.FakeManager')
+        serv.start()
+        serializer = mock_rpc.call_args[0][2]
+        self.assertFalse(serializer.lazy)
+
+        self.flags(lazy_object_deserialization=True)
+        serv.start()
+        serializer = mock_rpc.call_args[0][2]
+        self.assertTrue(serializer.lazy)
+
     def test_reset(self):
         serv = service.Service(self.host,
                                self.binary,
@@ -288,6 +321,14 @@ class TestWSGIService(test.NoDBTestCase):
         self.assertNotEqual(0, test_service.port)
         test_service.stop()
 
+    @mock.patch('nova.notifications.pipeline.flush')
+    @mock.patch('nova.objects.Service.get_by_host_and_binary')
+    def test_service_stop_flushes_notifications(self, mock_get, mock_flush):
+        test_service = service.WSGIService("test_service")
+        test_service.start()
+        test_service.stop()
+        mock_flush.assert_called_once_with()
+
     def test_workers_set_default(self):
         test_service = service.WSGIService("osapi_compute")
         self.assertEqual(test_service.workers, processutils.get_worker_count())
@@ -15,6 +15,8 @@
 
 """Tests for the ironic driver."""
 
+import time
+
 from ironicclient import exc as ironic_exception
 import mock
 from oslo_config import cfg
@@ -566,7 +568,8 @@ class IronicDriverTestCase(test.NoDBTestCase):
         self.assertTrue(self.driver.node_is_available(node.uuid))
         mock_get.assert_called_with(node.uuid,
                                     fields=ironic_driver._NODE_FIELDS)
-        mock_list.assert_called_with(detail=True, limit=0)
+        mock_list.assert_called_with(fields=ironic_driver._NODE_FIELDS,
+                                     limit=0)
 
         mock_get.side_effect = ironic_exception.NotFound
         self.assertFalse(self.driver.node_is_available(node.uuid))
@@ -581,7 +584,8 @@ class IronicDriverTestCase(test.NoDBTestCase):
         mock_get.return_value = node
         mock_list.return_value = [node]
         self.assertTrue(self.driver.node_is_available(node.uuid))
-        mock_list.assert_called_with(detail=True, limit=0)
+        mock_list.assert_called_with(fields=ironic_driver._NODE_FIELDS,
+                                     limit=0)
         self.assertEqual(0, mock_get.call_count)
 
     @mock.patch.object(FAKE_CLIENT.node, 'list')
@@ -1003,6 +1007,32 @@ class IronicDriverTestCase(test.NoDBTestCase):
         self.assertEqual(hardware.InstanceInfo(state=nova_states.RUNNING),
                          result)
 
+    @mock.patch.object(FAKE_CLIENT.node, 'get_by_instance_uuid')
+    def test_get_info_from_cache(self, mock_gbiu):
+        self.flags(node_cache_max_age=60, group='ironic')
+        node = ironic_utils.get_test_node(instance_uuid=self.instance_uuid,
+                                          power_state=ironic_states.POWER_ON)
+        self.driver.node_cache = {node.uuid: node}
+        self.driver.node_cache_time = time.time()
+        instance = fake_instance.fake_instance_obj('fake-context',
+                                                   uuid=self.instance_uuid,
+                                                   node=node.uuid)
+        result = self.driver.get_info(instance)
+        self.assertEqual(hardware.InstanceInfo(state=nova_states.RUNNING),
+                         result)
+        mock_gbiu.assert_not_called()
+
+        # The cache is too old.
+        self.driver.node_cache_time = time.time() - 120
+        mock_gbiu.return_value = ironic_utils.get_test_node(
+            instance_uuid=self.instance_uuid,
+            power_state=ironic_states.POWER_OFF)
+        result = self.driver.get_info(instance)
+        self.assertEqual(hardware.InstanceInfo(state=nova_states.SHUTDOWN),
+                         result)
+        mock_gbiu.assert_called_once_with(
+            self.instance_uuid, fields=ironic_driver._NODE_FIELDS)
+
     @mock.patch.object(FAKE_CLIENT.node, 'get_by_instance_uuid')
     def test_get_info_http_not_found(self, mock_gbiu):
         mock_gbiu.side_effect = ironic_exception.NotFound()
@@ -2840,6 +2870,8 @@ class HashRingTestCase(test.NoDBTestCase):
         self.ctx = nova_context.get_admin_context()
         self.mock_is_up = (
             self.driver.servicegroup_api.service_is_up)
+        self.driver.servicegroup_api.services_are_up.side_effect = (
+            lambda services: [self.mock_is_up(svc) for svc in services])
 
     @mock.patch.object(ironic_driver.IronicDriver, '_refresh_hash_ring')
     def test_hash_ring_refreshed_on_init(self, mock_hr):
@@ -2896,6 +2928,25 @@ class HashRingTestCase(test.NoDBTestCase):
         self.mock_is_up.side_effect = [True, True, False, True]
         self._test__refresh_hash_ring(services, expected_hosts)
 
+    @mock.patch.object(hash_ring, 'HashRing')
+    @mock.patch.object(objects.ServiceList, 'get_all_computes_by_hv_type')
+    def test__refresh_hash_ring_services_unchanged(self, mock_services,
+                                                   mock_hash_ring):
+        self.flags(host='host1')
+        mock_services.return_value = [_make_compute_service('host2')]
+        self.mock_is_up.return_value = True
+
+        self.driver._refresh_hash_ring(self.ctx)
+        hr = self.driver.hash_ring
+        self.driver._refresh_hash_ring(self.ctx)
+        mock_hash_ring.assert_called_once_with({'host1', 'host2'},
+                                               partitions=32)
+        self.assertIs(hr, self.driver.hash_ring)
+
+        self.mock_is_up.return_value = False
+        self.driver._refresh_hash_ring(self.ctx)
+        mock_hash_ring.assert_called_with({'host1'}, partitions=32)
+
 
 class NodeCacheTestCase(test.NoDBTestCase):
 
@@ -2927,7 +2978,8 @@ class NodeCacheTestCase(test.NoDBTestCase):
 
         mock_hash_ring.assert_called_once_with(mock.ANY)
         mock_instances.assert_called_once_with(mock.ANY, self.host)
-        mock_nodes.assert_called_once_with(detail=True, limit=0)
+        mock_nodes.assert_called_once_with(fields=ironic_driver._NODE_FIELDS,
+                                           limit=0)
         self.assertIsNotNone(self.driver.node_cache_time)
 
     def test__refresh_cache(self):
@@ -3006,6 +3058,101 @@ class NodeCacheTestCase(test.NoDBTestCase):
         expected_cache = {n.uuid: n for n in nodes[1:]}
         self.assertEqual(expected_cache, self.driver.node_cache)
 
+    def _get_nodes_updates(self, nodes):
+        return [ironic_utils.get_test_node(uuid=node.uuid,
+                                           instance_uuid=node.instance_uuid,
+                                           created_at=node.updated_at)
+                for node in nodes]
+
+    @mock.patch.object(ironic_driver.IronicDriver, '_refresh_hash_ring')
+    @mock.patch.object(ironic_driver.IronicDriver, '_manages_node',
+                       return_value=True)
+    @mock.patch.object(ironic_driver.IronicDriver, '_get_node')
+    @mock.patch.object(ironic_driver.IronicDriver, '_get_node_list')
+    @mock.patch.object(objects.InstanceList, 'get_uuids_by_host',
+                       return_value=[])
+    def test__refresh_cache_incremental(self, mock_instances, mock_nodes,
+                                        mock_get_node, mock_manages,
+                                        mock_hash_ring):
+        # NOTE: get_test_node() sets updated_at from created_at.
+        nodes = [ironic_utils.get_test_node(uuid=uuidutils.generate_uuid(),
+                                            created_at=1)
+                 for i in range(3)]
+        mock_nodes.return_value = nodes
+        self.driver._refresh_cache()
+        mock_nodes.assert_called_once_with(fields=ironic_driver._NODE_FIELDS,
+                                           limit=0)
+
+        # Only the updated and new nodes are fetched again.
+        updates = self._get_nodes_updates(nodes)
+        updates[1].updated_at = 2
+        new_node = ironic_utils.get_test_node(uuid=uuidutils.generate_uuid())
+        updates.append(new_node)
+        updated_node = ironic_utils.get_test_node(uuid=nodes[1].uuid,
+                                                  created_at=2)
+        mock_get_node.side_effect = [updated_node, new_node]
+        mock_nodes.reset_mock()
+        mock_nodes.return_value = updates[1:]
+        self.driver._refresh_cache()
+
+        mock_nodes.assert_called_once_with(
+            fields=ironic_driver._NODE_UPDATE_FIELDS, limit=0)
+        mock_get_node.assert_has_calls([mock.call(nodes[1].uuid),
+                                        mock.call(new_node.uuid)])
+        self.assertEqual({nodes[1].uuid: updated_node,
+                          nodes[2].uuid: nodes[2],
+                          new_node.uuid: new_node}, self.driver.node_cache)
+
+    @mock.patch.object(ironic_driver.IronicDriver, '_refresh_hash_ring')
+    @mock.patch.object(ironic_driver.IronicDriver, '_manages_node',
+                       return_value=True)
+    @mock.patch.object(ironic_driver.IronicDriver, '_get_node')
+    @mock.patch.object(ironic_driver.IronicDriver, '_get_node_list')
+    @mock.patch.object(objects.InstanceList, 'get_uuids_by_host',
+                       return_value=[])
+    def test__refresh_cache_incremental_too_many_updates(
+            self, mock_instances, mock_nodes, mock_get_node, mock_manages,
+            mock_hash_ring):
+        nodes = [ironic_utils.get_test_node(uuid=uuidutils.generate_uuid())
+                 for i in range(3)]
+        self.driver.node_cache = {nodes[0].uuid: nodes[0]}
+        self.driver._node_cache_full_refresh_time = time.time()
+        mock_nodes.side_effect = [self._get_nodes_updates(nodes), nodes]
+
+        with mock.patch.object(ironic_driver, '_NODE_CACHE_MAX_NODE_GETS', 1):
+            self.driver._refresh_cache()
+
+        mock_nodes.assert_has_calls([
+            mock.call(fields=ironic_driver._NODE_UPDATE_FIELDS, limit=0),
+            mock.call(fields=ironic_driver._NODE_FIELDS, limit=0)])
+        mock_get_node.assert_not_called()
+        self.assertEqual({n.uuid: n for n in nodes}, self.driver.node_cache)
+
+    @mock.patch.object(ironic_driver.IronicDriver, '_refresh_hash_ring')
+    @mock.patch.object(ironic_driver.IronicDriver, '_get_node_list')
+    @mock.patch.object(objects.InstanceList, 'get_uuids_by_host',
+                       return_value=[])
+    def test__refresh_cache_full_refresh_interval(self, mock_instances,
+                                                  mock_nodes, mock_hash_ring):
+        node = ironic_utils.get_test_node(uuid=uuidutils.generate_uuid())
+        mock_nodes.return_value = []
+        self.driver.node_cache = {node.uuid: node}
+
+        # The last full refresh is too old.
+        self.driver._node_cache_full_refresh_time = time.time() - 3600
+        self.driver._refresh_cache()
+        mock_nodes.assert_called_once_with(fields=ironic_driver._NODE_FIELDS,
+                                           limit=0)
+
+        # Full refreshes are always done.
+        self.flags(node_cache_full_refresh_interval=0, group='ironic')
+        self.driver.node_cache = {node.uuid: node}
+        self.driver._node_cache_full_refresh_time = time.time()
+        mock_nodes.reset_mock()
+        self.driver._refresh_cache()
+        mock_nodes.assert_called_once_with(fields=ironic_driver._NODE_FIELDS,
+                                           limit=0)
+
 
 @mock.patch.object(FAKE_CLIENT, 'node')
 class IronicDriverConsoleTestCase(test.NoDBTestCase):
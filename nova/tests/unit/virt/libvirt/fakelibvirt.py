@@ -59,6 +59,11 @@ VIR_DOMAIN_BLOCK_JOB_ABORT_PIVOT = 2
 
 VIR_DOMAIN_EVENT_ID_LIFECYCLE = 0
 
+VIR_NODE_DEVICE_EVENT_ID_LIFECYCLE = 0
+
+VIR_NODE_DEVICE_EVENT_CREATED = 0
+VIR_NODE_DEVICE_EVENT_DELETED = 1
+
 VIR_DOMAIN_EVENT_DEFINED = 0
 VIR_DOMAIN_EVENT_UNDEFINED = 1
 VIR_DOMAIN_EVENT_STARTED = 2
@@ -1012,6 +1017,7 @@ class Connection(object):
         self._nwfilters = {}
         self._nodedevs = {}
         self._event_callbacks = {}
+        self._node_device_event_callbacks = {}
         self.fakeLibVersion = version
         self.fakeVersion = hv_version
         self.host_info = host_info or HostInfo()
@@ -1120,6 +1126,18 @@ class Connection(object):
     def domainEventRegisterAny(self, dom, eventid, callback, opaque):
         self._event_callbacks[eventid] = [callback, opaque]
 
+    def nodeDeviceEventRegisterAny(self, dev, eventid, callback, opaque):
+        self._node_device_event_callbacks[eventid] = [callback, opaque]
+
+    def _emit_node_device_lifecycle(self, dev, event, detail=0):
+        if (VIR_NODE_DEVICE_EVENT_ID_LIFECYCLE not in
+                self._node_device_event_callbacks):
+            return
+
+        callback, opaque = self._node_device_event_callbacks[
+            VIR_NODE_DEVICE_EVENT_ID_LIFECYCLE]
+        callback(self, dev, event, detail, opaque)
+
     def registerCloseCallback(self, cb, opaque):
         pass
 
@@ -85,6 +85,8 @@ class RbdTestCase(test.NoDBTestCase):
 
         self.rbd_pool = 'rbd'
         self.driver = rbd_utils.RBDDriver(self.rbd_pool, None, None)
+        rbd_utils.reset_connection_pool()
+        self.addCleanup(rbd_utils.reset_connection_pool)
 
         self.volume_name = u'volume-00000001'
         self.snap_name = u'test-snap'
@@ -297,6 +299,111 @@ class RbdTestCase(test.NoDBTestCase):
         self.mock_rados.Rados.open_ioctx.assert_called_with(
             test.MatchType(str))
 
+    def _use_healthy_clients(self, pool_size=4):
+        self.flags(rbd_connection_pool_size=pool_size, group='libvirt')
+        clients = []
+
+        # NOTE: setUp sets the methods of the fake clients on mock.Mock
+        # itself, so they are overridden here for each client.
+        def fake_rados(**kwargs):
+            client = mock.Mock(state='configuring')
+
+            def connect():
+                client.state = 'connected'
+
+            def open_ioctx(pool):
+                ioctx = mock.Mock(state='open', close=mock.Mock())
+                ioctx.name = pool
+                return ioctx
+
+            client.connect = mock.Mock(side_effect=connect)
+            client.open_ioctx = mock.Mock(side_effect=open_ioctx)
+            client.shutdown = mock.Mock()
+            clients.append(client)
+            return client
+
+        self.mock_rados.Rados = mock.Mock(side_effect=fake_rados)
+        return clients
+
+    def test_connection_pool_reuses_connection(self):
+        clients = self._use_healthy_clients()
+        client, ioctx = self.driver._connect_to_rados()
+        self.driver._disconnect_from_rados(client, ioctx)
+        self.assertFalse(client.shutdown.called)
+        self.assertFalse(ioctx.close.called)
+
+        self.assertEqual((client, ioctx), self.driver._connect_to_rados())
+        self.assertEqual(1, len(clients))
+        client.connect.assert_called_once_with()
+
+    def test_connection_pool_keyed_by_pool(self):
+        clients = self._use_healthy_clients()
+        client, ioctx = self.driver._connect_to_rados()
+        self.driver._disconnect_from_rados(client, ioctx)
+
+        alt_client, alt_ioctx = self.driver._connect_to_rados('alt_pool')
+        self.assertEqual(2, len(clients))
+        self.assertIsNot(client, alt_client)
+        self.assertEqual('alt_pool', alt_ioctx.name)
+        # A driver with another user does not get the connection either
+        driver = rbd_utils.RBDDriver(self.rbd_pool, None, 'other_user')
+        driver._connect_to_rados()
+        self.assertEqual(3, len(clients))
+
+    def test_connection_pool_bounded(self):
+        self._use_healthy_clients(pool_size=1)
+        first = self.driver._connect_to_rados()
+        second = self.driver._connect_to_rados()
+        self.driver._disconnect_from_rados(*first)
+        self.driver._disconnect_from_rados(*second)
+        self.assertFalse(first[0].shutdown.called)
+        second[0].shutdown.assert_called_once_with()
+        second[1].close.assert_called_once_with()
+
+    def test_connection_pool_drops_unhealthy(self):
+        clients = self._use_healthy_clients()
+        client, ioctx = self.driver._connect_to_rados()
+        self.driver._disconnect_from_rados(client, ioctx)
+        ioctx.state = 'closed'
+
+        new_client, _new_ioctx = self.driver._connect_to_rados()
+        self.assertIsNot(client, new_client)
+        self.assertEqual(2, len(clients))
+        client.shutdown.assert_called_once_with()
+
+    @mock.patch.object(rbd_utils.time, 'time')
+    def test_connection_pool_checks_old_connections(self, mock_time):
+        clients = self._use_healthy_clients()
+        mock_time.return_value = 1000
+        client, ioctx = self.driver._connect_to_rados()
+        self.driver._disconnect_from_rados(client, ioctx)
+        client.get_cluster_stats.side_effect = self.mock_rados.Error
+
+        mock_time.return_value = (
+            1000 + rbd_utils._POOL_HEALTH_CHECK_INTERVAL + 1)
+        new_client, _new_ioctx = self.driver._connect_to_rados()
+        client.get_cluster_stats.assert_called_once_with()
+        self.assertIsNot(client, new_client)
+        self.assertEqual(2, len(clients))
+        client.shutdown.assert_called_once_with()
+
+    def test_connection_pool_disabled(self):
+        clients = self._use_healthy_clients(pool_size=0)
+        client, ioctx = self.driver._connect_to_rados()
+        self.driver._disconnect_from_rados(client, ioctx)
+        client.shutdown.assert_called_once_with()
+        ioctx.close.assert_called_once_with()
+        self.driver._connect_to_rados()
+        self.assertEqual(2, len(clients))
+
+    def test_reset_connection_pool(self):
+        self._use_healthy_clients()
+        client, ioctx = self.driver._connect_to_rados()
+        self.driver._disconnect_from_rados(client, ioctx)
+        rbd_utils.reset_connection_pool()
+        client.shutdown.assert_called_once_with()
+        ioctx.close.assert_called_once_with()
+
     def test_ceph_args_none(self):
         self.driver.rbd_user = None
         self.driver.ceph_conf = None
@@ -10507,6 +10507,51 @@ class LibvirtConnTestCase(test.NoDBTestCase,
                                              self.EXPECT_SUCCESS,
                                              expected_switch=True)
 
+    @mock.patch('nova.virt.libvirt.migration.update_downtime')
+    @mock.patch('nova.virt.libvirt.migration.update_downtime_adaptive')
+    @mock.patch('nova.virt.libvirt.migration.should_switch_to_postcopy')
+    @mock.patch('nova.virt.libvirt.migration.'
+                'should_switch_to_postcopy_adaptive')
+    @mock.patch.object(libvirt_driver.LibvirtDriver,
+                       "_is_post_copy_enabled", return_value=True)
+    def test_live_migration_monitor_adaptive(self, mock_postcopy_enabled,
+                                             mock_should_switch_adaptive,
+                                             mock_should_switch,
+                                             mock_downtime_adaptive,
+                                             mock_downtime):
+        self.flags(live_migration_adaptive_control=True,
+                   live_migration_completion_timeout=100,
+                   group='libvirt')
+        mock_should_switch_adaptive.side_effect = [False, True]
+        mock_downtime_adaptive.side_effect = [50, 100]
+        domain_info_records = [
+            libvirt_guest.JobInfo(
+                type=fakelibvirt.VIR_DOMAIN_JOB_UNBOUNDED,
+                data_processed=100, data_remaining=900),
+            libvirt_guest.JobInfo(
+                type=fakelibvirt.VIR_DOMAIN_JOB_UNBOUNDED,
+                data_processed=200, data_remaining=850),
+            "thread-finish",
+            "domain-stop",
+            libvirt_guest.JobInfo(
+                type=fakelibvirt.VIR_DOMAIN_JOB_COMPLETED),
+        ]
+
+        self._test_live_migration_monitoring(domain_info_records, [0, 1, 2],
+                                             self.EXPECT_SUCCESS,
+                                             expected_switch=True)
+
+        progress = mock_should_switch_adaptive.call_args[0][0]
+        self.assertIsInstance(progress, libvirt_migrate.MigrationProgress)
+        self.assertEqual(850, progress.data_remaining)
+        # The completion timeout is 200 secs for the minimum 2GB of data
+        mock_should_switch_adaptive.assert_called_with(
+            progress, 0, 'unset', 198)
+        mock_downtime_adaptive.assert_called_with(
+            mock.ANY, mock.ANY, 50, progress)
+        self.assertFalse(mock_should_switch.called)
+        self.assertFalse(mock_downtime.called)
+
     @mock.patch.object(host.Host, "get_connection")
     @mock.patch.object(utils, "spawn")
     @mock.patch.object(libvirt_driver.LibvirtDriver, "_live_migration_monitor")
@@ -11427,6 +11472,7 @@ class LibvirtConnTestCase(test.NoDBTestCase,
         vdmock = self.mox.CreateMock(fakelibvirt.virDomain)
         self.mox.StubOutWithMock(vdmock, "XMLDesc")
         vdmock.XMLDesc(0).AndReturn(dummyxml)
+        vdmock.UUIDString().AndReturn(instance.uuid)
 
         def fake_lookup(_uuid):
             if _uuid == instance.uuid:
@@ -11579,6 +11625,7 @@ class LibvirtConnTestCase(test.NoDBTestCase,
         vdmock = self.mox.CreateMock(fakelibvirt.virDomain)
         self.mox.StubOutWithMock(vdmock, "XMLDesc")
         vdmock.XMLDesc(0).AndReturn(dummyxml)
+        vdmock.UUIDString().AndReturn(instance.uuid)
 
         def fake_lookup(_uuid):
             if _uuid == instance.uuid:
@@ -11647,6 +11694,7 @@ class LibvirtConnTestCase(test.NoDBTestCase,
         vdmock = self.mox.CreateMock(fakelibvirt.virDomain)
         self.mox.StubOutWithMock(vdmock, "XMLDesc")
         vdmock.XMLDesc(0).AndReturn(dummyxml)
+        vdmock.UUIDString().AndReturn(instance.uuid)
 
         def fake_lookup(_uuid):
             if _uuid == instance.uuid:
@@ -14287,6 +14335,49 @@ class LibvirtConnTestCase(test.NoDBTestCase,
                 if key not in ['phys_function', 'virt_functions', 'label']:
                     self.assertEqual(expectvfs[dev][key], actualvfs[dev][key])
 
+    @mock.patch.object(host.Host, 'get_node_device_generation')
+    @mock.patch.object(host.Host, 'list_pci_devices')
+    @mock.patch.object(libvirt_driver.LibvirtDriver, '_get_pcidev_info')
+    def test_get_pci_passthrough_devices_cached(self, mock_info, mock_list,
+                                                mock_generation):
+        mock_info.side_effect = lambda name: {'dev_id': name}
+        mock_list.return_value = ['pci_0000_04_00_3', 'pci_0000_04_10_7']
+        mock_generation.return_value = 1
+        drvr = libvirt_driver.LibvirtDriver(fake.FakeVirtAPI(), False)
+
+        expected = [{'dev_id': 'pci_0000_04_00_3'},
+                    {'dev_id': 'pci_0000_04_10_7'}]
+        for i in range(2):
+            self.assertEqual(
+                expected,
+                jsonutils.loads(drvr._get_pci_passthrough_devices()))
+        self.assertEqual(2, mock_info.call_count)
+
+        # Only the new device is looked up while nothing changed
+        mock_list.return_value = ['pci_0000_04_00_3', 'pci_0000_04_11_7']
+        drvr._get_pci_passthrough_devices()
+        mock_info.assert_called_with('pci_0000_04_11_7')
+        self.assertEqual(3, mock_info.call_count)
+
+        # Every device is looked up again after a node device event
+        mock_generation.return_value = 2
+        drvr._get_pci_passthrough_devices()
+        self.assertEqual(5, mock_info.call_count)
+
+    @mock.patch.object(host.Host, 'get_node_device_generation',
+                       return_value=None)
+    @mock.patch.object(host.Host, 'list_pci_devices',
+                       return_value=['pci_0000_04_00_3'])
+    @mock.patch.object(libvirt_driver.LibvirtDriver, '_get_pcidev_info',
+                       return_value={})
+    def test_get_pci_passthrough_devices_no_events(self, mock_info,
+                                                   mock_list,
+                                                   mock_generation):
+        drvr = libvirt_driver.LibvirtDriver(fake.FakeVirtAPI(), False)
+        drvr._get_pci_passthrough_devices()
+        drvr._get_pci_passthrough_devices()
+        self.assertEqual(2, mock_info.call_count)
+
     def _test_get_host_numa_topology(self, mempages):
         caps = vconfig.LibvirtConfigCaps()
         caps.host = vconfig.LibvirtConfigCapsHost()
@@ -17179,6 +17270,94 @@ class LibvirtDriverTestCase(test.NoDBTestCase):
         flavor_obj = objects.Flavor(**flavor)
         self._test_migrate_disk_and_power_off(self.context, flavor_obj)
 
+    @mock.patch.object(libvirt_utils, 'copy_image')
+    def test_copy_disks_for_migration(self, mock_copy):
+        copies = [('/base_resize/disk', '/base/disk', True),
+                  ('/base_resize/disk.local', '/base/disk.local', True),
+                  ('/base_resize/disk.config', '/base/disk.config', False)]
+
+        self.drvr._copy_disks_for_migration(copies, 'dest', mock.sentinel.ex,
+                                            mock.sentinel.comp)
+
+        mock_copy.assert_has_calls(
+            [mock.call(src, dst, host='dest', on_execute=mock.sentinel.ex,
+                       on_completion=mock.sentinel.comp,
+                       compression=compression)
+             for src, dst, compression in copies], any_order=True)
+        self.assertEqual(3, mock_copy.call_count)
+
+    @mock.patch.object(libvirt_utils, 'copy_image')
+    def test_copy_disks_for_migration_concurrent(self, mock_copy):
+        self.flags(remote_filesystem_copy_concurrency=2, group='libvirt')
+        running = []
+        max_running = []
+
+        def fake_copy_image(src, dst, **kwargs):
+            running.append(src)
+            max_running.append(len(running))
+            greenthread.sleep(0)
+            running.remove(src)
+
+        mock_copy.side_effect = fake_copy_image
+        copies = [('/src%d' % i, '/dst%d' % i, True) for i in range(5)]
+
+        self.drvr._copy_disks_for_migration(copies, 'dest', None, None)
+
+        self.assertEqual(5, mock_copy.call_count)
+        self.assertEqual(2, max(max_running))
+
+    @mock.patch.object(libvirt_utils, 'copy_image')
+    def test_copy_disks_for_migration_error(self, mock_copy):
+        error = processutils.ProcessExecutionError()
+
+        def fake_copy_image(src, dst, **kwargs):
+            if src == '/src0':
+                raise error
+
+        mock_copy.side_effect = fake_copy_image
+        self.flags(remote_filesystem_copy_retries=0, group='libvirt')
+        copies = [('/src%d' % i, '/dst%d' % i, True) for i in range(3)]
+
+        ex = self.assertRaises(processutils.ProcessExecutionError,
+                               self.drvr._copy_disks_for_migration,
+                               copies, 'dest', None, None)
+
+        self.assertIs(error, ex)
+        # The other copies are not interrupted.
+        self.assertEqual(3, mock_copy.call_count)
+
+    @mock.patch.object(libvirt_utils, 'copy_image')
+    def test_copy_disk_for_migration_retries(self, mock_copy):
+        self.flags(remote_filesystem_copy_retries=2, group='libvirt')
+        mock_copy.side_effect = [processutils.ProcessExecutionError(),
+                                 processutils.ProcessExecutionError(),
+                                 None]
+
+        self.drvr._copy_disk_for_migration('/src', '/dst', 'dest', True,
+                                           None, None)
+
+        self.assertEqual(3, mock_copy.call_count)
+
+        mock_copy.reset_mock()
+        mock_copy.side_effect = processutils.ProcessExecutionError()
+        self.assertRaises(processutils.ProcessExecutionError,
+                          self.drvr._copy_disk_for_migration,
+                          '/src', '/dst', 'dest', True, None, None)
+        self.assertEqual(3, mock_copy.call_count)
+
+    @mock.patch.object(libvirt_utils, 'copy_image')
+    def test_copy_disk_for_migration_killed_not_retried(self, mock_copy):
+        self.flags(remote_filesystem_copy_retries=2, group='libvirt')
+        mock_copy.side_effect = processutils.ProcessExecutionError(
+            exit_code=-signal.SIGKILL)
+
+        self.assertRaises(processutils.ProcessExecutionError,
+                          self.drvr._copy_disk_for_migration,
+                          '/src', '/dst', 'dest', True, None, None)
+        mock_copy.assert_called_once_with(
+            '/src', '/dst', host='dest', on_execute=None, on_completion=None,
+            compression=True)
+
     @mock.patch('nova.virt.libvirt.driver.LibvirtDriver._disconnect_volume')
     def test_migrate_disk_and_power_off_boot_from_volume(self,
                                                          disconnect_volume):
@@ -19698,6 +19877,12 @@ class LibvirtNonblockingTestCase(test.NoDBTestCase):
                 conn.registerCloseCallback,
                 mox.IgnoreArg(),
                 mox.IgnoreArg())
+        eventlet.tpool.execute(
+            conn.nodeDeviceEventRegisterAny,
+            None,
+            fakelibvirt.VIR_NODE_DEVICE_EVENT_ID_LIFECYCLE,
+            mox.IgnoreArg(),
+            mox.IgnoreArg())
         self.mox.ReplayAll()
 
         driver = libvirt_driver.LibvirtDriver(fake.FakeVirtAPI(), True)
@@ -25,6 +25,7 @@ from nova import context
 from nova import exception
 from nova import test
 from nova.tests.unit.virt.libvirt import fakelibvirt
+from nova.tests import uuidsentinel as uuids
 from nova.virt.libvirt import config as vconfig
 from nova.virt.libvirt import guest as libvirt_guest
 from nova.virt.libvirt import host
@@ -40,6 +41,8 @@ class GuestTestCase(test.NoDBTestCase):
         super(GuestTestCase, self).setUp()
 
         self.useFixture(fakelibvirt.FakeLibvirtFixture())
+        libvirt_guest.reset_config_cache()
+        self.addCleanup(libvirt_guest.reset_config_cache)
         self.host = host.Host("qemu:///system")
         self.context = context.get_admin_context()
 
@@ -433,6 +436,55 @@ class GuestTestCase(test.NoDBTestCase):
         self.assertEqual('kvm', result.virt_type)
         self.assertEqual('fake', result.name)
 
+    @mock.patch.object(vconfig.LibvirtConfigGuest, 'parse_str',
+                       autospec=True)
+    def test_get_config_cached(self, mock_parse):
+        self.domain.UUIDString.return_value = uuids.instance
+        self.domain.XMLDesc.return_value = "<domain type='kvm'/>"
+        config = self.guest.get_config()
+        # A new Guest object for the same domain reuses the parsed config
+        guest = libvirt_guest.Guest(self.domain)
+        self.assertIs(config, guest.get_config())
+        self.assertEqual([], guest.get_all_disks())
+        self.assertEqual(1, mock_parse.call_count)
+
+        # But not once the XML of the domain changed
+        self.domain.XMLDesc.return_value = "<domain type='qemu'/>"
+        self.assertIsNot(config, self.guest.get_config())
+        mock_parse.assert_called_with(mock.ANY, "<domain type='qemu'/>")
+        self.assertEqual(2, mock_parse.call_count)
+
+    def test_get_disk(self):
+        self.domain.XMLDesc.return_value = """<domain type='kvm'>
+  <devices>
+    <disk type='file'>
+      <source file='/test/disk'/>
+      <target dev='vda' bus='virtio'/>
+    </disk>
+    <disk type='block'>
+      <source dev='/dev/sdb'/>
+      <target dev='vdb' bus='virtio'/>
+    </disk>
+  </devices>
+</domain>"""
+        self.assertEqual('/dev/sdb', self.guest.get_disk('vdb').source_path)
+        self.assertEqual('vda', self.guest.get_disk('/test/disk').target_dev)
+        self.assertIsNone(self.guest.get_disk('/dev/sdb'))
+        self.assertIsNone(self.guest.get_disk('vdc'))
+
+    @mock.patch.object(libvirt_guest, '_CONFIG_CACHE_SIZE', 1)
+    def test_get_config_cache_size(self):
+        self.domain.UUIDString.return_value = uuids.instance
+        self.domain.XMLDesc.return_value = "<domain type='kvm'/>"
+        self.guest.get_config()
+
+        domain = mock.Mock(spec=fakelibvirt.virDomain)
+        domain.UUIDString.return_value = uuids.other
+        domain.XMLDesc.return_value = "<domain type='kvm'/>"
+        libvirt_guest.Guest(domain).get_config()
+
+        self.assertEqual([uuids.other], list(libvirt_guest._config_cache))
+
     def test_get_devices(self):
         xml = """
 <domain type='qemu'>
@@ -192,6 +192,32 @@ class HostTestCase(test.NoDBTestCase):
         self.assertEqual(got_events[0].transition,
                          event.EVENT_LIFECYCLE_STOPPED)
 
+    def test_event_node_device(self):
+        conn = self.host.get_connection()
+        generation = self.host.get_node_device_generation()
+        self.assertIsNotNone(generation)
+
+        conn._emit_node_device_lifecycle(
+            None, fakelibvirt.VIR_NODE_DEVICE_EVENT_CREATED)
+        self.assertEqual(generation + 1,
+                         self.host.get_node_device_generation())
+
+    @mock.patch.object(host.Host, '_test_connection', return_value=False)
+    def test_node_device_generation_reconnect(self, mock_test_conn):
+        generation = self.host.get_node_device_generation()
+        # The connection is tested and replaced as it is broken, events may
+        # have been missed in between.
+        self.assertEqual(generation + 1,
+                         self.host.get_node_device_generation())
+
+    @mock.patch.object(fakelibvirt.virConnect, 'nodeDeviceEventRegisterAny',
+                       side_effect=fakelibvirt.libvirtError('not supported'))
+    def test_node_device_generation_not_supported(self, mock_register):
+        self.assertIsNone(self.host.get_node_device_generation())
+        mock_register.assert_called_once_with(
+            None, fakelibvirt.VIR_NODE_DEVICE_EVENT_ID_LIFECYCLE,
+            self.host._event_node_device_callback, self.host)
+
     def test_event_emit_delayed_call_delayed(self):
         ev = event.LifecycleEvent(
             "cef19ce0-0ca2-11df-855d-b19fbce37686",
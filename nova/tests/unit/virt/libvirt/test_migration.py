@@ -693,6 +693,137 @@ class MigrationMonitorTestCase(test.NoDBTestCase):
         self.assertFalse(migration.should_switch_to_postcopy(
                 2, 100, 155, "running"))
 
+    def _make_progress(self, *samples):
+        progress = migration.MigrationProgress()
+        for now, kwargs in samples:
+            progress.update(now, libvirt_guest.JobInfo(**kwargs))
+        return progress
+
+    def test_live_migration_progress_estimated(self):
+        # 100MiB/s sent but the remaining data only shrinks by 25MiB/s
+        progress = self._make_progress(
+            (0, dict(data_processed=0, data_remaining=1000 * units.Mi)),
+            (2, dict(data_processed=200 * units.Mi,
+                     data_remaining=950 * units.Mi)))
+
+        self.assertEqual(100 * units.Mi, progress.transfer_rate)
+        self.assertEqual(75 * units.Mi, progress.dirty_rate)
+        self.assertTrue(progress.converging)
+        self.assertEqual(38, progress.predicted_completion())
+        self.assertEqual(9500, progress.required_downtime())
+
+    def test_live_migration_progress_reported(self):
+        progress = self._make_progress(
+            (0, dict(data_remaining=500 * units.Mi, memory_bps=40 * units.Mi,
+                     disk_bps=10 * units.Mi, memory_dirty_rate=25600,
+                     memory_page_size=4 * units.Ki)))
+
+        self.assertEqual(50 * units.Mi, progress.transfer_rate)
+        self.assertEqual(100 * units.Mi, progress.dirty_rate)
+        self.assertFalse(progress.converging)
+        self.assertIsNone(progress.predicted_completion())
+        self.assertEqual(10000, progress.required_downtime())
+
+    def test_live_migration_progress_no_estimate(self):
+        progress = self._make_progress(
+            (0, dict(data_processed=0, data_remaining=1000)))
+
+        self.assertFalse(progress.has_estimate)
+        self.assertFalse(progress.converging)
+        self.assertIsNone(progress.required_downtime())
+
+    def _make_stalled_progress(self, remaining):
+        # Sending 100 bytes/s which are all dirtied again
+        return self._make_progress(
+            (0, dict(data_processed=0, data_remaining=remaining)),
+            (1, dict(data_processed=100, data_remaining=remaining)))
+
+    def test_live_migration_postcopy_adaptive_not_converging(self):
+        self.flags(live_migration_downtime=500, group='libvirt')
+        # 10 secs of downtime would be needed
+        progress = self._make_stalled_progress(1000)
+        self.assertTrue(migration.should_switch_to_postcopy_adaptive(
+            progress, 2, "running"))
+        # But not before the end of the first memory iteration
+        self.assertFalse(migration.should_switch_to_postcopy_adaptive(
+            progress, 1, "running"))
+        self.assertFalse(migration.should_switch_to_postcopy_adaptive(
+            progress, 2, "running (post-copy)"))
+
+        # Fits in the maximum downtime, the downtime will be raised instead
+        progress = self._make_stalled_progress(40)
+        self.assertFalse(migration.should_switch_to_postcopy_adaptive(
+            progress, 2, "running"))
+
+    def test_live_migration_postcopy_adaptive_converging(self):
+        progress = self._make_progress(
+            (0, dict(data_processed=0, data_remaining=1000)),
+            (1, dict(data_processed=100, data_remaining=950)))
+
+        # Predicted to complete in 19 secs
+        self.assertFalse(migration.should_switch_to_postcopy_adaptive(
+            progress, 2, "running"))
+        self.assertFalse(migration.should_switch_to_postcopy_adaptive(
+            progress, 2, "running", time_left=20))
+        self.assertTrue(migration.should_switch_to_postcopy_adaptive(
+            progress, 2, "running", time_left=10))
+
+    @mock.patch.object(libvirt_guest.Guest,
+                       "migrate_configure_max_downtime")
+    def test_live_migration_update_downtime_adaptive_converging(self,
+                                                                mock_dt):
+        self.flags(live_migration_downtime=500,
+                   live_migration_downtime_steps=10, group='libvirt')
+        progress = self._make_progress(
+            (0, dict(data_processed=0, data_remaining=1000)),
+            (1, dict(data_processed=100, data_remaining=950)))
+
+        newdt = migration.update_downtime_adaptive(
+            self.guest, self.instance, None, progress)
+        self.assertEqual(50, newdt)
+        mock_dt.assert_called_once_with(50)
+
+        # Already set
+        newdt = migration.update_downtime_adaptive(
+            self.guest, self.instance, 50, progress)
+        self.assertEqual(50, newdt)
+        mock_dt.assert_called_once_with(50)
+
+    @mock.patch.object(libvirt_guest.Guest,
+                       "migrate_configure_max_downtime")
+    def test_live_migration_update_downtime_adaptive_stalled(self, mock_dt):
+        self.flags(live_migration_downtime=500,
+                   live_migration_downtime_steps=10, group='libvirt')
+
+        # 200ms are needed to transfer what remains
+        newdt = migration.update_downtime_adaptive(
+            self.guest, self.instance, 50, self._make_stalled_progress(20))
+        self.assertEqual(220, newdt)
+        mock_dt.assert_called_once_with(220)
+
+        # Capped to the maximum downtime
+        newdt = migration.update_downtime_adaptive(
+            self.guest, self.instance, 220, self._make_stalled_progress(100))
+        self.assertEqual(500, newdt)
+        mock_dt.assert_called_with(500)
+
+        # Never lowered
+        newdt = migration.update_downtime_adaptive(
+            self.guest, self.instance, 500, self._make_stalled_progress(10))
+        self.assertEqual(500, newdt)
+        self.assertEqual(2, mock_dt.call_count)
+
+    @mock.patch.object(libvirt_guest.Guest,
+                       "migrate_configure_max_downtime")
+    def test_live_migration_update_downtime_adaptive_no_estimate(self,
+                                                                 mock_dt):
+        progress = self._make_progress(
+            (0, dict(data_processed=0, data_remaining=1000)))
+        newdt = migration.update_downtime_adaptive(
+            self.guest, self.instance, None, progress)
+        self.assertIsNone(newdt)
+        self.assertFalse(mock_dt.called)
+
     @mock.patch.object(libvirt_guest.Guest,
                        "migrate_configure_max_downtime")
     def test_live_migration_update_downtime_no_steps(self, mock_dt):
@@ -166,6 +166,7 @@ class RemoteFSTestCase(test.NoDBTestCase):
                                          '/home/favourite', None, None,
                                          compression=True)
         mock_execute.assert_called_once_with('rsync', '-r', '--sparse',
+                                             '--partial',
                                              '1.2.3.4:/home/star_wars',
                                              '/home/favourite',
                                              '--compress',
@@ -178,6 +179,7 @@ class RemoteFSTestCase(test.NoDBTestCase):
                                          '/home/favourite', None, None,
                                          compression=False)
         mock_execute.assert_called_once_with('rsync', '-r', '--sparse',
+                                             '--partial',
                                              '1.2.3.4:/home/star_wars',
                                              '/home/favourite',
                                              on_completion=None,
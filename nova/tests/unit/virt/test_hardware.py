@@ -1807,6 +1807,88 @@ class VirtNUMAHostTopologyTestCase(test.NoDBTestCase):
         self.assertIsInstance(instance_topology, objects.InstanceNUMATopology)
         self.assertEqual(1, instance_topology.cells[0].id)
 
+    def _get_host(self, num_cells, memory_usage=None):
+        memory_usage = memory_usage or [0] * num_cells
+        return objects.NUMATopology(cells=[
+            objects.NUMACell(id=i, cpuset=set([2 * i, 2 * i + 1]),
+                             memory=2048, cpu_usage=0,
+                             memory_usage=memory_usage[i], mempages=[],
+                             siblings=[set([2 * i]), set([2 * i + 1])],
+                             pinned_cpus=set([]))
+            for i in range(num_cells)])
+
+    def test_get_fitting_ordered(self):
+        host = self._get_host(3, memory_usage=[512, 0, 1024])
+        instance_topology = hw.numa_fit_instance_to_host(
+                host, self.instance3, self.limits)
+        self.assertEqual(0, instance_topology.cells[0].id)
+
+    def test_get_fitting_pack(self):
+        self.flags(numa_cell_placement_policy='pack', group='compute')
+        host = self._get_host(3, memory_usage=[512, 0, 1024])
+        instance_topology = hw.numa_fit_instance_to_host(
+                host, self.instance3, self.limits)
+        self.assertEqual(2, instance_topology.cells[0].id)
+
+    def test_get_fitting_spread(self):
+        self.flags(numa_cell_placement_policy='spread', group='compute')
+        host = self._get_host(3, memory_usage=[512, 0, 1024])
+        instance_topology = hw.numa_fit_instance_to_host(
+                host, self.instance3, self.limits)
+        self.assertEqual(1, instance_topology.cells[0].id)
+
+    def test_get_fitting_does_not_modify_instance(self):
+        instance_topology = hw.numa_fit_instance_to_host(
+                self.host, self.instance3, self.limits)
+        self.assertEqual(1, instance_topology.cells[0].id)
+        self.assertEqual(0, self.instance3.cells[0].id)
+
+    def test_get_fitting_fits_each_cell_pair_once(self):
+        host = self._get_host(4)
+        instance = objects.InstanceNUMATopology(cells=[
+            objects.InstanceNUMACell(id=0, cpuset=set([0, 1]), memory=1024),
+            objects.InstanceNUMACell(id=1, cpuset=set([2, 3]), memory=1024)])
+        pci_reqs = [objects.InstancePCIRequest(
+            count=1, spec=[{'vendor_id': '8086'}])]
+        pci_stats = stats.PciDeviceStats()
+        with test.nested(
+            mock.patch.object(hw, '_numa_fit_instance_cell',
+                              wraps=hw._numa_fit_instance_cell),
+            mock.patch.object(stats.PciDeviceStats, 'support_requests',
+                              return_value=False),
+        ) as (mock_fit, mock_support):
+            self.assertIsNone(hw.numa_fit_instance_to_host(
+                host, instance, pci_requests=pci_reqs, pci_stats=pci_stats))
+        # All the 12 assignments are tried but each pair of cells is only
+        # fitted once.
+        self.assertEqual(12, mock_support.call_count)
+        self.assertEqual(8, mock_fit.call_count)
+
+    def test_get_fitting_pruned_by_capacity(self):
+        host = self._get_host(4)
+        instance = objects.InstanceNUMATopology(cells=[
+            objects.InstanceNUMACell(id=0, cpuset=set([0, 1]), memory=1024),
+            objects.InstanceNUMACell(id=1, cpuset=set([2, 3, 4]),
+                                     memory=1024)])
+        with mock.patch.object(hw, '_numa_fit_instance_cell') as mock_fit:
+            self.assertIsNone(hw.numa_fit_instance_to_host(host, instance))
+        mock_fit.assert_not_called()
+
+    def test_get_fitting_pruned_by_matching(self):
+        # Only host cell 0 can fit the pinned instance cells, so no
+        # assignment is possible.
+        host = self._get_host(3)
+        for cell in host.cells[1:]:
+            cell.pinned_cpus = set(cell.cpuset)
+        instance = objects.InstanceNUMATopology(cells=[
+            objects.InstanceNUMACell(
+                id=i, cpuset=set([i]), memory=512,
+                cpu_policy=fields.CPUAllocationPolicy.DEDICATED)
+            for i in range(2)])
+        with mock.patch.object(hw, '_numa_fit_instance_cell') as mock_fit:
+            self.assertIsNone(hw.numa_fit_instance_to_host(host, instance))
+        mock_fit.assert_not_called()
+
 
 class NumberOfSerialPortsTest(test.NoDBTestCase):
     def test_flavor(self):
@@ -1526,10 +1526,11 @@ def numa_fit_instance_to_host(
     """Fit the instance topology onto the host topology.
 
     Given a host, instance topology, and (optional) limits, attempt to
-    fit instance cells onto all permutations of host cells by calling
-    the _fit_instance_cell method, and return a new InstanceNUMATopology
+    fit instance cells onto distinct host cells by calling the
+    _numa_fit_instance_cell method, and return a new InstanceNUMATopology
     with its cell ids set to host cell ids of the first successful
-    permutation, or None.
+    assignment, or None. Host cells are tried in the order given by the
+    [compute]/numa_cell_placement_policy option.
 
     :param host_topology: objects.NUMATopology object to fit an
                           instance on
@@ -1557,7 +1558,7 @@ def numa_fit_instance_to_host(
     if 'emulator_threads_policy' in instance_topology:
         emulator_threads_policy = instance_topology.emulator_threads_policy
 
-    host_cells = host_topology.cells
+    host_cells = _sort_host_cells_for_fit(host_topology.cells)
 
     # If PCI device(s) are not required, prefer host cells that don't have
     # devices attached. Presence of a given numa_node in a PCI pool is
@@ -1566,42 +1567,167 @@ def numa_fit_instance_to_host(
         host_cells = sorted(host_cells, key=lambda cell: cell.id in [
             pool['numa_node'] for pool in pci_stats.pools])
 
-    # TODO(ndipanov): We may want to sort permutations differently
-    # depending on whether we want packing/spreading over NUMA nodes
-    for host_cell_perm in itertools.permutations(
-            host_cells, len(instance_topology)):
-        cells = []
-        for host_cell, instance_cell in zip(
-                host_cell_perm, instance_topology.cells):
+    for cells in _numa_fit_instance_cells(host_cells, instance_topology,
+                                          limits):
+        if not pci_requests or ((pci_stats is not None) and
+                pci_stats.support_requests(pci_requests, cells)):
+            return objects.InstanceNUMATopology(
+                cells=cells,
+                emulator_threads_policy=emulator_threads_policy)
+
+
+def _sort_host_cells_for_fit(host_cells):
+    """Sort host cells according to the NUMA cell placement policy.
+
+    :param host_cells: list of objects.NUMACell to sort
+    :returns: the list of host cells, sorted in the order they should be
+              tried when fitting instance cells
+    """
+    policy = CONF.compute.numa_cell_placement_policy
+    if policy not in ('pack', 'spread'):
+        return list(host_cells)
+
+    def _free_resources(cell):
+        return (cell.memory - cell.memory_usage,
+                len(cell.cpuset) - cell.cpu_usage)
+
+    return sorted(host_cells, key=_free_resources,
+                  reverse=(policy == 'spread'))
+
+
+def _numa_cell_fits_capacity(host_cell, instance_cell, cpuset_reserved=0):
+    """Check the capacity bounds of fitting an instance cell onto a host cell.
+
+    This is a quick check of the conditions _numa_fit_instance_cell requires
+    first. It can only rule out host cells, a host cell passing it may still
+    not fit the instance cell.
+
+    :param host_cell: objects.NUMACell to fit the instance cell onto
+    :param instance_cell: objects.InstanceNUMACell to fit
+    :param cpuset_reserved: An int to indicate the number of CPUs overhead
+
+    :returns: False if the instance cell cannot fit onto the host cell
+    """
+    required_cpus = len(instance_cell.cpuset) + cpuset_reserved
+    if (instance_cell.memory > host_cell.memory or
+            required_cpus > len(host_cell.cpuset)):
+        return False
+    if instance_cell.cpu_pinning_requested:
+        return (required_cpus <= host_cell.avail_cpus and
+                instance_cell.memory <= host_cell.avail_memory)
+    return True
+
+
+def _numa_cells_matchable(candidates, excluded):
+    """Check that every instance cell can get a distinct host cell.
+
+    :param candidates: dict of the indexes of the host cells which may fit
+                       each instance cell, by instance cell index
+    :param excluded: set of the indexes of the host cells already used
+    :returns: True if there is a matching of the instance cells with distinct
+              host cells among the candidates
+    """
+    matches = {}
+
+    def _augment(instance_idx, seen):
+        for host_idx in candidates[instance_idx]:
+            if host_idx in excluded or host_idx in seen:
+                continue
+            seen.add(host_idx)
+            if (host_idx not in matches or
+                    _augment(matches[host_idx], seen)):
+                matches[host_idx] = instance_idx
+                return True
+        return False
+
+    return all(_augment(instance_idx, set()) for instance_idx in candidates)
+
+
+def _numa_fit_instance_cells(host_cells, instance_topology, limits=None):
+    """Generate the fits of the instance cells onto distinct host cells.
+
+    The assignments are searched with backtracking, trying the host cells in
+    the given order for each instance cell, so they are generated in the same
+    order as the permutations of the host cells would be. The fit of each
+    pair of host and instance cells is computed at most once, and branches
+    which cannot lead to an assignment of all the instance cells are pruned
+    using the capacity bounds of the host cells and the fits already known.
+
+    :param host_cells: list of objects.NUMACell to fit the instance cells onto
+    :param instance_topology: objects.InstanceNUMATopology to be fitted
+    :param limits: objects.NUMATopologyLimits that defines limits
+
+    :returns: a generator of lists of objects.InstanceNUMACell, one for each
+              instance cell with its id set to that of a distinct host cell
+    """
+    instance_cells = instance_topology.cells
+
+    def _cpuset_reserved(instance_idx):
+        # For the case of isolate emulator threads, to make predictable where
+        # that CPU overhead is located we always configure it to be on host
+        # NUMA node associated to the guest NUMA node 0.
+        if instance_topology.emulator_threads_isolated and instance_idx == 0:
+            return 1
+        return 0
+
+    candidates = {}
+    for instance_idx, instance_cell in enumerate(instance_cells):
+        candidates[instance_idx] = [
+            host_idx for host_idx, host_cell in enumerate(host_cells)
+            if _numa_cell_fits_capacity(host_cell, instance_cell,
+                                        _cpuset_reserved(instance_idx))]
+
+    fits = {}
+
+    def _fit(host_idx, instance_idx):
+        if (host_idx, instance_idx) not in fits:
+            # NOTE: _numa_fit_instance_cell updates the instance cell it is
+            # given, so every pair works on its own copy.
+            instance_cell = instance_cells[instance_idx].obj_clone()
             try:
-                cpuset_reserved = 0
-                if (instance_topology.emulator_threads_isolated
-                    and len(cells) == 0):
-                    # For the case of isolate emulator threads, to
-                    # make predictable where that CPU overhead is
-                    # located we always configure it to be on host
-                    # NUMA node associated to the guest NUMA node
-                    # 0.
-                    cpuset_reserved = 1
                 got_cell = _numa_fit_instance_cell(
-                    host_cell, instance_cell, limits, cpuset_reserved)
+                    host_cells[host_idx], instance_cell, limits,
+                    _cpuset_reserved(instance_idx))
             except exception.MemoryPageSizeNotSupported:
                 # This exception will been raised if instance cell's
                 # custom pagesize is not supported with host cell in
                 # _numa_cell_supports_pagesize_request function.
-                break
+                got_cell = None
+            fits[(host_idx, instance_idx)] = got_cell
             if got_cell is None:
-                break
-            cells.append(got_cell)
+                candidates[instance_idx].remove(host_idx)
+        return fits[(host_idx, instance_idx)]
 
-        if len(cells) != len(host_cell_perm):
-            continue
+    if not _numa_cells_matchable(candidates, set()):
+        LOG.debug('Not enough host cells have the capacity to fit the '
+                  'instance cells.')
+        return
 
-        if not pci_requests or ((pci_stats is not None) and
-                pci_stats.support_requests(pci_requests, cells)):
-            return objects.InstanceNUMATopology(
-                cells=cells,
-                emulator_threads_policy=emulator_threads_policy)
+    used = set()
+    cells = []
+
+    def _assign(instance_idx):
+        if instance_idx == len(instance_cells):
+            yield list(cells)
+            return
+        for host_idx in list(candidates[instance_idx]):
+            if host_idx in used:
+                continue
+            got_cell = _fit(host_idx, instance_idx)
+            if got_cell is None:
+                continue
+            used.add(host_idx)
+            cells.append(got_cell)
+            remaining = dict((idx, candidates[idx]) for idx in
+                             range(instance_idx + 1, len(instance_cells)))
+            if _numa_cells_matchable(remaining, used):
+                for assignment in _assign(instance_idx + 1):
+                    yield assignment
+            cells.pop()
+            used.remove(host_idx)
+
+    for assignment in _assign(0):
+        yield assignment
 
 
 def numa_get_reserved_huge_pages():
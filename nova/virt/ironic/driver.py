@@ -77,7 +77,15 @@ _UNPROVISION_STATES = (ironic_states.ACTIVE, ironic_states.DEPLOYFAIL,
 
 _NODE_FIELDS = ('uuid', 'power_state', 'target_power_state', 'provision_state',
                 'target_provision_state', 'last_error', 'maintenance',
-                'properties', 'instance_uuid', 'traits', 'resource_class')
+                'properties', 'instance_uuid', 'traits', 'resource_class',
+                'updated_at')
+
+# Fields listed to find the nodes updated since they were cached
+_NODE_UPDATE_FIELDS = ('uuid', 'instance_uuid', 'updated_at')
+
+# Maximum number of updated nodes fetched one by one when refreshing the node
+# cache, above which all the nodes are listed again instead
+_NODE_CACHE_MAX_NODE_GETS = 50
 
 # Console state checking interval in seconds
 _CONSOLE_STATE_CHECKING_INTERVAL = 1
@@ -162,6 +170,9 @@ class IronicDriver(virt_driver.ComputeDriver):
             default='nova.virt.firewall.NoopFirewallDriver')
         self.node_cache = {}
         self.node_cache_time = 0
+        self._node_cache_full_refresh_time = 0
+        self.hash_ring = None
+        self._hash_ring_services = None
         self.servicegroup_api = servicegroup.API()
 
         self.ironicclient = client_wrapper.IronicClientWrapper()
@@ -654,45 +665,102 @@ class IronicDriver(virt_driver.ComputeDriver):
     def _refresh_hash_ring(self, ctxt):
         service_list = objects.ServiceList.get_all_computes_by_hv_type(
             ctxt, self._get_hypervisor_type())
-        services = set()
-        for svc in service_list:
-            is_up = self.servicegroup_api.service_is_up(svc)
-            if is_up:
-                services.add(svc.host)
+        services = set(
+            svc.host for svc, is_up in zip(
+                service_list,
+                self.servicegroup_api.services_are_up(service_list))
+            if is_up)
         # NOTE(jroll): always make sure this service is in the list, because
         # only services that have something registered in the compute_nodes
         # table will be here so far, and we might be brand new.
         services.add(CONF.host)
 
+        # The hash ring only changes when the set of services does.
+        if self.hash_ring is not None and services == self._hash_ring_services:
+            return
         self.hash_ring = hash_ring.HashRing(services,
                                             partitions=_HASH_RING_PARTITIONS)
+        self._hash_ring_services = services
 
-    def _refresh_cache(self):
+    def _manages_node(self, node, instances):
+        """Check if this compute service manages a node.
+
+        :param node: the node, with at least its uuid and instance_uuid
+        :param instances: the UUIDs of the instances of this compute service
+        """
+        # NOTE(jroll): we always manage the nodes for instances we manage
+        if node.instance_uuid in instances:
+            return True
+
+        # NOTE(jroll): check if the node matches us in the hash ring, and
+        # does not have an instance_uuid (which would imply the node has
+        # an instance managed by another compute service).
+        # Note that this means nodes with an instance that was deleted in
+        # nova while the service was down, and not yet reaped, will not be
+        # reported until the periodic task cleans it up.
+        return (node.instance_uuid is None and
+                CONF.host in
+                self.hash_ring.get_nodes(node.uuid.encode('utf-8')))
+
+    def _get_updated_node_cache(self, instances):
+        """Update the node cache from the nodes updated since they were cached.
+
+        :param instances: the UUIDs of the instances of this compute service
+        :returns: the new node cache, or None if too many nodes were updated
+                  and all the nodes must be listed again
+        """
+        node_cache = {}
+        updated_nodes = []
         # NOTE(lucasagomes): limit == 0 is an indicator to continue
         # pagination until there're no more values to be returned.
+        for node in self._get_node_list(fields=_NODE_UPDATE_FIELDS, limit=0):
+            if not self._manages_node(node, instances):
+                continue
+            cached_node = self.node_cache.get(node.uuid)
+            if (cached_node is None or
+                    cached_node.instance_uuid != node.instance_uuid or
+                    cached_node.updated_at != node.updated_at):
+                updated_nodes.append(node.uuid)
+            else:
+                node_cache[node.uuid] = cached_node
+
+        if len(updated_nodes) > _NODE_CACHE_MAX_NODE_GETS:
+            return None
+
+        for node_uuid in updated_nodes:
+            try:
+                node_cache[node_uuid] = self._get_node(node_uuid)
+            except ironic.exc.NotFound:
+                LOG.debug("Node %s was deleted while refreshing the node "
+                          "cache.", node_uuid)
+        LOG.debug("Refreshed %(updated)d updated node(s) out of %(total)d "
+                  "node(s) in the node cache.",
+                  {'updated': len(updated_nodes), 'total': len(node_cache)})
+        return node_cache
+
+    def _refresh_cache(self):
         ctxt = nova_context.get_admin_context()
         self._refresh_hash_ring(ctxt)
         instances = objects.InstanceList.get_uuids_by_host(ctxt, CONF.host)
-        node_cache = {}
-
-        for node in self._get_node_list(detail=True, limit=0):
-            # NOTE(jroll): we always manage the nodes for instances we manage
-            if node.instance_uuid in instances:
-                node_cache[node.uuid] = node
-
-            # NOTE(jroll): check if the node matches us in the hash ring, and
-            # does not have an instance_uuid (which would imply the node has
-            # an instance managed by another compute service).
-            # Note that this means nodes with an instance that was deleted in
-            # nova while the service was down, and not yet reaped, will not be
-            # reported until the periodic task cleans it up.
-            elif (node.instance_uuid is None and
-                  CONF.host in
-                  self.hash_ring.get_nodes(node.uuid.encode('utf-8'))):
-                node_cache[node.uuid] = node
+        node_cache = None
+
+        now = time.time()
+        interval = CONF.ironic.node_cache_full_refresh_interval
+        if (interval and self.node_cache and
+                now - self._node_cache_full_refresh_time < interval):
+            node_cache = self._get_updated_node_cache(instances)
+
+        if node_cache is None:
+            # NOTE(lucasagomes): limit == 0 is an indicator to continue
+            # pagination until there're no more values to be returned.
+            node_cache = {}
+            for node in self._get_node_list(fields=_NODE_FIELDS, limit=0):
+                if self._manages_node(node, instances):
+                    node_cache[node.uuid] = node
+            self._node_cache_full_refresh_time = now
 
         self.node_cache = node_cache
-        self.node_cache_time = time.time()
+        self.node_cache_time = now
         # For Pike, we need to ensure that all instances have their flavor
         # migrated to include the resource_class. Since there could be many,
         # many instances controlled by this host, spawn this asynchronously so
@@ -842,6 +910,22 @@ class IronicDriver(virt_driver.ComputeDriver):
             self.node_cache[node_uuid] = node
             return node
 
+    def _cached_node_for_instance(self, instance):
+        """Return the node of an instance from the cache, if it is recent.
+
+        :param instance: the instance object.
+        :returns: the node, or None if the node cache is older than
+                  [ironic]/node_cache_max_age or does not have the node of
+                  the instance
+        """
+        max_age = CONF.ironic.node_cache_max_age
+        if not max_age or time.time() - self.node_cache_time > max_age:
+            return None
+        node = self.node_cache.get(instance.node)
+        if node is None or node.instance_uuid != instance.uuid:
+            return None
+        return node
+
     def get_info(self, instance):
         """Get the current state and resource usage for this instance.
 
@@ -851,11 +935,13 @@ class IronicDriver(virt_driver.ComputeDriver):
         :param instance: the instance object.
         :returns: an InstanceInfo object
         """
-        try:
-            node = self._validate_instance_and_node(instance)
-        except exception.InstanceNotFound:
-            return hardware.InstanceInfo(
-                state=map_power_state(ironic_states.NOSTATE))
+        node = self._cached_node_for_instance(instance)
+        if node is None:
+            try:
+                node = self._validate_instance_and_node(instance)
+            except exception.InstanceNotFound:
+                return hardware.InstanceInfo(
+                    state=map_power_state(ironic_states.NOSTATE))
 
         properties = self._parse_node_properties(node)
         memory_kib = properties['memory_mb'] * 1024
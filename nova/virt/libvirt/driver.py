@@ -37,6 +37,8 @@ import operator
 import os
 import pwd
 import shutil
+import signal
+import sys
 import tempfile
 import time
 import uuid
@@ -362,6 +364,8 @@ class LibvirtDriver(driver.ComputeDriver):
         self._fc_wwpns = None
         self._caps = None
         self._supported_perf_events = []
+        self._pci_dev_info_cache = {}
+        self._pci_dev_info_generation = None
         self.firewall_driver = firewall.load_driver(
             DEFAULT_FIREWALL_DRIVER,
             host=self._host)
@@ -5942,9 +5946,26 @@ class LibvirtDriver(driver.ComputeDriver):
             else:
                 raise
 
+        # NOTE: Parsing the XML of every node device is expensive on hosts
+        # with many devices, but their information only changes when libvirt
+        # sends a node device event, so it is kept until then.
+        generation = self._host.get_node_device_generation()
+        if (generation is None or
+                generation != self._pci_dev_info_generation):
+            self._pci_dev_info_cache = {}
+
+        pci_info_cache = {}
         pci_info = []
         for name in dev_names:
-            pci_info.append(self._get_pcidev_info(name))
+            info = self._pci_dev_info_cache.get(name)
+            if info is None:
+                info = self._get_pcidev_info(name)
+            pci_info_cache[name] = info
+            pci_info.append(info)
+
+        if generation is not None:
+            self._pci_dev_info_cache = pci_info_cache
+        self._pci_dev_info_generation = generation
 
         return jsonutils.dumps(pci_info)
 
@@ -6411,10 +6432,23 @@ class LibvirtDriver(driver.ComputeDriver):
         # See: https://bugs.launchpad.net/nova/+bug/1215593
         data["supported_instances"] = self._get_instance_capabilities()
 
+        # NOTE: These go through every guest or every node device and mostly
+        # wait on libvirt, qemu-img and the database, so they are gathered
+        # concurrently rather than one after the other.
+        collectors = {
+            'vcpus_used': self._get_vcpu_used,
+            'disk_over_committed': self._get_disk_over_committed_size_total,
+            'pci_passthrough_devices': self._get_pci_passthrough_devices,
+            'numa_topology': self._get_host_numa_topology,
+        }
+        threads = {name: utils.spawn(collector)
+                   for name, collector in collectors.items()}
+        collected = {name: thread.wait() for name, thread in threads.items()}
+
         data["vcpus"] = self._get_vcpu_total()
         data["memory_mb"] = self._host.get_memory_mb_total()
         data["local_gb"] = disk_info_dict['total']
-        data["vcpus_used"] = self._get_vcpu_used()
+        data["vcpus_used"] = collected['vcpus_used']
         data["memory_mb_used"] = self._host.get_memory_mb_used()
         data["local_gb_used"] = disk_info_dict['used']
         data["hypervisor_type"] = self._host.get_driver_type()
@@ -6432,14 +6466,14 @@ class LibvirtDriver(driver.ComputeDriver):
         data["cpu_info"] = jsonutils.dumps(self._get_cpu_info())
 
         disk_free_gb = disk_info_dict['free']
-        disk_over_committed = self._get_disk_over_committed_size_total()
+        disk_over_committed = collected['disk_over_committed']
         available_least = disk_free_gb * units.Gi - disk_over_committed
         data['disk_available_least'] = available_least / units.Gi
 
         data['pci_passthrough_devices'] = \
-            self._get_pci_passthrough_devices()
+            collected['pci_passthrough_devices']
 
-        numa_topology = self._get_host_numa_topology()
+        numa_topology = collected['numa_topology']
         if numa_topology:
             data['numa_topology'] = numa_topology._to_json()
         else:
@@ -7159,6 +7193,9 @@ class LibvirtDriver(driver.ComputeDriver):
         progress_watermark = None
         previous_data_remaining = -1
         is_post_copy_enabled = self._is_post_copy_enabled(migration_flags)
+        progress = None
+        if CONF.libvirt.live_migration_adaptive_control:
+            progress = libvirt_migrate.MigrationProgress()
         while True:
             info = guest.get_job_info()
 
@@ -7191,6 +7228,8 @@ class LibvirtDriver(driver.ComputeDriver):
 
                 now = time.time()
                 elapsed = now - start
+                if progress is not None:
+                    progress.update(now, info)
 
                 if ((progress_watermark is None) or
                     (progress_watermark == 0) or
@@ -7214,18 +7253,34 @@ class LibvirtDriver(driver.ComputeDriver):
                         self._clear_empty_migration(instance)
                         raise
 
-                if (is_post_copy_enabled and
-                    libvirt_migrate.should_switch_to_postcopy(
-                    info.memory_iteration, info.data_remaining,
-                    previous_data_remaining, migration.status)):
+                if not is_post_copy_enabled:
+                    switch_to_postcopy = False
+                elif progress is not None:
+                    time_left = None
+                    if completion_timeout:
+                        time_left = completion_timeout - elapsed
+                    switch_to_postcopy = (
+                        libvirt_migrate.should_switch_to_postcopy_adaptive(
+                            progress, info.memory_iteration,
+                            migration.status, time_left))
+                else:
+                    switch_to_postcopy = (
+                        libvirt_migrate.should_switch_to_postcopy(
+                            info.memory_iteration, info.data_remaining,
+                            previous_data_remaining, migration.status))
+                if switch_to_postcopy:
                     libvirt_migrate.trigger_postcopy_switch(guest,
                                                             instance,
                                                             migration)
                 previous_data_remaining = info.data_remaining
 
-                curdowntime = libvirt_migrate.update_downtime(
-                    guest, instance, curdowntime,
-                    downtime_steps, elapsed)
+                if progress is not None:
+                    curdowntime = libvirt_migrate.update_downtime_adaptive(
+                        guest, instance, curdowntime, progress)
+                else:
+                    curdowntime = libvirt_migrate.update_downtime(
+                        guest, instance, curdowntime,
+                        downtime_steps, elapsed)
 
                 # We loop every 500ms, so don't log on every
                 # iteration to avoid spamming logs for long
@@ -7250,7 +7305,7 @@ class LibvirtDriver(driver.ComputeDriver):
                                           100 / info.memory_total)
 
                     libvirt_migrate.save_stats(instance, migration,
-                                               info, remaining)
+                                               info, remaining, progress)
 
                     lg = LOG.debug
                     if (n % 60) == 0:
@@ -8177,6 +8232,7 @@ class LibvirtDriver(driver.ComputeDriver):
             on_completion = lambda process: \
                 self.job_tracker.remove_job(instance, process.pid)
 
+            copies = []
             for info in disk_info:
                 # assume inst_base == dirname(info['path'])
                 img_path = info['path']
@@ -8192,10 +8248,9 @@ class LibvirtDriver(driver.ComputeDriver):
                     continue
 
                 compression = info['type'] not in NO_COMPRESSION_TYPES
-                libvirt_utils.copy_image(from_path, img_path, host=dest,
-                                         on_execute=on_execute,
-                                         on_completion=on_completion,
-                                         compression=compression)
+                copies.append((from_path, img_path, compression))
+            self._copy_disks_for_migration(copies, dest, on_execute,
+                                           on_completion)
 
             # Ensure disk.info is written to the new path to avoid disks being
             # reinspected and potentially changing format.
@@ -8214,6 +8269,55 @@ class LibvirtDriver(driver.ComputeDriver):
 
         return jsonutils.dumps(disk_info)
 
+    def _copy_disks_for_migration(self, copies, dest, on_execute,
+                                  on_completion):
+        """Copy the disks of an instance to the destination of a migration.
+
+        The disks are copied concurrently, up to
+        CONF.libvirt.remote_filesystem_copy_concurrency at a time, and all
+        the copies are waited for before the first error is raised.
+
+        :param copies: List of (source path, destination path, compression)
+        :param dest: Destination host, None if the storage is shared
+        """
+        pool = eventlet.GreenPool(
+            CONF.libvirt.remote_filesystem_copy_concurrency)
+        threads = [pool.spawn(self._copy_disk_for_migration, src, dst, dest,
+                              compression, on_execute, on_completion)
+                   for src, dst, compression in copies]
+        error = None
+        for thread in threads:
+            try:
+                thread.wait()
+            except Exception:
+                if error is None:
+                    error = sys.exc_info()
+        if error is not None:
+            six.reraise(*error)
+
+    @staticmethod
+    def _copy_disk_for_migration(src, dst, dest, compression, on_execute,
+                                 on_completion):
+        attempts = CONF.libvirt.remote_filesystem_copy_retries + 1
+        for attempt in range(1, attempts + 1):
+            try:
+                libvirt_utils.copy_image(src, dst, host=dest,
+                                         on_execute=on_execute,
+                                         on_completion=on_completion,
+                                         compression=compression)
+                return
+            except processutils.ProcessExecutionError as e:
+                # NOTE: The copies are killed by the job tracker when the
+                # instance is deleted, they must not be started again.
+                if attempt == attempts or e.exit_code == -signal.SIGKILL:
+                    raise
+                LOG.warning('Copy of disk %(src)s to %(dest)s failed, '
+                            'retrying (attempt %(attempt)d of %(attempts)d): '
+                            '%(error)s',
+                            {'src': src, 'dest': dest or dst,
+                             'attempt': attempt + 1, 'attempts': attempts,
+                             'error': e})
+
     def _wait_for_running(self, instance):
         state = self.get_info(instance).state
 
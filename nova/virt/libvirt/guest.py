@@ -27,9 +27,9 @@ higher level APIs around the raw libvirt API. These APIs are
 then used by all the other libvirt related classes
 """
 
+import collections
 import time
 
-from lxml import etree
 from oslo_log import log as logging
 from oslo_service import loopingcall
 from oslo_utils import encodeutils
@@ -76,6 +76,18 @@ LIBVIRT_POWER_STATE = {
     VIR_DOMAIN_PMSUSPENDED: power_state.SUSPENDED,
 }
 
+# NOTE: Parsing the XML of a domain is expensive, so the config last parsed
+# for each domain is kept along with its XML and reused for as long as
+# libvirt returns the same XML. The least recently used are dropped first.
+_CONFIG_CACHE_SIZE = 1024
+_config_cache = collections.OrderedDict()
+
+
+def reset_config_cache():
+    """Reset the cache of parsed guest configs, mainly for testing purposes.
+    """
+    _config_cache.clear()
+
 
 class Guest(object):
 
@@ -110,6 +122,25 @@ class Guest(object):
     def _encoded_xml(self):
         return encodeutils.safe_decode(self._domain.XMLDesc(0))
 
+    def _get_cached_config(self):
+        """Returns the config of the guest, parsing its XML only if it
+        changed since the last call for the same domain.
+
+        The config instance is shared and must not be modified.
+        """
+        xml = self._domain.XMLDesc(0)
+        uuid = self.uuid
+        cached = _config_cache.pop(uuid, None)
+        if cached is not None and cached[0] == xml:
+            config = cached[1]
+        else:
+            config = vconfig.LibvirtConfigGuest()
+            config.parse_str(xml)
+        _config_cache[uuid] = (xml, config)
+        if len(_config_cache) > _CONFIG_CACHE_SIZE:
+            _config_cache.popitem(last=False)
+        return config
+
     @classmethod
     def create(cls, xml, host):
         """Create a new Guest
@@ -208,20 +239,9 @@ class Guest(object):
 
     def get_interfaces(self):
         """Returns a list of all network interfaces for this domain."""
-        doc = None
-
-        try:
-            doc = etree.fromstring(self._encoded_xml)
-        except Exception:
-            return []
-
-        interfaces = []
-
-        nodes = doc.findall('./devices/interface/target')
-        for target in nodes:
-            interfaces.append(target.get('dev'))
-
-        return interfaces
+        return [interface.target_dev for interface in
+                self.get_all_devices(vconfig.LibvirtConfigGuestInterface)
+                if interface.target_dev]
 
     def get_interface_by_cfg(self, cfg):
         """Lookup a full LibvirtConfigGuestInterface with
@@ -305,34 +325,30 @@ class Guest(object):
     def get_config(self):
         """Returns the config instance for a guest
 
+        The instance may be shared with other callers and must not be
+        modified.
+
         :returns: LibvirtConfigGuest instance
         """
-        config = vconfig.LibvirtConfigGuest()
-        config.parse_str(self._domain.XMLDesc(0))
-        return config
+        return self._get_cached_config()
 
     def get_disk(self, device):
         """Returns the disk mounted at device
 
         :returns LivirtConfigGuestDisk: mounted at device or None
         """
-        try:
-            doc = etree.fromstring(self._domain.XMLDesc(0))
-        except Exception:
-            return None
+        disks = self.get_all_disks()
 
         # FIXME(lyarwood): Workaround for the device being either a target dev
         # when called via swap_volume or source file when called via
         # live_snapshot. This should be removed once both are refactored to use
         # only the target dev of the device.
-        node = doc.find("./devices/disk/target[@dev='%s'].." % device)
-        if node is None:
-            node = doc.find("./devices/disk/source[@file='%s'].." % device)
-
-        if node is not None:
-            conf = vconfig.LibvirtConfigGuestDisk()
-            conf.parse_dom(node)
-            return conf
+        for disk in disks:
+            if disk.target_dev == device:
+                return disk
+        for disk in disks:
+            if disk.source_type == 'file' and disk.source_path == device:
+                return disk
 
     def get_all_disks(self):
         """Returns all the disks for a guest
@@ -347,13 +363,12 @@ class Guest(object):
 
         :param devtype: a LibvirtConfigGuestDevice subclass class
 
-        :returns: a list of LibvirtConfigGuestDevice instances
+        :returns: a list of LibvirtConfigGuestDevice instances, which may be
+                  shared with other callers and must not be modified
         """
 
         try:
-            config = vconfig.LibvirtConfigGuest()
-            config.parse_str(
-                self._domain.XMLDesc(0))
+            config = self._get_cached_config()
         except Exception:
             return []
 
@@ -924,6 +939,8 @@ class JobInfo(object):
         self.memory_normal = kwargs.get("memory_normal", 0)
         self.memory_normal_bytes = kwargs.get("memory_normal_bytes", 0)
         self.memory_bps = kwargs.get("memory_bps", 0)
+        self.memory_dirty_rate = kwargs.get("memory_dirty_rate", 0)
+        self.memory_page_size = kwargs.get("memory_page_size", 0)
         self.disk_total = kwargs.get("disk_total", 0)
         self.disk_processed = kwargs.get("disk_processed", 0)
         self.disk_remaining = kwargs.get("disk_remaining", 0)
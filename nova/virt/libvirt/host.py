@@ -90,6 +90,9 @@ class Host(object):
         self._lifecycle_event_handler = lifecycle_event_handler
         self._caps = None
         self._hostname = None
+        # NOTE: Bumped on every node device event, None if the connection
+        # does not support them.
+        self._node_device_generation = None
 
         self._wrapped_conn = None
         self._wrapped_conn_lock = threading.Lock()
@@ -177,6 +180,20 @@ class Host(object):
         if transition is not None:
             self._queue_event(virtevent.LifecycleEvent(uuid, transition))
 
+    @staticmethod
+    def _event_node_device_callback(conn, dev, event, detail, opaque):
+        """Receives node device lifecycle events from libvirt.
+
+        NB: this method is executing in a native thread, not
+        an eventlet coroutine. It can only invoke other libvirt
+        APIs, or use self._queue_event(). Any use of logging APIs
+        in particular is forbidden.
+        """
+
+        self = opaque
+        if self._node_device_generation is not None:
+            self._node_device_generation += 1
+
     def _close_callback(self, conn, reason, opaque):
         close_info = {'conn': conn, 'reason': reason}
         self._queue_event(close_info)
@@ -387,6 +404,22 @@ class Host(object):
                         " events: %(error)s",
                         {'uri': self._uri, 'error': e})
 
+        # NOTE: Events may have been missed while disconnected, so the node
+        # device information cached until now is invalidated either way.
+        generation = (self._node_device_generation or 0) + 1
+        try:
+            LOG.debug("Registering for node device events %s", self)
+            wrapped_conn.nodeDeviceEventRegisterAny(
+                None,
+                libvirt.VIR_NODE_DEVICE_EVENT_ID_LIFECYCLE,
+                self._event_node_device_callback,
+                self)
+            self._node_device_generation = generation
+        except Exception as e:
+            self._node_device_generation = None
+            LOG.debug("URI %(uri)s does not support node device events: "
+                      "%(error)s", {'uri': self._uri, 'error': e})
+
         return wrapped_conn
 
     def _queue_conn_event_handler(self, *args, **kwargs):
@@ -837,6 +870,15 @@ class Host(object):
         """
         return self.get_connection().nodeDeviceLookupByName(name)
 
+    def get_node_device_generation(self):
+        """Returns a counter increased every time the node devices change.
+
+        :returns: an integer, or None if libvirt does not send node device
+                  events, in which case changes cannot be detected
+        """
+        self.get_connection()
+        return self._node_device_generation
+
     def list_pci_devices(self, flags=0):
         """Lookup pci devices.
 
@@ -21,6 +21,7 @@ from collections import deque
 
 from lxml import etree
 from oslo_log import log as logging
+from oslo_utils import units
 
 from nova.compute import power_state
 import nova.conf
@@ -330,6 +331,151 @@ def should_switch_to_postcopy(memory_iteration, current_data_remaining,
     return False
 
 
+class MigrationProgress(object):
+    """Estimates how a live migration converges from its job info
+
+    The transfer rate and the rate at which the guest dirties its memory
+    again are taken from the job info when the hypervisor reports them,
+    and otherwise estimated from the data processed and remaining over the
+    last samples. The remaining data shrinks by the difference of both, so
+    they tell whether and when the migration can complete.
+    """
+
+    # NOTE: The job info is sampled every 500ms, so the rates are averaged
+    # over about the last 5 seconds.
+    WINDOW = 10
+
+    def __init__(self):
+        self._samples = deque(maxlen=self.WINDOW)
+        self.transfer_rate = 0
+        self.dirty_rate = 0
+        self.data_remaining = 0
+
+    def update(self, now, info):
+        """Add a sample of the job info
+
+        :param now: current time in secs since epoch
+        :param info: a nova.virt.libvirt.guest.JobInfo
+        """
+        self._samples.append((now, info.data_processed, info.data_remaining))
+        self.data_remaining = info.data_remaining
+        oldest_time, oldest_processed, oldest_remaining = self._samples[0]
+        elapsed = now - oldest_time
+
+        if info.memory_bps or info.disk_bps:
+            self.transfer_rate = info.memory_bps + info.disk_bps
+        elif elapsed > 0:
+            self.transfer_rate = (
+                (info.data_processed - oldest_processed) / elapsed)
+
+        if info.memory_dirty_rate:
+            self.dirty_rate = (info.memory_dirty_rate *
+                               (info.memory_page_size or units.Ki * 4))
+        elif elapsed > 0:
+            shrink_rate = (oldest_remaining - info.data_remaining) / elapsed
+            self.dirty_rate = max(0, self.transfer_rate - shrink_rate)
+
+    @property
+    def has_estimate(self):
+        """Whether enough samples were added to estimate the rates"""
+        return self.transfer_rate > 0
+
+    @property
+    def converging(self):
+        return self.has_estimate and self.transfer_rate > self.dirty_rate
+
+    def predicted_completion(self):
+        """Returns the estimated secs before all the data is transferred,
+        or None if the migration does not converge.
+        """
+        if not self.converging:
+            return None
+        return self.data_remaining / (self.transfer_rate - self.dirty_rate)
+
+    def required_downtime(self):
+        """Returns the downtime, in ms, needed to transfer the remaining
+        data with the guest paused, or None if it cannot be estimated yet.
+        """
+        if not self.has_estimate:
+            return None
+        return int(self.data_remaining * 1000 / self.transfer_rate)
+
+
+def should_switch_to_postcopy_adaptive(progress, memory_iteration,
+                                       migration_status, time_left=None):
+    """Determine if the migration should be switched to postcopy mode
+
+    :param progress: a MigrationProgress of the migration
+    :param memory_iteration: Number of memory iterations during the migration
+    :param migration_status: current status of the migration
+    :param time_left: secs left before the completion timeout, or None
+
+    After the first memory iteration, switch to post-copy mode when the
+    migration cannot complete within the maximum downtime: either it does
+    not converge and the data left needs a longer downtime, or it is
+    predicted to converge only after the completion timeout.
+
+    :returns: True if migration should be switched to postcopy mode,
+    False otherwise
+    """
+    if (migration_status == 'running (post-copy)' or
+            memory_iteration <= 1 or not progress.has_estimate):
+        return False
+
+    completion = progress.predicted_completion()
+    if completion is None:
+        return (progress.required_downtime() >
+                CONF.libvirt.live_migration_downtime)
+    return time_left is not None and completion > time_left
+
+
+def update_downtime_adaptive(guest, instance, olddowntime, progress):
+    """Update max downtime from the progress of the migration
+
+    :param guest: a nova.virt.libvirt.guest.Guest to set downtime for
+    :param instance: a nova.objects.Instance
+    :param olddowntime: current set downtime, or None
+    :param progress: a MigrationProgress of the migration
+
+    While the migration converges the lowest downtime step is used, as
+    the hypervisor will switch over by itself. Once it stops converging the
+    remaining data does not shrink anymore, so the downtime is raised right
+    away to what is needed to transfer it, up to the maximum downtime,
+    instead of waiting for the next downtime steps. The downtime is never
+    lowered.
+
+    Any errors hit when updating downtime will be ignored
+
+    :returns: the new downtime value
+    """
+    maxdowntime = CONF.libvirt.live_migration_downtime
+    downtime = int(maxdowntime / CONF.libvirt.live_migration_downtime_steps)
+    if not progress.converging:
+        required = progress.required_downtime()
+        if required is None:
+            return olddowntime
+        # NOTE: Leave some room for the data dirtied meanwhile
+        downtime = max(downtime, min(int(required * 1.1), maxdowntime))
+
+    if olddowntime is not None and downtime <= olddowntime:
+        return olddowntime
+
+    LOG.info("Increasing downtime to %(downtime)d ms, transferring "
+             "%(transfer)d bytes/s with %(dirty)d bytes/s dirtied and "
+             "%(remaining)d bytes remaining",
+             {"downtime": downtime, "transfer": progress.transfer_rate,
+              "dirty": progress.dirty_rate,
+              "remaining": progress.data_remaining},
+             instance=instance)
+
+    try:
+        guest.migrate_configure_max_downtime(downtime)
+    except libvirt.libvirtError as e:
+        LOG.warning("Unable to increase max downtime to %(time)d ms: %(e)s",
+                    {"time": downtime, "e": e}, instance=instance)
+    return downtime
+
+
 def update_downtime(guest, instance,
                     olddowntime,
                     downtime_steps, elapsed):
@@ -385,18 +531,33 @@ def update_downtime(guest, instance,
     return thisstep[1]
 
 
-def save_stats(instance, migration, info, remaining):
+def save_stats(instance, migration, info, remaining, progress=None):
     """Save migration stats to the database
 
     :param instance: a nova.objects.Instance
     :param migration: a nova.objects.Migration
     :param info: a nova.virt.libvirt.guest.JobInfo
     :param remaining: percentage data remaining to transfer
+    :param progress: an optional MigrationProgress of the migration
 
     Update the migration and instance objects with
     the latest available migration stats
     """
 
+    if progress is not None and progress.has_estimate:
+        completion = progress.predicted_completion()
+        LOG.debug("Migration transferring %(transfer)d bytes/s, "
+                  "%(dirty)d bytes/s dirtied, %(iteration)d memory "
+                  "iterations, predicted completion %(completion)s secs, "
+                  "required downtime %(downtime)d ms",
+                  {"transfer": progress.transfer_rate,
+                   "dirty": progress.dirty_rate,
+                   "iteration": info.memory_iteration,
+                   "completion": ('never' if completion is None
+                                  else int(completion)),
+                   "downtime": progress.required_downtime()},
+                  instance=instance)
+
     # The fully detailed stats
     migration.memory_total = info.memory_total
     migration.memory_processed = info.memory_processed
@@ -14,6 +14,10 @@
 #    License for the specific language governing permissions and limitations
 #    under the License.
 
+import collections
+import threading
+import time
+
 from eventlet import tpool
 from six.moves import urllib
 
@@ -30,13 +34,96 @@ from oslo_service import loopingcall
 from oslo_utils import excutils
 from oslo_utils import units
 
+import nova.conf
 from nova import exception
 from nova.i18n import _
 from nova import utils
 from nova.virt.libvirt import utils as libvirt_utils
 
+CONF = nova.conf.CONF
 LOG = logging.getLogger(__name__)
 
+# NOTE: Idle connections older than this are checked with a round trip to the
+# cluster before being reused, newer ones only by their local state.
+_POOL_HEALTH_CHECK_INTERVAL = 60
+
+
+class RADOSConnectionPool(object):
+    """A per-process pool of idle RADOS connections.
+
+    Connecting to a ceph cluster authenticates against and fetches the maps
+    from the monitors, which costs much more than the operations nova usually
+    does with the connection. The connections and their ioctx are kept here
+    once released, keyed by (pool, rbd user, ceph conf), so that they can be
+    reused by the following operations. At most
+    [libvirt]/rbd_connection_pool_size idle connections are kept per key,
+    the others are shut down when released.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._idle = collections.defaultdict(list)
+
+    @staticmethod
+    def _is_healthy(client, ioctx, idle_since):
+        if (getattr(client, 'state', None) != 'connected' or
+                getattr(ioctx, 'state', None) != 'open'):
+            return False
+        if time.time() - idle_since < _POOL_HEALTH_CHECK_INTERVAL:
+            return True
+        try:
+            tpool.execute(client.get_cluster_stats)
+        except rados.Error as e:
+            LOG.debug('Dropping unhealthy pooled rados connection: %s', e)
+            return False
+        return True
+
+    @staticmethod
+    def _close(client, ioctx):
+        # closing an ioctx cannot raise an exception
+        ioctx.close()
+        client.shutdown()
+
+    def get(self, key):
+        """Return a healthy idle (client, ioctx) for a key, or None."""
+        while True:
+            with self._lock:
+                idle = self._idle.get(key)
+                if not idle:
+                    return None
+                client, ioctx, idle_since = idle.pop()
+            if self._is_healthy(client, ioctx, idle_since):
+                return client, ioctx
+            self._close(client, ioctx)
+
+    def put(self, key, client, ioctx):
+        """Release a connection to the pool, closing it if the pool is full.
+        """
+        now = time.time()
+        if self._is_healthy(client, ioctx, now):
+            with self._lock:
+                idle = self._idle[key]
+                if len(idle) < CONF.libvirt.rbd_connection_pool_size:
+                    idle.append((client, ioctx, now))
+                    return
+        self._close(client, ioctx)
+
+    def clear(self):
+        """Close all of the idle connections."""
+        with self._lock:
+            idle, self._idle = self._idle, collections.defaultdict(list)
+        for connections in idle.values():
+            for client, ioctx, _idle_since in connections:
+                self._close(client, ioctx)
+
+
+_connection_pool = RADOSConnectionPool()
+
+
+def reset_connection_pool():
+    """Close the pooled connections, mainly for testing purposes."""
+    _connection_pool.clear()
+
 
 class RbdProxy(object):
     """A wrapper around rbd.RBD class instance to avoid blocking of process.
@@ -126,17 +213,24 @@ class RBDDriver(object):
         if rbd is None:
             raise RuntimeError(_('rbd python libraries not found'))
 
+    def _connection_key(self, pool=None):
+        # NOTE(luogangyi): open_ioctx >= 10.1.0 could handle unicode
+        # arguments perfectly as part of Python 3 support.
+        # Therefore, when we turn to Python 3, it's safe to remove
+        # str() conversion.
+        return str(pool or self.pool), self.rbd_user, self.ceph_conf
+
     def _connect_to_rados(self, pool=None):
+        key = self._connection_key(pool)
+        if CONF.libvirt.rbd_connection_pool_size:
+            connection = _connection_pool.get(key)
+            if connection is not None:
+                return connection
         client = rados.Rados(rados_id=self.rbd_user,
                                   conffile=self.ceph_conf)
         try:
             client.connect()
-            pool_to_open = pool or self.pool
-            # NOTE(luogangyi): open_ioctx >= 10.1.0 could handle unicode
-            # arguments perfectly as part of Python 3 support.
-            # Therefore, when we turn to Python 3, it's safe to remove
-            # str() conversion.
-            ioctx = client.open_ioctx(str(pool_to_open))
+            ioctx = client.open_ioctx(key[0])
             return client, ioctx
         except rados.Error:
             # shutdown cannot raise an exception
@@ -144,6 +238,10 @@ class RBDDriver(object):
             raise
 
     def _disconnect_from_rados(self, client, ioctx):
+        if CONF.libvirt.rbd_connection_pool_size:
+            _connection_pool.put(
+                self._connection_key(ioctx.name), client, ioctx)
+            return
         # closing an ioctx cannot raise an exception
         ioctx.close()
         client.shutdown()
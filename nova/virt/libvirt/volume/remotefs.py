@@ -322,8 +322,10 @@ class RsyncDriver(RemoteFilesystemDriver):
                       on_execute=on_execute, on_completion=on_completion)
 
     def copy_file(self, src, dst, on_execute, on_completion, compression):
-        # As far as ploop disks are in fact directories we add '-r' argument
-        args = ['rsync', '-r', '--sparse', src, dst]
+        # As far as ploop disks are in fact directories we add '-r' argument.
+        # Partially transferred files are kept so that a retried copy only
+        # transfers the missing data.
+        args = ['rsync', '-r', '--sparse', '--partial', src, dst]
         if compression:
             args.append('--compress')
         utils.execute(*args,